@@ -0,0 +1,129 @@
+"""
+Mikrobenchmark: sähkön hintadatan normalisointi.
+
+Vertaa rivikohtaista putkea (per-item -apurit) ja eränormalisointia
+(`electricity_batch`) realistisella pörssisähkö v2 -payloadilla:
+2 vrk × 96 varttia = 192 riviä, uusin ensin kuten rajapinnassa.
+
+Ajo projektin juuresta:
+    python -m benchmarks.bench_electricity_normalize
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import random
+import timeit
+from datetime import datetime, timedelta, timezone
+
+from src.api.electricity_batch import (
+    expand_hours_to_quarters,
+    hourly_means,
+    normalize_payload_15min,
+    parse_payload,
+)
+from src.api.electricity_normalize import (
+    _parse_cents_from_item,
+    _parse_ts_15min_from_item,
+)
+from src.config import TZ
+
+DAY = dt.date(2025, 11, 11)
+
+
+def make_v2_payload(start_day: dt.date = DAY, days: int = 2, seed: int = 42) -> list[dict]:
+    """Rakentaa latest-prices.json -tyyppisen listan (startDate/endDate UTC, price snt/kWh)."""
+    rng = random.Random(seed)
+    start = datetime.combine(start_day, datetime.min.time(), tzinfo=TZ).astimezone(timezone.utc)
+    items: list[dict] = []
+    for q in range(days * 96):
+        begin = start + timedelta(minutes=15 * q)
+        items.append(
+            {
+                "price": round(rng.uniform(-0.5, 25.0), 3),
+                "startDate": begin.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+                "endDate": (begin + timedelta(minutes=15)).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            }
+        )
+    items.reverse()
+    return items
+
+
+def _per_item_15min(items: list[dict], date_ymd: dt.date) -> list[dict]:
+    """Vanha rivikohtainen putki (skeema arvataan jokaiselle riville)."""
+    out_map: dict[datetime, float] = {}
+    for idx, item in enumerate(items):
+        ts = _parse_ts_15min_from_item(item, date_ymd, idx)
+        ts = ts.replace(minute=(ts.minute // 15) * 15, second=0, microsecond=0)
+        if ts.date() != date_ymd:
+            continue
+        cents = _parse_cents_from_item(item)
+        if cents is not None and ts not in out_map:
+            out_map[ts] = float(cents)
+    return [{"ts": ts, "cents": out_map[ts]} for ts in sorted(out_map)]
+
+
+def _per_item_hourly_means(items: list[dict], date_ymd: dt.date) -> dict[int, float]:
+    per_hour: dict[int, list[float]] = {}
+    for item in items:
+        ts = datetime.fromisoformat(item["startDate"].replace("Z", "+00:00")).astimezone(TZ)
+        if ts.date() == date_ymd:
+            per_hour.setdefault(ts.hour, []).append(float(item["price"]))
+    return {h: sum(v) / len(v) for h, v in per_hour.items()}
+
+
+def _per_item_expand(hourly: list[dict], date_ymd: dt.date) -> list[dict]:
+    out = []
+    for item in hourly:
+        base = datetime.combine(date_ymd, datetime.min.time()).replace(tzinfo=TZ)
+        base = base.replace(hour=int(item["hour"]))
+        out.extend(
+            {"ts": base + timedelta(minutes=15 * q), "cents": item["cents"]} for q in range(4)
+        )
+    return out
+
+
+def _bench(label: str, func, number: int) -> float:
+    best = min(timeit.repeat(func, number=number, repeat=5)) / number
+    print(f"{label:<44} {best * 1e6:10.1f} µs")
+    return best
+
+
+def main(number: int = 200) -> None:
+    payload = make_v2_payload()
+    hourly = [{"hour": h, "cents": 5.0 + h} for h in range(24)]
+
+    import numpy as np
+
+    hours = np.arange(24)
+    cents = hours + 5.0
+
+    print(f"payload: {len(payload)} riviä (2 vrk × 15 min)\n")
+    old = _bench("per-item 15 min", lambda: _per_item_15min(payload, DAY), number)
+    new = _bench("batch 15 min (arrays)", lambda: normalize_payload_15min(payload, DAY), number)
+    _bench(
+        "batch 15 min (+ to_price15)",
+        lambda: normalize_payload_15min(payload, DAY).to_price15(),
+        number,
+    )
+    print(f"{'  -> nopeutus':<44} {old / new:10.1f} ×\n")
+
+    arrays = parse_payload(payload)
+    old = _bench("per-item tuntikeskiarvot", lambda: _per_item_hourly_means(payload, DAY), number)
+    new = _bench(
+        "batch tuntikeskiarvot (parse + means)",
+        lambda: hourly_means(parse_payload(payload), DAY),
+        number,
+    )
+    _bench(
+        "batch tuntikeskiarvot (valmiista taulukoista)", lambda: hourly_means(arrays, DAY), number
+    )
+    print(f"{'  -> nopeutus':<44} {old / new:10.1f} ×\n")
+
+    old = _bench("per-item 60 -> 15 min", lambda: _per_item_expand(hourly, DAY), number)
+    new = _bench("batch 60 -> 15 min", lambda: expand_hours_to_quarters(hours, cents, DAY), number)
+    print(f"{'  -> nopeutus':<44} {old / new:10.1f} ×")
+
+
+if __name__ == "__main__":
+    main()
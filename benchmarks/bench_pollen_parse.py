@@ -0,0 +1,92 @@
+"""
+Mikrobenchmark: siitepölytiedotteen jäsennys.
+
+Aineistona arkistoidut tiedotteet (tests/fixtures/pollen/*.txt). Mitataan
+yhden läpikäynnin indeksointi, näkymien kokoaminen kaikille asemille sekä
+alias-automaatti verrattuna kasvi- ja aliaskohtaisiin sanahakuihin.
+
+Ajo projektin juuresta:
+    python -m benchmarks.bench_pollen_parse
+"""
+
+from __future__ import annotations
+
+import timeit
+from pathlib import Path
+
+from src.api.pollen import parse_pollen_text, view_from_index
+from src.api.pollen_parser import (
+    _SENTENCE_END_RE,
+    PLANT_AUTOMATON,
+    PLANTS,
+    index_bulletin,
+    normalize_text,
+)
+from src.paths import ROOT_DIR
+
+FIXTURES = ROOT_DIR / "tests" / "fixtures" / "pollen"
+
+
+def load_bulletins(folder: Path = FIXTURES) -> list[str]:
+    return [path.read_text(encoding="utf-8") for path in sorted(folder.glob("*.txt"))]
+
+
+def _naive_mentions(sections: list[str]) -> list[list[set[str]]]:
+    """Vanha tapa: lauseet erikseen, jokainen alias jokaisesta lauseesta."""
+    out = []
+    for section in sections:
+        sentences = [s for s in _SENTENCE_END_RE.split(section) if s.strip()]
+        out.append(
+            [
+                {key for key, aliases in PLANTS if any(a in s.lower() for a in aliases)}
+                for s in sentences
+            ]
+        )
+    return out
+
+
+def _bench(label: str, func, number: int) -> float:
+    best = min(timeit.repeat(func, number=number, repeat=5)) / number
+    print(f"{label:<44} {best * 1e6:10.1f} µs")
+    return best
+
+
+def main(number: int = 200) -> None:
+    bulletins = load_bulletins()
+    indexes = [index_bulletin(text) for text in bulletins]
+    stations = sorted({name for index in indexes for name in index.station_names()})
+    print(f"tiedotteita: {len(bulletins)}, asemia: {len(stations)}\n")
+
+    _bench(
+        "index_bulletin (kaikki tiedotteet)", lambda: [index_bulletin(t) for t in bulletins], number
+    )
+    _bench("parse_pollen_text, 1 asema", lambda: [parse_pollen_text(t) for t in bulletins], number)
+
+    reparse = _bench(
+        "jäsennys uudelleen jokaiselle asemalle",
+        lambda: [parse_pollen_text(t, station=s) for t in bulletins for s in stations],
+        number,
+    )
+    indexed = _bench(
+        "indeksi kerran + näkymä jokaiselle asemalle",
+        lambda: [
+            view_from_index(index, station=s)
+            for index in (index_bulletin(t) for t in bulletins)
+            for s in stations
+        ],
+        number,
+    )
+    print(f"{'  -> nopeutus':<44} {reparse / indexed:10.1f} ×\n")
+
+    sections = [normalize_text(text) for text in bulletins]
+    naive = _bench("aliakset: sanahaku per lause/kasvi", lambda: _naive_mentions(sections), number)
+    automaton = _bench(
+        "aliakset: automaatti, teksti kerralla",
+        lambda: [PLANT_AUTOMATON.scan(s) for s in sections],
+        number,
+    )
+    print(f"{'  -> suhde':<44} {naive / automaton:10.1f} ×")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Mikrobenchmark: sääkortin HTML:n renderöinti.
+
+Vertaa kolmea tilannetta viiden solun ennusteella:
+  * kylmä: välimuistit tyhjinä (jokainen solu ja ikoni renderöidään)
+  * yksi muuttunut solu (esim. tunnin vaihtuessa uusi ikoni)
+  * muuttumaton ennuste (Streamlitin tavallinen rerun)
+
+Ikonit ovat väliaikaisessa hakemistossa ~4 kt PNG-tiedostoina, kuten Forecan
+ikonit assets/foreca-kansiossa. Lopuksi verrataan dokumentin kokoa data-URI-
+ikoneilla ja sprite-viittauksilla (src.weather_sprite).
+
+Ajo projektin juuresta:
+    python -m benchmarks.bench_weather_render
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import timeit
+from pathlib import Path
+
+from PIL import Image
+
+import src.weather_icons as weather_icons
+from src.api.weather_viewmodel import point_fingerprint
+from src.ui.card_weather import clear_weather_render_cache, render_weather_html
+from src.weather_sprite import build_sprite
+
+KEYS = ("d000", "d100", "d200", "d300", "d410", "n000", "n100", "n410")
+
+
+def make_points(step: int = 3, shift: int = 0) -> list[dict]:
+    """Viisi pistettä kuten build_weather_view palauttaa (sis. tiivisteen)."""
+    points = []
+    for i in range(5):
+        offset = step * i
+        point = {
+            "label": "Nyt" if offset == 0 else f"+{offset} h",
+            "hour": (10 + offset) % 24,
+            "key": KEYS[(i + shift) % len(KEYS)],
+            "temp": 4.0 + i,
+            "pop": 10 * i,
+        }
+        points.append({**point, "fp": point_fingerprint(point)})
+    return points
+
+
+def _bench(label: str, func, number: int) -> float:
+    best = min(timeit.repeat(func, number=number, repeat=5)) / number
+    print(f"{label:<44} {best * 1e6:10.1f} µs")
+    return best
+
+
+def main(number: int = 200) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        icon_dir, static_dir = Path(tmp) / "foreca", Path(tmp) / "static"
+        icon_dir.mkdir()
+        for key in KEYS:
+            # kohinaa: PNG ei pakkaudu, ~4 kt kuten oikeat ikonit
+            Image.frombytes("RGBA", (32, 32), os.urandom(32 * 32 * 4)).save(icon_dir / f"{key}.png")
+        weather_icons.SEARCH_DIRS = [icon_dir]
+        weather_icons.SPRITE_DIR = static_dir
+        weather_icons.reset_icon_index()
+
+        points = make_points()
+        changed = [*points[:4], make_points(shift=1)[4]]
+
+        def cold() -> str:
+            clear_weather_render_cache()
+            return render_weather_html(points)
+
+        def one_changed() -> str:
+            render_weather_html(points)
+            return render_weather_html(changed)
+
+        render_weather_html(points)
+        old = _bench("kylmä (kaikki solut + ikonit)", cold, number)
+        _bench("1 muuttunut solu (+ edellinen rerun)", one_changed, number)
+        new = _bench("muuttumaton ennuste", lambda: render_weather_html(points), number)
+        print(f"{'  -> nopeutus (muuttumaton vs. kylmä)':<44} {old / new:10.1f} ×")
+
+        inline_size = len(render_weather_html(points).encode("utf-8"))
+        build_sprite({p.stem: p for p in icon_dir.glob("*.png")}, static_dir)
+        weather_icons.reset_icon_index()
+        clear_weather_render_cache()
+        sprite_size = len(render_weather_html(points).encode("utf-8"))
+        _bench("kylmä, sprite-viittaukset", cold, number)
+        print(f"{'dokumentti, data-URI-ikonit':<44} {inline_size:10d} t")
+        print(f"{'dokumentti, sprite':<44} {sprite_size:10d} t")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+"""
+Paikallinen simulaattori kaikille ulkoisille lähteille kuorma- ja viivetestejä varten.
+
+    python -m benchmarks.fake_upstream --port 8790 --latency 0.2 --jitter 0.1 \\
+        --profile api.coingecko.com:rate_limit_rate=0.3
+    FAKE_UPSTREAM=127.0.0.1:8790 streamlit run main.py
+
+HTTP-palvelin (port) vastaa CoinGeckon, CryptoComparen, pörssisähkön,
+sahkonhintatanaan.fi:n, Open-Meteon, zenquotesin, Home Assistantin REST-rajapinnan,
+Hue-sillan (v1/v2) ja siitepölytiedotteen pyyntöihin samoista tallenteista kuin
+offline-benchmarkit (benchmarks/offline.py). src.upstream_override ohjaa
+osoitteen muotoon http://host:port/<alkuperäinen isäntä>/<polku>, joten
+alkuperäinen isäntä luetaan polun ensimmäisestä osasta. HEOS CLI -protokolla
+(heos://komento -> JSON-rivi) palvellaan TCP-portissa port + 1.
+
+Home Assistant ja Hue tunnistetaan benchmarkien asetuksista (BENCH_SECRETS:
+ha.bench.invalid, hue.bench.invalid), joten kioskia ajettaessa samat arvot
+kuuluvat .streamlit/secrets.toml-tiedostoon. HA:n WebSocket-rajapintaa ei
+simuloida: sovellus käyttää vain REST-kutsuja.
+
+Viive, satunnaisvaihtelu, virheet (503 / HEOS "fail") ja 429-vastaukset
+(Retry-After) säädetään FaultProfile-oliolla, isäntäkohtaisesti tarvittaessa.
+Pyyntömäärät isännittäin: GET /_stats.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import socketserver
+import threading
+import time
+from collections import Counter
+from collections.abc import Sequence
+from dataclasses import dataclass, fields, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+import requests
+
+from benchmarks.offline import RecordedTransport, load_fixture
+from src.upstream_override import HEOS_PORT_OFFSET
+
+DEFAULT_PORT = 8790
+HEOS_HOST_KEY = "heos"  # FaultProfile- ja tilastoavain HEOS-yhteyksille
+STATS_PATH = "/_stats"
+
+
+@dataclass(frozen=True)
+class FaultProfile:
+    """Yhden isännän vasteaika ja virheet; osuudet 0–1 pyynnöistä."""
+
+    latency_s: float = 0.0
+    jitter_s: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after_s: int = 1
+
+    def delay(self, rng: random.Random) -> float:
+        if not self.jitter_s:
+            return self.latency_s
+        return max(0.0, self.latency_s + rng.uniform(-self.jitter_s, self.jitter_s))
+
+
+def parse_profile(spec: str, base: FaultProfile) -> tuple[str, FaultProfile]:
+    """Komentorivin profiili, esim. api.coingecko.com:rate_limit_rate=0.3,latency_s=1."""
+    host, sep, settings = spec.partition(":")
+    if not sep or not host:
+        raise ValueError(f"profiili muotoa isäntä:avain=arvo[,avain=arvo]: {spec!r}")
+    types = {f.name: f.type for f in fields(FaultProfile)}
+    changes: dict[str, Any] = {}
+    for item in filter(None, settings.split(",")):
+        key, _, value = item.partition("=")
+        if key not in types:
+            raise ValueError(f"tuntematon profiiliavain {key!r} ({', '.join(types)})")
+        changes[key] = int(value) if types[key] == "int" else float(value)
+    return host, replace(base, **changes)
+
+
+# ============================================================
+# HTTP
+# ============================================================
+
+
+class _HttpHandler(BaseHTTPRequestHandler):
+    server: _HttpServer
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        self._handle()
+
+    def do_POST(self) -> None:
+        self._handle()
+
+    def do_PUT(self) -> None:
+        self._handle()
+
+    def log_message(self, format: str, *args: Any) -> None:
+        return None
+
+    def _reply(self, status: int, body: bytes, content_type: str, **headers: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        upstream = self.server.upstream
+        if self.path == STATS_PATH:
+            body = json.dumps(upstream.stats()).encode("utf-8")
+            self._reply(200, body, "application/json")
+            return
+
+        # /api.coingecko.com/api/v3/simple/price?ids=... -> isäntä + alkuperäinen polku
+        host, _, rest = self.path.lstrip("/").partition("/")
+        host = host.partition("?")[0]
+        outcome = upstream.roll(host)
+        if outcome == "rate_limited":
+            profile = upstream.profile_for(host)
+            body = b'{"status":{"error_code":429,"error_message":"rate limited"}}'
+            self._reply(
+                429, body, "application/json", **{"Retry-After": str(profile.retry_after_s)}
+            )
+            return
+        if outcome == "error":
+            self._reply(503, b'{"error":"simulated outage"}', "application/json")
+            return
+        try:
+            status, body, content_type = upstream.transport.resolve(
+                self.command, f"http://{host}/{rest}"
+            )
+        except requests.ConnectionError as e:
+            self._reply(502, str(e).encode("utf-8"), "text/plain; charset=utf-8")
+            return
+        self._reply(status, body, content_type)
+
+
+class _HttpServer(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: tuple[str, int], upstream: FakeUpstream) -> None:
+        self.upstream = upstream
+        super().__init__(address, _HttpHandler)
+
+
+# ============================================================
+# HEOS CLI
+# ============================================================
+
+
+class _HeosHandler(socketserver.StreamRequestHandler):
+    server: _HeosServer
+
+    def handle(self) -> None:
+        for raw in self.rfile:
+            line = raw.decode("utf-8", errors="replace").strip()
+            if not line:
+                continue
+            reply = self.server.upstream.heos_reply(line.removeprefix("heos://"))
+            self.wfile.write(json.dumps(reply, ensure_ascii=False).encode("utf-8") + b"\r\n")
+            self.wfile.flush()
+
+
+class _HeosServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: tuple[str, int], upstream: FakeUpstream) -> None:
+        self.upstream = upstream
+        super().__init__(address, _HeosHandler)
+
+
+# ============================================================
+# SIMULAATTORI
+# ============================================================
+
+
+class FakeUpstream:
+    """
+    HTTP- ja HEOS-palvelimet taustasäikeissä.
+
+        with FakeUpstream(FaultProfile(latency_s=0.05)).start() as fake:
+            os.environ["FAKE_UPSTREAM"] = fake.address
+    """
+
+    def __init__(
+        self,
+        default: FaultProfile | None = None,
+        profiles: dict[str, FaultProfile] | None = None,
+        seed: int | None = None,
+    ) -> None:
+        self.default = default or FaultProfile()
+        self.profiles = dict(profiles or {})
+        self.transport = RecordedTransport()
+        self.heos_responses: dict[str, dict] = load_fixture("heos_responses.json")
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._counts: Counter[tuple[str, str]] = Counter()
+        self._servers: list[socketserver.BaseServer] = []
+        self.host = "127.0.0.1"
+        self.port = 0
+
+    # --- käynnistys ---
+
+    def start(self, port: int = 0, bind: str = "127.0.0.1", attempts: int = 20) -> FakeUpstream:
+        """port=0: vapaa portti; HEOS tarvitsee myös portin port + 1, joten yritetään uudelleen."""
+        for _ in range(attempts):
+            http = _HttpServer((bind, port), self)
+            try:
+                heos = _HeosServer((bind, http.server_address[1] + HEOS_PORT_OFFSET), self)
+            except OSError:
+                http.server_close()
+                if port:
+                    raise
+                continue
+            break
+        else:
+            raise OSError("simulaattorille ei löytynyt kahta peräkkäistä vapaata porttia")
+        self.host, self.port = bind, http.server_address[1]
+        self._servers = [http, heos]
+        for server in self._servers:
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        self._servers = []
+
+    def __enter__(self) -> FakeUpstream:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+    @property
+    def address(self) -> str:
+        """FAKE_UPSTREAM-ympäristömuuttujan arvo."""
+        return f"{self.host}:{self.port}"
+
+    @property
+    def heos_port(self) -> int:
+        return self.port + HEOS_PORT_OFFSET
+
+    # --- viat ja tilastot ---
+
+    def profile_for(self, host: str) -> FaultProfile:
+        return self.profiles.get(host, self.default)
+
+    def roll(self, host: str) -> str:
+        """Odottaa profiilin viiveen; palauttaa "ok", "error" tai "rate_limited"."""
+        profile = self.profile_for(host)
+        with self._lock:
+            delay = profile.delay(self._rng)
+            draw = self._rng.random()
+        if delay:
+            time.sleep(delay)
+        if draw < profile.rate_limit_rate:
+            outcome = "rate_limited"
+        elif draw < profile.rate_limit_rate + profile.error_rate:
+            outcome = "error"
+        else:
+            outcome = "ok"
+        with self._lock:
+            self._counts[(host, "requests")] += 1
+            if outcome != "ok":
+                self._counts[(host, outcome)] += 1
+        return outcome
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """{isäntä: {"requests": n, "error": n, "rate_limited": n}}"""
+        with self._lock:
+            counts = dict(self._counts)
+        out: dict[str, dict[str, int]] = {}
+        for (host, kind), n in sorted(counts.items()):
+            out.setdefault(host, {"requests": 0, "error": 0, "rate_limited": 0})[kind] = n
+        return out
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+    # --- HEOS ---
+
+    def heos_reply(self, line: str) -> dict[str, Any]:
+        """Komento (player/get_play_state?pid=1) -> tallennettu vastaus tai yleinen onnistuminen."""
+        command, _, query = line.partition("?")
+        # HEOS ei tunne HTTP-virheitä: 429 ja 503 näkyvät "fail"-tuloksena
+        if self.roll(HEOS_HOST_KEY) != "ok":
+            return {
+                "heos": {
+                    "command": command,
+                    "result": "fail",
+                    "message": "eid=13&text=Processing previous command",
+                }
+            }
+        recorded = self.heos_responses.get(command)
+        if recorded is None:
+            return {"heos": {"command": command, "result": "success", "message": query}}
+        return recorded
+
+
+# ============================================================
+# KOMENTORIVI
+# ============================================================
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="HTTP; HEOS = port + 1")
+    parser.add_argument("--bind", default="127.0.0.1")
+    parser.add_argument("--latency", type=float, default=0.0, help="sekuntia / pyyntö")
+    parser.add_argument("--jitter", type=float, default=0.0, help="± sekuntia")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503-osuus (0–1)")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="429-osuus (0–1)")
+    parser.add_argument("--retry-after", type=int, default=1, help="429:n Retry-After (s)")
+    parser.add_argument(
+        "--profile",
+        action="append",
+        default=[],
+        metavar="ISÄNTÄ:AVAIN=ARVO",
+        help="isäntäkohtainen profiili, esim. api.coingecko.com:rate_limit_rate=0.3 "
+        f"(HEOS: {HEOS_HOST_KEY}:latency_s=0.5)",
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    default = FaultProfile(
+        latency_s=args.latency,
+        jitter_s=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after_s=args.retry_after,
+    )
+    try:
+        profiles = dict(parse_profile(spec, default) for spec in args.profile)
+    except ValueError as e:
+        parser.error(str(e))
+    fake = FakeUpstream(default, profiles, seed=args.seed).start(args.port, args.bind)
+    print(f"simulaattori: http://{fake.address}  HEOS: {fake.host}:{fake.heos_port}")
+    print(f"  FAKE_UPSTREAM={fake.address} streamlit run main.py")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fake.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,231 @@
+"""
+Kuormaskripti: N kioski-istuntoa renderöi koko sivun samassa prosessissa
+simulaattoria (benchmarks/fake_upstream.py) vasten.
+
+    python -m benchmarks.load_driver --sessions 10 --duration 60 --interval 5
+    python -m benchmarks.load_driver --upstream 127.0.0.1:8790   # erillinen simulaattori
+
+Jokainen istunto on oma säikeensä, jolla on oma session_state; välimuistit
+(st.cache_data, tiedostovälimuistit, HA:n yhdistetyt päivitykset) ovat yhteiset
+kuten Streamlit-palvelimella. Streamlit on korvattu tyngällä (benchmarks/offline.py),
+mutta HTTP- ja HEOS-liikenne kulkee oikeasti simulaattorin kautta
+(FAKE_UPSTREAM), joten viiveet, virheet ja 429-vastaukset näkyvät
+renderöintiajoissa. Tuloksena renderöintien p50/p95/max ja pyynnöt isännittäin.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import threading
+import time
+from collections.abc import Iterator, MutableMapping, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import pytest
+import requests
+
+from benchmarks.fake_upstream import STATS_PATH, FakeUpstream, FaultProfile
+from benchmarks.offline import StubStreamlit, offline_dashboard, quiet_logs
+from src.upstream_override import FAKE_UPSTREAM_ENV
+
+
+class SessionState(MutableMapping[str, Any]):
+    """st.session_state säiekohtaisesti: jokainen säie on oma selainistuntonsa."""
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+
+    @property
+    def _data(self) -> dict[str, Any]:
+        data = getattr(self._local, "data", None)
+        if data is None:
+            data = self._local.data = {}
+        return data
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._data[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        del self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    # st.session_state tukee myös attribuuttimuotoa (st.session_state.foo)
+    def __getattr__(self, key: str) -> Any:
+        try:
+            return self._data[key]
+        except KeyError:
+            raise AttributeError(key) from None
+
+    def __setattr__(self, key: str, value: Any) -> None:
+        if key == "_local":
+            object.__setattr__(self, key, value)
+        else:
+            self._data[key] = value
+
+
+@dataclass(frozen=True)
+class LoadReport:
+    sessions: int
+    duration_s: float
+    renders: int
+    failures: int
+    p50_ms: float
+    p95_ms: float
+    max_ms: float
+    upstream: dict[str, dict[str, int]]
+
+    def format(self) -> str:
+        lines = [
+            f"istuntoja {self.sessions}, {self.duration_s:.0f} s: "
+            f"{self.renders} renderöintiä, {self.failures} epäonnistui",
+            f"renderöinti p50 {self.p50_ms:.1f} ms  p95 {self.p95_ms:.1f} ms  "
+            f"max {self.max_ms:.1f} ms",
+            f"{'isäntä':<32} {'pyynnöt':>8} {'503':>6} {'429':>6}",
+        ]
+        for host, counts in self.upstream.items():
+            lines.append(
+                f"{host:<32} {counts['requests']:>8} {counts['error']:>6} "
+                f"{counts['rate_limited']:>6}"
+            )
+        return "\n".join(lines)
+
+
+def _p95(values: list[float]) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=20, method="inclusive")[-1]
+
+
+def _fetch_stats(address: str) -> dict[str, dict[str, int]]:
+    resp = requests.get(f"http://{address}{STATS_PATH}", timeout=5)
+    resp.raise_for_status()
+    return resp.json()
+
+
+def run_load(
+    sessions: int = 5,
+    duration_s: float = 30.0,
+    interval_s: float = 5.0,
+    heos: bool = True,
+    fault: FaultProfile | None = None,
+    upstream_address: str | None = None,
+) -> LoadReport:
+    """
+    Ajaa istunnot loppuun ja palauttaa yhteenvedon. upstream_address=None
+    käynnistää simulaattorin tähän prosessiin (fault-profiililla).
+    """
+    import main
+    from src.ui.registry import load_card
+
+    quiet_logs()
+    card_heos = load_card("card_heos") if heos else None
+    fake = None
+    if upstream_address is None:
+        fake = FakeUpstream(fault).start()
+        upstream_address = fake.address
+
+    stub = StubStreamlit(session_state=SessionState())
+    times: list[float] = []
+    failures = [0]
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration_s
+
+    def session(index: int) -> None:
+        # istunnot porrastetaan, kuten eri aikaan avatut kioskit
+        time.sleep(interval_s * index / sessions)
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                main.main()
+                if card_heos is not None:
+                    card_heos()
+                ok = True
+            except (Exception, SystemExit):  # main() kutsuu sys.exit(1) virheestä
+                ok = False
+            elapsed = time.perf_counter() - started
+            with lock:
+                times.append(elapsed)
+                failures[0] += 0 if ok else 1
+            time.sleep(max(0.0, interval_s - elapsed))
+
+    try:
+        with (
+            pytest.MonkeyPatch.context() as mp,
+            offline_dashboard(record=False, stub=stub),
+        ):
+            mp.setenv(FAKE_UPSTREAM_ENV, upstream_address)
+            started = time.monotonic()
+            threads = [
+                threading.Thread(target=session, args=(i,), name=f"kiosk-{i}", daemon=True)
+                for i in range(sessions)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            wall = time.monotonic() - started
+            upstream = fake.stats() if fake is not None else _fetch_stats(upstream_address)
+    finally:
+        if fake is not None:
+            fake.stop()
+
+    ms = [t * 1e3 for t in times]
+    return LoadReport(
+        sessions=sessions,
+        duration_s=wall,
+        renders=len(ms),
+        failures=failures[0],
+        p50_ms=statistics.median(ms) if ms else 0.0,
+        p95_ms=_p95(ms),
+        max_ms=max(ms, default=0.0),
+        upstream=upstream,
+    )
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Kioski-istuntojen kuormaskripti")
+    parser.add_argument("--sessions", type=int, default=5)
+    parser.add_argument("--duration", type=float, default=30.0, help="sekuntia")
+    parser.add_argument("--interval", type=float, default=5.0, help="renderöintiväli / istunto")
+    parser.add_argument("--no-heos", action="store_true", help="ilman HEOS-korttia")
+    parser.add_argument("--upstream", default=None, help="erillinen simulaattori host:port")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--json", action="store_true", help="tulos JSON-muodossa")
+    args = parser.parse_args(argv)
+
+    report = run_load(
+        sessions=args.sessions,
+        duration_s=args.duration,
+        interval_s=args.interval,
+        heos=not args.no_heos,
+        fault=FaultProfile(
+            latency_s=args.latency,
+            jitter_s=args.jitter,
+            error_rate=args.error_rate,
+            rate_limit_rate=args.rate_limit_rate,
+        ),
+        upstream_address=args.upstream,
+    )
+    if args.json:
+        print(json.dumps(report.__dict__, indent=2))
+    else:
+        print(report.format())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,425 @@
+"""
+Offline-ympäristö benchmarkeille: tallennetut vastaukset ja Streamlit-tynkä.
+
+    with offline_dashboard() as env:
+        main.main()                      # koko sivu ilman verkkoa ja palvelinta
+        env.transport.unmatched          # [] -> kaikki pyynnöt osuivat fixtureihin
+
+RecordedTransport on yhteisen async-asiakkaan kuljetuskerros
+(async_http.set_transport), joten kaikki HTTP-kutsut (http_get_json, HA, Hue,
+siitepöly) palautetaan benchmarks/fixtures-kansion tallenteista. Samaa resolve()-hakua käyttää
+paikallinen simulaattori (benchmarks/fake_upstream.py). Tuntematon osoite nostaa
+ConnectionErrorin eikä koskaan mene verkkoon.
+
+Aikasidonnaiset tallenteet (hinnat, ennuste, kurssihistoria) siirretään
+ajohetkeen, jotta kortit näyttävät saman datan kuin tallennushetkellä:
+pörssisähkön "tänään" on aina tämä päivä jne.
+"""
+
+from __future__ import annotations
+
+import importlib
+import json
+import sys
+import tempfile
+from collections import Counter
+from collections.abc import Callable, Iterator, MutableMapping
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+import httpx
+import pytest
+import requests
+import streamlit as st
+
+from src.api import async_http
+from src.config import TZ
+from src.paths import ROOT_DIR
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+POLLEN_FIXTURE = ROOT_DIR / "tests" / "fixtures" / "pollen" / "2026-05-03_teksti.txt"
+
+# tallenteiden päivä (rebase siirtää päiväsidonnaiset ajohetkeen)
+RECORDED_DAY = date(2026, 5, 3)
+
+BENCH_SECRETS: dict[str, Any] = {
+    "home_assistant": {
+        "base_url": "http://ha.bench.invalid:8123",
+        "token": "bench-token",
+        "eqe_soc_entity": "sensor.eqe_state_of_charge",
+        "eqe_range_entity": "sensor.eqe_range_electric",
+        "eqe_charging_entity": "sensor.eqe_charging_status",
+        "eqe_lock_entity": "lock.eqe_lock",
+        "eqe_lock_status_entity": "sensor.eqe_lock",
+        "eqe_preclimate_entity": "switch.eqe_pre_entry_climate_control",
+        "eqe_charging_power_entity": "sensor.eqe_charging_power",
+        "eqe_charging_switch_entity": "switch.eqe_charging",
+    },
+    "hue": {
+        "bridge_host": "hue.bench.invalid",
+        "bridge_user": "bench-user",
+        "v2_app_key": "bench-key",
+    },
+}
+
+
+def load_fixture(name: str) -> Any:
+    return json.loads((FIXTURES / name).read_text(encoding="utf-8"))
+
+
+def load_pollen_bulletin() -> str:
+    return POLLEN_FIXTURE.read_text(encoding="utf-8")
+
+
+# ============================================================
+# AJOHETKEEN SIIRTO
+# ============================================================
+
+
+def _day_shift(today: date | None = None) -> timedelta:
+    return timedelta(days=((today or datetime.now(TZ).date()) - RECORDED_DAY).days)
+
+
+def rebase_market_chart(payload: dict, now: datetime | None = None) -> dict:
+    """CoinGecko market_chart: viimeinen piste = nyt."""
+    end_ms = int((now or datetime.now(timezone.utc)).timestamp() * 1000)
+    shift = end_ms - payload["prices"][-1][0]
+    return {
+        key: [[ts + shift, value] for ts, value in rows]
+        for key, rows in payload.items()
+        if isinstance(rows, list)
+    }
+
+
+def rebase_histohour(payload: dict, now: datetime | None = None) -> dict:
+    """CryptoCompare histohour: viimeinen tunti = kuluva tunti."""
+    rows = payload["Data"]["Data"]
+    end = int((now or datetime.now(timezone.utc)).timestamp()) // 3600 * 3600
+    shift = end - rows[-1]["time"]
+    shifted = [{**row, "time": row["time"] + shift} for row in rows]
+    data = {**payload["Data"], "Data": shifted}
+    data.update(TimeFrom=shifted[0]["time"], TimeTo=shifted[-1]["time"])
+    return {**payload, "Data": data}
+
+
+def _shift_iso(value: str, shift: timedelta) -> str:
+    if value.endswith("Z"):
+        moved = datetime.fromisoformat(value.replace("Z", "+00:00")) + shift
+        return moved.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+    if "T" in value:
+        fmt = "%Y-%m-%dT%H:%M"
+        return (datetime.strptime(value, fmt) + shift).strftime(fmt)
+    return (date.fromisoformat(value) + shift).isoformat()
+
+
+def rebase_prices(payload: dict, today: date | None = None) -> dict:
+    """Pörssisähkö v2: tallennuspäivä = tänään (ja huominen huomenna)."""
+    shift = _day_shift(today)
+    return {
+        "prices": [
+            {
+                **item,
+                "startDate": _shift_iso(item["startDate"], shift),
+                "endDate": _shift_iso(item["endDate"], shift),
+            }
+            for item in payload["prices"]
+        ]
+    }
+
+
+def rebase_open_meteo(payload: dict, today: date | None = None) -> dict:
+    """Open-Meteo: paikalliset ajat (YYYY-MM-DDTHH:MM / YYYY-MM-DD) päivinä eteenpäin."""
+    shift = _day_shift(today)
+    out = dict(payload)
+    for block in ("hourly", "daily"):
+        if block not in payload:
+            continue
+        out[block] = {
+            key: [_shift_iso(v, shift) for v in values]
+            if key in ("time", "sunrise", "sunset")
+            else values
+            for key, values in payload[block].items()
+        }
+    if "current" in payload:
+        out["current"] = {
+            **payload["current"],
+            "time": _shift_iso(payload["current"]["time"], shift),
+        }
+    return out
+
+
+def rebase_day_prices(payload: list[dict], day: date) -> list[dict]:
+    """sahkonhintatanaan.fi v1: päivän tunnit pyydetylle päivälle (päivä tulee polusta)."""
+    shift = timedelta(days=(day - RECORDED_DAY).days)
+
+    def moved(value: str) -> str:
+        return (datetime.fromisoformat(value) + shift).isoformat()
+
+    return [
+        {**item, "time_start": moved(item["time_start"]), "time_end": moved(item["time_end"])}
+        for item in payload
+    ]
+
+
+# ============================================================
+# TALLENNETUT VASTAUKSET
+# ============================================================
+
+
+@dataclass(frozen=True)
+class Route:
+    host: str
+    path: str  # polun alku
+    fixture: str
+    query: str = ""  # pakollinen osamerkkijono kyselyssä (Open-Meteo: ennuste vs. varoitukset)
+    rebase: Callable[[Any], Any] | None = None
+
+
+ROUTES: tuple[Route, ...] = (
+    Route("api.coingecko.com", "/api/v3/simple/price", "coingecko_simple_price.json"),
+    Route(
+        "api.coingecko.com",
+        "/api/v3/coins/bitcoin/market_chart",
+        "coingecko_market_chart_btc.json",
+        rebase=rebase_market_chart,
+    ),
+    Route(
+        "api.coingecko.com",
+        "/api/v3/coins/ethereum/market_chart",
+        "coingecko_market_chart_eth.json",
+        rebase=rebase_market_chart,
+    ),
+    Route("api.coingecko.com", "/api/v3/coins/bitcoin", "coingecko_coin_bitcoin.json"),
+    Route("api.coingecko.com", "/api/v3/coins/ethereum", "coingecko_coin_ethereum.json"),
+    Route(
+        "min-api.cryptocompare.com",
+        "/data/v2/histohour",
+        "cryptocompare_histohour.json",
+        rebase=rebase_histohour,
+    ),
+    Route(
+        "api.porssisahko.net",
+        "/v2/latest-prices.json",
+        "porssisahko_latest.json",
+        rebase=rebase_prices,
+    ),
+    Route(
+        "api.open-meteo.com",
+        "/v1/forecast",
+        "open_meteo_forecast.json",
+        query="hourly=",
+        rebase=rebase_open_meteo,
+    ),
+    Route("api.open-meteo.com", "/v1/forecast", "open_meteo_alerts.json", rebase=rebase_open_meteo),
+    Route("zenquotes.io", "/api/today", "zenquotes_today.json"),
+    Route("hue.bench.invalid", "/clip/v2/resource/device", "hue_v2_device.json"),
+    Route("hue.bench.invalid", "/clip/v2/resource/contact", "hue_v2_contact.json"),
+    Route("hue.bench.invalid", "/api/bench-user/sensors", "hue_v1_sensors.json"),
+)
+
+HA_HOST = urlsplit(BENCH_SECRETS["home_assistant"]["base_url"]).hostname
+POLLEN_HOST = "siirto.siitepoly.fi"
+DAY_PRICES_HOST = "www.sahkonhintatanaan.fi"
+
+
+class RecordedTransport(httpx.AsyncBaseTransport):
+    """httpx-kuljetus: rungot rakennetaan kerran, vastaukset tallenteista."""
+
+    def __init__(self, routes: tuple[Route, ...] = ROUTES) -> None:
+        self.routes = routes
+        self.requests: Counter[str] = Counter()
+        self.unmatched: list[str] = []
+        self._bodies: dict[str, bytes] = {}
+        self._ha_states: dict[str, Any] = load_fixture("ha_states.json")
+        self._day_prices: list[dict] = load_fixture("sahkonhintatanaan_prices.json")
+
+    def _body(self, route: Route) -> bytes:
+        body = self._bodies.get(route.fixture)
+        if body is None:
+            payload = load_fixture(route.fixture)
+            if route.rebase is not None:
+                payload = route.rebase(payload)
+            body = self._bodies[route.fixture] = json.dumps(payload).encode("utf-8")
+        return body
+
+    def resolve(self, method: str, url: str) -> tuple[int, bytes, str]:
+        """(status, runko, content-type); ConnectionError, jos tallennetta ei ole."""
+        parts = urlsplit(url)
+        host, path = parts.hostname or "", parts.path
+        if host == HA_HOST and path.startswith("/api/states/"):
+            state = self._ha_states.get(path.removeprefix("/api/states/"))
+            if state is None:
+                return 404, b'{"message":"Entity not found."}', "application/json"
+            return 200, json.dumps(state).encode("utf-8"), "application/json"
+        if host == HA_HOST and method == "POST" and path.startswith("/api/services/"):
+            return 200, b"[]", "application/json"
+        if host == POLLEN_HOST:
+            return 200, POLLEN_FIXTURE.read_bytes(), "text/plain; charset=utf-8"
+        if host == DAY_PRICES_HOST and path.startswith("/api/v1/prices/"):
+            # /api/v1/prices/2026/05-03.json
+            year, _, rest = path.removeprefix("/api/v1/prices/").partition("/")
+            try:
+                day = date.fromisoformat(f"{year}-{rest.removesuffix('.json')}")
+            except ValueError:
+                return 404, b"[]", "application/json"
+            body = json.dumps(rebase_day_prices(self._day_prices, day)).encode("utf-8")
+            return 200, body, "application/json"
+        for route in self.routes:
+            if host == route.host and path.startswith(route.path) and route.query in parts.query:
+                return 200, self._body(route), "application/json"
+        self.unmatched.append(url)
+        raise requests.ConnectionError(f"offline-benchmark: ei tallennetta osoitteelle {url}")
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        self.requests[request.url.host or url] += 1
+        status, body, content_type = self.resolve(request.method, url)
+        return httpx.Response(
+            status, content=body, headers={"Content-Type": content_type}, request=request
+        )
+
+
+# ============================================================
+# STREAMLIT-TYNKÄ
+# ============================================================
+
+
+class _Block:
+    """st.columns/st.container -lohko: kontekstinhallinta, joka nielee kaiken."""
+
+    def __enter__(self) -> _Block:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+
+@dataclass
+class StubStreamlit:
+    """Laskee renderöidyt elementit; palauttaa painikkeille False."""
+
+    calls: Counter[str] = field(default_factory=Counter)
+    session_state: MutableMapping[str, Any] = field(default_factory=dict)
+    query_params: dict[str, str] = field(default_factory=dict)
+
+    def element(self, kind: str) -> Callable[..., None]:
+        def render(*args: Any, **kwargs: Any) -> None:
+            self.calls[kind] += 1
+
+        return render
+
+    def widget(self, kind: str) -> Callable[..., Any]:
+        def render(*args: Any, value: Any = False, **kwargs: Any) -> Any:
+            self.calls[kind] += 1
+            return value
+
+        return render
+
+    def columns(self, spec: Any, **kwargs: Any) -> list[_Block]:
+        self.calls["columns"] += 1
+        return [_Block() for _ in range(spec if isinstance(spec, int) else len(spec))]
+
+
+_ELEMENTS = ("markdown", "caption", "info", "error", "warning", "plotly_chart", "set_page_config")
+_HTML_MODULES = ("src.ui.card_system", "src.ui.card_weather", "src.ui.card_eqe")
+
+
+def stub_streamlit(mp: pytest.MonkeyPatch, stub: StubStreamlit) -> None:
+    """Korvaa korttien käyttämät st-funktiot; components.html patchataan kortteihin."""
+    for name in _ELEMENTS:
+        mp.setattr(st, name, stub.element(name))
+    mp.setattr(st, "button", stub.widget("button"))
+    mp.setattr(st, "toggle", stub.widget("toggle"))
+    mp.setattr(st, "rerun", stub.element("rerun"))
+    mp.setattr(st, "columns", stub.columns)
+    mp.setattr(st, "container", lambda *a, **k: _Block())
+    mp.setattr(st, "session_state", stub.session_state)
+    mp.setattr(st, "query_params", stub.query_params)
+    mp.setattr(st, "secrets", BENCH_SECRETS)
+    for module_name in _HTML_MODULES:
+        mp.setattr(importlib.import_module(module_name), "st_html", stub.element("html"))
+
+
+def _redirect_file_caches(mp: pytest.MonkeyPatch, folder: Path) -> None:
+    """*_CACHE_FILE-polut väliaikaishakemistoon, ettei data/-kansio muutu."""
+    import src.metrics
+
+    for module_name, module in list(sys.modules.items()):
+        if not module_name.startswith("src.") or module is None:
+            continue
+        for attr, value in list(vars(module).items()):
+            if attr.endswith("_CACHE_FILE") and isinstance(value, Path):
+                mp.setattr(module, attr, folder / value.name)
+    mp.setattr(src.metrics, "METRICS_FILE", folder / "metrics.prom")
+
+
+# ============================================================
+# YHDISTELMÄ
+# ============================================================
+
+
+def quiet_logs() -> None:
+    """Hiljentää bare mode -varoitukset ja sovelluksen INFO-lokit mittausten ajaksi."""
+    import logging
+
+    from streamlit import config
+    from streamlit.logger import set_log_level
+
+    import main  # noqa: F401 (setup_logging ajetaan importissa)
+
+    # bare mode -varoitukset ("No runtime found") jokaisesta välimuistikutsusta
+    config.set_option("logger.level", "error")
+    set_log_level("error")
+    logging.getLogger("homedashboard").setLevel(logging.WARNING)
+
+
+@dataclass
+class OfflineEnv:
+    transport: RecordedTransport
+    st: StubStreamlit
+    tmp: Path
+
+
+def clear_caches() -> None:
+    """Tyhjentää st.cache_data:n ja moduulien omat välimuistit (kylmä renderöinti)."""
+    from src.api import home_assistant, pollen, weather_fetch
+
+    st.cache_data.clear()
+    weather_fetch.clear_forecast_cache()
+    pollen._FILE_MEMO.update(key=None, payload=None)
+    home_assistant.reset_eqe_refresh()
+
+
+@contextmanager
+def offline_dashboard(
+    record: bool = True,
+    stub: StubStreamlit | None = None,
+) -> Iterator[OfflineEnv]:
+    """
+    Tallenteet + Streamlit-tynkä + väliaikaiset tiedostovälimuistit. Kaikki
+    korttimoduulit ladataan ensin, jotta niiden *_CACHE_FILE-polut ohjautuvat.
+    record=False jättää HTTP:n ennalleen (kuormaskripti: FAKE_UPSTREAM-simulaattori).
+    """
+    from src.ui.registry import CARD_MODULES, load_card
+
+    for name in CARD_MODULES:
+        load_card(name)
+
+    transport = RecordedTransport()
+    stub = stub or StubStreamlit()
+    with tempfile.TemporaryDirectory() as tmp, pytest.MonkeyPatch.context() as mp:
+        if record:
+            async_http.set_transport(transport)
+        stub_streamlit(mp, stub)
+        _redirect_file_caches(mp, Path(tmp))
+        clear_caches()
+        try:
+            yield OfflineEnv(transport=transport, st=stub, tmp=Path(tmp))
+        finally:
+            clear_caches()
+            if record:
+                async_http.set_transport(None)
@@ -0,0 +1,486 @@
+"""
+Offline-benchmarkit korteittain ja koko sivulle tallennetuilla vastauksilla.
+
+Jokainen kortti on pilkottu vaiheisiin (jäsennys, normalisointi, näkymämalli,
+kuvaaja/HTML) ja lisäksi mitataan kortin kylmä renderöinti sekä koko sivun
+main() kylmänä ja välimuistit lämpiminä. Verkkoa ei käytetä: vastaukset
+tulevat benchmarks/fixtures-kansiosta (ks. benchmarks.offline) ja Streamlit
+on korvattu tyngällä.
+
+Ajo projektin juuresta:
+    python -m benchmarks.suite                       # kaikki tapaukset
+    python -m benchmarks.suite -k weather            # nimen osalla
+    python -m benchmarks.suite --save                # benchmarks/results/<commit>.json
+    python -m benchmarks.suite --compare a1b2c3d     # vertaa tallennettuun
+    python -m benchmarks.suite --compare a1b2c3d e4f5a6b
+
+Tulokset ovat konekohtaisia: vertaa vain saman laitteen (esim. kioskin
+Raspberry Pi) ajoja keskenään.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import timeit
+from collections.abc import Callable, Iterable
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from benchmarks.offline import (
+    BENCH_SECRETS,
+    OfflineEnv,
+    clear_caches,
+    load_fixture,
+    load_pollen_bulletin,
+    offline_dashboard,
+    quiet_logs,
+    rebase_histohour,
+    rebase_market_chart,
+    rebase_open_meteo,
+    rebase_prices,
+)
+from src.config import TZ
+from src.paths import ROOT_DIR
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+# hidastuminen, joka merkitään vertailussa regressioksi
+REGRESSION_RATIO = 1.10
+
+Setup = Callable[[OfflineEnv], Callable[[], Any]]
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    setup: Setup
+    number: int
+
+
+@dataclass(frozen=True)
+class CaseResult:
+    best_ms: float
+    median_ms: float
+    number: int
+    repeat: int
+
+
+CASES: dict[str, Case] = {}
+
+
+def case(name: str, number: int = 200) -> Callable[[Setup], Setup]:
+    """Rekisteröi tapauksen; setup(env) palauttaa mitattavan funktion."""
+
+    def register(setup: Setup) -> Setup:
+        CASES[name] = Case(name, setup, number)
+        return setup
+
+    return register
+
+
+# ============================================================
+# BITCOIN (CoinGecko, CryptoCompare)
+# ============================================================
+
+
+@case("bitcoin.parse")
+def _bitcoin_parse(env: OfflineEnv) -> Callable[[], Any]:
+    from src.api.bitcoin import _extract_coingecko_prices, _extract_cryptocompare_prices
+
+    chart = rebase_market_chart(load_fixture("coingecko_market_chart_btc.json"))
+    hourly = rebase_histohour(load_fixture("cryptocompare_histohour.json"))
+    return lambda: (_extract_coingecko_prices(chart), _extract_cryptocompare_prices(hourly))
+
+
+@case("bitcoin.normalize")
+def _bitcoin_normalize(env: OfflineEnv) -> Callable[[], Any]:
+    from src.api.bitcoin import _extract_coingecko_prices, _to_dashboard_from_ms
+
+    prices = _extract_coingecko_prices(
+        rebase_market_chart(load_fixture("coingecko_market_chart_btc.json"))
+    )
+    return lambda: _to_dashboard_from_ms(prices, 30)
+
+
+@case("bitcoin.figure", number=20)
+def _bitcoin_figure(env: OfflineEnv) -> Callable[[], Any]:
+    from src.api.bitcoin import _extract_coingecko_prices, _to_dashboard_from_ms
+    from src.ui.card_bitcoin_parts import build_btc_figure
+
+    def series(name: str) -> list:
+        prices = _extract_coingecko_prices(rebase_market_chart(load_fixture(name)))
+        return _to_dashboard_from_ms(prices, 7)
+
+    btc, eth = series("coingecko_market_chart_btc.json"), series("coingecko_market_chart_eth.json")
+    market = load_fixture("coingecko_coin_bitcoin.json")["market_data"]
+    ath, ath_date = market["ath"]["eur"], market["ath_date"]["eur"]
+    scale = btc[-1][1] / eth[-1][1]
+    return lambda: build_btc_figure(btc, "7d", ath, ath_date, eth_series=eth, eth_scale=scale)
+
+
+# ============================================================
+# SÄHKÖN HINTA (pörssisähkö v2)
+# ============================================================
+
+
+@case("prices.parse")
+def _prices_parse(env: OfflineEnv) -> Callable[[], Any]:
+    from src.api.electricity_batch import parse_payload
+
+    items = rebase_prices(load_fixture("porssisahko_latest.json"))["prices"]
+    return lambda: parse_payload(items)
+
+
+@case("prices.normalize")
+def _prices_normalize(env: OfflineEnv) -> Callable[[], Any]:
+    from src.api.electricity_batch import normalize_payload_15min
+
+    items = rebase_prices(load_fixture("porssisahko_latest.json"))["prices"]
+    today = datetime.now(TZ).date()
+    return lambda: normalize_payload_15min(items, today).to_price15()
+
+
+@case("prices.viewmodel", number=50)
+def _prices_viewmodel(env: OfflineEnv) -> Callable[[], Any]:
+    from src.api.prices_15min_vm import build_prices_15min_vm
+
+    def run() -> Any:
+        clear_caches()  # haku tallenteesta + jäsennys + näkymämalli
+        return build_prices_15min_vm(now_dt=datetime.now(TZ))
+
+    return run
+
+
+# ============================================================
+# SÄÄ (Open-Meteo)
+# ============================================================
+
+
+@case("weather.parse")
+def _weather_parse(env: OfflineEnv) -> Callable[[], Any]:
+    from src.api.weather_hourly import parse_hourly
+
+    hourly = rebase_open_meteo(load_fixture("open_meteo_forecast.json"))["hourly"]
+    return lambda: parse_hourly(hourly)
+
+
+@case("weather.viewmodel", number=50)
+def _weather_viewmodel(env: OfflineEnv) -> Callable[[], Any]:
+    from src.api.weather_viewmodel import build_weather_view
+
+    def run() -> Any:
+        clear_caches()
+        return build_weather_view("3 h")
+
+    return run
+
+
+@case("weather.render", number=50)
+def _weather_render(env: OfflineEnv) -> Callable[[], Any]:
+    from src.api.weather_viewmodel import build_weather_view
+    from src.ui.card_weather import clear_weather_render_cache, render_weather_html
+
+    points = build_weather_view("3 h")["points"]
+
+    def run() -> str:
+        clear_weather_render_cache()
+        return render_weather_html(points)
+
+    return run
+
+
+# ============================================================
+# EQE (Home Assistant)
+# ============================================================
+
+
+def _ha_states() -> list[dict[str, Any]]:
+    states = load_fixture("ha_states.json")
+    ha = BENCH_SECRETS["home_assistant"]
+    keys = (
+        "eqe_soc_entity",
+        "eqe_range_entity",
+        "eqe_charging_entity",
+        "eqe_lock_status_entity",
+        "eqe_preclimate_entity",
+        "eqe_charging_power_entity",
+        "eqe_charging_switch_entity",
+    )
+    return [states[ha[key]] for key in keys]
+
+
+@case("eqe.parse")
+def _eqe_parse(env: OfflineEnv) -> Callable[[], Any]:
+    from src.api.home_assistant import build_eqe_status_from_states
+
+    states = _ha_states()
+    return lambda: build_eqe_status_from_states(*states)
+
+
+@case("eqe.viewmodel")
+def _eqe_viewmodel(env: OfflineEnv) -> Callable[[], Any]:
+    from src.api.home_assistant import build_eqe_status_from_states
+    from src.ui.card_eqe import build_eqe_viewmodel
+
+    status = build_eqe_status_from_states(*_ha_states())
+    return lambda: build_eqe_viewmodel(status, None, True, True, None, None, False)
+
+
+# ============================================================
+# HUE (v2 ovikontaktit, v1 sensorit)
+# ============================================================
+
+
+@case("hue_v2.parse", number=50)
+def _hue_v2_parse(env: OfflineEnv) -> Callable[[], Any]:
+    from src.api.hue_contacts_v2 import fetch_hue_contact_sensors
+
+    return fetch_hue_contact_sensors
+
+
+@case("hue_v2.viewmodel")
+def _hue_v2_viewmodel(env: OfflineEnv) -> Callable[[], Any]:
+    from src.api.hue_contacts_v2 import fetch_hue_contact_sensors
+    from src.viewmodels.hue_contacts import build_hue_contacts_viewmodel
+
+    sensors = fetch_hue_contact_sensors()
+    return lambda: build_hue_contacts_viewmodel(sensors)
+
+
+@case("hue_v1.parse", number=50)
+def _hue_v1_parse(env: OfflineEnv) -> Callable[[], Any]:
+    from src.api.hue_motion import fetch_hue_door_sensors
+
+    return fetch_hue_door_sensors
+
+
+@case("hue_v1.viewmodel")
+def _hue_v1_viewmodel(env: OfflineEnv) -> Callable[[], Any]:
+    from src.api.hue_motion import fetch_hue_door_sensors
+    from src.viewmodels.hue_motion import build_hue_motion_viewmodel
+
+    sensors = fetch_hue_door_sensors()
+    return lambda: build_hue_motion_viewmodel(sensors)
+
+
+# ============================================================
+# SIITEPÖLY
+# ============================================================
+
+
+@case("pollen.parse")
+def _pollen_parse(env: OfflineEnv) -> Callable[[], Any]:
+    from src.api.pollen_parser import index_bulletin
+
+    text = load_pollen_bulletin()
+    return lambda: index_bulletin(text)
+
+
+@case("pollen.viewmodel")
+def _pollen_viewmodel(env: OfflineEnv) -> Callable[[], Any]:
+    from src.api.pollen import view_from_index
+    from src.api.pollen_parser import index_bulletin
+    from src.settings import get_settings
+
+    index = index_bulletin(load_pollen_bulletin())
+    location = get_settings().location
+    return lambda: view_from_index(
+        index, station=location.pollen_station, location=location.pollen_location
+    )
+
+
+# ============================================================
+# KORTIT JA KOKO SIVU (Streamlit-tynkä)
+# ============================================================
+
+PAGE_CARDS = (
+    "card_nameday",
+    "card_zen",
+    "card_hue_doors",
+    "card_weather",
+    "card_eqe",
+    "card_prices",
+    "card_bitcoin",
+    "card_bitcoin_ticker",
+    "card_ethereum_ticker",
+    "card_system",
+    "card_pollen",
+)
+
+
+def _card_case(name: str) -> None:
+    @case(f"card.{name}", number=20)
+    def _setup(env: OfflineEnv) -> Callable[[], Any]:
+        from src.ui.registry import load_card
+
+        render = load_card(name)
+
+        def run() -> None:
+            clear_caches()  # kylmä: haku tallenteesta + koko putki
+            render()
+
+        return run
+
+
+for _name in PAGE_CARDS:
+    _card_case(_name)
+
+
+@case("page.cold", number=10)
+def _page_cold(env: OfflineEnv) -> Callable[[], Any]:
+    import main
+
+    def run() -> None:
+        clear_caches()
+        main.main()
+
+    return run
+
+
+@case("page.warm", number=20)
+def _page_warm(env: OfflineEnv) -> Callable[[], Any]:
+    """Tavallinen rerun: st.cache_data ja moduulien välimuistit lämpiminä."""
+    import main
+
+    main.main()
+    return main.main
+
+
+# ============================================================
+# AJO, TALLENNUS JA VERTAILU
+# ============================================================
+
+
+def run_suite(
+    names: Iterable[str] | None = None,
+    number: int | None = None,
+    repeat: int = 5,
+    echo: Callable[[str], None] | None = print,
+) -> dict[str, CaseResult]:
+    """
+    Ajaa tapaukset offline-ympäristössä; number=None -> tapauksen oma oletus.
+    "Kylmä" tyhjentää prosessin välimuistit (st.cache_data, ennuste, HA),
+    tiedostovälimuistit säilyvät kuten kioskin uudelleenkäynnistyksessä.
+    """
+    quiet_logs()
+    selected = [CASES[name] for name in (names if names is not None else CASES)]
+    results: dict[str, CaseResult] = {}
+    with offline_dashboard() as env:
+        for item in selected:
+            func = item.setup(env)
+            n = number or item.number
+            times = [t / n for t in timeit.repeat(func, number=n, repeat=repeat)]
+            results[item.name] = CaseResult(
+                best_ms=min(times) * 1e3,
+                median_ms=statistics.median(times) * 1e3,
+                number=n,
+                repeat=repeat,
+            )
+            if echo:
+                echo(f"{item.name:<28} {min(times) * 1e3:10.3f} ms")
+        if env.transport.unmatched:
+            raise RuntimeError(f"tallenne puuttuu: {sorted(set(env.transport.unmatched))}")
+    return results
+
+
+def _git(*args: str) -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", *args], cwd=ROOT_DIR, capture_output=True, text=True, check=True, timeout=10
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip()
+
+
+def current_label() -> str:
+    """Lyhyt commit-tunniste; '+dirty', jos työhakemistossa on muutoksia."""
+    commit = _git("rev-parse", "--short", "HEAD") or "local"
+    dirty = _git("status", "--porcelain", "--untracked-files=no")
+    return f"{commit}+dirty" if dirty else commit
+
+
+def save_results(
+    results: dict[str, CaseResult],
+    label: str | None = None,
+    folder: Path = RESULTS_DIR,
+) -> Path:
+    label = label or current_label()
+    folder.mkdir(parents=True, exist_ok=True)
+    path = folder / f"{label}.json"
+    payload = {
+        "label": label,
+        "created": datetime.now(TZ).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}",
+        "cases": {name: asdict(result) for name, result in sorted(results.items())},
+    }
+    path.write_text(json.dumps(payload, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    return path
+
+
+def load_results(label_or_path: str, folder: Path = RESULTS_DIR) -> dict[str, CaseResult]:
+    path = Path(label_or_path)
+    if not path.suffix:
+        path = folder / f"{label_or_path}.json"
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    return {name: CaseResult(**values) for name, values in payload["cases"].items()}
+
+
+def compare(
+    base: dict[str, CaseResult],
+    head: dict[str, CaseResult],
+) -> list[tuple[str, float | None, float | None, float | None]]:
+    """(nimi, base ms, head ms, suhde head/base) parhaista ajoista; puuttuva = None."""
+    rows = []
+    for name in sorted(set(base) | set(head)):
+        old = base[name].best_ms if name in base else None
+        new = head[name].best_ms if name in head else None
+        ratio = new / old if old and new is not None else None
+        rows.append((name, old, new, ratio))
+    return rows
+
+
+def format_comparison(rows: list[tuple[str, float | None, float | None, float | None]]) -> str:
+    def ms(value: float | None) -> str:
+        return f"{value:10.3f}" if value is not None else f"{'–':>10}"
+
+    lines = [f"{'tapaus':<28} {'base ms':>10} {'head ms':>10} {'suhde':>8}"]
+    for name, old, new, ratio in rows:
+        mark = ""
+        if ratio is not None:
+            mark = f"{ratio:7.2f}×" + (" hitaampi" if ratio >= REGRESSION_RATIO else "")
+        lines.append(f"{name:<28} {ms(old)} {ms(new)} {mark}")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-k", dest="pattern", help="aja vain tapaukset, joiden nimessä tämä on")
+    parser.add_argument("--number", type=int, help="kutsuja per toisto (oletus tapauskohtainen)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", nargs="?", const="", metavar="NIMI", help="tallenna tulokset")
+    parser.add_argument("--compare", nargs="+", metavar="TULOS", help="base [head]")
+    args = parser.parse_args(argv)
+
+    if args.compare and len(args.compare) == 2:
+        base, head = (load_results(item) for item in args.compare)
+        print(format_comparison(compare(base, head)))
+        return
+
+    names = [name for name in CASES if not args.pattern or args.pattern in name]
+    results = run_suite(names, number=args.number, repeat=args.repeat)
+    if args.save is not None:
+        print(f"\ntallennettu: {save_results(results, args.save or None)}")
+    if args.compare:
+        print()
+        print(format_comparison(compare(load_results(args.compare[0]), results)))
+
+
+if __name__ == "__main__":
+    main()
@@ -9,21 +9,23 @@ import streamlit as st
 from dotenv import load_dotenv
 
 from src.logger_config import setup_logging
+from src.metrics import write_metrics_file
 from src.paths import ensure_dirs
-from src.ui import (
-    card_bitcoin,
-    card_bitcoin_ticker,
-    card_eqe,
-    card_ethereum_ticker,
-    card_hue_doors,
-    card_nameday,
-    card_pollen,
-    card_prices,
-    card_system,
-    card_weather,
-    card_zen,
-)
 from src.ui.common import load_css
+from src.ui.registry import lazy_card
+
+# Kortit ladataan ensimmäisellä renderöinnillä (plotly, src.api jne. vasta silloin)
+card_bitcoin = lazy_card("card_bitcoin")
+card_bitcoin_ticker = lazy_card("card_bitcoin_ticker")
+card_eqe = lazy_card("card_eqe")
+card_ethereum_ticker = lazy_card("card_ethereum_ticker")
+card_hue_doors = lazy_card("card_hue_doors")
+card_nameday = lazy_card("card_nameday")
+card_pollen = lazy_card("card_pollen")
+card_prices = lazy_card("card_prices")
+card_system = lazy_card("card_system")
+card_weather = lazy_card("card_weather")
+card_zen = lazy_card("card_zen")
 
 ensure_dirs()
 
@@ -99,6 +101,8 @@ def main() -> None:
         with col2:
             card_pollen()
 
+        write_metrics_file()
+
     except KeyboardInterrupt:
         logger.info("HomeDashboard shutdown requested")
         sys.exit(0)
@@ -45,6 +45,15 @@ else
 fi
 deactivate
 
+# 3a) Sääikonien sprite static/-kansioon (git clean poisti edellisen)
+"$PYTHON_BIN" -m src.weather_sprite || echo "Huom: sprite-build epäonnistui, ikonit data-URI:na."
+
+# 3b) Valinnainen kylmäkäynnistyksen import-profiili: PROFILE_STARTUP=1 ./update.sh
+if [ "${PROFILE_STARTUP:-0}" = "1" ]; then
+  say "--- Import-profiili (main.py) ---"
+  "$PYTHON_BIN" -m src.import_profiler --top 15 || true
+fi
+
 # 4) Käynnistys: yritä ensin systemd (root), sitten systemd --user, muuten manuaali
 say "--- Käynnistys ---"
 if sudo systemctl status "$SERVICE_NAME" >/dev/null 2>&1; then
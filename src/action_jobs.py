@@ -0,0 +1,311 @@
+"""
+Taustatyöt korttien ohjaustoiminnoille (EQE:n lukitus, ilmastointi, lataus, …).
+
+Komento ajetaan rajatussa työpoolissa (ActionExecutor), ja sen vaikutus
+varmistetaan pollaamalla kohdetilaa eksponentiaalisesti kasvavin välein
+(1 s, 2 s, 4 s, … enintään poll_max_s) kunnes tila vastaa tavoitetta tai
+confirm_timeout_s kuluu. Pollausten väliset odotukset ajastetaan (schedule,
+oletuksena threading.Timer): työpoolin säie ajaa vain komennon ja yksittäiset
+tarkistukset, joten pitkään kuittausta odottava työ ei varaa poolia muilta.
+Viimeisin pollattu tulos julkaistaan tilannekuvaan, josta kortti lukee sen.
+Streamlitin renderöinti lukee vain snapshot()-kuvan eikä koskaan odota.
+
+Jokaisella ohjattavalla kohteella (avain, esim. "eqe_lock") on oma ActionJob:
+  * saman kohteen komennot ajetaan peräkkäin; kesken olevan työn aikana tullut
+    eri komento jää jonoon (uusin voittaa)
+  * toistuvat klikkaukset (sama komento kesken tai jonossa) ohitetaan
+  * jumiutunut työ näkyy tilassa "timeout", kun job_timeout_s ylittyy; seuraava
+    komento ohittaa sen (jono tyhjennetään) eikä jää sen taakse
+
+    executor = ActionExecutor(max_workers=2)
+    executor.submit("eqe_lock", "lock", command=..., confirm=check_locked)
+    snap = executor.snapshot("eqe_lock")   # idle | pending | polling | done | timeout | error
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Any
+
+# confirm() -> (tavoitetila saavutettu, kortille julkaistava tulos)
+Confirm = Callable[[], tuple[bool, Any]]
+Runner = Callable[[Callable[[], None]], Any]
+# schedule(viive_s, fn): ajaa fn:n viiveen jälkeen odottamatta kutsujan säikeessä
+Scheduler = Callable[[float, Callable[[], None]], Any]
+
+ACTIVE = ("pending", "polling")
+
+
+@dataclass(frozen=True)
+class JobSnapshot:
+    status: str = "idle"
+    action: str | None = None
+    error: str | None = None
+    result: Any = None
+    attempts: int = 0
+    started_at: float | None = None
+    finished_at: float | None = None
+
+    @property
+    def active(self) -> bool:
+        return self.status in ACTIVE
+
+    def finished_within(self, seconds: float, now: float | None = None) -> bool:
+        if self.finished_at is None:
+            return False
+        return (time.time() if now is None else now) - self.finished_at <= seconds
+
+
+@dataclass(frozen=True)
+class _Request:
+    action: str
+    command: Callable[[], Any]
+    confirm: Confirm | None
+    tolerated: tuple[type[BaseException], ...]
+
+
+def backoff_delays(
+    initial_s: float,
+    factor: float,
+    max_s: float,
+    timeout_s: float,
+) -> Iterator[float]:
+    """Odotusajat 1, 2, 4, … (katto max_s), kunnes yhteensä timeout_s täyttyy."""
+    total = 0.0
+    delay = initial_s
+    while total < timeout_s:
+        step = min(delay, max_s, timeout_s - total)
+        yield step
+        total += step
+        delay *= factor
+
+
+def _thread_runner(fn: Callable[[], None]) -> None:
+    threading.Thread(target=fn, daemon=True).start()
+
+
+def _timer_schedule(delay_s: float, fn: Callable[[], None]) -> None:
+    timer = threading.Timer(delay_s, fn)
+    timer.daemon = True
+    timer.start()
+
+
+class ActionJob:
+    """Yhden ohjattavan kohteen työ: komennot peräkkäin, toistot ohitetaan."""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        poll_initial_s: float = 1.0,
+        poll_factor: float = 2.0,
+        poll_max_s: float = 8.0,
+        confirm_timeout_s: float = 30.0,
+        job_timeout_s: float | None = None,
+        schedule: Scheduler = _timer_schedule,
+        runner: Runner = _thread_runner,
+    ) -> None:
+        self.name = name
+        self.poll_initial_s = poll_initial_s
+        self.poll_factor = poll_factor
+        self.poll_max_s = poll_max_s
+        self.confirm_timeout_s = confirm_timeout_s
+        # komento + varmistus; HA-kutsujen omat aikakatkaisut mahtuvat väliin
+        self.job_timeout_s = job_timeout_s or confirm_timeout_s + 60.0
+        self._schedule = schedule
+        self._runner = runner
+        self._lock = threading.Lock()
+        self._state = JobSnapshot()
+        # ajossa oleva pyyntö; ohitetun (jumiutuneen) työn päivitykset hylätään
+        self._current: _Request | None = None
+        self._queued: _Request | None = None
+        self._idle = threading.Event()
+        self._idle.set()
+
+    def _expired(self, state: JobSnapshot, now: float) -> bool:
+        return (
+            state.active
+            and state.started_at is not None
+            and now - state.started_at > self.job_timeout_s
+        )
+
+    def snapshot(self, now: float | None = None) -> JobSnapshot:
+        state = self._state
+        if self._expired(state, time.time() if now is None else now):
+            return replace(state, status="timeout", error="aikakatkaisu")
+        return state
+
+    def reset(self) -> None:
+        """Unohtaa valmiin työn tuloksen (kesken olevaa työtä ei keskeytetä)."""
+        with self._lock:
+            if not self._state.active:
+                self._state = JobSnapshot()
+
+    def start(
+        self,
+        action: str,
+        command: Callable[[], Any],
+        confirm: Confirm | None = None,
+        tolerated: tuple[type[BaseException], ...] = (),
+    ) -> bool:
+        """
+        Käynnistää komennon taustalla tai jonottaa sen kesken olevan perään.
+        False, jos sama komento on jo kesken tai jonossa (toistuva klikkaus).
+        tolerated: poikkeukset, joiden jälkeen pollataan silti (esim. HA:n
+        aikakatkaisu, kun pilvipalvelun kuittaus viipyy).
+
+        job_timeout_s:n ylittänyt työ päätetään tilaan "timeout" ja sen jono
+        tyhjennetään, joten uusi komento käynnistyy heti.
+        """
+        request = _Request(action, command, confirm, tolerated)
+        with self._lock:
+            now = time.time()
+            if self._expired(self._state, now):
+                self._state = replace(
+                    self._state, status="timeout", error="aikakatkaisu", finished_at=now
+                )
+                self._current = self._queued = None
+            if self._state.active:
+                queued = self._queued.action if self._queued else None
+                if action in (self._state.action, queued):
+                    return False
+                self._queued = request
+                return True
+            self._begin(request)
+        self._runner(lambda: self._run(request))
+        return True
+
+    def join(self, timeout: float | None = None) -> bool:
+        """Odottaa, kunnes työ (ja jono) on käsitelty. Testejä ja sammutusta varten."""
+        return self._idle.wait(timeout)
+
+    def _begin(self, request: _Request) -> None:
+        self._current = request
+        self._state = JobSnapshot(status="pending", action=request.action, started_at=time.time())
+        self._idle.clear()
+
+    def _update(self, request: _Request, **changes: Any) -> None:
+        with self._lock:
+            if self._current is request:
+                self._state = replace(self._state, **changes)
+
+    def _finish(self, request: _Request, status: str, **changes: Any) -> None:
+        """Päättää työn ja käynnistää jonossa olevan (ohitettu työ ei tee mitään)."""
+        with self._lock:
+            if self._current is not request:
+                return
+            self._state = replace(self._state, status=status, finished_at=time.time(), **changes)
+            following, self._queued = self._queued, None
+            self._current = None
+            if following is not None:
+                self._begin(following)
+            else:
+                self._idle.set()
+        if following is not None:
+            self._runner(lambda: self._run(following))
+
+    def _run(self, request: _Request) -> None:
+        try:
+            try:
+                request.command()
+            except request.tolerated:
+                pass
+            if request.confirm is None:
+                self._finish(request, "done")
+                return
+            self._update(request, status="polling")
+            delays = backoff_delays(
+                self.poll_initial_s, self.poll_factor, self.poll_max_s, self.confirm_timeout_s
+            )
+            self._schedule_poll(request, request.confirm, delays, 1)
+        except Exception as e:
+            self._finish(request, "error", error=str(e))
+
+    def _schedule_poll(
+        self,
+        request: _Request,
+        confirm: Confirm,
+        delays: Iterator[float],
+        attempt: int,
+    ) -> None:
+        delay = next(delays, None)
+        if delay is None:
+            self._finish(request, "timeout")
+            return
+
+        def submit() -> None:
+            try:
+                self._runner(lambda: self._poll(request, confirm, delays, attempt))
+            except RuntimeError as e:  # pooli suljettu
+                self._finish(request, "error", error=str(e))
+
+        self._schedule(delay, submit)
+
+    def _poll(
+        self,
+        request: _Request,
+        confirm: Confirm,
+        delays: Iterator[float],
+        attempt: int,
+    ) -> None:
+        try:
+            reached, result = confirm()
+        except Exception:
+            self._update(request, attempts=attempt)
+        else:
+            if reached:
+                self._finish(request, "done", result=result, attempts=attempt)
+                return
+            if result is None:
+                self._update(request, attempts=attempt)
+            else:
+                self._update(request, result=result, attempts=attempt)
+        self._schedule_poll(request, confirm, delays, attempt + 1)
+
+
+class ActionExecutor:
+    """
+    Prosessinlaajuinen ohjauskomentojen suorittaja: rajattu työpooli ja oma
+    ActionJob jokaiselle kohteelle. Uusi ohjattava kohde on pelkkä uusi avain.
+    """
+
+    def __init__(self, max_workers: int = 2, **job_defaults: Any) -> None:
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="action")
+        self._job_defaults = job_defaults
+        self._jobs: dict[str, ActionJob] = {}
+        self._lock = threading.Lock()
+
+    def job(self, key: str, **options: Any) -> ActionJob:
+        """Kohteen työ; options (poll_max_s, confirm_timeout_s, …) vain luonnissa."""
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None:
+                job = ActionJob(key, runner=self._pool.submit, **{**self._job_defaults, **options})
+                self._jobs[key] = job
+            return job
+
+    def submit(
+        self,
+        key: str,
+        action: str,
+        command: Callable[[], Any],
+        confirm: Confirm | None = None,
+        tolerated: tuple[type[BaseException], ...] = (),
+    ) -> bool:
+        return self.job(key).start(action, command, confirm, tolerated)
+
+    def snapshot(self, key: str) -> JobSnapshot:
+        job = self._jobs.get(key)
+        return job.snapshot() if job is not None else JobSnapshot()
+
+    def reset(self, key: str) -> None:
+        job = self._jobs.get(key)
+        if job is not None:
+            job.reset()
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -32,4 +32,6 @@ from .electricity import try_fetch_prices as try_fetch_prices
 from .electricity import try_fetch_prices_15min as try_fetch_prices_15min
 from .quotes import fetch_daily_quote as fetch_daily_quote
 from .weather import card_weather_debug_matrix as card_weather_debug_matrix
+from .weather import fetch_alerts as fetch_alerts
+from .weather import fetch_current as fetch_current
 from .weather import fetch_weather_points as fetch_weather_points
@@ -0,0 +1,143 @@
+"""
+Asynkroninen HTTP-kerros: yksi tapahtumasilmukka taustasäikeessä ja yhteinen
+httpx.AsyncClient-yhteyspooli.
+
+    resp = await request("GET", url, timeout=5)          # silmukan sisällä
+    data = run_sync(http_get_json_async(url))            # synkroninen kutsuja
+
+Kaikki ulkoiset HTTP-kutsut (http_client, Home Assistant, Hue v1/v2,
+siitepöly, sää, sähkö, lainaukset) kulkevat request()-kutsun kautta samassa
+silmukassa. Jokaisella lähteellä on *_async-funktio; synkroniset funktiot ovat
+ohuita run_sync()-kääreitä, joten Streamlit-skriptit ja taustatyöt toimivat
+ennallaan. Useamman haun funktiot (HA:n entiteetit, Hue v2:n laitteet +
+kontaktit, lataustilan päivitykset) ajavat hakunsa asyncio.gather()-kutsulla
+ilman lisäsäikeitä, ja eri lähteet voi päivittää rinnakkain samalla tavalla.
+
+httpx:n poikkeukset käännetään requests-poikkeuksiksi (Timeout,
+ConnectionError, HTTPError + response), jotta olemassa oleva virheenkäsittely
+(report_error, lähteiden health-pisteet, 400/404 = "ei vielä dataa") pysyy
+ennallaan.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import Coroutine
+from typing import Any, TypeVar
+
+import httpx
+import requests
+
+T = TypeVar("T")
+
+# avoimet yhteydet yhteensä / keep-alive-yhteydet (Pi: muutama isäntä kerrallaan)
+POOL_SIZE = 8
+LOOP_THREAD_NAME = "homedashboard-async"
+
+_LOCK = threading.Lock()
+_STATE: dict[str, Any] = {"loop": None, "thread": None, "transport": None}
+# verify -> asiakas; käsitellään vain silmukan säikeessä, joten ei lukitusta
+_CLIENTS: dict[bool, httpx.AsyncClient] = {}
+
+
+# ============================================================
+# TAPAHTUMASILMUKKA
+# ============================================================
+
+
+def event_loop() -> asyncio.AbstractEventLoop:
+    """Taustasäikeen tapahtumasilmukka; käynnistetään ensimmäisellä kutsulla."""
+    loop = _STATE["loop"]
+    if loop is None:
+        with _LOCK:
+            loop = _STATE["loop"]
+            if loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name=LOOP_THREAD_NAME, daemon=True
+                )
+                thread.start()
+                _STATE.update(loop=loop, thread=thread)
+    return loop
+
+
+def run_sync(coro: Coroutine[Any, Any, T], timeout: float | None = None) -> T:
+    """
+    Ajaa korutiinin taustasilmukassa ja odottaa tuloksen (poikkeus nousee
+    kutsujalle). Silmukan omasta säikeestä kutsu estetään, koska se lukitsisi
+    silmukan: siellä käytetään awaitia.
+    """
+    loop = event_loop()
+    if threading.current_thread() is _STATE["thread"]:
+        coro.close()
+        raise RuntimeError("run_sync() silmukan säikeestä; käytä awaitia")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
+
+
+# ============================================================
+# YHTEINEN ASIAKAS
+# ============================================================
+
+
+def _client(verify: bool) -> httpx.AsyncClient:
+    client = _CLIENTS.get(verify)
+    if client is None:
+        client = _CLIENTS[verify] = httpx.AsyncClient(
+            verify=verify,
+            limits=httpx.Limits(max_connections=POOL_SIZE, max_keepalive_connections=POOL_SIZE),
+            transport=_STATE["transport"],
+            follow_redirects=True,
+        )
+    return client
+
+
+async def request(method: str, url: str, *, verify: bool = True, **kwargs: Any) -> httpx.Response:
+    """
+    HTTP-pyyntö yhteisellä asiakkaalla (kwargs: headers, json, timeout, ...).
+    verify=False käyttää omaa asiakasta (Hue-sillan itse allekirjoitettu varmenne).
+    """
+    try:
+        return await _client(verify).request(method, url, **kwargs)
+    except httpx.TimeoutException as e:
+        raise requests.Timeout(str(e) or "timeout") from e
+    except httpx.TransportError as e:
+        raise requests.ConnectionError(str(e) or type(e).__name__) from e
+
+
+def raise_for_status(resp: httpx.Response) -> None:
+    """requests.Response.raise_for_status vastine: 4xx/5xx -> requests.HTTPError."""
+    if resp.is_error:
+        raise requests.HTTPError(
+            f"{resp.status_code} Error: {resp.reason_phrase} for url: {resp.url}",
+            response=resp,  # type: ignore[arg-type]
+        )
+
+
+async def _close_clients() -> None:
+    clients = list(_CLIENTS.values())
+    _CLIENTS.clear()
+    for client in clients:
+        await client.aclose()
+
+
+def set_transport(transport: httpx.AsyncBaseTransport | None) -> None:
+    """
+    Vaihtaa asiakkaiden kuljetuskerroksen (testit: httpx.MockTransport,
+    offline-benchmarkit: tallenteet); None palauttaa oikean verkon.
+    """
+    _STATE["transport"] = transport
+    run_sync(_close_clients())
+
+
+def shutdown() -> None:
+    """Sulkee asiakkaat ja pysäyttää silmukan (testit, sammutus)."""
+    with _LOCK:
+        loop, thread = _STATE["loop"], _STATE["thread"]
+        _STATE.update(loop=None, thread=None)
+    if loop is None:
+        return
+    asyncio.run_coroutine_threadsafe(_close_clients(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
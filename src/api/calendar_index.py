@@ -0,0 +1,253 @@
+"""
+Kalenteri-indeksi: nimipäivät, pyhät ja liputuspäivät päivän mukaan.
+
+    nimipäivä-JSON + pyhä-JSON -> build_calendar_index(...) -> CalendarIndex
+
+Molemmat tuetut nimipäivärakenteet (litteä "MM-DD" ja sisäkkäinen
+"nimipäivät"/kuukausi/päivä) sekä pyhätiedoston muodot (dict "MM-DD" /
+"YYYY-MM-DD" tai lista {"date": ...}) normalisoidaan kerran taulukoiksi,
+joita indeksoidaan päivän järjestysnumerolla (karkausvuoden 1–366).
+Päivän haku on kaksi taulukkohakua; liputuspäivät ovat valmiiksi
+järjestetty lista.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Any
+
+NO_NAMES = "—"
+
+MONTHS_FI = (
+    "tammikuu",
+    "helmikuu",
+    "maaliskuu",
+    "huhtikuu",
+    "toukokuu",
+    "kesäkuu",
+    "heinäkuu",
+    "elokuu",
+    "syyskuu",
+    "lokakuu",
+    "marraskuu",
+    "joulukuu",
+)
+
+# karkausvuoden kuukausien alut: 29.2. on aina oma paikkansa
+_MONTH_START = (0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335)
+_DAYS_IN_MONTH = (31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+DAYS = 366
+
+
+def day_slot(month: int, day: int) -> int:
+    """(kuukausi, päivä) -> taulukon indeksi 0–365."""
+    return _MONTH_START[month - 1] + day - 1
+
+
+@dataclass(frozen=True)
+class HolidayEntry:
+    name: str | None
+    is_holiday: bool
+    is_flag_day: bool
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "holiday": self.name,
+            "is_flag_day": self.is_flag_day,
+            "is_holiday": self.is_holiday,
+        }
+
+
+NO_HOLIDAY = HolidayEntry(name=None, is_holiday=False, is_flag_day=False)
+
+
+@dataclass(frozen=True)
+class CalendarDay:
+    """Yhden päivän tiedot kortille."""
+
+    date: dt.date
+    names: str
+    holiday: HolidayEntry
+
+
+@dataclass(frozen=True)
+class CalendarIndex:
+    """
+    names:     366 merkkijonoa (NO_NAMES = ei nimipäivää / ei tietoa)
+    recurring: 366 HolidayEntry-arvoa "MM-DD"-avaimista (joka vuosi)
+    dated:     {date.toordinal(): HolidayEntry} "YYYY-MM-DD"-avaimista
+    flag_days: liputuspäivien (ordinal, nimi), järjestyksessä; vuosittaiset
+               "MM-DD"-liputuspäivät erikseen recurring_flags-listassa
+    """
+
+    names: tuple[str, ...]
+    recurring: tuple[HolidayEntry, ...]
+    dated: dict[int, HolidayEntry]
+    flag_days: tuple[tuple[int, str], ...]
+    recurring_flags: tuple[tuple[int, int, str], ...]
+
+    def holiday(self, day: dt.date) -> HolidayEntry:
+        return self.dated.get(day.toordinal()) or self.recurring[day_slot(day.month, day.day)]
+
+    def day(self, day: dt.date) -> CalendarDay:
+        return CalendarDay(
+            date=day,
+            names=self.names[day_slot(day.month, day.day)],
+            holiday=self.holiday(day),
+        )
+
+    def next_flag_days(self, start: dt.date, count: int) -> list[tuple[dt.date, str]]:
+        """Seuraavat count liputuspäivää alkaen päivästä start (mukaan lukien)."""
+        lo = bisect_left(self.flag_days, (start.toordinal(), ""))
+        found = [(dt.date.fromordinal(o), name) for o, name in self.flag_days[lo : lo + count]]
+        if self.recurring_flags:
+            for year in (start.year, start.year + 1):
+                for month, day, name in self.recurring_flags:
+                    if month == 2 and day == 29 and not _is_leap(year):
+                        continue
+                    when = dt.date(year, month, day)
+                    if when >= start and when.toordinal() not in self.dated:
+                        found.append((when, name))
+            found.sort()
+        return found[:count]
+
+
+def _is_leap(year: int) -> bool:
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+# ============================================================
+# NIMIPÄIVÄT
+# ============================================================
+
+
+def normalize_names(names: Any) -> str:
+    """Normalisoi nimipäiväkentän muodosta riippumatta."""
+    if isinstance(names, list):
+        joined = ", ".join(str(n).strip() for n in names if str(n).strip())
+        return joined or NO_NAMES
+    if isinstance(names, str) and names.strip():
+        return names.strip()
+    return NO_NAMES
+
+
+def _parse_month_day(key: Any) -> tuple[int, int] | None:
+    """'MM-DD' -> (kk, pv) tai None."""
+    if not isinstance(key, str) or len(key) != 5 or key[2] != "-":
+        return None
+    try:
+        month, day = int(key[:2]), int(key[3:])
+    except ValueError:
+        return None
+    if 1 <= month <= 12 and 1 <= day <= _DAYS_IN_MONTH[month - 1]:
+        return month, day
+    return None
+
+
+def nameday_table(data: Any) -> tuple[str, ...]:
+    """
+    Nimipäivät 366 paikan taulukoksi. Tuetut rakenteet:
+
+    1) litteä:       {"11-11": ["Panu"]} tai {"11-11": "Panu"}
+    2) sisäkkäinen:  {"nimipäivät": {"marraskuu": {"11": "Panu"}}}
+
+    Litteä arvo voittaa sisäkkäisen, jos molemmat ovat samassa tiedostossa.
+    """
+    table = [NO_NAMES] * DAYS
+    if not isinstance(data, dict):
+        return tuple(table)
+
+    root = data.get("nimipäivät")
+    if isinstance(root, dict):
+        for month_key, days in root.items():
+            if not isinstance(month_key, str) or not isinstance(days, dict):
+                continue
+            month_name = month_key.strip().lower()
+            if month_name not in MONTHS_FI:
+                continue
+            month = MONTHS_FI.index(month_name) + 1
+            for day_key, names in days.items():
+                try:
+                    day = int(day_key)
+                except (TypeError, ValueError):
+                    continue
+                if 1 <= day <= _DAYS_IN_MONTH[month - 1]:
+                    table[day_slot(month, day)] = normalize_names(names)
+
+    for key, names in data.items():
+        parsed = _parse_month_day(key)
+        if parsed is None:
+            continue
+        value = normalize_names(names)
+        if value != NO_NAMES:
+            table[day_slot(*parsed)] = value
+    return tuple(table)
+
+
+# ============================================================
+# PYHÄT JA LIPUTUSPÄIVÄT
+# ============================================================
+
+
+def parse_holiday_entry(entry: dict) -> HolidayEntry:
+    """Raakadatadict -> HolidayEntry."""
+    name = entry.get("name")
+    hol_field = entry.get("holiday")
+
+    is_holiday = bool(entry.get("is_holiday")) or (
+        isinstance(hol_field, bool) and hol_field is True
+    )
+
+    # joskus nimi on vain "holiday"-kentässä
+    if not name and isinstance(hol_field, str) and hol_field.strip():
+        name = hol_field.strip()
+
+    return HolidayEntry(
+        name=name.strip() if isinstance(name, str) and name.strip() else None,
+        is_holiday=is_holiday,
+        is_flag_day=bool(entry.get("flag") or entry.get("is_flag_day")),
+    )
+
+
+def _holiday_items(data: Any) -> list[tuple[str, dict]]:
+    if isinstance(data, dict):
+        return [(str(k).strip(), v) for k, v in data.items() if isinstance(v, dict)]
+    if isinstance(data, list):
+        return [
+            (str(item.get("date") or "").strip(), item) for item in data if isinstance(item, dict)
+        ]
+    return []
+
+
+def build_calendar_index(nameday_data: Any, holiday_data: Any) -> CalendarIndex:
+    """Normalisoi molemmat tiedostot kerran päiväindeksoiduiksi taulukoiksi."""
+    recurring = [NO_HOLIDAY] * DAYS
+    dated: dict[int, HolidayEntry] = {}
+    flag_days: list[tuple[int, str]] = []
+    recurring_flags: list[tuple[int, int, str]] = []
+
+    for key, raw in _holiday_items(holiday_data):
+        entry = parse_holiday_entry(raw)
+        month_day = _parse_month_day(key)
+        if month_day is not None:
+            recurring[day_slot(*month_day)] = entry
+            if entry.is_flag_day:
+                recurring_flags.append((*month_day, entry.name or "Liputuspäivä"))
+            continue
+        try:
+            when = dt.date.fromisoformat(key)
+        except ValueError:
+            continue
+        dated[when.toordinal()] = entry
+        if entry.is_flag_day:
+            flag_days.append((when.toordinal(), entry.name or "Liputuspäivä"))
+
+    return CalendarIndex(
+        names=nameday_table(nameday_data),
+        recurring=tuple(recurring),
+        dated=dated,
+        flag_days=tuple(sorted(flag_days)),
+        recurring_flags=tuple(sorted(recurring_flags)),
+    )
@@ -4,11 +4,18 @@ from __future__ import annotations
 import datetime as dt
 import json
 from pathlib import Path
-
-import streamlit as st
-
+from typing import Any
+
+from src.api.calendar_index import (
+    NO_HOLIDAY,
+    NO_NAMES,
+    CalendarDay,
+    CalendarIndex,
+    build_calendar_index,
+    day_slot,
+    nameday_table,
+)
 from src.config import (
-    CACHE_TTL_LONG,
     HOLIDAY_PATHS,
     NAMEDAY_FILE,
     NAMEDAY_PATHS,
@@ -46,80 +53,95 @@ def _resolve_first_existing(paths) -> Path:
 
 
 def _load_nameday_data(path: Path):
-    """Lataa JSONin ja palauttaa python-datan."""
+    """Lataa JSONin ja palauttaa python-datan (nimipäivä- ja pyhätiedostot)."""
     with path.open("r", encoding="utf-8") as f:
         return json.load(f)
 
 
-# --- varsinainen nimipäivälogiikka ----------------------------------------
+# --- kalenteri-indeksi ---------------------------------------------------
 
+# Indeksi rakennetaan uudelleen vain, kun lähdetiedosto (polku tai mtime) muuttuu.
+_CALENDAR_STATE: dict[str, Any] = {
+    "key": None,
+    "index": None,
+    "holiday_path": None,
+    "holiday_error": None,
+}
 
-_MONTHS_FI = [
-    "tammikuu",
-    "helmikuu",
-    "maaliskuu",
-    "huhtikuu",
-    "toukokuu",
-    "kesäkuu",
-    "heinäkuu",
-    "elokuu",
-    "syyskuu",
-    "lokakuu",
-    "marraskuu",
-    "joulukuu",
-]
+
+def _file_stamp(path: Path) -> tuple[str, int | None]:
+    try:
+        return str(path), path.stat().st_mtime_ns
+    except OSError:
+        return str(path), None
+
+
+def _load_source(path: Path, stamp: tuple[str, int | None], label: str) -> tuple[Any, str | None]:
+    """(data, virheteksti); puuttuva tiedosto -> (None, None)."""
+    if stamp[1] is None:
+        return None, None
+    try:
+        return _load_nameday_data(path), None
+    except Exception as e:
+        report_error(label, e)
+        return None, str(e)
 
 
-def _normalize_nameday_value(names) -> str:
-    """Normalisoi nimipäiväkentän muodosta riippumatta."""
-    if isinstance(names, list):
-        joined = ", ".join(n.strip() for n in names if str(n).strip())
-        return joined or "—"
-    if isinstance(names, str) and names.strip():
-        return names.strip()
-    return "—"
+def calendar_index() -> CalendarIndex:
+    """
+    Nimipäivät + pyhä-/liputuspäivät yhtenä indeksinä. Tiedostot luetaan ja
+    normalisoidaan kerran; sen jälkeen haku ei lue tiedostoja ennen kuin
+    polku tai mtime muuttuu.
+    """
+    nameday_path = _resolve_nameday_file()
+    holiday_path = _resolve_first_existing(HOLIDAY_PATHS)
+    key = (_file_stamp(nameday_path), _file_stamp(holiday_path))
+    index: CalendarIndex | None = _CALENDAR_STATE["index"]
+    if index is not None and _CALENDAR_STATE["key"] == key:
+        return index
+
+    names, _ = _load_source(nameday_path, key[0], "nameday: local json")
+    holidays, holiday_error = _load_source(holiday_path, key[1], "holiday: local json")
+    index = build_calendar_index(names, holidays)
+    _CALENDAR_STATE.update(
+        key=key,
+        index=index,
+        holiday_path=holiday_path if key[1][1] is not None else None,
+        holiday_error=holiday_error,
+    )
+    return index
 
 
-def _pick_today_name_flat(data, today: dt.datetime) -> str:
-    """Poimii tämän päivän nimipäivän litteästä rakenteesta."""
-    if not isinstance(data, dict):
-        return "—"
+def holiday_source() -> tuple[Path | None, str | None]:
+    """(pyhätiedoston polku tai None, lukuvirhe tai None) debug-tekstejä varten."""
+    calendar_index()
+    return _CALENDAR_STATE["holiday_path"], _CALENDAR_STATE["holiday_error"]
 
-    key_md = today.strftime("%m-%d")
-    if key_md not in data:
-        return "—"
 
-    names = data[key_md]
-    return _normalize_nameday_value(names)
+def clear_calendar_cache() -> None:
+    _CALENDAR_STATE.update(key=None, index=None, holiday_path=None, holiday_error=None)
 
 
-def _pick_today_name_nested(data, today: dt.datetime) -> str:
-    """Poimii tämän päivän nimipäivän sisäkkäisestä rakenteesta."""
-    if not isinstance(data, dict):
-        return "—"
+def _today() -> dt.date:
+    return dt.datetime.now(TZ).date()
 
-    root = data.get("nimipäivät")
-    if not isinstance(root, dict):
-        return "—"
 
-    month_name = _MONTHS_FI[today.month - 1]
-    day_str = str(today.day)
+def calendar_today() -> CalendarDay:
+    return calendar_index().day(_today())
 
-    # avaimet voivat olla eri kirjainkoossa
-    month_obj = next(
-        (v for k, v in root.items() if isinstance(k, str) and k.strip().lower() == month_name),
-        None,
-    )
-    if not isinstance(month_obj, dict):
-        return "—"
 
-    names = month_obj.get(day_str)
-    return _normalize_nameday_value(names)
+def calendar_tomorrow() -> CalendarDay:
+    return calendar_index().day(_today() + dt.timedelta(days=1))
+
+
+def next_flag_days(count: int = 3) -> list[tuple[dt.date, str]]:
+    """Seuraavat liputuspäivät tänään alkaen: [(päivä, nimi), ...]."""
+    return calendar_index().next_flag_days(_today(), count)
 
 
 def _pick_today_name(data, today: dt.datetime) -> str:
     """
-    Poimii tämän päivän nimipäivän kahdesta yleisestä rakenteesta:
+    Poimii päivän nimipäivän kahdesta yleisestä rakenteesta:
 
     1) litteä:
        {"11-11": ["Panu"]} tai {"11-11": "Panu"}
@@ -127,88 +149,18 @@ def _pick_today_name(data, today: dt.datetime) -> str:
     2) sisäkkäinen:
        {"nimipäivät": {"marraskuu": {"11": "Panu"}}}
     """
-    if not isinstance(data, dict):
-        return "—"
-
-    name = _pick_today_name_flat(data, today)
-    if name != "—":
-        return name
-
-    return _pick_today_name_nested(data, today)
+    return nameday_table(data)[day_slot(today.month, today.day)]
 
 
-@st.cache_data(ttl=CACHE_TTL_LONG)
 def fetch_nameday_today(_cache_buster: int | None = None) -> str:
-    """
-    Ohut julkinen funktio:
-      1) valitse lähdetiedosto
-      2) lataa data
-      3) poimi tämän päivän nimi
-    """
+    """Tämän päivän nimipäivät ("—", jos ei tietoa)."""
     try:
-        path = _resolve_nameday_file()
-        if not path.exists():
-            return "—"
-        data = _load_nameday_data(path)
-        now = dt.datetime.now(TZ)
-        return _pick_today_name(data, now)
+        return calendar_today().names
     except Exception as e:
         report_error("nameday: local json", e)
-        return "—"
+        return NO_NAMES
 
 
-# --- pyhä-/liputuspäivät samaan moduuliin ---------------------------------
-
-
-def _default_holiday_result() -> dict:
-    return {"holiday": None, "is_flag_day": False, "is_holiday": False}
-
-
-def _parse_holiday_entry(entry: dict) -> dict:
-    """Muuntaa raakadatadictin normalisoiduksi holiday-dictiksi."""
-    name = entry.get("name")
-    hol_field = entry.get("holiday")
-
-    is_holiday = bool(entry.get("is_holiday")) or (
-        isinstance(hol_field, bool) and hol_field is True
-    )
-
-    # joskus nimi on vain "holiday"-kentässä
-    if not name and isinstance(hol_field, str) and hol_field.strip():
-        name = hol_field.strip()
-
-    is_flag = bool(entry.get("flag") or entry.get("is_flag_day"))
-
-    return {
-        "holiday": (name.strip() if isinstance(name, str) and name.strip() else None),
-        "is_flag_day": is_flag,
-        "is_holiday": is_holiday,
-    }
-
-
-def _pick_holiday_entry_for_today(data, today: dt.datetime) -> dict | None:
-    """Valitsee tälle päivälle sopivan holiday-entryn dict- tai lista-rakenteesta."""
-    key_md = today.strftime("%m-%d")
-    key_iso = today.strftime("%Y-%m-%d")
-
-    # dict-muoto
-    if isinstance(data, dict):
-        entry = data.get(key_md) or data.get(key_iso)
-        return entry if isinstance(entry, dict) else None
-
-    # lista-muoto
-    if isinstance(data, list):
-        for item in data:
-            if not isinstance(item, dict):
-                continue
-            d = str(item.get("date") or "").strip()
-            if d in (key_iso, key_md):
-                return item
-
-    return None
-
-
-@st.cache_data(ttl=CACHE_TTL_LONG)
 def fetch_holiday_today(_cache_buster: int | None = None) -> dict:
     """
     Palauttaa dictin:
@@ -218,24 +170,11 @@ def fetch_holiday_today(_cache_buster: int | None = None) -> dict:
         "is_holiday": bool,
       }
     """
-    out = _default_holiday_result()
     try:
-        p = _resolve_first_existing(HOLIDAY_PATHS)
-        if not p or not p.exists():
-            return out
-
-        with p.open("r", encoding="utf-8") as f:
-            data = json.load(f)
-
-        now = dt.datetime.now(TZ)
-        entry = _pick_holiday_entry_for_today(data, now)
-        if not isinstance(entry, dict):
-            return out
-
-        return _parse_holiday_entry(entry)
+        return calendar_today().holiday.as_dict()
     except Exception as e:
         report_error("holiday: local json", e)
-        return out
+        return NO_HOLIDAY.as_dict()
 
 
 __all__ = [
@@ -244,6 +183,12 @@ __all__ = [
     "_resolve_first_existing",
     "_load_nameday_data",
     "_pick_today_name",
+    "calendar_index",
+    "calendar_today",
+    "calendar_tomorrow",
+    "clear_calendar_cache",
+    "holiday_source",
+    "next_flag_days",
     "fetch_nameday_today",
     "fetch_holiday_today",
 ]
@@ -14,7 +14,7 @@ from src.api.electricity_normalize import (
 from src.api.electricity_sources import (
     fetch_from_porssisahko_latest,
     fetch_from_sahkonhintatanaan,
-    filter_latest_to_day,
+    hourly_prices_from_latest,
 )
 from src.utils import report_error
 
@@ -22,39 +22,49 @@ from src.utils import report_error
 Price15 = dict[str, datetime | float]
 
 
-def get_hourly_from_porssisahko(date_ymd: dt.date) -> list[dict[str, float]] | None:
+def _no_data_yet(e: requests.HTTPError) -> bool:
+    # 400/404 = "ei tälle päivälle", ei lähteen vika eikä virheraporttia
+    return e.response is not None and e.response.status_code in (400, 404)
+
+
+def fetch_hourly_porssisahko(date_ymd: dt.date) -> list[dict[str, float]] | None:
     """
-    Hakee pörssisähkö v2 -datasta tunnit annetulle päivälle.
-    Palauttaa listan muotoa: [{"hour": 0, "cents": 5.3}, ...] tai None.
+    Pörssisähkö v2:n tunnit päivälle: [{"hour": 0, "cents": 5.3}, ...].
+    None = dataa ei (vielä) ole (400/404 tai tyhjä päivä); yhteys-, HTTP- ja
+    jäsennysvirheet nousevat kutsujalle (lähteen terveystiedot).
     """
     try:
         latest = fetch_from_porssisahko_latest()
-        if not latest:
-            return None
-
-        per_hour = filter_latest_to_day(latest, date_ymd)
-        if not per_hour:
+    except requests.HTTPError as e:
+        if _no_data_yet(e):
             return None
+        raise
+    if not latest:
+        return None
+    # varttien keskiarvo tunnille
+    return hourly_prices_from_latest(latest, date_ymd) or None
 
-        # lasketaan varttien keskiarvo tunnille
-        out: list[dict[str, float]] = []
-        for hour, vals in sorted(per_hour.items()):
-            if not vals:
-                continue
-            out.append(
-                {
-                    "hour": hour,
-                    "cents": sum(vals) / len(vals),
-                }
-            )
-        return out
 
+def fetch_hourly_sahkonhintatanaan(date_ymd: dt.date) -> list[dict[str, float]] | None:
+    """sahkonhintatanaan.fi samassa muodossa; virheet kuten fetch_hourly_porssisahko."""
+    try:
+        raw = fetch_from_sahkonhintatanaan(date_ymd)
     except requests.HTTPError as e:
-        # 400/404 = "ei tälle päivälle", ei tehdä virheraporttia
-        if e.response is not None and e.response.status_code in (400, 404):
+        if _no_data_yet(e):
             return None
-        report_error(f"prices: porssisahko {date_ymd.isoformat()}", e)
-        return None
+        raise
+    # logitetaan aina, jotta voidaan katsoa raakadataa myöhemmin
+    log_raw_prices("sahkonhintatanaan", date_ymd, raw)
+    return normalize_prices_list(raw, date_ymd)
+
+
+def get_hourly_from_porssisahko(date_ymd: dt.date) -> list[dict[str, float]] | None:
+    """
+    Hakee pörssisähkö v2 -datasta tunnit annetulle päivälle.
+    Palauttaa listan muotoa: [{"hour": 0, "cents": 5.3}, ...] tai None.
+    """
+    try:
+        return fetch_hourly_porssisahko(date_ymd)
     except Exception as e:
         report_error(f"prices: porssisahko {date_ymd.isoformat()}", e)
         return None
@@ -65,16 +75,7 @@ def get_hourly_from_sahkonhintatanaan(date_ymd: dt.date) -> list[dict[str, float
     Hakee sahkonhintatanaan.fi:stä ja normalisoi saman muodon kuin yllä.
     """
     try:
-        raw = fetch_from_sahkonhintatanaan(date_ymd)
-        # logitetaan aina, jotta voidaan katsoa raakadataa myöhemmin
-        log_raw_prices("sahkonhintatanaan", date_ymd, raw)
-        prices = normalize_prices_list(raw, date_ymd)
-        return prices
-    except requests.HTTPError as e:
-        if e.response is not None and e.response.status_code in (400, 404):
-            return None
-        report_error(f"prices: sahkonhintatanaan {date_ymd.isoformat()}", e)
-        return None
+        return fetch_hourly_sahkonhintatanaan(date_ymd)
     except Exception as e:
         report_error(f"prices: sahkonhintatanaan {date_ymd.isoformat()}", e)
         return None
@@ -0,0 +1,309 @@
+"""
+Sähkön hintadatan eränormalisointi (batch).
+
+Per-item -apurit (`electricity_normalize`) arvaavat kentät jokaiselle riville
+erikseen. Tämä moduuli tunnistaa skeeman kerran koko payloadille ja muuntaa
+rivit yhdellä läpikäynnillä tyypitetyiksi taulukoiksi:
+
+    raakadata -> detect_schema(...) -> parse_payload(...) -> PriceArrays
+
+Varttisuodatus, tuntikeskiarvot ja 60 min -> 15 min -laajennus tehdään
+numpy-taulukko-operaatioina.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+from dataclasses import dataclass
+from datetime import datetime, time
+from typing import Any
+
+import numpy as np
+
+from src.config import TZ
+
+# varttidata: {"ts": datetime, "cents": float}
+Price15 = dict[str, datetime | float]
+
+TS_KEYS: tuple[str, ...] = (
+    "time",
+    "Time",
+    "timestamp",
+    "Timestamp",
+    "datetime",
+    "DateTime",
+    "start",
+    "Start",
+    "startDate",
+    "endDate",
+)
+CENTS_KEYS: tuple[str, ...] = (
+    "cents",
+    "cents_per_kwh",
+    "price",
+    "Price",
+    "value",
+    "Value",
+    "EUR_per_kWh",
+)
+
+QUARTER_S = 15 * 60
+HOUR_S = 3600
+DAY_S = 86400
+_QUARTER_OFFSETS = np.arange(4, dtype=np.int64) * QUARTER_S
+_EPOCH_DATE = dt.date(1970, 1, 1)
+
+
+# ============================================================
+# SKEEMA JA TAULUKOT
+# ============================================================
+
+
+@dataclass(frozen=True)
+class PayloadSchema:
+    """Payloadin kenttäkartta, tunnistetaan kerran ensimmäisestä rivistä."""
+
+    ts_key: str | None
+    cents_key: str | None
+    is_v2: bool
+
+
+@dataclass(frozen=True)
+class PriceArrays:
+    """
+    Tyypitetyt hintarivit.
+
+    ts:    int64, UTC epoch-sekunnit
+    cents: float64, snt/kWh
+    """
+
+    ts: np.ndarray
+    cents: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.ts.size)
+
+    def local_ts(self) -> np.ndarray:
+        """Paikalliset (TZ) seinäkelloajat epoch-sekunteina."""
+        return self.ts + _utc_offsets(self.ts)
+
+    def for_day(self, date_ymd: dt.date) -> PriceArrays:
+        """Suodattaa rivit, joiden paikallinen päivä on date_ymd (järjestys säilyy)."""
+        day_index = (date_ymd - _EPOCH_DATE).days
+        mask = self.local_ts() // DAY_S == day_index
+        return PriceArrays(self.ts[mask], self.cents[mask])
+
+    def local_hours(self) -> np.ndarray:
+        """Paikallinen tunti (0–23) jokaiselle riville."""
+        return (self.local_ts() % DAY_S) // HOUR_S
+
+    def to_price15(self) -> list[Price15]:
+        """Muuntaa taulukot vanhaan [{"ts": datetime, "cents": float}, ...] -muotoon."""
+        return [
+            {"ts": datetime.fromtimestamp(ts, TZ), "cents": cents}
+            for ts, cents in zip(self.ts.tolist(), self.cents.tolist(), strict=True)
+        ]
+
+
+def _empty() -> PriceArrays:
+    return PriceArrays(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64))
+
+
+def detect_schema(items: list[dict] | None) -> PayloadSchema | None:
+    """
+    Tunnistaa aikaleima- ja hintakentän ensimmäisestä dict-rivistä.
+    Palauttaa None, jos payloadissa ei ole yhtään dictiä.
+    """
+    first = next((item for item in items or [] if isinstance(item, dict)), None)
+    if first is None:
+        return None
+
+    ts_key = next((k for k in TS_KEYS if first.get(k)), None)
+    cents_key = next((k for k in CENTS_KEYS if first.get(k) is not None), None)
+    is_v2 = "startDate" in first or "endDate" in first
+    return PayloadSchema(ts_key=ts_key, cents_key=cents_key, is_v2=is_v2)
+
+
+# ============================================================
+# PARSEROINTI
+# ============================================================
+
+
+def _offset_at(epoch_s: int) -> int:
+    return int(datetime.fromtimestamp(epoch_s, TZ).utcoffset().total_seconds())
+
+
+def _utc_offsets(epoch_s: np.ndarray) -> np.ndarray:
+    """
+    TZ:n UTC-offset sekunteina jokaiselle aikaleimalle.
+
+    Tavallisesti koko payload osuu samaan offsettiin (ei DST-siirtymää), jolloin
+    offset lasketaan kahdesti. Siirtymän sattuessa offset lasketaan kerran
+    jokaista eri UTC-tuntia kohden; DST-siirtymät osuvat aina tasatunnille.
+    """
+    if epoch_s.size == 0:
+        return np.zeros(0, dtype=np.int64)
+    first = _offset_at(int(epoch_s.min()))
+    if first == _offset_at(int(epoch_s.max())):
+        return np.full(epoch_s.shape, first, dtype=np.int64)
+    hours, inverse = np.unique(epoch_s // HOUR_S, return_inverse=True)
+    offsets = np.fromiter(
+        (_offset_at(h * HOUR_S) for h in hours.tolist()),
+        dtype=np.int64,
+        count=hours.size,
+    )
+    return offsets[inverse.reshape(-1)]
+
+
+def _naive_local_to_utc(local_s: np.ndarray) -> np.ndarray:
+    """Naivit paikallisajat (TZ) -> UTC epoch-sekunnit."""
+    if local_s.size == 0:
+        return local_s
+    # offsetit haetaan UTC-arviosta; DST-rajalla arvio korjataan toisella kierroksella
+    guess = local_s - _utc_offsets(local_s)
+    return local_s - _utc_offsets(guess)
+
+
+def _parse_iso_scalar(value: str) -> float:
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return np.nan
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=TZ)
+    return parsed.timestamp()
+
+
+def _iso_to_epoch(values: list[Any]) -> np.ndarray:
+    """
+    ISO-aikaleimat -> float64 UTC epoch-sekunnit (NaN = ei parsittavissa).
+
+    Muoto päätellään ensimmäisestä arvosta:
+      * "...Z" (pörssisähkö v2) ja naivit ajat parsitaan numpylla kerralla
+      * offsetilliset ("+02:00") ja rikkinäiset payloadit rivi kerrallaan
+    """
+    strings = [str(v) if v else "" for v in values]
+    sample = next((s for s in strings if s), "")
+    if not sample:
+        return np.full(len(strings), np.nan)
+
+    is_utc = sample.endswith("Z")
+    has_offset = not is_utc and len(sample) > 19 and sample[-6] in "+-" and sample[-3] == ":"
+    if not has_offset:
+        try:
+            # "2025-11-11T22:00:00.000Z" -> "2025-11-11T22:00:00"
+            parsed = np.asarray(strings, dtype="U19").astype("datetime64[s]")
+        except ValueError:
+            parsed = None
+        if parsed is not None:
+            valid = ~np.isnat(parsed)
+            epoch = parsed[valid].astype(np.int64)
+            out = np.full(len(strings), np.nan)
+            out[valid] = epoch if is_utc else _naive_local_to_utc(epoch)
+            return out
+
+    return np.fromiter(
+        (_parse_iso_scalar(s) if s else np.nan for s in strings),
+        dtype=np.float64,
+        count=len(strings),
+    )
+
+
+def _to_float_array(values: list[Any]) -> np.ndarray:
+    try:
+        return np.asarray([np.nan if v is None else v for v in values], dtype=np.float64)
+    except (TypeError, ValueError):
+        out = np.full(len(values), np.nan)
+        for idx, value in enumerate(values):
+            try:
+                out[idx] = float(str(value).replace(",", "."))
+            except (TypeError, ValueError):
+                continue
+        return out
+
+
+def parse_payload(items: list[dict] | None, schema: PayloadSchema | None = None) -> PriceArrays:
+    """
+    Muuntaa raakapayloadin tyypitetyiksi taulukoiksi yhdellä läpikäynnillä.
+
+    Rivit, joilta puuttuu aikaleima tai hinta, pudotetaan. Järjestys säilyy.
+    """
+    rows = [item for item in items or [] if isinstance(item, dict)]
+    schema = schema or detect_schema(rows)
+    if not rows or schema is None or schema.ts_key is None or schema.cents_key is None:
+        return _empty()
+
+    ts_key, cents_key = schema.ts_key, schema.cents_key
+    pairs = [(item.get(ts_key), item.get(cents_key)) for item in rows]
+    raw_ts, raw_cents = zip(*pairs, strict=True)
+
+    ts = _iso_to_epoch(list(raw_ts))
+    cents = _to_float_array(list(raw_cents))
+    if not schema.is_v2:
+        # vanha data saattoi antaa euroina
+        cents = np.where(cents >= 1.0, cents, cents * 100.0)
+
+    valid = ~(np.isnan(ts) | np.isnan(cents))
+    return PriceArrays(ts[valid].astype(np.int64), cents[valid])
+
+
+# ============================================================
+# JOHDETUT NÄKYMÄT
+# ============================================================
+
+
+def quarters_for_day(arrays: PriceArrays, date_ymd: dt.date) -> PriceArrays:
+    """
+    Päivän vartit: pyöristys alaspäin varttiin, suodatus paikalliseen päivään,
+    duplikaateista ensimmäinen voittaa ja tulos järjestetään ajan mukaan.
+    """
+    floored = PriceArrays(arrays.ts - arrays.ts % QUARTER_S, arrays.cents).for_day(date_ymd)
+    if not len(floored):
+        return floored
+    ts, first_idx = np.unique(floored.ts, return_index=True)
+    return PriceArrays(ts, floored.cents[first_idx])
+
+
+def normalize_payload_15min(
+    items: list[dict] | None,
+    date_ymd: dt.date,
+    schema: PayloadSchema | None = None,
+) -> PriceArrays:
+    """Raakapayload -> päivän varttitaulukot."""
+    return quarters_for_day(parse_payload(items, schema), date_ymd)
+
+
+def hourly_means(arrays: PriceArrays, date_ymd: dt.date) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Laskee päivän tuntikeskiarvot varttidatasta.
+    Palauttaa (tunnit, keskiarvot) vain niille tunneille, joilla on dataa.
+    """
+    day = arrays.for_day(date_ymd)
+    if not len(day):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+    hours = day.local_hours()
+    sums = np.bincount(hours, weights=day.cents, minlength=24)
+    counts = np.bincount(hours, minlength=24)
+    present = np.flatnonzero(counts)
+    return present, sums[present] / counts[present]
+
+
+def expand_hours_to_quarters(
+    hours: np.ndarray,
+    cents: np.ndarray,
+    date_ymd: dt.date,
+) -> PriceArrays:
+    """Tuntihinnat -> neljä varttia / tunti (tunti = paikallinen seinäkelloaika)."""
+    if hours.size == 0:
+        return _empty()
+    bases = np.fromiter(
+        (
+            datetime.combine(date_ymd, time(hour=h), tzinfo=TZ).timestamp()
+            for h in hours.astype(np.int64).tolist()
+        ),
+        dtype=np.int64,
+        count=hours.size,
+    )
+    ts = (bases[:, None] + _QUARTER_OFFSETS[None, :]).reshape(-1)
+    return PriceArrays(ts, np.repeat(cents.astype(np.float64), 4))
@@ -3,6 +3,13 @@ from __future__ import annotations
 import datetime as dt
 from datetime import datetime, timedelta
 
+import numpy as np
+
+from src.api.electricity_batch import (
+    detect_schema,
+    expand_hours_to_quarters,
+    normalize_payload_15min,
+)
 from src.config import TZ
 
 # varttidata: {"ts": datetime, "cents": float}
@@ -194,20 +201,13 @@ def normalize_prices_list(items: list[dict], date_ymd: dt.date) -> list[HourPric
 def expand_hourly_to_15min(hourly: list[HourPrice], date_ymd: dt.date) -> list[Price15]:
     """
     Tuntidata -> neljä varttia / tunti.
+    Laajennus tehdään taulukko-operaationa (electricity_batch).
     """
-    out: list[Price15] = []
-
-    for item in hourly:
-        hour = int(item["hour"])
-        cents = float(item["cents"])
-
-        base = datetime.combine(date_ymd, datetime.min.time()).replace(tzinfo=TZ).replace(hour=hour)
-
-        for q in range(4):
-            ts = base + timedelta(minutes=15 * q)
-            out.append({"ts": ts, "cents": cents})
-
-    return out
+    hours = np.fromiter((int(item["hour"]) for item in hourly), dtype=np.int64, count=len(hourly))
+    cents = np.fromiter(
+        (float(item["cents"]) for item in hourly), dtype=np.float64, count=len(hourly)
+    )
+    return expand_hours_to_quarters(hours, cents, date_ymd).to_price15()
 
 
 # ============================================================
@@ -218,7 +218,14 @@ def expand_hourly_to_15min(hourly: list[HourPrice], date_ymd: dt.date) -> list[P
 def normalize_prices_list_15min(items: list[dict], date_ymd: dt.date) -> list[Price15]:
     """
     Muuttaa varttidatan -> [{"ts": ..., "cents": ...}, ...] ja ottaa vain pyydetyn päivän.
+
+    Jos payloadista löytyy aikaleima- ja hintakenttä, koko lista normalisoidaan
+    kerralla (electricity_batch). Muuten käytetään rivikohtaista arvausta.
     """
+    schema = detect_schema(items)
+    if schema is not None and schema.ts_key and schema.cents_key:
+        return normalize_payload_15min(items, date_ymd, schema).to_price15()
+
     out_map: dict[datetime, float] = {}
 
     for idx, item in enumerate(items or []):
@@ -0,0 +1,248 @@
+"""
+Sähkön hintalähteiden rekisteri ja hedgattu haku.
+
+Jokainen lähde kertoo kykynsä (resoluutio, päivämääräikkuna, latenssi-SLO).
+Haku käynnistää parhaan terveyspisteen lähteen ja, jos se ei vastaa SLO:n
+kuluessa, käynnistää seuraavan rinnalle. Ensimmäinen kelvollinen tulos voittaa.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any
+
+# lähteen vastaus: [{"hour": h, "cents": x}, ...] tai None
+PriceFetcher = Callable[[dt.date], list[dict[str, float]] | None]
+
+_EWMA_ALPHA = 0.3
+_LATENCY_WEIGHT = 0.25
+
+_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="prices")
+
+
+@dataclass(frozen=True)
+class PriceProvider:
+    """
+    Yksi hintalähde ja sen kyvyt.
+
+    resolution_min: lähteen natiiviresoluutio (15 tai 60 min)
+    days_back / days_ahead: päivät suhteessa tähän päivään, joille lähteellä on dataa
+                            (None = ei rajaa)
+    latency_slo_s: tavoitevasteaika; tämän jälkeen käynnistetään varalähde rinnalle
+    priority: järjestys, kun terveyspisteet ovat tasan (pienempi ensin)
+    """
+
+    name: str
+    fetch: PriceFetcher
+    resolution_min: int = 60
+    days_back: int | None = None
+    days_ahead: int | None = 1
+    latency_slo_s: float = 1.5
+    priority: int = 100
+
+    def supports(self, date_ymd: dt.date, today: dt.date) -> bool:
+        delta = (date_ymd - today).days
+        if self.days_back is not None and delta < -self.days_back:
+            return False
+        if self.days_ahead is not None and delta > self.days_ahead:
+            return False
+        return True
+
+
+@dataclass
+class ProviderHealth:
+    """Lähteen onnistumiset, epäonnistumiset ja latenssin liukuva keskiarvo."""
+
+    successes: int = 0
+    failures: int = 0
+    ewma_latency_s: float | None = None
+    last_error: str | None = None
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, ok: bool | None, latency_s: float, error: str | None = None) -> None:
+        """ok=None: lähde vastasi, mutta päivälle ei ole dataa (neutraali, vain latenssi)."""
+        with self._lock:
+            if ok:
+                self.successes += 1
+            elif ok is False:
+                self.failures += 1
+                self.last_error = error
+            if self.ewma_latency_s is None:
+                self.ewma_latency_s = latency_s
+            else:
+                self.ewma_latency_s = (
+                    _EWMA_ALPHA * latency_s + (1 - _EWMA_ALPHA) * self.ewma_latency_s
+                )
+
+    def score(self, latency_slo_s: float) -> float:
+        """
+        0..1, suurempi parempi: onnistumisosuus (Laplace-tasoitettu)
+        miinus latenssirangaistus suhteessa SLO:hon.
+        """
+        with self._lock:
+            total = self.successes + self.failures
+            success_rate = (self.successes + 1) / (total + 2)
+            if self.ewma_latency_s is None or latency_slo_s <= 0:
+                return success_rate
+            penalty = min(1.0, self.ewma_latency_s / latency_slo_s) * _LATENCY_WEIGHT
+            return success_rate - penalty
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "successes": self.successes,
+                "failures": self.failures,
+                "ewma_latency_s": self.ewma_latency_s,
+                "last_error": self.last_error,
+            }
+
+
+_REGISTRY: dict[str, PriceProvider] = {}
+_HEALTH: dict[str, ProviderHealth] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+# ============================================================
+# REKISTERI
+# ============================================================
+
+
+def register_provider(provider: PriceProvider) -> None:
+    """Lisää tai korvaa lähteen nimen perusteella."""
+    with _REGISTRY_LOCK:
+        _REGISTRY[provider.name] = provider
+        _HEALTH.setdefault(provider.name, ProviderHealth())
+
+
+def unregister_provider(name: str) -> None:
+    with _REGISTRY_LOCK:
+        _REGISTRY.pop(name, None)
+        _HEALTH.pop(name, None)
+
+
+def provider_health(name: str) -> ProviderHealth:
+    with _REGISTRY_LOCK:
+        return _HEALTH.setdefault(name, ProviderHealth())
+
+
+def reset_provider_health() -> None:
+    """Nollaa terveystiedot (testit / uudelleenkäynnistys)."""
+    with _REGISTRY_LOCK:
+        for name in list(_HEALTH):
+            _HEALTH[name] = ProviderHealth()
+
+
+def health_report() -> dict[str, dict[str, Any]]:
+    """Lähdekohtaiset terveystiedot ja pisteet, esim. diagnostiikkanäkymään."""
+    with _REGISTRY_LOCK:
+        items = [(p, _HEALTH.setdefault(p.name, ProviderHealth())) for p in _REGISTRY.values()]
+    return {
+        provider.name: {**health.snapshot(), "score": health.score(provider.latency_slo_s)}
+        for provider, health in items
+    }
+
+
+def providers_for(
+    date_ymd: dt.date,
+    today: dt.date | None = None,
+    resolution_min: int | None = None,
+) -> list[PriceProvider]:
+    """
+    Palauttaa lähteet hakujärjestyksessä:
+      1) päivämääräikkunaan sopivat ennen muita
+      2) terveyspisteet (suurin ensin)
+      3) priority
+    resolution_min rajaa lähteisiin, jotka antavat vähintään tämän tarkkuuden.
+    """
+    today = today or dt.date.today()
+    with _REGISTRY_LOCK:
+        candidates = [
+            (p, _HEALTH.setdefault(p.name, ProviderHealth()))
+            for p in _REGISTRY.values()
+            if resolution_min is None or p.resolution_min <= resolution_min
+        ]
+
+    def sort_key(item: tuple[PriceProvider, ProviderHealth]) -> tuple[bool, float, int]:
+        provider, health = item
+        # ikkunan ulkopuoliset lähteet jäävät viimeiseksi varalle
+        return (
+            not provider.supports(date_ymd, today),
+            -health.score(provider.latency_slo_s),
+            provider.priority,
+        )
+
+    return [provider for provider, _ in sorted(candidates, key=sort_key)]
+
+
+# ============================================================
+# HEDGATTU HAKU
+# ============================================================
+
+
+def _timed_call(provider: PriceProvider, date_ymd: dt.date) -> list[dict[str, float]] | None:
+    started = time.monotonic()
+    try:
+        result = provider.fetch(date_ymd)
+    except Exception as e:
+        provider_health(provider.name).record(False, time.monotonic() - started, str(e))
+        return None
+    # tyhjä vastaus ei ole lähteen vika: esim. huomisen hintoja ei ole vielä
+    # julkaistu missään lähteessä, eikä se saa pudottaa terveitä lähteitä
+    provider_health(provider.name).record(True if result else None, time.monotonic() - started)
+    return result
+
+
+def hedged_fetch(
+    providers: list[PriceProvider],
+    date_ymd: dt.date,
+) -> list[dict[str, float]] | None:
+    """
+    Hakee lähteistä järjestyksessä hedgaten:
+
+    1) käynnistä ensimmäinen lähde
+    2) jos se ei vastaa latency_slo_s:n kuluessa, käynnistä seuraava rinnalle
+    3) jos lähde epäonnistuu, käynnistä seuraava heti
+    4) palauta ensimmäinen kelvollinen (ei-tyhjä) tulos
+
+    Hävinneiden lähteiden haut saavat valmistua taustalla; niiden tulos
+    päivittää vain terveystiedot.
+    """
+    queue = list(providers)
+    pending: dict[Future, PriceProvider] = {}
+
+    def launch() -> float:
+        provider = queue.pop(0)
+        pending[_EXECUTOR.submit(_timed_call, provider, date_ymd)] = provider
+        return provider.latency_slo_s
+
+    if not queue:
+        return None
+    hedge_after_s = launch()
+
+    while pending:
+        done, _ = wait(
+            pending,
+            timeout=hedge_after_s if queue else None,
+            return_when=FIRST_COMPLETED,
+        )
+        if not done:
+            # ensisijainen on hidas -> varalähde rinnalle
+            hedge_after_s = launch()
+            continue
+
+        for fut in done:
+            pending.pop(fut)
+            result = fut.result()
+            if result:
+                return result
+
+        if queue:
+            # epäonnistunut lähde korvataan heti seuraavalla
+            hedge_after_s = launch()
+
+    return None
@@ -7,20 +7,76 @@ from datetime import datetime
 import streamlit as st
 
 from src.api.electricity_adapters import (
+    fetch_hourly_porssisahko,
+    fetch_hourly_sahkonhintatanaan,
     get_15min_from_porssisahko,
-    get_hourly_from_porssisahko,
-    get_hourly_from_sahkonhintatanaan,
 )
 from src.api.electricity_normalize import (
     expand_hourly_to_15min,
     normalize_prices_list_15min,
 )
-from src.config import CACHE_TTL_MED
+from src.api.electricity_providers import (
+    PriceProvider,
+    hedged_fetch,
+    providers_for,
+    register_provider,
+)
+from src.config import CACHE_TTL_MED, TZ
+from src.utils import report_error
 
 # sama tyyppi kuin aiemmin
 Price15 = dict[str, datetime | float]
 
 
+# --- lähderekisteri ---------------------------------------------------------
+# Kääreet hakevat adapterin moduulin globaaleista kutsuhetkellä, jotta testit
+# (monkeypatch) ja mahdolliset ajonaikaiset korvaukset osuvat. Haut nostavat
+# virheet, jotta hedged_fetch kirjaa ne lähteen terveystietoihin; None on
+# vain "ei vielä dataa".
+
+
+def _fetch_porssisahko(date_ymd: dt.date) -> list[dict[str, float]] | None:
+    try:
+        return fetch_hourly_porssisahko(date_ymd)
+    except Exception as e:
+        report_error(f"prices: porssisahko {date_ymd.isoformat()}", e)
+        raise
+
+
+def _fetch_sahkonhintatanaan(date_ymd: dt.date) -> list[dict[str, float]] | None:
+    try:
+        return fetch_hourly_sahkonhintatanaan(date_ymd)
+    except Exception as e:
+        report_error(f"prices: sahkonhintatanaan {date_ymd.isoformat()}", e)
+        raise
+
+
+# v2 latest-prices kattaa n. 48 h: eilinen/tänään/huominen, natiivisti 15 min
+register_provider(
+    PriceProvider(
+        name="porssisahko",
+        fetch=_fetch_porssisahko,
+        resolution_min=15,
+        days_back=1,
+        days_ahead=1,
+        latency_slo_s=1.5,
+        priority=10,
+    )
+)
+# päiväkohtainen arkisto, tuntidata
+register_provider(
+    PriceProvider(
+        name="sahkonhintatanaan",
+        fetch=_fetch_sahkonhintatanaan,
+        resolution_min=60,
+        days_back=None,
+        days_ahead=1,
+        latency_slo_s=2.0,
+        priority=20,
+    )
+)
+
+
 def _has_any_timestamp(items: list[dict]) -> bool:
     """
     Tarkistaa, onko tuntidatassa jo aikaleimoja.
@@ -78,20 +134,13 @@ def try_fetch_prices_15min(date_ymd: dt.date) -> list[Price15] | None:
 
 def fetch_prices_for(date_ymd: dt.date) -> list[dict[str, float]]:
     """
-    Orkestroi tuntihintojen hakemisen:
-    1) pörssisähkö v2 (tunti)
-    2) sahkonhintatanaan
+    Orkestroi tuntihintojen hakemisen lähderekisterin kautta:
+    1) lähteet järjestetään kykyjen ja terveyspisteiden mukaan
+       (oletuksena pörssisähkö v2 ennen sahkonhintatanaania)
+    2) jos ensisijainen ei vastaa SLO:n kuluessa, varalähde käynnistetään rinnalle
+    3) ensimmäinen kelvollinen tulos voittaa
     Palauttaa aina listan (voi olla tyhjä).
     """
-    # 1) ensisijainen lähde
-    prices = get_hourly_from_porssisahko(date_ymd)
-    if prices:
-        return prices
-
-    # 2) varalähde
-    prices = get_hourly_from_sahkonhintatanaan(date_ymd)
-    if prices:
-        return prices
-
-    # 3) mitään ei saatu
-    return []
+    today = datetime.now(TZ).date()
+    prices = hedged_fetch(providers_for(date_ymd, today=today), date_ymd)
+    return prices or []
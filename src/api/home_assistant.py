@@ -1,9 +1,8 @@
 from __future__ import annotations
 
-import json
-import os
+import asyncio
 import re
-from collections.abc import Mapping
+from collections.abc import Awaitable
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Any
@@ -11,7 +10,12 @@ from typing import Any
 import requests
 import streamlit as st
 
-from src.config import CACHE_TTL_SHORT, HTTP_TIMEOUT_S, TZ
+from src.api.async_http import raise_for_status, request, run_sync
+from src.config import HTTP_TIMEOUT_S, TZ
+from src.metrics import payload_size, upstream
+from src.refresh_coordinator import RefreshCoordinator
+from src.settings import HASettings, get_settings, read_secret
+from src.upstream_override import upstream_url
 from src.utils import report_error
 
 
@@ -40,151 +44,55 @@ class EqeStatus:
 
 
 def _get_secret(name: str) -> str | None:
-    """Hae asetus Streamlit secretsista tai ympäristömuuttujasta."""
-    try:
-        if name in st.secrets:
-            secret_val = st.secrets.get(name)
-            if secret_val is not None and str(secret_val).strip():
-                return str(secret_val).strip()
-
-        ha_section = st.secrets.get("home_assistant")
-        if isinstance(ha_section, Mapping):
-            key_map = {
-                "HA_BASE_URL": "base_url",
-                "HA_TOKEN": "token",
-                "HA_EQE_SOC_ENTITY": "eqe_soc_entity",
-                "HA_EQE_RANGE_ENTITY": "eqe_range_entity",
-                "HA_EQE_CHARGING_ENTITY": "eqe_charging_entity",
-                "HA_EQE_LOCK_ENTITY": "eqe_lock_entity",
-                "HA_EQE_LOCK_STATUS_ENTITY": "eqe_lock_status_entity",
-                "HA_EQE_LOCK_CODE": "eqe_lock_code",
-                "HA_EQE_LOCK_REFRESH_SERVICE": "eqe_lock_refresh_service",
-                "HA_EQE_LOCK_REFRESH_ENTITY": "eqe_lock_refresh_entity",
-                "HA_EQE_LOCK_REFRESH_DATA": "eqe_lock_refresh_data",
-                "HA_EQE_PRECLIMATE_ENTITY": "eqe_preclimate_entity",
-                "HA_EQE_PRECLIMATE_START_ENTITY": "eqe_preclimate_start_entity",
-                "HA_EQE_PRECLIMATE_STOP_ENTITY": "eqe_preclimate_stop_entity",
-                "HA_EQE_CHARGING_POWER_ENTITY": "eqe_charging_power_entity",
-                "HA_EQE_CHARGING_SWITCH_ENTITY": "eqe_charging_switch_entity",
-                "HA_EQE_REFRESH_SERVICE": "eqe_refresh_service",
-                "HA_EQE_REFRESH_ENTITY": "eqe_refresh_entity",
-                "HA_EQE_REFRESH_DATA": "eqe_refresh_data",
-                "HA_EQE_REFRESH_INTERVAL": "eqe_refresh_interval",
-                "HA_CACHE_TTL": "cache_ttl",
-            }
-            mapped = key_map.get(name)
-            if mapped:
-                mapped_val = ha_section.get(mapped)
-                if mapped_val is not None and str(mapped_val).strip():
-                    return str(mapped_val).strip()
-    except Exception:
-        pass
-
-    # env fallback (last)
-    val = os.getenv(name)
-    if val is not None and str(val).strip():
-        return val.strip()
+    """Hae asetus Streamlit secretsista tai ympäristömuuttujasta (ohittaa välimuistin)."""
+    return read_secret(name)
 
-    return None
+
+def ha_settings() -> HASettings:
+    """Home Assistant -asetukset; jäsennetään kerran, uudelleen vain secretsin muuttuessa."""
+    return get_settings().ha
 
 
 def _ha_cache_ttl() -> int:
-    raw = _get_secret("HA_CACHE_TTL")
-    if raw:
-        try:
-            return max(5, int(float(raw)))
-        except ValueError:
-            pass
-    return CACHE_TTL_SHORT
+    return ha_settings().cache_ttl
 
 
 def _ha_lock_timeout_s() -> float:
-    raw = _get_secret("HA_EQE_LOCK_TIMEOUT")
-    if raw:
-        try:
-            return max(5.0, float(raw))
-        except ValueError:
-            pass
-    return max(HTTP_TIMEOUT_S, 20.0)
+    return ha_settings().lock_timeout_s
 
 
 def ha_eqe_refresh_interval_s() -> float:
-    raw = _get_secret("HA_EQE_REFRESH_INTERVAL")
-    if raw:
-        try:
-            return max(30.0, float(raw))
-        except ValueError:
-            pass
-    return 300.0
+    return ha_settings().refresh_interval_s
 
 
-def _require_config() -> dict[str, str]:
-    base_url = _get_secret("HA_BASE_URL")
-    token = _get_secret("HA_TOKEN")
-    if not token:
+def _require_config() -> dict[str, Any]:
+    settings = ha_settings()
+    if not settings.token:
         raise RuntimeError("Home Assistant token puuttuu secrets.toml-tiedostosta")
-    token = token.strip().strip('"').strip("'")
-
-    soc_entity = _get_secret("HA_EQE_SOC_ENTITY")
-    range_entity = _get_secret("HA_EQE_RANGE_ENTITY")
-    charging_entity = _get_secret("HA_EQE_CHARGING_ENTITY")
-    lock_entity = _get_secret("HA_EQE_LOCK_ENTITY")
-    lock_status_entity = _get_secret("HA_EQE_LOCK_STATUS_ENTITY")
-    preclimate_entity = _get_secret("HA_EQE_PRECLIMATE_ENTITY")
-    preclimate_start_entity = _get_secret("HA_EQE_PRECLIMATE_START_ENTITY")
-    preclimate_stop_entity = _get_secret("HA_EQE_PRECLIMATE_STOP_ENTITY")
-    charging_power_entity = _get_secret("HA_EQE_CHARGING_POWER_ENTITY")
-    charging_switch_entity = _get_secret("HA_EQE_CHARGING_SWITCH_ENTITY")
-
-    missing = [
-        name
-        for name, value in (
-            ("HA_BASE_URL", base_url),
-            ("HA_TOKEN", token),
-            ("HA_EQE_SOC_ENTITY", soc_entity),
-            ("HA_EQE_RANGE_ENTITY", range_entity),
-            ("HA_EQE_CHARGING_ENTITY", charging_entity),
-        )
-        if not value
-    ]
+    missing = settings.missing()
     if missing:
         raise HAConfigError(f"Home Assistant -asetukset puuttuvat: {', '.join(missing)}")
-
-    return {
-        "base_url": str(base_url).rstrip("/"),
-        "token": str(token),
-        "soc_entity": str(soc_entity),
-        "range_entity": str(range_entity),
-        "charging_entity": str(charging_entity),
-        "lock_entity": str(lock_entity) if lock_entity else None,
-        "lock_status_entity": str(lock_status_entity) if lock_status_entity else None,
-        "preclimate_entity": str(preclimate_entity) if preclimate_entity else None,
-        "preclimate_start_entity": (
-            str(preclimate_start_entity) if preclimate_start_entity else None
-        ),
-        "preclimate_stop_entity": str(preclimate_stop_entity) if preclimate_stop_entity else None,
-        "charging_power_entity": str(charging_power_entity) if charging_power_entity else None,
-        "charging_switch_entity": (str(charging_switch_entity) if charging_switch_entity else None),
-    }
+    return settings.as_config()
 
 
 def eqe_preclimate_configured() -> bool:
     """Palauttaa True, jos EQE-ilmastoinnin entity on määritetty."""
+    settings = ha_settings()
     return bool(
-        _get_secret("HA_EQE_PRECLIMATE_ENTITY")
-        or _get_secret("HA_EQE_PRECLIMATE_START_ENTITY")
-        or _get_secret("HA_EQE_PRECLIMATE_STOP_ENTITY")
+        settings.preclimate_entity
+        or settings.preclimate_start_entity
+        or settings.preclimate_stop_entity
     )
 
 
 def eqe_lock_configured() -> bool:
     """Palauttaa True, jos EQE-lukituksen entity on määritetty."""
-    return bool(_get_secret("HA_EQE_LOCK_ENTITY"))
+    return bool(ha_settings().lock_entity)
 
 
 def eqe_charging_switch_configured() -> bool:
     """Palauttaa True, jos EQE-latauksen kytkinentity on määritetty."""
-    return bool(_get_secret("HA_EQE_CHARGING_SWITCH_ENTITY"))
+    return bool(ha_settings().charging_switch_entity)
 
 
 def _parse_float(value: Any) -> float | None:
@@ -219,37 +127,51 @@ def _parse_ts(raw: str | None) -> datetime | None:
         return None
 
 
-def _fetch_state(
-    base_url: str, token: str, entity_id: str, session: requests.Session | None = None
-) -> dict[str, Any]:
-    url = f"{base_url}/api/states/{entity_id}"
+async def _fetch_state_async(base_url: str, token: str, entity_id: str) -> dict[str, Any]:
+    url = upstream_url(f"{base_url}/api/states/{entity_id}")
     headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
-    sess = session or requests
-    resp = sess.get(url, headers=headers, timeout=HTTP_TIMEOUT_S)
-    resp.raise_for_status()
-    data = resp.json()
+    with upstream("ha_state") as span:
+        resp = await request("GET", url, headers=headers, timeout=HTTP_TIMEOUT_S)
+        raise_for_status(resp)
+        span.payload_bytes = payload_size(resp)
+        data = resp.json()
     return data if isinstance(data, dict) else {}
 
 
-def _call_service(
+def _fetch_state(base_url: str, token: str, entity_id: str) -> dict[str, Any]:
+    return run_sync(_fetch_state_async(base_url, token, entity_id))
+
+
+async def _call_service_async(
     base_url: str,
     token: str,
     domain: str,
     service: str,
     data: dict[str, Any],
-    session: requests.Session | None = None,
     timeout_s: float | None = None,
 ) -> Any:
-    url = f"{base_url}/api/services/{domain}/{service}"
+    url = upstream_url(f"{base_url}/api/services/{domain}/{service}")
     headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
-    sess = session or requests
     timeout = HTTP_TIMEOUT_S if timeout_s is None else timeout_s
-    resp = sess.post(url, headers=headers, json=data, timeout=timeout)
-    resp.raise_for_status()
-    return resp.json()
+    with upstream("ha_service") as span:
+        resp = await request("POST", url, headers=headers, json=data, timeout=timeout)
+        raise_for_status(resp)
+        span.payload_bytes = payload_size(resp)
+        return resp.json()
 
 
-def set_eqe_preclimate(enabled: bool, session: requests.Session | None = None) -> Any:
+def _call_service(
+    base_url: str,
+    token: str,
+    domain: str,
+    service: str,
+    data: dict[str, Any],
+    timeout_s: float | None = None,
+) -> Any:
+    return run_sync(_call_service_async(base_url, token, domain, service, data, timeout_s))
+
+
+def set_eqe_preclimate(enabled: bool) -> Any:
     cfg = _require_config()
     start_entity = cfg.get("preclimate_start_entity")
     stop_entity = cfg.get("preclimate_stop_entity")
@@ -268,7 +190,6 @@ def set_eqe_preclimate(enabled: bool, session: requests.Session | None = None) -
             domain,
             service,
             {"entity_id": entity_id},
-            session,
         )
 
     entity_id = cfg.get("preclimate_entity")
@@ -282,11 +203,10 @@ def set_eqe_preclimate(enabled: bool, session: requests.Session | None = None) -
         domain,
         service,
         {"entity_id": entity_id},
-        session,
     )
 
 
-def set_eqe_lock(locked: bool, session: requests.Session | None = None) -> Any:
+def set_eqe_lock(locked: bool) -> Any:
     cfg = _require_config()
     entity_id = cfg.get("lock_entity")
     if not entity_id:
@@ -297,11 +217,9 @@ def set_eqe_lock(locked: bool, session: requests.Session | None = None) -> Any:
     else:
         service = "lock" if locked else "unlock"
     data = {"entity_id": entity_id}
-    lock_code = _get_secret("HA_EQE_LOCK_CODE")
+    lock_code = ha_settings().lock_code
     if lock_code:
-        cleaned = lock_code.strip().strip('"').strip("'")
-        if cleaned:
-            data["code"] = cleaned
+        data["code"] = lock_code
     try:
         return _call_service(
             cfg["base_url"],
@@ -309,7 +227,6 @@ def set_eqe_lock(locked: bool, session: requests.Session | None = None) -> Any:
             domain,
             service,
             data,
-            session,
             timeout_s=_ha_lock_timeout_s(),
         )
     except requests.HTTPError as e:
@@ -321,7 +238,7 @@ def set_eqe_lock(locked: bool, session: requests.Session | None = None) -> Any:
         raise
 
 
-def set_eqe_charging_enabled(enabled: bool, session: requests.Session | None = None) -> Any:
+def set_eqe_charging_enabled(enabled: bool) -> Any:
     cfg = _require_config()
     entity_id = cfg.get("charging_switch_entity")
     if not entity_id:
@@ -334,32 +251,24 @@ def set_eqe_charging_enabled(enabled: bool, session: requests.Session | None = N
         domain,
         service,
         {"entity_id": entity_id},
-        session,
     )
 
 
-def refresh_eqe_lock_status(session: requests.Session | None = None) -> Any:
+def refresh_eqe_lock_status() -> Any:
     cfg = _require_config()
     entity_id = cfg.get("lock_status_entity") or cfg.get("lock_entity")
     if not entity_id:
         raise HAConfigError("HA_EQE_LOCK_ENTITY puuttuu")
-    refresh_service = _get_secret("HA_EQE_LOCK_REFRESH_SERVICE")
-    refresh_entity = _get_secret("HA_EQE_LOCK_REFRESH_ENTITY")
-    refresh_data_raw = _get_secret("HA_EQE_LOCK_REFRESH_DATA")
+    settings = ha_settings()
+    refresh_service = settings.lock_refresh_service
+    refresh_entity = settings.lock_refresh_entity
     if refresh_service:
         if "." in refresh_service:
             domain, service = refresh_service.split(".", 1)
         else:
             domain, service = "homeassistant", refresh_service
         data: dict[str, Any] = {}
-        extra: dict[str, Any] = {}
-        if refresh_data_raw:
-            try:
-                parsed = json.loads(refresh_data_raw)
-                if isinstance(parsed, dict):
-                    extra = parsed
-            except json.JSONDecodeError:
-                extra = {}
+        extra = dict(settings.lock_refresh_data)
         if refresh_entity:
             data["entity_id"] = refresh_entity
         elif "entry_id" not in extra:
@@ -372,7 +281,6 @@ def refresh_eqe_lock_status(session: requests.Session | None = None) -> Any:
             domain,
             service,
             data,
-            session,
             timeout_s=_ha_lock_timeout_s(),
         )
     return _call_service(
@@ -381,56 +289,53 @@ def refresh_eqe_lock_status(session: requests.Session | None = None) -> Any:
         "homeassistant",
         "update_entity",
         {"entity_id": entity_id},
-        session,
         timeout_s=_ha_lock_timeout_s(),
     )
 
 
-def refresh_eqe_charging_power(session: requests.Session | None = None) -> Any:
+async def refresh_eqe_charging_power_async() -> Any:
     cfg = _require_config()
     entity_id = cfg.get("charging_power_entity")
     if not entity_id:
         raise HAConfigError("HA_EQE_CHARGING_POWER_ENTITY puuttuu")
-    return _call_service(
+    return await _call_service_async(
         cfg["base_url"],
         cfg["token"],
         "homeassistant",
         "update_entity",
         {"entity_id": entity_id},
-        session,
     )
 
 
-def refresh_eqe_charging_state(session: requests.Session | None = None) -> Any:
+def refresh_eqe_charging_power() -> Any:
+    return run_sync(refresh_eqe_charging_power_async())
+
+
+async def refresh_eqe_charging_state_async() -> Any:
     cfg = _require_config()
     entity_id = cfg.get("charging_entity")
     if not entity_id:
         raise HAConfigError("HA_EQE_CHARGING_ENTITY puuttuu")
-    return _call_service(
+    return await _call_service_async(
         cfg["base_url"],
         cfg["token"],
         "homeassistant",
         "update_entity",
         {"entity_id": entity_id},
-        session,
     )
 
 
-def refresh_eqe_status_entities(session: requests.Session | None = None) -> Any:
+def refresh_eqe_charging_state() -> Any:
+    return run_sync(refresh_eqe_charging_state_async())
+
+
+def refresh_eqe_status_entities() -> Any:
     cfg = _require_config()
-    refresh_service = _get_secret("HA_EQE_REFRESH_SERVICE")
-    refresh_entity = _get_secret("HA_EQE_REFRESH_ENTITY")
-    refresh_data_raw = _get_secret("HA_EQE_REFRESH_DATA")
+    settings = ha_settings()
+    refresh_service = settings.refresh_service
+    refresh_entity = settings.refresh_entity
     data: dict[str, Any] = {}
-    extra: dict[str, Any] = {}
-
-    if refresh_data_raw:
-        try:
-            parsed = json.loads(refresh_data_raw)
-            if isinstance(parsed, dict):
-                extra = parsed
-        except json.JSONDecodeError:
-            extra = {}
+    extra = dict(settings.refresh_data)
 
     if refresh_service:
         if "." in refresh_service:
@@ -446,7 +351,6 @@ def refresh_eqe_status_entities(session: requests.Session | None = None) -> Any:
             domain,
             service,
             data,
-            session,
             timeout_s=_ha_lock_timeout_s(),
         )
 
@@ -473,36 +377,91 @@ def refresh_eqe_status_entities(session: requests.Session | None = None) -> Any:
         "homeassistant",
         "update_entity",
         data,
-        session,
     )
 
 
-def fetch_eqe_charging_power(
-    session: requests.Session | None = None,
-) -> tuple[float | None, str | None, datetime | None]:
+# update_entity herättää auton pilvipalvelun: kutsut yhdistetään kaikkien
+# istuntojen (kioskien) kesken ja rajataan prosessin laajuisesti
+_REFRESH = RefreshCoordinator()
+EQE_CHARGING_REFRESH_INTERVAL_S = 30.0
+
+
+async def _refresh_eqe_charging_async() -> None:
+    # lataustila ja -teho päivitetään rinnakkain; virhe vain, jos kumpikin epäonnistuu
+    results = await asyncio.gather(
+        refresh_eqe_charging_state_async(),
+        refresh_eqe_charging_power_async(),
+        return_exceptions=True,
+    )
+    errors = [r for r in results if isinstance(r, Exception)]
+    if len(errors) == 2:
+        raise errors[-1]
+
+
+def _refresh_eqe_charging() -> None:
+    run_sync(_refresh_eqe_charging_async())
+
+
+def request_eqe_status_refresh(last_changed: datetime | None = None) -> bool:
+    """
+    EQE-entiteettien päivitys korkeintaan kerran ha_eqe_refresh_interval_s-jaksossa.
+    last_changed: tuorein tunnettu tilamuutos; jos se on jakson sisällä, ei päivitetä.
+    True, jos päivitys tehtiin (fetch_eqe_status-välimuisti kannattaa tyhjentää).
+    """
+    return _REFRESH.request(
+        "eqe_status",
+        refresh_eqe_status_entities,
+        ha_eqe_refresh_interval_s(),
+        last_changed,
+    )
+
+
+def request_eqe_charging_refresh(
+    last_changed: datetime | None = None,
+    interval_s: float = EQE_CHARGING_REFRESH_INTERVAL_S,
+) -> bool:
+    """Lataustilan ja -tehon päivitys latauksen seurannan aikana (ks. yllä)."""
+    return _REFRESH.request("eqe_charging", _refresh_eqe_charging, interval_s, last_changed)
+
+
+def reset_eqe_refresh() -> None:
+    _REFRESH.reset()
+
+
+def fetch_eqe_charging_power() -> tuple[float | None, str | None, datetime | None]:
     cfg = _require_config()
     entity_id = cfg.get("charging_power_entity")
     if not entity_id:
         raise HAConfigError("HA_EQE_CHARGING_POWER_ENTITY puuttuu")
-    state = _fetch_state(cfg["base_url"], cfg["token"], entity_id, session)
+    state = _fetch_state(cfg["base_url"], cfg["token"], entity_id)
     val, unit = _extract_power_value(state)
     updated = _parse_ts(state.get("last_changed") or state.get("last_updated"))
     return val, str(unit) if unit else None, updated
 
 
-def fetch_eqe_lock_state(
-    session: requests.Session | None = None,
-) -> tuple[str | None, str | None, str | None, str | None, datetime | None]:
+def fetch_eqe_lock_state() -> tuple[
+    str | None, str | None, str | None, str | None, datetime | None
+]:
     cfg = _require_config()
     lock_state_entity = cfg.get("lock_status_entity") or cfg.get("lock_entity")
     if not lock_state_entity:
         raise HAConfigError("HA_EQE_LOCK_ENTITY puuttuu")
-    state = _fetch_state(cfg["base_url"], cfg["token"], lock_state_entity, session)
+    state = _fetch_state(cfg["base_url"], cfg["token"], lock_state_entity)
     lock_val, lock_raw, lock_attr, lock_source = _extract_lock_state(state)
     lock_updated = _parse_ts(state.get("last_changed") or state.get("last_updated"))
     return lock_val, lock_raw, lock_attr, lock_source, lock_updated
 
 
+def fetch_eqe_preclimate_state() -> str:
+    """Esi-ilmastoinnin normalisoitu tila ("Käynnissä" / "Käynnistä") suoraan HA:sta."""
+    cfg = _require_config()
+    entity_id = cfg.get("preclimate_entity")
+    if not entity_id:
+        raise HAConfigError("HA_EQE_PRECLIMATE_ENTITY puuttuu")
+    state = _fetch_state(cfg["base_url"], cfg["token"], entity_id)
+    return _normalize_preclimate_state(state.get("state"))
+
+
 def _normalize_charging_state(state: str | None) -> str | None:
     if not state:
         return None
@@ -681,8 +640,8 @@ def build_eqe_status_from_states(
     )
 
 
-def _fetch_eqe_states(
-    cfg: dict[str, str | None], session: requests.Session | None
+async def _fetch_eqe_states_async(
+    cfg: dict[str, str | None],
 ) -> tuple[
     dict[str, Any],
     dict[str, Any],
@@ -692,48 +651,42 @@ def _fetch_eqe_states(
     dict[str, Any],
     dict[str, Any],
 ]:
-    soc_state = _fetch_state(cfg["base_url"], cfg["token"], cfg["soc_entity"], session)
-    range_state = _fetch_state(cfg["base_url"], cfg["token"], cfg["range_entity"], session)
-    charging_state = _fetch_state(cfg["base_url"], cfg["token"], cfg["charging_entity"], session)
+    """Kaikki EQE-entiteetit rinnakkain; valinnaiset puuttuvat -> {}."""
     lock_state_entity = cfg.get("lock_status_entity") or cfg.get("lock_entity")
-    lock_state = (
-        _fetch_state(cfg["base_url"], cfg["token"], lock_state_entity, session)
-        if lock_state_entity
-        else {}
-    )
-    preclimate_state = (
-        _fetch_state(cfg["base_url"], cfg["token"], cfg["preclimate_entity"], session)
-        if cfg.get("preclimate_entity")
-        else {}
-    )
-    charging_power_state = (
-        _fetch_state(cfg["base_url"], cfg["token"], cfg["charging_power_entity"], session)
-        if cfg.get("charging_power_entity")
-        else {}
-    )
-    charging_switch_state = (
-        _fetch_state(cfg["base_url"], cfg["token"], cfg["charging_switch_entity"], session)
-        if cfg.get("charging_switch_entity")
-        else {}
-    )
-    return (
-        soc_state,
-        range_state,
-        charging_state,
-        lock_state,
-        preclimate_state,
-        charging_power_state,
-        charging_switch_state,
+    entity_ids = (
+        cfg["soc_entity"],
+        cfg["range_entity"],
+        cfg["charging_entity"],
+        lock_state_entity,
+        cfg.get("preclimate_entity"),
+        cfg.get("charging_power_entity"),
+        cfg.get("charging_switch_entity"),
     )
 
+    async def missing() -> dict[str, Any]:
+        return {}
 
-@st.cache_data(ttl=_ha_cache_ttl())
-def fetch_eqe_status(session: requests.Session | None = None) -> EqeStatus:
+    def state(index: int, entity_id: str | None) -> Awaitable[dict[str, Any]]:
+        # kolme ensimmäistä ovat pakollisia (haetaan, vaikka arvo puuttuisi)
+        if index >= 3 and not entity_id:
+            return missing()
+        return _fetch_state_async(cfg["base_url"], cfg["token"], entity_id)
+
+    states = await asyncio.gather(*(state(i, e) for i, e in enumerate(entity_ids)))
+    return tuple(states)  # type: ignore[return-value]
+
+
+async def fetch_eqe_status_async() -> EqeStatus:
     cfg = _require_config()
 
     try:
-        states = _fetch_eqe_states(cfg, session)
+        states = await _fetch_eqe_states_async(cfg)
     except Exception as e:
         report_error("home_assistant_eqe: fetch", e)
         raise
     return build_eqe_status_from_states(*states)
+
+
+@st.cache_data(ttl=_ha_cache_ttl())
+def fetch_eqe_status() -> EqeStatus:
+    return run_sync(fetch_eqe_status_async())
@@ -6,6 +6,7 @@ from src.api import http_client as _http_client
 
 api_request_with_retry = _http_client.api_request_with_retry
 http_get_json = _http_client.http_get_json
+http_get_json_async = _http_client.http_get_json_async
 RateLimitBackoff = _http_client.RateLimitBackoff
 report_error = _http_client.report_error
 requests = _http_client.requests
@@ -13,6 +14,7 @@ requests = _http_client.requests
 __all__ = [
     "api_request_with_retry",
     "http_get_json",
+    "http_get_json_async",
     "RateLimitBackoff",
     "report_error",
     "requests",
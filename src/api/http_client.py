@@ -1,15 +1,23 @@
 # src/api/http_client.py
+import asyncio
 import logging
 import time
 from typing import Any
+from urllib.parse import urlsplit
 
+import httpx
 import requests
 from requests.exceptions import RequestException
 
+from src.api.async_http import raise_for_status, request, run_sync
 from src.config import COINGECKO_BACKOFF_S, HTTP_TIMEOUT_S
+from src.metrics import payload_size, upstream
+from src.upstream_override import upstream_url
 from src.utils import report_error
 
 logger = logging.getLogger("homedashboard")
+# 429/403 (muu kuin CoinGecko): yksi uusintayritys tämän tauon jälkeen
+RETRY_DELAY_S = 0.8
 _COINGECKO_BACKOFF_UNTIL = 0.0
 
 
@@ -21,7 +29,7 @@ def _is_coingecko_url(url: str) -> bool:
     return "api.coingecko.com" in url
 
 
-def _set_coingecko_backoff(resp: requests.Response) -> None:
+def _set_coingecko_backoff(resp: httpx.Response) -> None:
     global _COINGECKO_BACKOFF_UNTIL
     retry_after = resp.headers.get("Retry-After")
     backoff = COINGECKO_BACKOFF_S
@@ -37,37 +45,50 @@ def _coingecko_backoff_active() -> bool:
     return time.time() < _COINGECKO_BACKOFF_UNTIL
 
 
-def api_request_with_retry(
+async def api_request_with_retry_async(
     url: str, method: str = "GET", retry_count: int = 3, **kwargs
 ) -> dict[Any, Any] | None:
     for attempt in range(retry_count):
         try:
-            resp = requests.request(method, url, **kwargs)
-            resp.raise_for_status()
+            resp = await request(method, upstream_url(url), **kwargs)
+            raise_for_status(resp)
             return resp.json()
-        except RequestException as e:
+        except (RequestException, ValueError) as e:
             logger.warning("API request failed (%s/%s): %s", attempt + 1, retry_count, e)
             if attempt + 1 == retry_count:
                 return None
-            time.sleep(2**attempt)
+            await asyncio.sleep(2**attempt)
 
 
-def http_get_json(url: str, timeout: float = HTTP_TIMEOUT_S) -> dict:
+def api_request_with_retry(
+    url: str, method: str = "GET", retry_count: int = 3, **kwargs
+) -> dict[Any, Any] | None:
+    return run_sync(api_request_with_retry_async(url, method, retry_count, **kwargs))
+
+
+async def http_get_json_async(url: str, timeout: float = HTTP_TIMEOUT_S) -> dict:
     headers = {"User-Agent": "HomeDashboard/1.0 (+https://github.com/pvehvila/kotidashboard)"}
     try:
         if _is_coingecko_url(url) and _coingecko_backoff_active():
             raise RateLimitBackoff("coingecko backoff active")
-        resp = requests.get(url, timeout=timeout, headers=headers)
-        if resp.status_code in (429, 403):
-            if _is_coingecko_url(url):
-                _set_coingecko_backoff(resp)
-                raise RateLimitBackoff(f"coingecko rate limited ({resp.status_code})")
-            time.sleep(0.8)
-            resp = requests.get(url, timeout=timeout, headers=headers)
-        resp.raise_for_status()
-        return resp.json()
+        with upstream(f"http:{urlsplit(url).hostname or url}") as span:
+            target = upstream_url(url)
+            resp = await request("GET", target, timeout=timeout, headers=headers)
+            if resp.status_code in (429, 403):
+                if _is_coingecko_url(url):
+                    _set_coingecko_backoff(resp)
+                    raise RateLimitBackoff(f"coingecko rate limited ({resp.status_code})")
+                await asyncio.sleep(RETRY_DELAY_S)
+                resp = await request("GET", target, timeout=timeout, headers=headers)
+            raise_for_status(resp)
+            span.payload_bytes = payload_size(resp)
+            return resp.json()
     except RateLimitBackoff:
         raise
     except Exception as e:
         report_error(f"http_get_json: {url}", e)
         raise
+
+
+def http_get_json(url: str, timeout: float = HTTP_TIMEOUT_S) -> dict:
+    return run_sync(http_get_json_async(url, timeout))
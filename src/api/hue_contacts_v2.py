@@ -1,15 +1,15 @@
 # src/api/hue_contacts_v2.py
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Any
 
-import requests
-import streamlit as st
-import urllib3
-
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+from src.api.async_http import raise_for_status, request, run_sync
+from src.metrics import payload_size, upstream
+from src.settings import get_settings
+from src.upstream_override import upstream_url
 
 
 class HueV2ConfigError(RuntimeError):
@@ -27,14 +27,8 @@ class HueContactSensor:
 
 
 def _resolve_v2_config() -> tuple[str, str]:
-    host = None
-    key = None
-    try:
-        hue = st.secrets["hue"]
-        host = str(hue["bridge_host"]).strip()
-        key = str(hue["v2_app_key"]).strip().strip('"').strip("'")
-    except Exception:
-        pass
+    hue = get_settings().hue
+    host, key = hue.bridge_host, hue.v2_app_key
 
     if not host or not key:
         raise HueV2ConfigError(
@@ -44,13 +38,20 @@ def _resolve_v2_config() -> tuple[str, str]:
     return host, key
 
 
-def _hue_v2_get(path: str) -> dict:
+async def _hue_v2_get_async(path: str) -> dict:
     bridge_host, app_key = _resolve_v2_config()
-    url = f"https://{bridge_host}{path}"
+    url = upstream_url(f"https://{bridge_host}{path}")
     headers = {"hue-application-key": app_key}
-    resp = requests.get(url, headers=headers, timeout=5, verify=False)  # nosec B501
-    resp.raise_for_status()
-    return resp.json()
+    with upstream("hue_v2") as span:
+        # sillan varmenne on itse allekirjoitettu
+        resp = await request("GET", url, headers=headers, timeout=5, verify=False)  # nosec B501
+        raise_for_status(resp)
+        span.payload_bytes = payload_size(resp)
+        return resp.json()
+
+
+def _hue_v2_get(path: str) -> dict:
+    return run_sync(_hue_v2_get_async(path))
 
 
 def _hue_cfg() -> tuple[str, str]:
@@ -73,17 +74,27 @@ def _parse_iso8601(ts: str | None) -> datetime | None:
         return None
 
 
-def fetch_hue_contact_sensors() -> list[HueContactSensor]:
+async def fetch_hue_contact_sensors_async() -> list[HueContactSensor]:
     """Hakee Hue Secure -ovikontaktit v2-API:n kautta.
 
     Käyttää /clip/v2/resource/device ja /clip/v2/resource/contact -resursseja.
     """
-    # 1) Kaikki laitteet
-    device_payload = _hue_v2_get("/clip/v2/resource/device")
-    devices = device_payload.get("data", []) or []
+    # laitteet ja contact-resurssit (pelkät tilat) haetaan rinnakkain
+    device_payload, contact_payload = await asyncio.gather(
+        _hue_v2_get_async("/clip/v2/resource/device"),
+        _hue_v2_get_async("/clip/v2/resource/contact"),
+    )
+    return _contact_sensors(device_payload, contact_payload)
+
+
+def fetch_hue_contact_sensors() -> list[HueContactSensor]:
+    return run_sync(fetch_hue_contact_sensors_async())
+
 
-    # 2) Kaikki contact-resurssit (pelkät tilat)
-    contact_payload = _hue_v2_get("/clip/v2/resource/contact")
+def _contact_sensors(
+    device_payload: dict[str, Any], contact_payload: dict[str, Any]
+) -> list[HueContactSensor]:
+    devices = device_payload.get("data", []) or []
     contacts = contact_payload.get("data", []) or []
 
     contacts_by_id: dict[str, dict[str, Any]] = {c["id"]: c for c in contacts}
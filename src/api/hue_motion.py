@@ -3,9 +3,12 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from typing import Any
 
-import requests
-import streamlit as st
+from src.api.async_http import raise_for_status, request, run_sync
+from src.metrics import payload_size, upstream
+from src.settings import get_settings
+from src.upstream_override import upstream_url
 
 HUE_DEFAULT_TIMEOUT = 5
 
@@ -39,10 +42,9 @@ def _parse_lastupdated(value: str | None) -> datetime | None:
         return None
 
 
-def fetch_hue_door_sensors(
+async def fetch_hue_door_sensors_async(
     bridge_host: str | None = None,
     user: str | None = None,
-    session: requests.Session | None = None,
 ) -> list[HueDoorSensor]:
     """Hakee Hue-sensorit ja suodattaa ovikontaktit + liikesensorit.
 
@@ -51,25 +53,34 @@ def fetch_hue_door_sensors(
     """
 
     if not bridge_host or not user:
-        try:
-            hue = st.secrets["hue"]
-            bridge_host = bridge_host or str(hue["bridge_host"]).strip()
-            user = user or str(hue["bridge_user"]).strip()
-        except Exception:
-            pass
+        hue = get_settings().hue
+        bridge_host = bridge_host or hue.bridge_host
+        user = user or hue.bridge_user
 
     if not bridge_host or not user:
         raise RuntimeError(
             "Hue-konfiguraatio puuttuu secrets.toml-tiedostosta: [hue] bridge_host / bridge_user"
         )
 
-    url = f"http://{bridge_host}/api/{user}/sensors"
-    sess = session or requests
+    url = upstream_url(f"http://{bridge_host}/api/{user}/sensors")
+
+    with upstream("hue_v1") as span:
+        resp = await request("GET", url, timeout=HUE_DEFAULT_TIMEOUT)
+        raise_for_status(resp)
+        span.payload_bytes = payload_size(resp)
+        raw = resp.json()
+
+    return _door_sensors(raw)
+
+
+def fetch_hue_door_sensors(
+    bridge_host: str | None = None,
+    user: str | None = None,
+) -> list[HueDoorSensor]:
+    return run_sync(fetch_hue_door_sensors_async(bridge_host, user))
 
-    resp = sess.get(url, timeout=HUE_DEFAULT_TIMEOUT)
-    resp.raise_for_status()
-    raw = resp.json()
 
+def _door_sensors(raw: dict[str, Any]) -> list[HueDoorSensor]:
     sensors: list[HueDoorSensor] = []
 
     # Hue-sensorit: { "1": {...}, "2": {...}, ... }
@@ -1,38 +1,48 @@
 from __future__ import annotations
 
+import copy
+import hashlib
 import json
 import re
 import time
+from collections.abc import Iterable
 from dataclasses import asdict, dataclass
 from pathlib import Path
 from typing import Any
 
 import requests
 
-from src.config import HTTP_TIMEOUT_S, POLLEN_CACHE_FILE, POLLEN_CACHE_TTL_S
+from src.api.async_http import raise_for_status, request, run_sync
+from src.api.pollen_parser import (
+    CURRENT,
+    FORECAST,
+    PLANTS,
+    BulletinIndex,
+    index_bulletin,
+)
+from src.config import (
+    HTTP_TIMEOUT_S,
+    POLLEN_CACHE_FILE,
+    POLLEN_CACHE_TTL_S,
+    POLLEN_LOCATION,
+    POLLEN_STATION,
+)
+from src.metrics import count_cache, payload_size, upstream
+from src.upstream_override import upstream_url
 
 POLLEN_SOURCE_URL = "https://siirto.siitepoly.fi/media/sptied.txt"
 POLLEN_SOURCE_NAME = "Turun yliopiston siitepölytiedotus"
 
-PLANTS: tuple[tuple[str, tuple[str, ...]], ...] = (
-    ("koivu", ("koivu", "koivun", "koivua")),
-    ("heinät", ("heinä", "heinät", "heinien", "heinää", "heinäpöly")),
-    ("pujo", ("pujo", "pujon", "pujoa")),
-)
-
 LEVELS = ("ei havaittu", "vähän", "kohtalaisesti", "runsaasti")
 
-_FORECAST_RE = re.compile(
-    r"\b(ennuste|ennustetaan|odotetaan|lähipäiv|jatkuu|voimistuu|runsastuu|"
-    r"vähenee|alkaa|leviää|kulkeutuu|kulkeutua|tulevina)\b",
-    re.IGNORECASE,
-)
-_REGION_RE = re.compile(
-    r"\b(riihimä\w*|häme\w*|kanta-häme\w*|uusimaa|uudellama\w*|etelä-suom\w*|"
-    r"eteläisessä suomessa|"
-    r"maan eteläos\w*|etelärannik\w*|suomen eteläos\w*)\b",
-    re.IGNORECASE,
-)
+# Nosta, kun jäsennin tai indeksin rakenne muuttuu: vanhat välimuistiin
+# tallennetut indeksit jäävät silloin käyttämättä.
+PARSER_VERSION = 5
+
+DEFAULT_STATION = POLLEN_STATION
+DEFAULT_LOCATION = POLLEN_LOCATION
+
+_NO_FORECAST_TEXT = {"Riihimäki": "Ei erillistä ennustetta Riihimäen alueelle."}
 
 
 @dataclass(frozen=True)
@@ -53,9 +63,55 @@ class PollenView:
     summary: str
 
 
-def fetch_pollen_view() -> dict[str, Any]:
-    text = _fetch_pollen_text()
-    view = parse_pollen_text(text)
+async def fetch_pollen_view_async(
+    station: str | None = None,
+    location: str | None = None,
+) -> dict[str, Any]:
+    """
+    Palauttaa siitepölynäkymän yhdelle asemalle.
+
+    Koko tiedote (kaikki asemat) jäsennetään kerran indeksiksi, joka
+    tallennetaan välimuistitiedostoon tekstin sha256-tiivisteellä. Muuttumaton
+    tiedote ei aiheuta latausta (ETag / If-Modified-Since) eikä uutta
+    jäsennystä; asemakohtaiset näkymät kootaan indeksistä ja muistetaan.
+    """
+    selection = (station or DEFAULT_STATION, location or DEFAULT_LOCATION)
+    return (await fetch_pollen_views_async([selection]))[0]
+
+
+def fetch_pollen_view(
+    station: str | None = None,
+    location: str | None = None,
+) -> dict[str, Any]:
+    return run_sync(fetch_pollen_view_async(station, location))
+
+
+async def fetch_pollen_views_async(
+    selections: Iterable[tuple[str, str]],
+) -> list[dict[str, Any]]:
+    """
+    Näkymät usealle (asema, paikka) -parille yhdellä latauksella ja jäsennyksellä,
+    esim. kioskit, joilla on eri asetukset.
+    """
+    key, index = _cached_index(await _load_bulletin_async())
+    return [copy.deepcopy(_station_view(key, index, s, loc)) for s, loc in selections]
+
+
+def fetch_pollen_views(selections: Iterable[tuple[str, str]]) -> list[dict[str, Any]]:
+    return run_sync(fetch_pollen_views_async(selections))
+
+
+def fetch_pollen_index() -> BulletinIndex:
+    """Välimuistissa oleva koko tiedotteen indeksi (asema -> kasvi -> taso)."""
+    return _cached_index(run_sync(_load_bulletin_async()))[1]
+
+
+def pollen_stations() -> list[str]:
+    """Tiedotteen karttaosan asemat tiedotteen järjestyksessä."""
+    return fetch_pollen_index().station_names()
+
+
+def _view_to_dict(view: PollenView) -> dict[str, Any]:
     return {
         "location": view.location,
         "source": view.source,
@@ -65,57 +121,204 @@ def fetch_pollen_view() -> dict[str, Any]:
     }
 
 
-def parse_pollen_text(text: str) -> PollenView:
-    normalized = _normalize_text(text)
-    current_text, forecast_text = _extract_text_sections(normalized)
-    current_sentences = _section_sentences(current_text or normalized)
-    forecast_sentences = _section_sentences(forecast_text or normalized)
-    current_map = _station_levels(normalized, "TILANNE", "Helsinki")
-    forecast_map = _station_levels(normalized, "ENNUSTE", "Helsinki")
-
-    plants = [
-        _build_plant(
-            key,
-            _display_name(key),
-            aliases,
-            current_sentences,
-            forecast_sentences,
-            current_map,
-            forecast_map,
+def _index_to_dict(index: BulletinIndex) -> dict[str, Any]:
+    return asdict(index)
+
+
+def _index_from_dict(payload: dict[str, Any]) -> BulletinIndex:
+    return BulletinIndex(
+        updated=payload.get("updated"),
+        stations=payload.get("stations") or {},
+        current=payload.get("current") or {},
+        forecast=payload.get("forecast") or {},
+        current_regional=bool(payload.get("current_regional")),
+        forecast_regional=bool(payload.get("forecast_regional")),
+    )
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _index_key(text_hash: str) -> str:
+    return f"{PARSER_VERSION}:{text_hash}"
+
+
+# viimeisin indeksi muistissa sekä siitä kootut asemanäkymät
+_INDEX_MEMO: dict[str, Any] = {"key": None, "index": None, "views": {}}
+
+
+def _cached_index(entry: dict[str, Any]) -> tuple[str, BulletinIndex]:
+    """Jäsentää tiedotteen vain, jos tallennettu indeksi ei vastaa tekstiä."""
+    text = str(entry.get("text", ""))
+    text_hash = entry.get("sha256") or _text_hash(text)
+    key = _index_key(text_hash)
+    if _INDEX_MEMO["key"] == key:
+        return key, _INDEX_MEMO["index"]
+
+    stored = entry.get("index")
+    if isinstance(stored, dict) and entry.get("index_key") == key:
+        index = _index_from_dict(stored)
+    else:
+        index = index_bulletin(text)
+        entry.update({"sha256": text_hash, "index_key": key, "index": _index_to_dict(index)})
+        _write_cache(POLLEN_CACHE_FILE, entry)
+
+    _INDEX_MEMO.update(key=key, index=index, views={})
+    return key, index
+
+
+def _station_view(key: str, index: BulletinIndex, station: str, location: str) -> dict[str, Any]:
+    """Asemanäkymä kootaan kerran per indeksi; avaimena (indeksi, asema, paikka)."""
+    views: dict[tuple[str, str, str], dict[str, Any]] = _INDEX_MEMO["views"]
+    memo_key = (key, station, location)
+    if memo_key not in views:
+        views[memo_key] = _view_to_dict(view_from_index(index, station=station, location=location))
+    return views[memo_key]
+
+
+def parse_pollen_text(
+    text: str,
+    station: str = DEFAULT_STATION,
+    location: str = DEFAULT_LOCATION,
+) -> PollenView:
+    """Jäsentää tiedotteen ja kokoaa näkymän yhden aseman karttakoodeista."""
+    return view_from_index(index_bulletin(text), station=station, location=location)
+
+
+def view_from_index(
+    index: BulletinIndex,
+    station: str = DEFAULT_STATION,
+    location: str = DEFAULT_LOCATION,
+) -> PollenView:
+    """
+    Kokoaa näkymän valmiista indeksistä: aseman karttakoodit ensin, muuten
+    alueellisten lauseiden perusteella. Eteläisen Suomen lauseita ei sovelleta
+    muille asemille: niille ilman karttakoodia taso on "ei havaittu". Ei jäsennä
+    tekstiä uudelleen.
+    """
+    current_map = index.station_levels(CURRENT, station)
+    forecast_map = index.station_levels(FORECAST, station)
+    no_forecast = _NO_FORECAST_TEXT.get(location, "Ei erillistä ennustetta lähialueelle.")
+    current_covered = index.text_covers(CURRENT, station)
+    forecast_covered = index.text_covers(FORECAST, station)
+
+    plants = []
+    for key, _aliases in PLANTS:
+        current_sentence = index.current.get(key, "") if current_covered else ""
+        forecast_sentence = index.forecast.get(key, "") if forecast_covered else ""
+        plants.append(
+            PollenPlant(
+                key=key,
+                name=_display_name(key),
+                level=current_map.get(key) or _level_from_sentence(current_sentence),
+                forecast_level=forecast_map.get(key) or _level_from_sentence(forecast_sentence),
+                forecast=forecast_sentence or no_forecast,
+            )
         )
-        for key, aliases in PLANTS
-    ]
 
     return PollenView(
-        location="Riihimäki",
+        location=location,
         source=POLLEN_SOURCE_NAME,
-        updated=_extract_updated(normalized),
+        updated=index.updated,
         plants=plants,
         summary=_build_summary(plants),
     )
 
 
-def _fetch_pollen_text() -> str:
+async def _load_bulletin_async() -> dict[str, Any]:
+    """
+    Palauttaa välimuistimerkinnän (teksti + metatiedot), joka on enintään
+    POLLEN_CACHE_TTL_S vanha. TTL:n jälkeen tehdään ehdollinen pyyntö.
+    """
     cached = _read_cache(POLLEN_CACHE_FILE)
     now = time.time()
-    if cached and now - float(cached.get("fetched_at", 0)) < POLLEN_CACHE_TTL_S:
-        text = str(cached.get("text", ""))
-        if text:
-            return text
-
+    if (
+        cached
+        and cached.get("text")
+        and now - float(cached.get("fetched_at", 0)) < POLLEN_CACHE_TTL_S
+    ):
+        count_cache("pollen_bulletin", hit=True)
+        return cached
+    count_cache("pollen_bulletin", hit=False)
+    return await _download_bulletin_async(cached, now)
+
+
+def _conditional_headers(cached: dict[str, Any] | None) -> dict[str, str]:
     headers = {"User-Agent": "HomeDashboard/1.0"}
-    resp = requests.get(POLLEN_SOURCE_URL, timeout=HTTP_TIMEOUT_S, headers=headers)
-    resp.raise_for_status()
+    if not cached or not cached.get("text"):
+        return headers
+    if cached.get("etag"):
+        headers["If-None-Match"] = str(cached["etag"])
+    if cached.get("last_modified"):
+        headers["If-Modified-Since"] = str(cached["last_modified"])
+    return headers
+
+
+async def _download_bulletin_async(cached: dict[str, Any] | None, now: float) -> dict[str, Any]:
+    try:
+        with upstream("pollen") as span:
+            resp = await request(
+                "GET",
+                upstream_url(POLLEN_SOURCE_URL),
+                timeout=HTTP_TIMEOUT_S,
+                headers=_conditional_headers(cached),
+            )
+            span.payload_bytes = payload_size(resp)
+        if resp.status_code == 304 and cached and cached.get("text"):
+            # ennallaan: vain tuoreusleima päivittyy, näkymä säilyy
+            entry = {**cached, "fetched_at": now}
+            _write_cache(POLLEN_CACHE_FILE, entry)
+            return entry
+        raise_for_status(resp)
+    except requests.RequestException:
+        if cached and cached.get("text"):
+            return cached
+        raise
+
     text = resp.content.decode("utf-8-sig", errors="replace")
-    _write_cache(POLLEN_CACHE_FILE, {"fetched_at": now, "text": text})
-    return text
+    text_hash = _text_hash(text)
+    entry: dict[str, Any] = {
+        "fetched_at": now,
+        "text": text,
+        "sha256": text_hash,
+        "etag": resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+    }
+    if cached and cached.get("sha256") == text_hash:
+        # sama sisältö ilman validaattoreita: aiempi indeksi kelpaa
+        entry["index_key"] = cached.get("index_key")
+        entry["index"] = cached.get("index")
+    _write_cache(POLLEN_CACHE_FILE, entry)
+    return entry
+
+
+# muistissa pidettävä kopio välimuistitiedostosta, avaimena (polku, mtime, koko)
+_FILE_MEMO: dict[str, Any] = {"key": None, "payload": None}
+
+
+def _file_key(path: Path) -> tuple[str, int, int] | None:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return (str(path), stat.st_mtime_ns, stat.st_size)
 
 
 def _read_cache(path: Path) -> dict[str, Any] | None:
+    key = _file_key(path)
+    if key is None:
+        return None
+    if _FILE_MEMO["key"] == key:
+        return _FILE_MEMO["payload"]
     try:
-        return json.loads(path.read_text(encoding="utf-8"))
+        payload = json.loads(path.read_text(encoding="utf-8"))
     except (OSError, json.JSONDecodeError):
         return None
+    if not isinstance(payload, dict):
+        return None
+    _FILE_MEMO.update(key=key, payload=payload)
+    return payload
 
 
 def _write_cache(path: Path, payload: dict[str, Any]) -> None:
@@ -124,96 +327,7 @@ def _write_cache(path: Path, payload: dict[str, Any]) -> None:
         path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
     except OSError:
         return
-
-
-def _normalize_text(text: str) -> str:
-    clean = text.replace("\ufeff", "").replace("\r\n", "\n").replace("\r", "\n")
-    lines = [re.sub(r"[ \t]+", " ", line).strip() for line in clean.splitlines()]
-    return "\n".join(line for line in lines if line).strip()
-
-
-def _split_sentences(text: str) -> list[str]:
-    return [part.strip() for part in re.split(r"(?<=[.!?])\s+", text) if part.strip()]
-
-
-def _relevant_sentences(sentences: list[str]) -> list[str]:
-    return [sentence for sentence in sentences if _REGION_RE.search(sentence)]
-
-
-def _extract_text_sections(text: str) -> tuple[str, str]:
-    _, _, body = text.partition("(TEKSTIT)")
-    source = body or text
-
-    current_match = re.search(
-        r"\bTILANNE\b(?P<section>.*?)(?=\bENNUSTE\b)",
-        source,
-        flags=re.IGNORECASE | re.DOTALL,
-    )
-    forecast_match = re.search(
-        r"\bENNUSTE\b(?P<section>.*?)(?=\(END\)|©|\Z)",
-        source,
-        flags=re.IGNORECASE | re.DOTALL,
-    )
-
-    current = current_match.group("section").strip() if current_match else ""
-    forecast = forecast_match.group("section").strip() if forecast_match else ""
-    return current, forecast
-
-
-def _section_sentences(section: str) -> list[str]:
-    sentences = _split_sentences(section)
-    relevant = _relevant_sentences(sentences)
-    return relevant or sentences
-
-
-def _station_levels(text: str, heading: str, station: str) -> dict[str, str]:
-    section = _map_section(text, heading)
-    if not section:
-        return {}
-
-    station_re = re.compile(rf"^{re.escape(station)}\s+(?P<codes>[A-ZÅÄÖ,\s]+)$", re.IGNORECASE)
-    for raw_line in section.splitlines():
-        line = raw_line.strip()
-        match = station_re.match(line)
-        if not match:
-            continue
-        return _levels_from_codes(match.group("codes"))
-    return {}
-
-
-def _map_section(text: str, heading: str) -> str:
-    pattern = rf"\b{re.escape(heading)}\b\s+\d{{1,2}}\.\d{{1,2}}\.\d{{4}}(?:\s+-\s+\d{{1,2}}\.\d{{1,2}}\.\d{{4}})?(?P<section>.*?)(?=\b(?:TILANNE|ENNUSTE)\b|\bTunnukset\b|\(TEKSTIT\)|\Z)"
-    match = re.search(pattern, text, flags=re.IGNORECASE | re.DOTALL)
-    if match:
-        return match.group("section")
-    return ""
-
-
-def _levels_from_codes(codes: str) -> dict[str, str]:
-    result: dict[str, str] = {}
-    for match in re.finditer(r"([LCKHPT])\1{0,2}", codes.upper()):
-        code = match.group(0)
-        key = _plant_key_for_code(code[0])
-        if key:
-            result[key] = _level_from_code(code)
-    return result
-
-
-def _plant_key_for_code(code: str) -> str | None:
-    return {
-        "K": "koivu",
-        "H": "heinät",
-        "P": "pujo",
-    }.get(code)
-
-
-def _level_from_code(code: str) -> str:
-    length = len(code)
-    if length >= 3:
-        return "runsaasti"
-    if length == 2:
-        return "kohtalaisesti"
-    return "vähän"
+    _FILE_MEMO.update(key=_file_key(path), payload=payload)
 
 
 def _display_name(key: str) -> str:
@@ -224,53 +338,6 @@ def _display_name(key: str) -> str:
     return "Pujo"
 
 
-def _build_plant(
-    key: str,
-    name: str,
-    aliases: tuple[str, ...],
-    current_sentences: list[str],
-    forecast_sentences: list[str],
-    current_map: dict[str, str],
-    forecast_map: dict[str, str],
-) -> PollenPlant:
-    current_plant_sentences = [
-        sentence for sentence in current_sentences if _has_any(sentence, aliases)
-    ]
-    forecast_plant_sentences = [
-        sentence for sentence in forecast_sentences if _has_any(sentence, aliases)
-    ]
-    current_sentence = _first_current_sentence(current_plant_sentences)
-    forecast_sentence = _first_forecast_sentence(forecast_plant_sentences)
-
-    level = current_map.get(key) or _level_from_sentence(current_sentence)
-    forecast_level = forecast_map.get(key) or _level_from_sentence(forecast_sentence)
-    forecast = forecast_sentence or "Ei erillistä ennustetta Riihimäen alueelle."
-
-    return PollenPlant(
-        key=key,
-        name=name,
-        level=level,
-        forecast_level=forecast_level,
-        forecast=forecast,
-    )
-
-
-def _has_any(sentence: str, words: tuple[str, ...]) -> bool:
-    lower = sentence.lower()
-    return any(word in lower for word in words)
-
-
-def _first_current_sentence(sentences: list[str]) -> str:
-    for sentence in sentences:
-        if not _FORECAST_RE.search(sentence):
-            return sentence
-    return sentences[0] if sentences else ""
-
-
-def _first_forecast_sentence(sentences: list[str]) -> str:
-    return sentences[0] if sentences else ""
-
-
 def _level_from_sentence(sentence: str) -> str:
     lower = sentence.lower()
     if not lower:
@@ -286,13 +353,6 @@ def _level_from_sentence(sentence: str) -> str:
     return "ei havaittu"
 
 
-def _extract_updated(text: str) -> str | None:
-    match = re.search(r"\b(\d{1,2}\.\d{1,2}\.\d{4})\b", text)
-    if match:
-        return match.group(1)
-    return None
-
-
 def _build_summary(plants: list[PollenPlant]) -> str:
     active = [plant.name for plant in plants if plant.level in LEVELS[1:]]
     if not active:
@@ -0,0 +1,298 @@
+"""
+Siitepölytiedotteen (siitepoly.fi, sptied.txt) yhden läpikäynnin jäsennin.
+
+    teksti -> index_bulletin(...) -> BulletinIndex
+
+Tiedote käydään läpi kerran yhdellä tokenisaattorilla: karttaosan asemarivit
+(kaikki asemat) ja tekstiosan TILANNE/ENNUSTE-kappaleet kerätään samalla
+kierroksella.
+Kasvien maininnat tunnistetaan esikäännetyllä alias-automaatilla
+(Aho–Corasick-tyyppinen), joka löytää kaikkien kasvien aliakset osiosta
+yhdellä läpikäynnillä. Indeksistä voi koota näkymän mille tahansa asemalle ilman
+uutta jäsennystä.
+"""
+
+from __future__ import annotations
+
+import re
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Any
+
+PLANTS: tuple[tuple[str, tuple[str, ...]], ...] = (
+    ("koivu", ("koivu", "koivun", "koivua")),
+    ("heinät", ("heinä", "heinät", "heinien", "heinää", "heinäpöly")),
+    ("pujo", ("pujo", "pujon", "pujoa")),
+)
+
+_FORECAST_RE = re.compile(
+    r"\b(ennuste|ennustetaan|odotetaan|lähipäiv|jatkuu|voimistuu|runsastuu|"
+    r"vähenee|alkaa|leviää|kulkeutuu|kulkeutua|tulevina)\b",
+    re.IGNORECASE,
+)
+_REGION_RE = re.compile(
+    r"\b(riihimä\w*|häme\w*|kanta-häme\w*|uusimaa|uudellama\w*|etelä-suom\w*|"
+    r"eteläisessä suomessa|"
+    r"maan eteläos\w*|etelärannik\w*|suomen eteläos\w*)\b",
+    re.IGNORECASE,
+)
+# Asemat/paikkakunnat, joita _REGION_RE:n alueelliset lauseet koskevat
+# (Uusimaa, Häme, eteläinen rannikko). Muille asemille lauseiden tasoja ei
+# käytetä, jos karttakoodeja ei ole.
+SOUTHERN_STATIONS = frozenset(
+    {"helsinki", "espoo", "vantaa", "turku", "lahti", "hämeenlinna", "riihimäki", "hyvinkää"}
+)
+_DATE_RE = re.compile(r"\b(\d{1,2}\.\d{1,2}\.\d{4})\b")
+_SPACES_RE = re.compile(r"[ \t]+")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+# Tiedotteen rakennemerkit yhtenä tokenisaattorina; tekstiosat ovat
+# merkkien välisiä viipaleita, joten teksti käydään läpi kerran.
+_TOKEN_RE = re.compile(
+    r"(?P<texts>^\(TEKSTIT\))"
+    r"|(?P<end>\(END\)|©)"
+    r"|(?P<heading>^(?i:TILANNE|ENNUSTE)\b)"
+    r"|(?P<legend>^Tunnukset\b)"
+    # "Helsinki KK", "Kuopio K, HH" – asema ja karttakoodit
+    r"|(?P<station_line>^(?P<station>[A-ZÅÄÖ][\wåäöÅÄÖ-]*(?: [A-ZÅÄÖ][\wåäöÅÄÖ-]*)*)"
+    r" (?P<codes>[A-ZÅÄÖ]+(?:,? [A-ZÅÄÖ]+)*)$)",
+    re.MULTILINE,
+)
+_CODE_RE = re.compile(r"([LCKHPT])\1{0,2}")
+_CODE_PLANTS = {"K": "koivu", "H": "heinät", "P": "pujo"}
+
+CURRENT = "TILANNE"
+FORECAST = "ENNUSTE"
+_HEADINGS = (CURRENT, FORECAST)
+
+
+# ============================================================
+# ALIAS-AUTOMAATTI
+# ============================================================
+
+
+class AliasAutomaton:
+    """
+    Aho–Corasick-tyyppinen alias-automaatti: alias -> kasvin avain.
+
+    Aliakset kootaan trieksi, joka käännetään yhdeksi regexiksi (haarautuminen
+    trien solmuissa, ahne pisin osuma). Lookahead löytää osumat jokaisesta
+    alkukohdasta, myös päällekkäiset. Jokaisen trien lehden tulosjoukko
+    sisältää myös polun varrella olevien lyhyempien aliasten avaimet, kuten
+    Aho–Corasickin tulosfunktio. Haku on siis yksi C-tason läpikäynti tekstistä.
+    """
+
+    __slots__ = ("_pattern", "_outputs")
+
+    def __init__(self, aliases: dict[str, str]) -> None:
+        trie: dict[str, Any] = {}
+        for alias in aliases:
+            node = trie
+            for ch in alias.lower():
+                node = node.setdefault(ch, {})
+            node[""] = True
+
+        outputs: dict[str, frozenset[str]] = {}
+        for alias in aliases:
+            lowered = alias.lower()
+            outputs[lowered] = frozenset(
+                key for other, key in aliases.items() if lowered.startswith(other.lower())
+            )
+
+        self._outputs = outputs
+        self._pattern = re.compile(f"(?=({_trie_regex(trie)}))", re.IGNORECASE) if trie else None
+
+    @classmethod
+    def from_plants(cls, plants: tuple[tuple[str, tuple[str, ...]], ...]) -> AliasAutomaton:
+        return cls({alias: key for key, aliases in plants for alias in aliases})
+
+    def scan(self, text: str) -> list[tuple[int, frozenset[str]]]:
+        """(alkukohta, avaimet) jokaiselle osumalle; teksti käydään läpi kerran."""
+        if self._pattern is None:
+            return []
+        outputs = self._outputs
+        return [(m.start(), outputs[m.group(1).lower()]) for m in self._pattern.finditer(text)]
+
+    def find(self, text: str) -> frozenset[str]:
+        """Kaikki avaimet, joiden jokin alias esiintyy tekstissä (kirjainkoko ohitetaan)."""
+        found: set[str] = set()
+        for _, keys in self.scan(text):
+            found |= keys
+        return frozenset(found)
+
+
+def _trie_regex(node: dict[str, Any]) -> str:
+    """{"k": {"o": {...}}} -> "ko(?:ivu(?:n|a)?)" -tyylinen regex (pisin osuma ensin)."""
+    terminal = "" in node
+    branches = [re.escape(ch) + _trie_regex(child) for ch, child in node.items() if ch]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if terminal:
+        return f"(?:{body})?"
+    return body
+
+
+PLANT_AUTOMATON = AliasAutomaton.from_plants(PLANTS)
+
+
+# ============================================================
+# INDEKSI
+# ============================================================
+
+
+@dataclass(frozen=True)
+class BulletinIndex:
+    """
+    Tiedotteen jäsennetty sisältö.
+
+    stations: {"TILANNE"|"ENNUSTE": {asema: {kasvi: taso}}}
+    current / forecast: kasvikohtainen ensimmäinen osuva lause
+    current_regional / forecast_regional: osion lauseet on poimittu eteläisen
+    Suomen alueellisista lauseista
+    """
+
+    updated: str | None
+    stations: dict[str, dict[str, dict[str, str]]] = field(default_factory=dict)
+    current: dict[str, str] = field(default_factory=dict)
+    forecast: dict[str, str] = field(default_factory=dict)
+    current_regional: bool = False
+    forecast_regional: bool = False
+
+    def station_names(self) -> list[str]:
+        names = dict.fromkeys(self.stations.get(CURRENT, {}))
+        names.update(dict.fromkeys(self.stations.get(FORECAST, {})))
+        return list(names)
+
+    def station_levels(self, heading: str, station: str) -> dict[str, str]:
+        table = self.stations.get(heading, {})
+        if station in table:
+            return table[station]
+        wanted = station.casefold()
+        return next((v for k, v in table.items() if k.casefold() == wanted), {})
+
+    def text_covers(self, heading: str, station: str) -> bool:
+        """Koskevatko osion lauseet asemaa (alueettomat lauseet koskevat kaikkia)."""
+        regional = self.current_regional if heading == CURRENT else self.forecast_regional
+        return not regional or station.casefold() in SOUTHERN_STATIONS
+
+
+def normalize_text(text: str) -> str:
+    clean = text.replace("\ufeff", "").replace("\r\n", "\n").replace("\r", "\n")
+    clean = _SPACES_RE.sub(" ", clean)
+    return "\n".join(line for line in (raw.strip() for raw in clean.split("\n")) if line)
+
+
+def levels_from_codes(codes: str) -> dict[str, str]:
+    result: dict[str, str] = {}
+    for match in _CODE_RE.finditer(codes.upper()):
+        code = match.group(0)
+        key = _CODE_PLANTS.get(code[0])
+        if key:
+            result[key] = _level_from_code(code)
+    return result
+
+
+def _level_from_code(code: str) -> str:
+    length = len(code)
+    if length >= 3:
+        return "runsaasti"
+    if length == 2:
+        return "kohtalaisesti"
+    return "vähän"
+
+
+def _has_regional(section: str) -> bool:
+    return _REGION_RE.search(section) is not None
+
+
+def _first_mentions(
+    section: str,
+    automaton: AliasAutomaton,
+    prefer_current: bool,
+) -> dict[str, str]:
+    """
+    Kasvikohtainen ensimmäinen lause. Alueelliset lauseet (Riihimäki/Häme/
+    Uusimaa/Etelä-Suomi) voittavat, jos niitä on. TILANNE-osiossa suositaan
+    lausetta, joka ei ole ennuste.
+
+    Automaatti ja aluehaku ajetaan kerran koko osion yli; osumat kohdistetaan
+    lauseisiin lauserajojen perusteella.
+    """
+    bounds = [0, *(m.end() for m in _SENTENCE_END_RE.finditer(section))]
+    mentions: list[set[str]] = [set() for _ in bounds]
+    for start, keys in automaton.scan(section):
+        mentions[bisect_right(bounds, start) - 1] |= keys
+    regional = sorted({bisect_right(bounds, m.start()) - 1 for m in _REGION_RE.finditer(section)})
+    ends = [*bounds[1:], len(section)]
+
+    first: dict[str, str] = {}
+    fallback: dict[str, str] = {}
+    for idx in regional or range(len(bounds)):
+        pending = [key for key in mentions[idx] if key not in first]
+        if not pending:
+            continue
+        sentence = section[bounds[idx] : ends[idx]].strip()
+        if prefer_current and _FORECAST_RE.search(sentence):
+            for key in pending:
+                fallback.setdefault(key, sentence)
+            continue
+        for key in pending:
+            first[key] = sentence
+    return {**fallback, **first}
+
+
+def index_bulletin(text: str, automaton: AliasAutomaton = PLANT_AUTOMATON) -> BulletinIndex:
+    """Jäsentää tiedotteen yhdellä tokenisaattorin läpikäynnillä."""
+    normalized = normalize_text(text)
+    date = _DATE_RE.search(normalized)
+
+    stations: dict[str, dict[str, dict[str, str]]] = {CURRENT: {}, FORECAST: {}}
+    sections: dict[str, list[str]] = {CURRENT: [], FORECAST: []}
+    map_sections: dict[str, list[str]] = {CURRENT: [], FORECAST: []}
+    in_texts = False
+    heading: str | None = None
+    section_start = 0
+
+    def close(at: int) -> None:
+        if heading is not None:
+            target = sections if in_texts else map_sections
+            target[heading].append(normalized[section_start:at])
+
+    for token in _TOKEN_RE.finditer(normalized):
+        kind = token.lastgroup
+        if kind == "station_line":
+            if heading is not None and not in_texts:
+                stations[heading][token.group("station")] = levels_from_codes(token.group("codes"))
+            continue
+        if kind == "legend" and in_texts:
+            continue
+
+        close(token.start())
+        if kind == "heading":
+            heading, section_start = token.group().upper(), token.end()
+            continue
+
+        stop = kind == "end" and (in_texts or heading == FORECAST)
+        heading = None
+        if kind == "texts":
+            in_texts = True
+        if stop:
+            break
+    else:
+        close(len(normalized))
+
+    # tiedote ilman (TEKSTIT)-osaa: otsikoidut kappaleet ovat suoraan rungossa
+    if not in_texts:
+        sections = map_sections
+    current = "\n".join(sections[CURRENT]) if sections[FORECAST] else ""
+    forecast = "\n".join(sections[FORECAST])
+    current_text = current.strip() or normalized
+    forecast_text = forecast.strip() or normalized
+    return BulletinIndex(
+        updated=date.group(1) if date else None,
+        stations=stations,
+        current=_first_mentions(current_text, automaton, prefer_current=True),
+        forecast=_first_mentions(forecast_text, automaton, prefer_current=False),
+        current_regional=_has_regional(current_text),
+        forecast_regional=_has_regional(forecast_text),
+    )
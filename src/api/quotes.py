@@ -2,7 +2,8 @@
 
 import streamlit as st
 
-from src.api.http_client import http_get_json
+from src.api.async_http import run_sync
+from src.api.http_client import http_get_json_async
 from src.config import CACHE_TTL_LONG, HTTP_TIMEOUT_S
 from src.utils import report_error
 
@@ -17,9 +18,9 @@ LOCAL_ZEN: list[dict[str, str]] = [
 ]
 
 
-def _from_zenquotes() -> dict[str, str] | None:
+async def _from_zenquotes_async() -> dict[str, str] | None:
     try:
-        data = http_get_json("https://zenquotes.io/api/today", timeout=HTTP_TIMEOUT_S)
+        data = await http_get_json_async("https://zenquotes.io/api/today", timeout=HTTP_TIMEOUT_S)
         if isinstance(data, list) and data:
             q = data[0]
             quote = {"text": q.get("q", ""), "author": q.get("a", ""), "source": "zenquotes"}
@@ -29,9 +30,9 @@ def _from_zenquotes() -> dict[str, str] | None:
     return None
 
 
-def _from_quotable() -> dict[str, str] | None:
+async def _from_quotable_async() -> dict[str, str] | None:
     try:
-        data = http_get_json(
+        data = await http_get_json_async(
             "https://api.quotable.io/random?tags=wisdom|life|inspirational",
             timeout=HTTP_TIMEOUT_S,
         )
@@ -46,13 +47,17 @@ def _from_quotable() -> dict[str, str] | None:
     return None
 
 
-@st.cache_data(ttl=CACHE_TTL_LONG)
-def fetch_daily_quote(day_iso: str) -> dict[str, str]:
-    if quote := _from_zenquotes():
+async def fetch_daily_quote_async(day_iso: str) -> dict[str, str]:
+    if quote := await _from_zenquotes_async():
         return quote
-    if quote := _from_quotable():
+    if quote := await _from_quotable_async():
         return quote
     idx = sum(map(ord, day_iso)) % len(LOCAL_ZEN)
     out = dict(LOCAL_ZEN[idx])
     out["source"] = "local"
     return out
+
+
+@st.cache_data(ttl=CACHE_TTL_LONG)
+def fetch_daily_quote(day_iso: str) -> dict[str, str]:
+    return run_sync(fetch_daily_quote_async(day_iso))
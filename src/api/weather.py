@@ -15,7 +15,7 @@ from typing import Any
 
 # debug-kortti vain jos dashboard tarvitsee sitä
 from src.api.weather_debug import card_weather_debug_matrix  # noqa: F401
-from src.api.weather_fetch import fetch_weather_points
+from src.api.weather_fetch import fetch_alerts, fetch_current, fetch_weather_points
 from src.api.weather_mapping import (
     clear_map_trace,
     get_map_trace,
@@ -25,6 +25,8 @@ from src.api.weather_mapping import (
 
 __all__ = [
     "fetch_weather_points",
+    "fetch_current",
+    "fetch_alerts",
     "wmo_to_foreca_code",
     "wmo_to_icon_key",
     "get_map_trace",
@@ -2,10 +2,8 @@ from __future__ import annotations
 
 import streamlit as st
 
-from src.api.weather_mapping import (
-    get_map_trace,
-    wmo_to_foreca_code,
-)
+from src.api.weather_mapping import wmo_to_foreca_code
+from src.api.wmo_trace import map_trace_records
 from src.weather_icons import render_foreca_icon
 
 
@@ -16,7 +14,8 @@ def card_weather_debug_matrix() -> None:
         row_html = "<div style='display:flex; gap:10px; flex-wrap:wrap; align-items:center;'>"
         row_html += f"<div style='width:110px; opacity:.8;'>{label}</div>"
         for desc, key in items:
-            img = render_foreca_icon(key, size=40)
+            # pääsivulla ei ole spriten tyylitiedostoa -> data-URI
+            img = render_foreca_icon(key, size=40, sprite=False)
             row_html += (
                 "<div style='display:grid; place-items:center; "
                 "background:rgba(255,255,255,.06); padding:6px 8px; border-radius:10px; min-width:120px;'>"
@@ -96,16 +95,16 @@ def card_weather_debug_matrix() -> None:
     )
 
     if st.toggle("Näytä päätösjäljet (trace)", value=False):
-        rows = get_map_trace()
+        rows = map_trace_records()
         if rows:
             head = (
                 "<tr><th>WMO</th><th>Päivä</th><th>PoP %</th><th>T °C</th>"
                 "<th>Cloud %</th><th>Key</th><th>Syynys</th></tr>"
             )
             body = "".join(
-                f"<tr><td>{r['wmo']}</td><td>{'d' if r['is_day'] else 'n'}</td>"
-                f"<td>{r['pop']}</td><td>{r['temp_c']}</td><td>{r['cloudcover']}</td>"
-                f"<td><code>{r['key']}</code></td><td>{r['reason']}</td></tr>"
+                f"<tr><td>{r.wmo}</td><td>{'d' if r.is_day else 'n'}</td>"
+                f"<td>{r.pop}</td><td>{r.temp_c}</td><td>{r.cloudcover}</td>"
+                f"<td><code>{r.key}</code></td><td>{r.reason}</td></tr>"
                 for r in rows[::-1]
             )
             st.markdown(
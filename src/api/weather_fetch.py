@@ -1,156 +1,228 @@
 from __future__ import annotations
 
-from datetime import date, datetime, timedelta
+from datetime import date, datetime
 from typing import Any
 from urllib.parse import quote
 
-from src.api.http_client import http_get_json
-from src.api.weather_mapping import wmo_to_foreca_code
+from src.api.async_http import run_sync
+from src.api.http_client import http_get_json_async
+from src.api.weather_hourly import HourlyColumns, parse_hourly
+from src.api.weather_repository import ForecastEntry, ForecastRepository, Location
 from src.api.weather_utils import as_bool, as_float, as_int
-from src.config import TZ
+from src.api.wmo_foreca_code import wmo_to_foreca_code
+from src.config import (
+    ALERT_GUST_MS,
+    ALERT_RAIN_MM,
+    ALERT_SNOW_CM,
+    CACHE_TTL_LONG,
+    TZ,
+)
+
+CURRENT_FIELDS = (
+    "temperature_2m,apparent_temperature,precipitation,weathercode,cloudcover,is_day,wind_speed_10m"
+)
+HOURLY_FIELDS = "temperature_2m,precipitation_probability,weathercode,cloudcover,is_day"
+DAILY_FIELDS = "sunrise,sunset,temperature_2m_min,temperature_2m_max"
+# +24 h (6 h -väli) klo 23 jälkeen tarvitsee vielä ylihuomisen alun
+FORECAST_DAYS = 3
+
+# varoitukset johdetaan päiväkohtaisista ääriarvoista (tänään + huominen)
+ALERT_DAILY_FIELDS = "weathercode,precipitation_sum,snowfall_sum,wind_gusts_10m_max"
+ALERT_DAYS = 2
+_THUNDER_CODES = (95, 96, 99)
+_FREEZING_CODES = (56, 57, 66, 67)
 
 
 # --- uudet pienet hakufunktiot -------------------------------------------------
-def fetch_forecast(lat: float, lon: float, tz_name: str) -> dict[str, Any]:
-    """Hakee Open-Meteosta tuntiennusteen raakana."""
-    url = (
+def _coords(locations: tuple[Location, ...]) -> str:
+    lats = ",".join(f"{lat}" for lat, _ in locations)
+    lons = ",".join(f"{lon}" for _, lon in locations)
+    return f"latitude={lats}&longitude={lons}"
+
+
+def build_forecast_url(locations: tuple[Location, ...], tz_name: str) -> str:
+    """Open-Meteo -URL yhdelle tai useammalle paikalle (nykytila + tunti + päivä samassa)."""
+    return (
         "https://api.open-meteo.com/v1/forecast?"
-        f"latitude={lat}&longitude={lon}"
-        "&hourly=temperature_2m,precipitation_probability,weathercode,cloudcover,is_day"
+        f"{_coords(locations)}"
+        f"&current={CURRENT_FIELDS}"
+        f"&hourly={HOURLY_FIELDS}"
+        f"&daily={DAILY_FIELDS}"
+        f"&forecast_days={FORECAST_DAYS}"
+        "&wind_speed_unit=ms"
         f"&timezone={quote(tz_name)}"
     )
-    return http_get_json(url)
 
 
-def fetch_current(lat: float, lon: float, tz_name: str) -> dict[str, Any]:
-    """
-    Oma paikka nykytilalle.
-    Jos haluat myöhemmin hakea esim. https://api.open-meteo.com/v1/forecast?current=...
-    -endpointin, tee se tänne.
-    Nyt palautetaan vain tyhjä dict, jotta rajapinta on olemassa.
-    """
-    return {}
+def build_alerts_url(locations: tuple[Location, ...], tz_name: str) -> str:
+    """Open-Meteo -URL varoitusten päiväkohtaisille ääriarvoille."""
+    return (
+        "https://api.open-meteo.com/v1/forecast?"
+        f"{_coords(locations)}"
+        f"&daily={ALERT_DAILY_FIELDS}"
+        f"&forecast_days={ALERT_DAYS}"
+        "&wind_speed_unit=ms"
+        f"&timezone={quote(tz_name)}"
+    )
 
 
-def fetch_alerts(lat: float, lon: float, tz_name: str) -> dict[str, Any]:
-    """
-    Oma paikka säähälytyksille.
-    Open-Meteolla on erillinen weather alerts -kysely, jonka voi myöhemmin lisätä tähän.
-    """
-    return {}
+async def _fetch_batch_async(url: str, locations: tuple[Location, ...]) -> list[dict[str, Any]]:
+    """Open-Meteo palauttaa listan (monta paikkaa) tai olion (yksi paikka)."""
+    if not locations:
+        return []
+    data = await http_get_json_async(url)
+    if isinstance(data, list):
+        return [item if isinstance(item, dict) else {} for item in data]
+    return [data] if isinstance(data, dict) else []
 
 
-# --- apufunktiot dashboard-mapitukseen -----------------------------------------
-def _build_time_axis(hourly_raw: dict[str, Any], tz_name: str) -> list[datetime]:
-    """
-    Parsii Open-Meteon "time"-listan datetime-olioiksi.
+async def fetch_forecast_batch_async(
+    locations: tuple[Location, ...],
+    tz_name: str,
+) -> list[dict[str, Any]]:
+    """Hakee usean paikan ennusteen (nykytila, tunnit, päivät) yhdellä kutsulla."""
+    return await _fetch_batch_async(build_forecast_url(locations, tz_name), locations)
 
-    Tällä hetkellä tz_name ei ole kriittinen (ajat ovat jo oikeassa aikavyöhykkeessä),
-    mutta pidetään se rajapinnassa mahdollisia tulevia muutoksia varten.
-    """
-    raw_times: list[str] = hourly_raw.get("time", []) or []
-    axis: list[datetime] = []
 
-    for t in raw_times:
-        try:
-            dt = datetime.fromisoformat(t)
-        except ValueError:
-            # rikkinäinen aikaleima -> ohitetaan
-            continue
+def fetch_forecast_batch(
+    locations: tuple[Location, ...],
+    tz_name: str,
+) -> list[dict[str, Any]]:
+    return run_sync(fetch_forecast_batch_async(locations, tz_name))
 
-        # jos aikaleima on naivi, sidotaan se dashboardin oletus-TZ:ään
-        if dt.tzinfo is None and TZ is not None:
-            dt = dt.replace(tzinfo=TZ)
 
-        axis.append(dt)
+async def fetch_alerts_batch_async(
+    locations: tuple[Location, ...],
+    tz_name: str,
+) -> list[dict[str, Any]]:
+    """Hakee usean paikan varoitusdatan yhdellä kutsulla."""
+    return await _fetch_batch_async(build_alerts_url(locations, tz_name), locations)
 
-    return axis
 
+def fetch_alerts_batch(
+    locations: tuple[Location, ...],
+    tz_name: str,
+) -> list[dict[str, Any]]:
+    return run_sync(fetch_alerts_batch_async(locations, tz_name))
 
-def _build_time_index(time_axis: list[datetime]) -> dict[datetime, int]:
-    """Rakentaa nopean aikaleima → indeksi -hakemiston ilman poikkeuspohjaista logiikkaa."""
-    return {ts: idx for idx, ts in enumerate(time_axis)}
 
+def fetch_forecast(lat: float, lon: float, tz_name: str) -> dict[str, Any]:
+    """Hakee Open-Meteosta yhden paikan tunti- ja päiväennusteen raakana."""
+    payloads = fetch_forecast_batch(((lat, lon),), tz_name)
+    return payloads[0] if payloads else {}
 
-def _extract_point_fields(
-    temps: list[Any],
-    pops: list[Any],
-    wmos: list[Any],
-    covers: list[Any],
-    isday: list[Any],
-    idx: int,
-) -> tuple[float | None, int | None, int | None, int | None, bool | None]:
-    """
-    Lukee yksittäisen ennusterivin raakakentät ja muuntaa ne turvallisesti perus­tyyppeihin.
+
+# Haku katsotaan moduulin globaalista kutsuhetkellä (testit patchaavat http_get_json_async:n)
+_REPOSITORY = ForecastRepository(
+    lambda locations, tz_name: fetch_forecast_batch(locations, tz_name)
+)
+# varoitukset muuttuvat hitaasti -> oma välimuisti pidemmällä TTL:llä
+_ALERTS_REPOSITORY = ForecastRepository(
+    lambda locations, tz_name: fetch_alerts_batch(locations, tz_name),
+    ttl_s=CACHE_TTL_LONG,
+)
+
+
+def get_forecast_entry(lat: float, lon: float, tz_name: str) -> ForecastEntry:
+    """Välimuistissa oleva ennuste; hakee tarvittaessa kaikki tunnetut paikat kerralla."""
+    return _REPOSITORY.get(lat, lon, tz_name)
+
+
+def register_forecast_location(lat: float, lon: float, tz_name: str) -> None:
+    """Lisää paikan seuraavaan erähakuun (esim. useamman paikan dashboard)."""
+    _REPOSITORY.register(lat, lon, tz_name)
+
+
+def clear_forecast_cache() -> None:
+    _REPOSITORY.clear()
+    _ALERTS_REPOSITORY.clear()
+
+
+def fetch_current(lat: float, lon: float, tz_name: str) -> dict[str, Any]:
     """
-    raw_temp = temps[idx] if idx < len(temps) else None
-    raw_pop = pops[idx] if idx < len(pops) else None
-    raw_wmo = wmos[idx] if idx < len(wmos) else None
-    raw_ccov = covers[idx] if idx < len(covers) else None
-    raw_isday = isday[idx] if idx < len(isday) else None
-
-    temp = as_float(raw_temp)
-    pop = as_int(raw_pop)
-    wmo = as_int(raw_wmo)
-    ccov = as_int(raw_ccov)
-    is_day_flag = as_bool(raw_isday)
-
-    return temp, pop, wmo, ccov, is_day_flag
-
-
-def _build_point(
-    target_time: datetime,
-    offset: int,
-    temp: float | None,
-    pop: int | None,
-    wmo: int | None,
-    ccov: int | None,
-    is_day_flag: bool | None,
-) -> dict[str, Any]:
+    Nykytila samasta välimuistimerkinnästä kuin tuntiennuste: current-lohko
+    tulee mukana yhdistetyssä pyynnössä, joten erillistä kutsua ei tehdä.
+    Palauttaa tyhjän dictin, jos nykytilaa ei ole.
     """
-    Rakentaa dashboardin käyttämän piste-dictin yhden tunnin datasta.
+    entry = get_forecast_entry(lat, lon, tz_name)
+    current = entry.memo("current", lambda: _map_current(entry.payload.get("current") or {}))
+    return dict(current)
+
+
+def fetch_alerts(lat: float, lon: float, tz_name: str) -> dict[str, Any]:
     """
-    # fallback: päätellään päivä/yö kellonajasta jos api ei kerro
-    is_day = is_day_flag if is_day_flag is not None else (6 <= target_time.hour <= 20)
+    Säävaroitukset tälle ja huomiselle päivälle: {"alerts": [{date, kind, text}, ...]}.
 
+    Open-Meteon ennuste-API ei sisällä virallisia varoituksia, joten ne
+    johdetaan päiväkohtaisista ääriarvoista (ukkonen, jäätävä sade, puuskat,
+    sade- ja lumimäärä). Data haetaan omalla kevyellä pyynnöllä kerran
+    CACHE_TTL_LONG-välein.
+    """
+    entry = _ALERTS_REPOSITORY.get(lat, lon, tz_name)
+    alerts = entry.memo("alerts", lambda: _derive_alerts(entry.payload.get("daily") or {}))
+    return {"alerts": [dict(alert) for alert in alerts]}
+
+
+def _map_current(current: dict[str, Any]) -> dict[str, Any]:
+    if not current:
+        return {}
+    temp = as_float(current.get("temperature_2m"))
+    wmo = as_int(current.get("weathercode"))
+    cloudcover = as_int(current.get("cloudcover"))
+    is_day = as_bool(current.get("is_day"))
     return {
-        "label": "Nyt" if offset == 0 else f"+{offset} h",
-        "hour": target_time.hour,
+        "time": current.get("time"),
         "temp": temp,
-        "pop": pop,
+        "feels_like": as_float(current.get("apparent_temperature")),
+        "precipitation": as_float(current.get("precipitation")),
+        "wind": as_float(current.get("wind_speed_10m")),
         "key": wmo_to_foreca_code(
             wmo,
-            is_day=is_day,
-            pop=pop,
+            is_day=True if is_day is None else is_day,
             temp_c=temp,
-            cloudcover=ccov,
+            cloudcover=cloudcover,
         ),
     }
 
 
-def _compute_day_minmax(
-    temps: list[Any],
-    time_axis: list[datetime],
-    target_date: date,
-) -> tuple[Any | None, Any | None]:
-    """
-    Laskee annetun päivän min/max-lämpötilan.
-    Pidetään logiikka erillisenä, jotta _map_hourly_to_dashboard pysyy ohuena.
-    """
-    indices: list[int] = []
-    for i, ts in enumerate(time_axis):
-        if ts.date() == target_date:
-            indices.append(i)
-
-    values: list[Any] = []
-    for i in indices:
-        if i < len(temps):
-            values.append(temps[i])
+def _derive_alerts(daily: dict[str, Any]) -> list[dict[str, Any]]:
+    days: list[Any] = daily.get("time", []) or []
+
+    def value(field: str, idx: int) -> float | None:
+        values = daily.get(field, []) or []
+        return as_float(values[idx]) if idx < len(values) else None
+
+    alerts: list[dict[str, Any]] = []
+    for idx, day in enumerate(days):
+        code = value("weathercode", idx)
+        gust = value("wind_gusts_10m_max", idx)
+        rain = value("precipitation_sum", idx)
+        snow = value("snowfall_sum", idx)
+        found: list[tuple[str, str]] = []
+        if code in _THUNDER_CODES:
+            found.append(("thunder", "Ukkosta"))
+        if code in _FREEZING_CODES:
+            found.append(("freezing", "Jäätävää sadetta"))
+        if gust is not None and gust >= ALERT_GUST_MS:
+            found.append(("wind", f"Tuulenpuuskia {gust:.0f} m/s"))
+        if snow is not None and snow >= ALERT_SNOW_CM:
+            found.append(("snow", f"Runsasta lunta {snow:.0f} cm"))
+        elif rain is not None and rain >= ALERT_RAIN_MM:
+            found.append(("rain", f"Runsasta sadetta {rain:.0f} mm"))
+        alerts.extend({"date": day, "kind": kind, "text": text} for kind, text in found)
+    return alerts
 
-    if not values:
-        return None, None
 
-    return min(values), max(values)
+# --- apufunktiot dashboard-mapitukseen -----------------------------------------
+def _daily_value(daily: dict[str, Any], field: str, target_date: date) -> Any | None:
+    """Päivätaulukon arvo annetulle päivälle (daily.time = "YYYY-MM-DD")."""
+    days: list[Any] = daily.get("time", []) or []
+    values: list[Any] = daily.get(field, []) or []
+    iso = target_date.isoformat()
+    for idx, day in enumerate(days):
+        if day == iso and idx < len(values):
+            return values[idx]
+    return None
 
 
 def _map_hourly_to_dashboard(
@@ -158,63 +230,31 @@ def _map_hourly_to_dashboard(
     now: datetime,
     offsets: tuple[int, ...],
     tz_name: str,
+    daily: dict[str, Any] | None = None,
+    columns: HourlyColumns | None = None,
 ) -> dict[str, Any]:
     """
     Muuntaa Open-Meteon hourly-datan dashboardin käyttämään muotoon.
 
     Vastuu on nyt:
-      * rakentaa aika-akseli ja hakemisto (_build_time_axis, _build_time_index)
-      * käydä läpi pyydetyt offsetit
-      * koota pisteet _extract_point_fields- ja _build_point-apufunktioilla
-      * pyytää päivän min/max-lämpötilat _compute_day_minmax-apufunktiolta
+      * parsia tuntilohko sarakkeiksi (parse_hourly), ellei valmiita anneta
+      * poimia pyydetyt offsetit indeksihauilla
+      * ottaa päivän min/max-lämpötilat daily-datasta, muuten tuntidatasta
+
+    columns voidaan antaa valmiiksi parsittuna (välimuistista). tz_name on
+    rajapinnassa tulevia muutoksia varten; ajat ovat jo oikeassa vyöhykkeessä.
     """
-    temps: list[Any] = hourly.get("temperature_2m", []) or []
-    pops: list[Any] = hourly.get("precipitation_probability", []) or []
-    wmos: list[Any] = hourly.get("weathercode", []) or []
-    covers: list[Any] = hourly.get("cloudcover", []) or []
-    isday: list[Any] = hourly.get("is_day", []) or []
-
-    time_axis: list[datetime] = _build_time_axis(hourly, tz_name)
-    time_index = _build_time_index(time_axis)
-
-    points: list[dict[str, Any]] = []
-
-    for offset in offsets:
-        target_time = now + timedelta(hours=offset)
-        idx = time_index.get(target_time)
-
-        if idx is None:
-            # kyseistä tuntia ei tullut api:sta
-            continue
-
-        temp, pop, wmo, ccov, is_day_flag = _extract_point_fields(
-            temps=temps,
-            pops=pops,
-            wmos=wmos,
-            covers=covers,
-            isday=isday,
-            idx=idx,
-        )
-
-        point = _build_point(
-            target_time=target_time,
-            offset=offset,
-            temp=temp,
-            pop=pop,
-            wmo=wmo,
-            ccov=ccov,
-            is_day_flag=is_day_flag,
-        )
-        points.append(point)
-
-    min_temp, max_temp = _compute_day_minmax(
-        temps=temps,
-        time_axis=time_axis,
-        target_date=now.date(),
-    )
+    if columns is None:
+        columns = parse_hourly(hourly)
+
+    daily = daily or {}
+    min_temp = _daily_value(daily, "temperature_2m_min", now.date())
+    max_temp = _daily_value(daily, "temperature_2m_max", now.date())
+    if min_temp is None or max_temp is None:
+        min_temp, max_temp = columns.day_minmax(now.date())
 
     return {
-        "points": points,
+        "points": columns.points(now, offsets),
         "min_temp": min_temp,
         "max_temp": max_temp,
     }
@@ -228,16 +268,19 @@ def fetch_weather_points(
     offsets: tuple[int, ...] = (0, 3, 6, 9, 12),
 ) -> dict[str, Any]:
     """
-    Hakee tuntiennusteen ja palauttaa dashboardin käyttämän rakenteen.
+    Palauttaa dashboardin käyttämän rakenteen välimuistissa olevasta ennusteesta.
 
     Päävastuu:
-      * valita/hauttaa datalähteen (nyt: fetch_forecast)
-      * antaa raakadatan _map_hourly_to_dashboard-apufunktiolle
+      * hakea ennuste repositorysta (uusi HTTP-kutsu vain TTL:n umpeuduttua)
+      * parsia tuntilohko sarakkeiksi ja ikoniavaimiksi kerran per haku
+        ja antaa ne _map_hourly_to_dashboard-apufunktiolle
 
+    Eri offset-välit (1 h / 3 h / 6 h) johdetaan samoista sarakkeista.
     Paluuarvo on pidetty entisellään, jotta UI ei hajoa.
     """
-    data = fetch_forecast(lat, lon, tz_name)
-    hourly = data.get("hourly") or {}
+    entry = get_forecast_entry(lat, lon, tz_name)
+    hourly = entry.payload.get("hourly") or {}
+    columns = entry.memo("columns", lambda: parse_hourly(hourly))
 
     now = datetime.now(TZ).replace(minute=0, second=0, microsecond=0)
 
@@ -246,4 +289,29 @@ def fetch_weather_points(
         now=now,
         offsets=offsets,
         tz_name=tz_name,
+        daily=entry.payload.get("daily") or {},
+        columns=columns,
+    )
+
+
+def _hhmm(iso: Any) -> str | None:
+    if not iso:
+        return None
+    text = str(iso)
+    return text[11:16] if len(text) >= 16 else None
+
+
+def fetch_sun_times(lat: float, lon: float, tz_name: str) -> tuple[str | None, str | None]:
+    """
+    Palauttaa tämän päivän (sunrise_HH:MM, sunset_HH:MM) samasta
+    välimuistissa olevasta ennusteesta, tai (None, None).
+    """
+    try:
+        daily = get_forecast_entry(lat, lon, tz_name).payload.get("daily") or {}
+    except Exception:
+        return None, None
+    today = datetime.now(TZ).date()
+    return (
+        _hhmm(_daily_value(daily, "sunrise", today)),
+        _hhmm(_daily_value(daily, "sunset", today)),
     )
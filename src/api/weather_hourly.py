@@ -0,0 +1,180 @@
+"""
+Open-Meteon tuntidata sarakemuodossa.
+
+    hourly-dict -> parse_hourly(...) -> HourlyColumns
+
+Tuntilohko parsitaan kerran tyypitetyiksi taulukoiksi ja Foreca-ikoniavain
+lasketaan kaikille tunneille yhdellä vektoroidulla läpikäynnillä
+(wmo_to_foreca_codes). Välimuistissa oleva HourlyColumns palvelee kaikki
+offset-joukot (1 h / 3 h / 6 h) ja päivän min/max -kyselyt indeksihauilla.
+
+Ajat ovat seinäkelloaikaa epoch-sekunteina (Open-Meteo palauttaa ajat jo
+pyydetyssä aikavyöhykkeessä), joten "nyt + 3 h" on pelkkä yhteenlasku.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any
+
+import numpy as np
+
+from src.api.weather_utils import as_bool, as_float
+from src.api.wmo_foreca_code import wmo_to_foreca_codes
+from src.config import TZ
+
+HOUR_S = 3600
+DAY_S = 86400
+_EPOCH = datetime(1970, 1, 1)
+
+
+def wall_seconds(moment: datetime) -> int:
+    """Seinäkelloaika epoch-sekunteina (aikavyöhyketieto ohitetaan)."""
+    return int((moment.replace(tzinfo=None) - _EPOCH).total_seconds())
+
+
+@dataclass(frozen=True)
+class HourlyColumns:
+    """
+    Tuntiennuste taulukkoina, järjestettynä ajan mukaan.
+
+    ts:      int64, seinäkelloaika epoch-sekunteina
+    temp:    float64 (NaN = puuttuu)
+    pop:     float64, kokonaisluvuiksi katkaistu (NaN = puuttuu)
+    wmo:     float64, kokonaisluvuiksi katkaistu (NaN = puuttuu)
+    cloud:   float64, kokonaisluvuiksi katkaistu (NaN = puuttuu)
+    is_day:  bool; jos API ei kerro, päätellään kellonajasta (6–20)
+    keys:    Foreca-ikoniavain jokaiselle tunnille
+    """
+
+    ts: np.ndarray
+    temp: np.ndarray
+    pop: np.ndarray
+    wmo: np.ndarray
+    cloud: np.ndarray
+    is_day: np.ndarray
+    keys: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.ts.size)
+
+    def index_at(self, wall_s: int) -> int | None:
+        idx = int(np.searchsorted(self.ts, wall_s))
+        if idx < self.ts.size and int(self.ts[idx]) == wall_s:
+            return idx
+        return None
+
+    def point(self, idx: int, offset: int) -> dict[str, Any]:
+        temp = float(self.temp[idx])
+        pop = float(self.pop[idx])
+        return {
+            "label": "Nyt" if offset == 0 else f"+{offset} h",
+            "hour": int(self.ts[idx] % DAY_S) // HOUR_S,
+            "temp": None if np.isnan(temp) else temp,
+            "pop": None if np.isnan(pop) else int(pop),
+            "key": str(self.keys[idx]),
+        }
+
+    def points(self, now: datetime, offsets: tuple[int, ...]) -> list[dict[str, Any]]:
+        """Pisteet offseteille; tunnit, joita API ei palauttanut, ohitetaan."""
+        base = wall_seconds(now)
+        points: list[dict[str, Any]] = []
+        for offset in offsets:
+            idx = self.index_at(base + offset * HOUR_S)
+            if idx is not None:
+                points.append(self.point(idx, offset))
+        return points
+
+    def day_minmax(self, day: date) -> tuple[float | None, float | None]:
+        """Päivän min/max-lämpötila tuntidatasta."""
+        start = (day - _EPOCH.date()).days * DAY_S
+        lo, hi = np.searchsorted(self.ts, (start, start + DAY_S))
+        values = self.temp[lo:hi]
+        values = values[~np.isnan(values)]
+        if not values.size:
+            return None, None
+        return float(values.min()), float(values.max())
+
+
+def _column(values: list[Any], n: int, cast: Callable[[Any], Any]) -> np.ndarray:
+    """Raakalista -> float64 (NaN = puuttuu), pituus n. Nopea polku numeroille."""
+    values = list(values[:n]) + [None] * (n - len(values))
+    try:
+        return np.asarray([np.nan if v is None else v for v in values], dtype=np.float64)
+    except (TypeError, ValueError):
+        pass
+    out = np.full(n, np.nan)
+    for idx, value in enumerate(values):
+        cast_value = cast(value)
+        if cast_value is not None:
+            out[idx] = float(cast_value)
+    return out
+
+
+def _parse_time_scalar(value: Any) -> float:
+    try:
+        moment = datetime.fromisoformat(str(value))
+    except ValueError:
+        return np.nan
+    if moment.tzinfo is not None and TZ is not None:
+        moment = moment.astimezone(TZ)
+    return float(wall_seconds(moment))
+
+
+def _time_column(raw_times: list[Any]) -> np.ndarray:
+    """ISO-ajat -> float64 seinäkelloaika-sekunnit (NaN = rikkinäinen aikaleima)."""
+    strings = [str(t) if t else "" for t in raw_times]
+    try:
+        parsed = np.asarray(strings, dtype="U19").astype("datetime64[s]")
+    except ValueError:
+        # offsetilliset tai rikkinäiset ajat rivi kerrallaan
+        return np.fromiter(
+            (_parse_time_scalar(s) if s else np.nan for s in strings),
+            dtype=np.float64,
+            count=len(strings),
+        )
+    out = parsed.astype(np.int64).astype(np.float64)
+    out[np.isnat(parsed)] = np.nan
+    return out
+
+
+def parse_hourly(hourly: dict[str, Any]) -> HourlyColumns:
+    """
+    Parsii Open-Meteon hourly-lohkon kerran ja laskee ikoniavaimet kaikille tunneille.
+
+    Rivit, joiden aikaleima on rikki, pudotetaan. Lyhyemmät kenttälistat
+    täydennetään puuttuvilla arvoilla.
+    """
+    ts = _time_column(hourly.get("time", []) or [])
+    n = ts.size
+
+    def column(name: str, cast: Callable[[Any], Any] = as_float) -> np.ndarray:
+        return _column(hourly.get(name, []) or [], n, cast)
+
+    temp = column("temperature_2m")
+    pop = np.trunc(column("precipitation_probability"))
+    wmo = np.trunc(column("weathercode"))
+    cloud = np.trunc(column("cloudcover"))
+    day_flag = column("is_day", as_bool)
+
+    valid = ~np.isnan(ts)
+    order = np.argsort(ts[valid], kind="stable")
+    ts_s = ts[valid][order].astype(np.int64)
+    temp, pop, wmo, cloud, day_flag = (
+        col[valid][order] for col in (temp, pop, wmo, cloud, day_flag)
+    )
+
+    hours = (ts_s % DAY_S) // HOUR_S
+    is_day = np.where(np.isnan(day_flag), (hours >= 6) & (hours <= 20), day_flag != 0)
+    keys = wmo_to_foreca_codes(wmo, is_day, pop, temp, cloud)
+    return HourlyColumns(
+        ts=ts_s,
+        temp=temp,
+        pop=pop,
+        wmo=wmo,
+        cloud=cloud,
+        is_day=is_day,
+        keys=keys,
+    )
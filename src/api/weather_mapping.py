@@ -13,7 +13,9 @@ from src.api.wmo_map_loader import load_wmo_foreca_map
 from src.api.wmo_trace import (
     MAP_TRACE_ENABLED,
     clear_map_trace,
+    configure_map_trace,
     get_map_trace,
+    map_trace_records,
     trace_map,
 )
 
@@ -23,6 +25,8 @@ __all__ = [
     "load_wmo_foreca_map",
     "get_map_trace",
     "clear_map_trace",
+    "configure_map_trace",
+    "map_trace_records",
     "MAP_TRACE_ENABLED",
     "trace_map",
 ]
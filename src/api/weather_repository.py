@@ -0,0 +1,197 @@
+"""
+Open-Meteo -ennusteiden välimuisti (repository).
+
+Yksi HTTP-kutsu hakee kaikkien tunnettujen paikkojen tunti- ja päiväennusteen
+(multi-location: latitude=a,b&longitude=c,d). Koko tuntitaulukko tallennetaan
+kerran paikkaa kohden; kaikki näkymät (1 h / 3 h / 6 h -välit, päivän min/max,
+auringon nousu/lasku) johdetaan välimuistista ilman uutta pyyntöä.
+
+Repository ei itse tee HTTP:tä, vaan saa hakufunktion (ks. weather_fetch).
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.config import CACHE_TTL_MED
+from src.metrics import count_cache
+
+# (lat, lon), pyöristettynä -> sama paikka osuu samaan välimuistiavaimeen
+Location = tuple[float, float]
+
+# fetcher(locations, tz_name) -> yksi payload per paikka samassa järjestyksessä
+ForecastFetcher = Callable[[tuple[Location, ...], str], list[dict[str, Any]]]
+
+_COORD_DECIMALS = 4
+# epäonnistuneen haun jälkeen vanha data kelpaa näin kauan ilman uutta yritystä
+FAILURE_BACKOFF_S = 60.0
+
+
+def location_key(lat: float, lon: float) -> Location:
+    return (round(float(lat), _COORD_DECIMALS), round(float(lon), _COORD_DECIMALS))
+
+
+@dataclass
+class ForecastEntry:
+    """Yhden paikan ennuste ja siitä johdetut, uudelleenkäytettävät rakenteet."""
+
+    payload: dict[str, Any]
+    fetched_at: float
+    derived: dict[str, Any] = field(default_factory=dict)
+
+    def memo(self, key: str, factory: Callable[[], Any]) -> Any:
+        """Laskee johdetun arvon (esim. aika-akseli) kerran per haku."""
+        if key not in self.derived:
+            self.derived[key] = factory()
+        return self.derived[key]
+
+
+class _Flight:
+    """Yksi käynnissä oleva erähaku; samaa paikkaa pyytävät odottavat sitä."""
+
+    __slots__ = ("done", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.error: Exception | None = None
+
+
+class ForecastRepository:
+    """
+    Paikkakohtainen ennustevälimuisti TTL:llä.
+
+    Kun jonkin paikan data puuttuu tai vanhenee, haetaan samalla kaikki saman
+    aikavyöhykkeen vanhentuneet paikat yhdellä kutsulla. HTTP-haku tehdään
+    lukon ulkopuolella: tuoreen paikan lukijat eivät odota, ja samaa paikkaa
+    pyytävät istunnot odottavat yhtä käynnissä olevaa hakua (single-flight).
+    Epäonnistuneen haun jälkeen uutta hakua ei yritetä failure_backoff_s:n
+    aikana: vanha data palautetaan, tai jos dataa ei ole (kylmä käynnistys),
+    nostetaan edellisen haun virhe odottamatta uutta aikakatkaisua.
+    """
+
+    def __init__(
+        self,
+        fetcher: ForecastFetcher,
+        ttl_s: float = CACHE_TTL_MED,
+        failure_backoff_s: float = FAILURE_BACKOFF_S,
+    ) -> None:
+        self._fetcher = fetcher
+        self._ttl_s = ttl_s
+        self._failure_backoff_s = failure_backoff_s
+        self._entries: dict[tuple[Location, str], ForecastEntry] = {}
+        self._known: dict[str, list[Location]] = {}
+        self._inflight: dict[tuple[Location, str], _Flight] = {}
+        self._retry_at: dict[tuple[Location, str], float] = {}
+        self._errors: dict[tuple[Location, str], Exception] = {}
+        self._lock = threading.Lock()
+
+    def register(self, lat: float, lon: float, tz_name: str) -> None:
+        """Lisää paikan, jotta se haetaan mukana seuraavassa erähaussa."""
+        loc = location_key(lat, lon)
+        with self._lock:
+            known = self._known.setdefault(tz_name, [])
+            if loc not in known:
+                known.append(loc)
+
+    def get(self, lat: float, lon: float, tz_name: str) -> ForecastEntry:
+        self.register(lat, lon, tz_name)
+        key = (location_key(lat, lon), tz_name)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry.fetched_at < self._ttl_s:
+                count_cache("weather_forecast", hit=True)
+                return entry
+            count_cache("weather_forecast", hit=False)
+            if now < self._retry_at.get(key, 0.0):
+                # lähde oli juuri alhaalla: vanha data (tai edellinen virhe)
+                # ilman uutta aikakatkaisua
+                if entry is not None:
+                    return entry
+                error = self._errors.get(key)
+                if error is not None:
+                    raise error
+            flight = self._inflight.get(key)
+            owner = flight is None
+            if owner:
+                flight = _Flight()
+                stale = tuple(
+                    loc
+                    for loc in self._known[tz_name]
+                    if (loc, tz_name) == key
+                    or (
+                        not self._is_fresh((loc, tz_name), now)
+                        and (loc, tz_name) not in self._inflight
+                    )
+                )
+                for loc in stale:
+                    self._inflight[(loc, tz_name)] = flight
+
+        if owner:
+            self._run(flight, stale, tz_name)
+        else:
+            flight.done.wait()
+
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            return entry
+        if flight.error is not None:
+            raise flight.error
+        return ForecastEntry(payload={}, fetched_at=time.monotonic())
+
+    def _run(self, flight: _Flight, stale: tuple[Location, ...], tz_name: str) -> None:
+        """Erähaku lukon ulkopuolella; tulos tai virhe kirjataan kaikille paikoille."""
+        payloads: list[dict[str, Any]] | None = None
+        try:
+            payloads = self._fetcher(stale, tz_name)
+            if len(payloads) != len(stale):
+                raise ValueError(f"ennusteita {len(payloads)}, paikkoja {len(stale)} ({tz_name})")
+        except Exception as e:
+            flight.error = e
+            payloads = None
+        finally:
+            self._finish(flight, stale, tz_name, payloads)
+
+    def _finish(
+        self,
+        flight: _Flight,
+        stale: tuple[Location, ...],
+        tz_name: str,
+        payloads: list[dict[str, Any]] | None,
+    ) -> None:
+        fetched_at = time.monotonic()
+        with self._lock:
+            for loc in stale:
+                key = (loc, tz_name)
+                self._inflight.pop(key, None)
+                if payloads is None:
+                    self._retry_at[key] = fetched_at + self._failure_backoff_s
+                    if flight.error is not None:
+                        self._errors[key] = flight.error
+                else:
+                    self._retry_at.pop(key, None)
+                    self._errors.pop(key, None)
+            if payloads is not None:
+                for loc, payload in zip(stale, payloads, strict=True):
+                    self._entries[(loc, tz_name)] = ForecastEntry(
+                        payload=payload or {},
+                        fetched_at=fetched_at,
+                    )
+        flight.done.set()
+
+    def _is_fresh(self, key: tuple[Location, str], now: float) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and now - entry.fetched_at < self._ttl_s
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._known.clear()
+            self._retry_at.clear()
+            self._errors.clear()
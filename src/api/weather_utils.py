@@ -2,8 +2,6 @@ from __future__ import annotations
 
 from typing import Any
 
-import pandas as pd
-
 from src.config import (
     CLOUD_T_ALMOST,
     CLOUD_T_CLEAR,
@@ -59,6 +57,17 @@ def _cast_to_int(value: Any) -> int | None:
         return None
 
 
+def _is_na(value: Any) -> bool:
+    """
+    pd.isna-vastine skalaareille ilman pandas-importtia:
+    NaN ja NaT eivät ole yhtä kuin itsensä, pd.NA:n vertailu ei palauta boolia.
+    """
+    try:
+        return bool(value != value)
+    except Exception:
+        return type(value).__name__ == "NAType"
+
+
 def _normalize_scalar(value: Any) -> Any | None:
     """
     Yhtenäinen esikäsittely eri lähdetyypeille:
@@ -80,13 +89,9 @@ def _normalize_scalar(value: Any) -> Any | None:
             # jos value ei käyttäydy odotetusti, jatketaan sellaisenaan
             pass
 
-    # pandas NA
-    try:
-        if pd.isna(value):
-            return None
-    except Exception:
-        # jos pd.isna ei osaa käsitellä tyyppiä, jatketaan ilman tätä tarkistusta
-        pass
+    # pandas NA / NaN / NaT
+    if _is_na(value):
+        return None
 
     # numpy-scalar tms.
     if hasattr(value, "item"):
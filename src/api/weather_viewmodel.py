@@ -1,22 +1,53 @@
 # src/api/weather_viewmodel.py
 from __future__ import annotations
 
+import hashlib
 from typing import Any
 
-from src.api import fetch_weather_points
-from src.config import LAT, LON
+from src.api import fetch_alerts, fetch_current, fetch_weather_points
+from src.settings import get_settings
+
+
+def point_fingerprint(point: dict[str, Any]) -> str:
+    """
+    Pisteen näkyvän sisällön tiiviste: sama tiiviste = sama solu-HTML.
+    Lämpötila pyöristetään kuten kortissa, joten desimaalimuutos ei riko tiivistettä.
+    """
+    temp = point.get("temp")
+    content = (
+        point.get("label"),
+        point.get("hour"),
+        point.get("key"),
+        None if temp is None else round(temp),
+        point.get("pop"),
+    )
+    return hashlib.blake2b(repr(content).encode("utf-8"), digest_size=8).hexdigest()
 
 
 def build_weather_view(interval: str) -> dict[str, Any]:
     """
     Palauttaa kortin tarvitsemat säädatan osat.
     interval: esim. '1 h', '3 h' tai '6 h'
+
+    Jokaisella pisteellä on sisältötiiviste "fp", jonka avulla kortti käyttää
+    muuttumattomien solujen HTML:n uudelleen. "current" on nykytila samasta
+    pyynnöstä kuin tuntiennuste, "alerts" tämän ja huomisen varoitukset.
     """
     step = int(interval.split()[0])
     offsets = tuple(step * i for i in range(5))
 
-    weather_data = fetch_weather_points(LAT, LON, "Europe/Helsinki", offsets=offsets)
-    points = weather_data["points"]
+    location = get_settings().location
+    lat, lon = location.lat, location.lon
+
+    weather_data = fetch_weather_points(lat, lon, "Europe/Helsinki", offsets=offsets)
+    # nykytila samasta välimuistimerkinnästä, ei uutta pyyntöä
+    current = fetch_current(lat, lon, "Europe/Helsinki")
+    try:
+        alerts = fetch_alerts(lat, lon, "Europe/Helsinki")["alerts"]
+    except Exception:
+        # varoitusten puuttuminen ei saa kaataa sääkorttia
+        alerts = []
+    points = [{**p, "fp": point_fingerprint(p)} for p in weather_data["points"]]
     min_temp = weather_data["min_temp"]
     max_temp = weather_data["max_temp"]
 
@@ -26,4 +57,6 @@ def build_weather_view(interval: str) -> dict[str, Any]:
         "max_temp": max_temp,
         "interval": interval,
         "offsets": offsets,
+        "current": current,
+        "alerts": alerts,
     }
@@ -1,5 +1,13 @@
 from __future__ import annotations
 
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any
+
+import numpy as np
+
+from src.api import weather_utils, wmo_trace
 from src.api.weather_utils import cloud_icon_from_cover
 from src.api.wmo_map_loader import load_wmo_foreca_map
 from src.api.wmo_trace import trace_map
@@ -89,6 +97,202 @@ def _open_meteo_icon(
     return None
 
 
+# ============================================================
+# PÄÄTÖSTAULU
+# ============================================================
+
+# koodit, jotka _open_meteo_icon tuntee; muut menevät Excel-tauluun / pilvisyyteen
+OPEN_METEO_CODES: tuple[int, ...] = (
+    0, 1, 2, 3, 45, 48, 51, 53, 55, 56, 57, 61, 63, 65, 66, 67,
+    71, 73, 75, 77, 80, 81, 82, 85, 86, 95, 96, 99,
+)  # fmt: skip
+
+# PoP-kynnykset, joita haarat vertaavat (pop >= kynnys)
+_POP_BOUNDS: tuple[int, ...] = tuple(sorted({_CLOUD_CODE_POP_THRESHOLD, 80}))
+
+
+def _cloud_bounds() -> tuple[int, ...]:
+    """Pilvisyyskynnykset (cover < kynnys): _cloud_group ja cloud_icon_from_cover."""
+    return tuple(
+        sorted(
+            {
+                CLOUD_T_PARTLY,
+                CLOUD_T_MOSTLY,
+                weather_utils.CLOUD_T_CLEAR,
+                weather_utils.CLOUD_T_ALMOST,
+                weather_utils.CLOUD_T_PARTLY,
+                weather_utils.CLOUD_T_MOSTLY,
+            }
+        )
+    )
+
+
+def _bucket(value: float | None, bounds: tuple[int, ...]) -> int:
+    """0 = None, 1 = alle ensimmäisen kynnyksen, i + 1 = vähintään i:nnen kynnyksen."""
+    if value is None:
+        return 0
+    return 1 + bisect_right(bounds, value)
+
+
+def _temp_band(temp_c: float | None) -> int:
+    """0 = None, 1 = lumi (< SLEET_TEMP_MIN), 2 = räntä (<= SLEET_TEMP_MAX), 3 = vesi."""
+    if temp_c is None:
+        return 0
+    if temp_c < SLEET_TEMP_MIN:
+        return 1
+    if temp_c <= SLEET_TEMP_MAX:
+        return 2
+    return 3
+
+
+def _representatives(bounds: tuple[int, ...]) -> list[int | None]:
+    """Yksi edustaja jokaiselle _bucket-lokerolle."""
+    return [None, bounds[0] - 1, *bounds]
+
+
+# lokeroindeksi: int tai int-taulukko (vektoroitu haku)
+Index = Any
+
+_TEMP_REPRESENTATIVES: tuple[float | None, ...] = (
+    None,
+    SLEET_TEMP_MIN - 1.0,
+    SLEET_TEMP_MIN,
+    SLEET_TEMP_MAX + 1.0,
+)
+
+
+@dataclass(frozen=True)
+class DecisionTable:
+    """
+    _open_meteo_icon esilaskettuna diskreettiin syöteavaruuteen:
+
+        koodi × päivä/yö × PoP-lokero × lämpötilavyöhyke × pilvisyysvyöhyke
+
+    keys on litteä taulu; indeksi lasketaan lokeroista (ks. index).
+    """
+
+    codes: dict[int, int]
+    cloud_bounds: tuple[int, ...]
+    keys: tuple[str, ...]
+    array: np.ndarray = field(repr=False, compare=False)
+
+    @property
+    def shape(self) -> tuple[int, int, int, int, int]:
+        return (len(self.codes), 2, len(_POP_BOUNDS) + 2, 4, len(self.cloud_bounds) + 2)
+
+    def index(
+        self, row: Index, is_day: Index, pop_b: Index, temp_b: Index, cloud_b: Index
+    ) -> Index:
+        """Litteä indeksi lokeroista; toimii sekä skalaareille että numpy-taulukoille."""
+        _, n_day, n_pop, n_temp, n_cloud = self.shape
+        return (((row * n_day + is_day) * n_pop + pop_b) * n_temp + temp_b) * n_cloud + cloud_b
+
+    def lookup(
+        self,
+        code: int,
+        is_day: bool,
+        pop: int | None,
+        temp_c: float | None,
+        cloudcover: int | None,
+    ) -> str | None:
+        """Taulun avain tai None, jos koodi ei ole Open-Meteon joukossa."""
+        row = self.codes.get(code)
+        if row is None:
+            return None
+        return self.keys[
+            self.index(
+                row,
+                is_day,
+                _bucket(pop, _POP_BOUNDS),
+                _temp_band(temp_c),
+                _bucket(cloudcover, self.cloud_bounds),
+            )
+        ]
+
+
+def build_decision_table() -> DecisionTable:
+    """Laskee taulun haaralogiikasta (_open_meteo_icon) jokaisen lokeron edustajalla."""
+    cloud_bounds = _cloud_bounds()
+    keys = [
+        _open_meteo_icon(code, is_day, pop, temp_c, cloudcover)
+        for code in OPEN_METEO_CODES
+        for is_day in (False, True)
+        for pop in _representatives(_POP_BOUNDS)
+        for temp_c in _TEMP_REPRESENTATIVES
+        for cloudcover in _representatives(cloud_bounds)
+    ]
+    if any(key is None for key in keys):
+        raise ValueError("OPEN_METEO_CODES sisältää koodin, jota _open_meteo_icon ei tunne")
+    return DecisionTable(
+        codes={code: row for row, code in enumerate(OPEN_METEO_CODES)},
+        cloud_bounds=cloud_bounds,
+        keys=tuple(keys),  # type: ignore[arg-type]
+        array=np.array(keys),
+    )
+
+
+@lru_cache(maxsize=1)
+def decision_table() -> DecisionTable:
+    """Taulu rakennetaan kerran ensimmäisellä käytöllä."""
+    return build_decision_table()
+
+
+def _boundary_values(bounds: tuple[int, ...], low: int, high: int) -> list[int | None]:
+    values = {low, high, *bounds, *(b - 1 for b in bounds)}
+    return [None, *sorted(values)]
+
+
+def verify_decision_table(table: DecisionTable | None = None) -> list[dict[str, Any]]:
+    """
+    Vertaa taulua haaralogiikkaan. Palauttaa erot (tyhjä lista = taulu pätee).
+
+    Haarat vertaavat syötteitä vain kiinteisiin kynnyksiin, joten logiikka on
+    paloittain vakio. Kun jokaisen kynnyksen molemmat puolet, arvoalueen päät ja
+    None käydään läpi kaikissa yhdistelmissä, jokainen mahdollinen syöte osuu
+    johonkin tarkistettuun lokeroon.
+    """
+    table = table or decision_table()
+    pops = _boundary_values(_POP_BOUNDS, 0, 100)
+    clouds = _boundary_values(table.cloud_bounds, 0, 100)
+    temps: list[float | None] = [
+        None,
+        -40.0,
+        SLEET_TEMP_MIN - 0.1,
+        SLEET_TEMP_MIN,
+        (SLEET_TEMP_MIN + SLEET_TEMP_MAX) / 2,
+        SLEET_TEMP_MAX,
+        SLEET_TEMP_MAX + 0.1,
+        40.0,
+    ]
+
+    mismatches: list[dict[str, Any]] = []
+    for code in OPEN_METEO_CODES:
+        for is_day in (False, True):
+            for pop in pops:
+                for temp_c in temps:
+                    for cloudcover in clouds:
+                        expected = _open_meteo_icon(code, is_day, pop, temp_c, cloudcover)
+                        got = table.lookup(code, is_day, pop, temp_c, cloudcover)
+                        if got != expected:
+                            mismatches.append(
+                                {
+                                    "wmo": code,
+                                    "is_day": is_day,
+                                    "pop": pop,
+                                    "temp_c": temp_c,
+                                    "cloudcover": cloudcover,
+                                    "expected": expected,
+                                    "table": got,
+                                }
+                            )
+    return mismatches
+
+
+# ============================================================
+# MÄPPÄYS
+# ============================================================
+
+
 def wmo_to_foreca_code(
     code: int | None,
     is_day: bool,
@@ -99,22 +303,21 @@ def wmo_to_foreca_code(
     """
     Päämäppäys: WMO → Foreca-koodi ("d000"/"n000"/"d100"...)
 
-    1. Yritetään Excel/CSV-mäppäystä
-    2. Jos ei löydy -> pilvisyyspohjainen fallback
+    1. Open-Meteon koodit päätöstaulusta (yksi indeksihaku)
+    2. Muut koodit Excel/CSV-mäppäyksestä
+    3. Jos ei löydy -> pilvisyyspohjainen fallback
     """
-    maps = load_wmo_foreca_map()
-
     if code is None:
         key = "d000" if is_day else "n000"
         trace_map(code, is_day, pop, temp_c, cloudcover, key, "none → clear (default)")
         return key
 
-    key = _open_meteo_icon(code, is_day, pop, temp_c, cloudcover)
+    key = decision_table().lookup(code, is_day, pop, temp_c, cloudcover)
     if key is not None:
         trace_map(code, is_day, pop, temp_c, cloudcover, key, "Open-Meteo mapping")
         return key
 
-    lookup = maps["day" if is_day else "night"]
+    lookup = load_wmo_foreca_map()["day" if is_day else "night"]
     if code in lookup:
         key = lookup[code]
         trace_map(code, is_day, pop, temp_c, cloudcover, key, "Excel mapping")
@@ -124,3 +327,118 @@ def wmo_to_foreca_code(
     key = cloud_icon_from_cover(cloudcover, is_day)
     trace_map(code, is_day, pop, temp_c, cloudcover, key, "fallback: cloudcover")
     return key
+
+
+# ============================================================
+# VEKTOROITU MÄPPÄYS (koko tuntitaulukko kerralla)
+# ============================================================
+
+
+def _bucket_array(values: np.ndarray, bounds: tuple[int, ...]) -> np.ndarray:
+    """_bucket taulukolle (NaN = None)."""
+    buckets = 1 + np.searchsorted(np.asarray(bounds), values, side="right")
+    return np.where(np.isnan(values), 0, buckets)
+
+
+def _temp_band_array(temp_c: np.ndarray) -> np.ndarray:
+    return np.select(
+        [np.isnan(temp_c), temp_c < SLEET_TEMP_MIN, temp_c <= SLEET_TEMP_MAX],
+        [0, 1, 2],
+        default=3,
+    )
+
+
+def _cover_icons(prefix: np.ndarray, cloudcover: np.ndarray) -> np.ndarray:
+    """cloud_icon_from_cover taulukolle; kynnykset luetaan weather_utilsista kutsuhetkellä."""
+    cover = np.where(np.isnan(cloudcover), 100, np.trunc(cloudcover))
+    digit = np.select(
+        [
+            cover < weather_utils.CLOUD_T_CLEAR,
+            cover < weather_utils.CLOUD_T_ALMOST,
+            cover < weather_utils.CLOUD_T_PARTLY,
+            cover < weather_utils.CLOUD_T_MOSTLY,
+        ],
+        ["000", "100", "200", "300"],
+        default="400",
+    )
+    return np.char.add(prefix, digit)
+
+
+def wmo_to_foreca_codes(
+    codes: np.ndarray,
+    is_day: np.ndarray,
+    pop: np.ndarray,
+    temp_c: np.ndarray,
+    cloudcover: np.ndarray,
+) -> np.ndarray:
+    """
+    wmo_to_foreca_code koko taulukolle: lokerot lasketaan vektoroidusti ja
+    avaimet haetaan päätöstaulusta yhdellä indeksoinnilla.
+
+    Syötteet ovat samanpituisia float64-taulukoita (NaN = None), is_day bool.
+    Tulos on sama kuin skalaarifunktiolla rivi kerrallaan. Jäljitys kirjaa
+    näytteistetyt rivit samoilla syillä kuin skalaarifunktio.
+    """
+    table = decision_table()
+    is_day = is_day.astype(bool)
+    known = ~np.isnan(codes)
+    code = np.where(known, codes, -1).astype(np.int64)
+    rows = np.array([table.codes.get(c, -1) for c in code.tolist()], dtype=np.int64)
+    in_table = rows >= 0
+
+    flat = table.index(
+        np.where(in_table, rows, 0),
+        is_day,
+        _bucket_array(pop, _POP_BOUNDS),
+        _temp_band_array(temp_c),
+        _bucket_array(cloudcover, table.cloud_bounds),
+    )
+    prefix = np.where(is_day, "d", "n")
+    keys = np.where(in_table, table.array[flat], np.char.add(prefix, "000"))
+
+    reasons = np.where(known, "Open-Meteo mapping", "none → clear (default)").astype(object)
+    other = known & ~in_table
+    if other.any():
+        # muut koodit: Excel-taulu, muuten pilvisyys
+        maps = load_wmo_foreca_map()
+        fallback = _cover_icons(prefix, cloudcover)
+        keys = keys.astype(object)
+        for idx in np.flatnonzero(other).tolist():
+            lookup = maps["day" if is_day[idx] else "night"]
+            if int(code[idx]) in lookup:
+                keys[idx], reasons[idx] = lookup[int(code[idx])], "Excel mapping"
+            else:
+                keys[idx], reasons[idx] = fallback[idx], "fallback: cloudcover"
+
+    _trace_rows(codes, is_day, pop, temp_c, cloudcover, keys, reasons)
+    return keys
+
+
+def _trace_rows(
+    codes: np.ndarray,
+    is_day: np.ndarray,
+    pop: np.ndarray,
+    temp_c: np.ndarray,
+    cloudcover: np.ndarray,
+    keys: np.ndarray,
+    reasons: np.ndarray,
+) -> None:
+    """Kirjaa näytteistetyt rivit; tietue rakennetaan vain näytteeseen osuville."""
+    if not wmo_trace.MAP_TRACE_ENABLED:
+        return
+
+    def scalar(values: np.ndarray, idx: int, cast: type) -> Any:
+        value = float(values[idx])
+        return None if np.isnan(value) else cast(value)
+
+    for idx in range(codes.size):
+        if wmo_trace.trace_sampled():
+            wmo_trace.record_map(
+                scalar(codes, idx, int),
+                bool(is_day[idx]),
+                scalar(pop, idx, int),
+                scalar(temp_c, idx, float),
+                scalar(cloudcover, idx, int),
+                str(keys[idx]),
+                str(reasons[idx]),
+            )
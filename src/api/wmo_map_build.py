@@ -0,0 +1,36 @@
+"""
+Build-vaihe: kääntää WMO→Foreca -Excelin JSON-tauluksi.
+
+    python -m src.api.wmo_map_build
+
+Aja aina, kun data/WMO_Foreca-koodit.xlsx muuttuu, ja commitoi
+data/wmo_foreca_map.json lähteen rinnalle.
+
+Samalla tarkistetaan, että Open-Meteo-koodien päätöstaulu vastaa
+haaralogiikkaa (verify_decision_table); ero kaataa buildin.
+"""
+
+from __future__ import annotations
+
+from src.api.wmo_foreca_code import decision_table, verify_decision_table
+from src.api.wmo_map_loader import COMPILED_MAP_FILE, compile_wmo_map
+
+
+def main() -> None:
+    written = compile_wmo_map()
+    print(
+        f"{COMPILED_MAP_FILE}: versio {written['version']}, "
+        f"lähde {written['source']}, "
+        f"{len(written['day'])} päivä- / {len(written['night'])} yökoodia"
+    )
+
+    mismatches = verify_decision_table()
+    if mismatches:
+        for row in mismatches[:10]:
+            print(f"  ero: {row}")
+        raise SystemExit(f"päätöstaulu ei vastaa haaralogiikkaa ({len(mismatches)} eroa)")
+    print(f"päätöstaulu: {len(decision_table().keys)} solua, vastaa haaralogiikkaa")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,39 @@
+"""
+WMO→Foreca -mäppäys.
+
+Ajonaikana käytetään käännettyä taulua (data/wmo_foreca_map.json), jonka
+build-vaihe tuottaa Excelistä:
+
+    python -m src.api.wmo_map_build
+
+Excel luetaan pandasilla vain, jos lähdetiedosto on muuttunut käännöksen
+jälkeen (tai käännöstä ei ole). Pandas importataan vasta tällöin.
+"""
+
 from __future__ import annotations
 
+import hashlib
+import json
+import logging
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-import pandas as pd
+from src.paths import DATA, ROOT_DIR
 
-from src.paths import DATA
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+COMPILED_MAP_FILE = DATA / "wmo_foreca_map.json"
 
 # ---------------------------------------------------------
 # 1) TIEDOSTONLUKU – vain I/O
 # ---------------------------------------------------------
 
 
-def read_raw_wmo_mapping(path: str | None = None) -> pd.DataFrame:
-    """
-    Etsii ja lukee WMO→Foreca -mäppäysdatan.
-
-    Ei tee mitään validointia tai transformaatioita.
-    Palauttaa tyhjän DataFramen jos mitään ei löydy.
-    """
+def _candidate_paths(path: str | None = None) -> list[Path]:
     candidates: list[Path] = []
 
     if path:
@@ -34,8 +49,24 @@ def read_raw_wmo_mapping(path: str | None = None) -> pd.DataFrame:
             DATA / "WMO_Foreca-koodit.xlsx",
         ]
     )
+    return candidates
 
-    for p in candidates:
+
+def find_wmo_source(path: str | None = None) -> Path | None:
+    """Ensimmäinen olemassa oleva mäppäyksen lähdetiedosto (Excel/CSV)."""
+    return next((p for p in _candidate_paths(path) if p.exists()), None)
+
+
+def read_raw_wmo_mapping(path: str | None = None) -> pd.DataFrame:
+    """
+    Etsii ja lukee WMO→Foreca -mäppäysdatan.
+
+    Ei tee mitään validointia tai transformaatioita.
+    Palauttaa tyhjän DataFramen jos mitään ei löydy.
+    """
+    import pandas as pd
+
+    for p in _candidate_paths(path):
         try:
             if not p.exists():
                 continue
@@ -68,6 +99,8 @@ def _scalar(cell: Any) -> Any:
 
 
 def _normalize_cell(value: Any) -> str:
+    import pandas as pd
+
     if value is None or pd.isna(value):
         return ""
     return str(value).strip()
@@ -142,5 +175,112 @@ def load_wmo_foreca_map(
 
     CC-taso: matala, pelkkä orkestrointi.
     """
+    if df is None and (wmo_col, day_col, night_col) == ("wmo", "day", "night"):
+        return _load_default_map(_source_stamp())
     df = df if df is not None else read_raw_wmo_mapping()
     return build_wmo_foreca_maps(df, wmo_col, day_col, night_col)
+
+
+# ---------------------------------------------------------
+# 5) KÄÄNNETTY TAULU – build-vaihe ja ajonaikainen lataus
+# ---------------------------------------------------------
+
+
+def _file_sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _maps_version(maps: dict[str, dict[int, str]]) -> str:
+    """Sisällön tiiviste: sama mäppäys -> sama versio riippumatta lähteestä."""
+    canonical = json.dumps(
+        {side: sorted(table.items()) for side, table in maps.items()},
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:12]
+
+
+def _display_path(path: Path) -> str:
+    try:
+        return path.resolve().relative_to(ROOT_DIR.resolve()).as_posix()
+    except ValueError:
+        return str(path)
+
+
+def compile_wmo_map(
+    source: Path | None = None,
+    target: Path | None = None,
+) -> dict[str, Any]:
+    """
+    Build-vaihe: lukee lähteen (Excel/CSV) ja kirjoittaa käännetyn JSON-taulun.
+
+    Palauttaa kirjoitetun sisällön.
+    """
+    source = source or find_wmo_source()
+    if source is None:
+        raise FileNotFoundError("WMO→Foreca -lähdetiedostoa ei löytynyt")
+    target = target or COMPILED_MAP_FILE
+
+    maps = build_wmo_foreca_maps(read_raw_wmo_mapping(str(source)), "wmo", "day", "night")
+    payload: dict[str, Any] = {
+        "version": _maps_version(maps),
+        "source": _display_path(source),
+        "source_sha256": _file_sha256(source),
+        "day": {str(k): v for k, v in sorted(maps["day"].items())},
+        "night": {str(k): v for k, v in sorted(maps["night"].items())},
+    }
+    target.write_text(json.dumps(payload, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    return payload
+
+
+def read_compiled_wmo_map(target: Path | None = None) -> dict[str, Any] | None:
+    """Lukee käännetyn taulun. None, jos tiedostoa ei ole tai se on rikki."""
+    target = target or COMPILED_MAP_FILE
+    try:
+        payload = json.loads(target.read_text(encoding="utf-8"))
+        return {
+            **payload,
+            "day": {int(k): str(v) for k, v in payload["day"].items()},
+            "night": {int(k): str(v) for k, v in payload["night"].items()},
+        }
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def _is_compiled_stale(compiled: dict[str, Any], source: Path | None, target: Path) -> bool:
+    """
+    Käännös on vanhentunut vain, jos lähde on uudempi kuin käännös JA sen
+    sisältö on muuttunut (git checkout päivittää mtimet, hash ratkaisee).
+    """
+    if source is None:
+        return False
+    try:
+        if source.stat().st_mtime <= target.stat().st_mtime:
+            return False
+        return _file_sha256(source) != compiled.get("source_sha256")
+    except OSError:
+        return False
+
+
+def _source_stamp() -> tuple[str, float, float]:
+    """Välimuistin avain: lähteen polku ja mtime sekä käännöksen mtime."""
+    source = find_wmo_source()
+
+    def mtime(path: Path | None) -> float:
+        try:
+            return path.stat().st_mtime if path else 0.0
+        except OSError:
+            return 0.0
+
+    return (str(source or ""), mtime(source), mtime(COMPILED_MAP_FILE))
+
+
+@lru_cache(maxsize=1)
+def _load_default_map(_stamp: tuple[str, float, float]) -> dict[str, dict[int, str]]:
+    source = Path(_stamp[0]) if _stamp[0] else None
+    compiled = read_compiled_wmo_map()
+
+    if compiled is not None and not _is_compiled_stale(compiled, source, COMPILED_MAP_FILE):
+        return {"day": compiled["day"], "night": compiled["night"]}
+
+    logger.info("WMO-mäppäyksen käännös puuttuu tai on vanhentunut, luetaan %s", source)
+    return build_wmo_foreca_maps(read_raw_wmo_mapping(), "wmo", "day", "night")
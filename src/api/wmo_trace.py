@@ -1,9 +1,88 @@
+"""
+WMO→Foreca -päätösten jäljitys.
+
+Jäljet kirjoitetaan kiinteän kokoiseen rengaspuskuriin (src.ring_buffer), joten
+jäljitys voi olla aina päällä: kirjoitus ei kopioi listaa eikä tarvitse lukkoa,
+ja näytteistys (MAP_TRACE_SAMPLE_RATE) rajaa kirjattavien päätösten määrän.
+Sääkortin debug-matriisi lukee jäljet map_trace_records()-funktiolla.
+"""
+
 from __future__ import annotations
 
+import time
 from typing import Any
 
-MAP_TRACE_ENABLED = False
-_MAP_TRACE: list[dict[str, Any]] = []
+from src.ring_buffer import RingBuffer
+
+MAP_TRACE_ENABLED = True
+MAP_TRACE_CAPACITY = 256
+MAP_TRACE_SAMPLE_RATE = 1.0
+
+
+class MapTraceRecord:
+    """Yksi mäppäyspäätös."""
+
+    __slots__ = ("ts", "wmo", "is_day", "pop", "temp_c", "cloudcover", "key", "reason")
+
+    def __init__(
+        self,
+        wmo: int | None,
+        is_day: bool,
+        pop: int | None,
+        temp_c: float | None,
+        cloudcover: int | None,
+        key: str,
+        reason: str,
+    ) -> None:
+        self.ts = time.time()
+        self.wmo = wmo
+        self.is_day = is_day
+        self.pop = pop
+        self.temp_c = temp_c
+        self.cloudcover = cloudcover
+        self.key = key
+        self.reason = reason
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "wmo": self.wmo,
+            "is_day": self.is_day,
+            "pop": self.pop,
+            "temp_c": self.temp_c,
+            "cloudcover": self.cloudcover,
+            "key": self.key,
+            "reason": self.reason,
+        }
+
+
+_MAP_TRACE: RingBuffer[MapTraceRecord] = RingBuffer(MAP_TRACE_CAPACITY, MAP_TRACE_SAMPLE_RATE)
+
+
+def configure_map_trace(capacity: int | None = None, sample_rate: float | None = None) -> None:
+    """Vaihtaa puskurin kapasiteetin / näytteistyksen (vanhat jäljet hylätään)."""
+    global _MAP_TRACE
+    _MAP_TRACE = RingBuffer(
+        capacity or _MAP_TRACE.capacity,
+        sample_rate or _MAP_TRACE.sample_rate,
+    )
+
+
+def trace_sampled() -> bool:
+    """Halpa esitarkistus ennen tietueen rakentamista (esim. vektoroitu polku)."""
+    return MAP_TRACE_ENABLED and _MAP_TRACE.should_sample()
+
+
+def record_map(
+    wmo: int | None,
+    is_day: bool,
+    pop: int | None,
+    temp_c: float | None,
+    cloudcover: int | None,
+    chosen_key: str,
+    reason: str,
+) -> None:
+    """Kirjaa päätöksen ilman näytteistystä (kutsuja on jo kysynyt trace_sampled())."""
+    _MAP_TRACE.append(MapTraceRecord(wmo, is_day, pop, temp_c, cloudcover, chosen_key, reason))
 
 
 def trace_map(
@@ -15,29 +94,18 @@ def trace_map(
     chosen_key: str,
     reason: str,
 ) -> None:
-    if not MAP_TRACE_ENABLED:
+    if not trace_sampled():
         return
-    try:
-        _MAP_TRACE.append(
-            {
-                "wmo": wmo,
-                "is_day": is_day,
-                "pop": pop,
-                "temp_c": temp_c,
-                "cloudcover": cloudcover,
-                "key": chosen_key,
-                "reason": reason,
-            }
-        )
-        if len(_MAP_TRACE) > 200:
-            del _MAP_TRACE[:-120]
-    except Exception:
-        # tracing ei saa kaataa dashboardia
-        pass
+    record_map(wmo, is_day, pop, temp_c, cloudcover, chosen_key, reason)
+
+
+def map_trace_records() -> list[MapTraceRecord]:
+    """Jäljet tietueina, vanhin ensin."""
+    return _MAP_TRACE.snapshot()
 
 
 def get_map_trace() -> list[dict[str, Any]]:
-    return list(_MAP_TRACE)
+    return [record.as_dict() for record in _MAP_TRACE.snapshot()]
 
 
 def clear_map_trace() -> None:
@@ -91,10 +91,18 @@ CLOUD_T_PARTLY: int = 65
 CLOUD_T_MOSTLY: int = 85
 """Cloud cover thresholds (%) for weather icons (d000, d100, d200, d300, d400)."""
 
+ALERT_GUST_MS: float = 15.0
+ALERT_RAIN_MM: float = 20.0
+ALERT_SNOW_CM: float = 10.0
+"""Daily thresholds for weather alerts (max wind gust m/s, rain mm, snowfall cm)."""
+
 # ------------------- POLLEN SETTINGS -------------------
 
 POLLEN_CACHE_FILE = data_path("pollen_cache.json")
 POLLEN_CACHE_TTL_S: int = 6 * 3600
+POLLEN_STATION = os.getenv("POLLEN_STATION", "Helsinki")
+POLLEN_LOCATION = os.getenv("POLLEN_LOCATION", "Riihimäki")
+"""Tiedotteen karttakoodiasema ja kortissa näytettävä paikka (kioskikohtainen)."""
 
 # ------------------- PLOTLY CONFIG -------------------
 
@@ -6,6 +6,9 @@ import time
 import urllib.parse
 from typing import Any
 
+from src.metrics import upstream
+from src.upstream_override import heos_address
+
 DEFAULT_PORT = 1255
 
 
@@ -30,10 +33,15 @@ class HeosClient:
 
     def _send_cmd(self, cmd: str) -> dict[str, Any]:
         # Avataan lyhyt telnet-tyylinen yhteys jokaiselle komennolle.
-        with socket.create_connection((self.host, self.port), self.timeout) as s:
+        with (
+            upstream("heos") as span,
+            socket.create_connection(heos_address(self.host, self.port), self.timeout) as s,
+        ):
             s.sendall(f"heos://{cmd}\r\n".encode())
             s.settimeout(self.timeout)
-            data = s.recv(65535).decode("utf-8", errors="replace")
+            raw = s.recv(65535)
+            span.payload_bytes = len(raw)
+        data = raw.decode("utf-8", errors="replace")
 
         # HEOS voi joskus lähettää useamman JSON-rivin, otetaan eka kunnollinen
         for line in data.splitlines():
@@ -0,0 +1,102 @@
+"""
+Käynnistysajan import-profilointi.
+
+Ajaa kohdemoduulin importin puhtaassa aliprosessissa `python -X importtime`
+-tilassa ja tiivistää raportin hitaimpiin moduuleihin:
+
+    python -m src.import_profiler              # main.py
+    python -m src.import_profiler src.ui --top 15
+    python -m src.import_profiler --self       # järjestys oman ajan mukaan
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import subprocess
+import sys
+from dataclasses import dataclass
+
+from src.paths import ROOT_DIR
+
+# "import time:       self [us] |  cumulative | imported package"
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+@dataclass(frozen=True)
+class ImportRecord:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> list[ImportRecord]:
+    """Parsii -X importtime -tulosteen; otsikko- ja muut rivit ohitetaan."""
+    records: list[ImportRecord] = []
+    for line in output.splitlines():
+        match = _LINE_RE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        records.append(
+            ImportRecord(
+                module=module,
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+                # tulosteessa yksi välilyönti + kaksi per sisäkkäisyystaso
+                depth=max(0, (len(indent) - 1) // 2),
+            )
+        )
+    return records
+
+
+def profile_imports(target: str = "main", python: str | None = None) -> list[ImportRecord]:
+    """Importtaa kohteen uudessa tulkissa ja palauttaa import-ajat."""
+    proc = subprocess.run(
+        [python or sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if proc.returncode != 0:
+        tail = proc.stderr.strip().splitlines()[-1:] or ["?"]
+        raise RuntimeError(f"import {target} epäonnistui: {tail[0]}")
+    return parse_importtime(proc.stderr)
+
+
+def format_report(records: list[ImportRecord], top: int = 25, by_self: bool = False) -> str:
+    """Tekstiraportti: kokonaisaika ja hitaimmat moduulit."""
+    if not records:
+        return "Ei import-tietoja."
+
+    total_us = sum(r.cumulative_us for r in records if r.depth == 0)
+    key = (lambda r: r.self_us) if by_self else (lambda r: r.cumulative_us)
+    lines = [
+        f"Importit yhteensä: {total_us / 1000:.1f} ms, {len(records)} moduulia",
+        f"{'self ms':>9} {'cum ms':>9}  moduuli",
+    ]
+    for record in sorted(records, key=key, reverse=True)[:top]:
+        lines.append(
+            f"{record.self_us / 1000:9.1f} {record.cumulative_us / 1000:9.1f}  "
+            f"{'  ' * record.depth}{record.module}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Käynnistyksen import-profiili")
+    parser.add_argument("target", nargs="?", default="main", help="importattava moduuli")
+    parser.add_argument("--top", type=int, default=25, help="näytettävien rivien määrä")
+    parser.add_argument(
+        "--self", dest="by_self", action="store_true", help="järjestä oman ajan mukaan"
+    )
+    args = parser.parse_args(argv)
+
+    print(format_report(profile_imports(args.target), top=args.top, by_self=args.by_self))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,315 @@
+"""
+Suorituskykymittarit: ulkoisten lähteiden viive, virheet, välimuistiosumat,
+vastausten koot ja korttien renderöintiajat.
+
+    with upstream("ha_state") as span:        # viive + virhe lähteittäin
+        resp = requests.get(...)
+        span.payload_bytes = len(resp.content)
+    count_cache("weather_forecast", hit=True)  # välimuistiosuma / -huti
+
+Kortit mitataan src.ui.registry.LazyCard-kääreessä. Mittarit ovat prosessin
+muistissa (kaikki istunnot yhteensä) ja kirjoitetaan Prometheus-tekstimuodossa
+tiedostoon logs/metrics.prom (node_exporterin textfile-collector tai pelkkä
+cat). Tiedosto päivitetään main()-ajon lopussa korkeintaan METRICS_WRITE_INTERVAL_S
+välein. Järjestelmäkortin suorituskykypaneeli lukee samat luvut suoraan
+(summaries(), data_ages()).
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+from src.paths import LOGS
+
+METRICS_FILE = LOGS / "metrics.prom"
+METRICS_WRITE_INTERVAL_S = 15.0
+METRIC_PREFIX = "kotidashboard"
+
+# sekunteja; kattaa välimuistiosumat (ms) ja HA:n pilvikutsut (10 s+)
+LATENCY_BUCKETS_S = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PAYLOAD_BUCKETS_B = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+# viimeisimpien havaintojen määrä (last/p95 suorituskykypaneeliin)
+RECENT_SAMPLES = 120
+
+
+class Histogram:
+    """Kumulatiivinen histogrammi kiinteillä rajoilla (Prometheus-tyyli)."""
+
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for idx, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[idx] += 1
+                break
+        self.total += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        running = 0
+        result = []
+        for bound, n in zip(self.buckets, self.counts, strict=True):
+            running += n
+            result.append((bound, running))
+        return result
+
+
+@dataclass
+class Span:
+    """upstream()-kontekstin palauttama olio; kutsuja voi kirjata vastauksen koon."""
+
+    payload_bytes: int | None = None
+
+
+@dataclass(frozen=True)
+class LatencySummary:
+    """Yhden kortin tai lähteen viiveyhteenveto (sekunteja)."""
+
+    name: str
+    last: float
+    avg: float
+    p95: float
+    count: int
+    errors: int
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    """Lähimmän sijan persentiili (nearest-rank)."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(bound: float) -> str:
+    return str(int(bound)) if float(bound).is_integer() else repr(float(bound))
+
+
+class MetricsRegistry:
+    """Kaikki mittarit yhden lukon takana; kirjaus on muutama dict-haku."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._latency: dict[tuple[str, str], Histogram] = {}
+        self._payload: dict[str, Histogram] = {}
+        self._errors: dict[tuple[str, str], int] = {}
+        self._cache: dict[tuple[str, str], int] = {}
+        self._recent: dict[tuple[str, str], deque[float]] = {}
+        self._fresh_at: dict[str, float] = {}
+
+    # --- kirjaus ---
+
+    def observe(self, kind: str, name: str, seconds: float, error: bool = False) -> None:
+        """kind: "upstream" (lähde) tai "card" (kortin renderöinti)."""
+        key = (kind, name)
+        with self._lock:
+            hist = self._latency.get(key)
+            if hist is None:
+                hist = self._latency[key] = Histogram(LATENCY_BUCKETS_S)
+                self._recent[key] = deque(maxlen=RECENT_SAMPLES)
+            hist.observe(seconds)
+            self._recent[key].append(seconds)
+            if error:
+                self._errors[key] = self._errors.get(key, 0) + 1
+            elif kind == "upstream":
+                self._fresh_at[name] = time.time()
+
+    def observe_payload(self, source: str, nbytes: int) -> None:
+        with self._lock:
+            hist = self._payload.get(source)
+            if hist is None:
+                hist = self._payload[source] = Histogram(PAYLOAD_BUCKETS_B)
+            hist.observe(float(nbytes))
+
+    def count_cache(self, source: str, hit: bool) -> None:
+        key = (source, "hit" if hit else "miss")
+        with self._lock:
+            self._cache[key] = self._cache.get(key, 0) + 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._latency.clear()
+            self._payload.clear()
+            self._errors.clear()
+            self._cache.clear()
+            self._recent.clear()
+            self._fresh_at.clear()
+
+    # --- luku ---
+
+    def latency(self, kind: str, name: str) -> Histogram | None:
+        with self._lock:
+            return self._latency.get((kind, name))
+
+    def errors(self, kind: str, name: str) -> int:
+        with self._lock:
+            return self._errors.get((kind, name), 0)
+
+    def cache_ratio(self, source: str) -> float | None:
+        """Osumien osuus (0–1); None, jos lähteestä ei ole kirjauksia."""
+        with self._lock:
+            hits = self._cache.get((source, "hit"), 0)
+            misses = self._cache.get((source, "miss"), 0)
+        total = hits + misses
+        return hits / total if total else None
+
+    def summaries(self, kind: str) -> list[LatencySummary]:
+        """Nimen mukaan järjestetyt yhteenvedot; p95 viimeisimmistä havainnoista."""
+        with self._lock:
+            rows = [
+                (name, hist.total / hist.count, hist.count, list(self._recent[(k, name)]))
+                for (k, name), hist in self._latency.items()
+                if k == kind and hist.count
+            ]
+            errors = dict(self._errors)
+        return [
+            LatencySummary(
+                name=name,
+                last=recent[-1],
+                avg=avg,
+                p95=_percentile(recent, 95),
+                count=count,
+                errors=errors.get((kind, name), 0),
+            )
+            for name, avg, count, recent in sorted(rows)
+        ]
+
+    def data_ages(self, now: float | None = None) -> dict[str, float]:
+        """
+        Sekunteja kunkin lähteen viimeisimmästä onnistuneesta hausta, eli kuinka
+        vanhaa välimuistissa (st.cache_data, tiedostovälimuistit) oleva data on.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            return {source: max(0.0, now - ts) for source, ts in sorted(self._fresh_at.items())}
+
+    def render_prometheus(self) -> str:
+        """Prometheus-tekstimuoto (exposition format 0.0.4)."""
+        labels = {"upstream": "source", "card": "card"}
+        names = {
+            "upstream": f"{METRIC_PREFIX}_upstream_latency_seconds",
+            "card": f"{METRIC_PREFIX}_card_render_seconds",
+        }
+        errors = {
+            "upstream": f"{METRIC_PREFIX}_upstream_errors_total",
+            "card": f"{METRIC_PREFIX}_card_errors_total",
+        }
+        lines: list[str] = []
+        with self._lock:
+            latency = sorted(self._latency.items())
+            payload = sorted(self._payload.items())
+            error_counts = dict(self._errors)
+            cache = sorted(self._cache.items())
+
+        for kind in ("upstream", "card"):
+            rows = [(name, hist) for (k, name), hist in latency if k == kind]
+            if not rows:
+                continue
+            metric, label = names[kind], labels[kind]
+            lines.append(f"# TYPE {metric} histogram")
+            for name, hist in rows:
+                lines.extend(_histogram_lines(metric, f'{label}="{_escape(name)}"', hist))
+            lines.append(f"# TYPE {errors[kind]} counter")
+            for name, _hist in rows:
+                count = error_counts.get((kind, name), 0)
+                lines.append(f'{errors[kind]}{{{label}="{_escape(name)}"}} {count}')
+
+        if payload:
+            metric = f"{METRIC_PREFIX}_upstream_payload_bytes"
+            lines.append(f"# TYPE {metric} histogram")
+            for source, hist in payload:
+                lines.extend(_histogram_lines(metric, f'source="{_escape(source)}"', hist))
+
+        if cache:
+            metric = f"{METRIC_PREFIX}_cache_requests_total"
+            lines.append(f"# TYPE {metric} counter")
+            for (source, result), count in cache:
+                lines.append(f'{metric}{{source="{_escape(source)}",result="{result}"}} {count}')
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+def _histogram_lines(metric: str, label: str, hist: Histogram) -> list[str]:
+    lines = [f'{metric}_bucket{{{label},le="{_fmt(bound)}"}} {n}' for bound, n in hist.cumulative()]
+    lines.append(f'{metric}_bucket{{{label},le="+Inf"}} {hist.count}')
+    lines.append(f"{metric}_sum{{{label}}} {hist.total:.6g}")
+    lines.append(f"{metric}_count{{{label}}} {hist.count}")
+    return lines
+
+
+REGISTRY = MetricsRegistry()
+
+
+# ============================================================
+# KIRJAUSAPUJA
+# ============================================================
+
+
+@contextmanager
+def upstream(source: str) -> Iterator[Span]:
+    """Mittaa ulkoisen kutsun viiveen; poikkeus kirjataan virheeksi ja nostetaan."""
+    span = Span()
+    started = time.perf_counter()
+    failed = False
+    try:
+        yield span
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        REGISTRY.observe("upstream", source, time.perf_counter() - started, error=failed)
+        if span.payload_bytes is not None:
+            REGISTRY.observe_payload(source, span.payload_bytes)
+
+
+def payload_size(resp: object) -> int | None:
+    """HTTP-vastauksen (httpx.Response) rungon koko tavuina (testien tynkävastaukset: None)."""
+    content = getattr(resp, "content", None)
+    return len(content) if isinstance(content, bytes | str) else None
+
+
+def count_cache(source: str, hit: bool) -> None:
+    REGISTRY.count_cache(source, hit)
+
+
+# ============================================================
+# VIENTI
+# ============================================================
+
+_LAST_WRITE = [0.0]
+
+
+def write_metrics_file(
+    path: Path | None = None,
+    min_interval_s: float = METRICS_WRITE_INTERVAL_S,
+) -> bool:
+    """Kirjoittaa mittarit tiedostoon (atominen vaihto), korkeintaan kerran jaksossa."""
+    now = time.monotonic()
+    if _LAST_WRITE[0] and now - _LAST_WRITE[0] < min_interval_s:
+        return False
+    _LAST_WRITE[0] = now
+    target = METRICS_FILE if path is None else path
+    try:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(target.name + ".tmp")
+        tmp.write_text(REGISTRY.render_prometheus(), encoding="utf-8")
+        os.replace(tmp, target)
+    except OSError:
+        return False
+    return True
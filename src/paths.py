@@ -25,6 +25,8 @@ ASSETS = ROOT_DIR / "assets"
 DATA = ROOT_DIR / "data"
 DOCS = ROOT_DIR / "docs"
 LOGS = ROOT_DIR / "logs"
+# Streamlitin staattinen jako (server.enableStaticServing): /app/static/<tiedosto>
+STATIC = ROOT_DIR / "static"
 
 
 def root_path(*parts: str) -> Path:
@@ -0,0 +1,82 @@
+"""
+Prosessin resurssit suorituskykypaneelia varten ilman lisäriippuvuuksia:
+muisti (RSS) /proc-tiedostosta (Linux / Raspberry Pi), muualla resource-moduulin
+huippuarvo; CPU-osuus prosessiajan muutoksesta edelliseen mittaukseen nähden;
+Streamlitin aktiivisten istuntojen määrä ajonaikaisesta Runtime-oliosta.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+_STATM = Path("/proc/self/statm")
+
+
+@dataclass(frozen=True)
+class ProcessStats:
+    rss_bytes: int | None
+    cpu_percent: float | None
+    sessions: int | None
+
+
+def rss_bytes() -> int | None:
+    """Prosessin nykyinen muistinkäyttö (RSS); ei-Linuxilla huippuarvo."""
+    try:
+        pages = int(_STATM.read_text().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS ilmoittaa tavuina, Linux kilotavuina
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class CpuSampler:
+    """CPU-osuus (% yhdestä ytimestä) edellisestä sample()-kutsusta lähtien."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._last = (time.monotonic(), time.process_time())
+
+    def sample(self) -> float | None:
+        wall, cpu = time.monotonic(), time.process_time()
+        with self._lock:
+            last_wall, last_cpu = self._last
+            self._last = (wall, cpu)
+        elapsed = wall - last_wall
+        if elapsed <= 0:
+            return None
+        return max(0.0, (cpu - last_cpu) / elapsed * 100.0)
+
+
+_CPU = CpuSampler()
+
+
+def session_count() -> int | None:
+    """Aktiivisten Streamlit-istuntojen määrä; None, jos ajetaan ilman palvelinta."""
+    try:
+        from streamlit.runtime import Runtime
+
+        if not Runtime.exists():
+            return None
+        return Runtime.instance()._session_mgr.num_active_sessions()
+    except Exception:
+        # sisäinen rajapinta; muutos Streamlit-versiossa ei saa kaataa korttia
+        return None
+
+
+def process_stats() -> ProcessStats:
+    return ProcessStats(
+        rss_bytes=rss_bytes(),
+        cpu_percent=_CPU.sample(),
+        sessions=session_count(),
+    )
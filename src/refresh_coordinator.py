@@ -0,0 +1,89 @@
+"""
+Prosessinlaajuinen päivityspyyntöjen yhdistäjä (esim. Home Assistantin
+update_entity-kutsut, jotka herättävät auton pilvipalvelun).
+
+Jokainen Streamlit-istunto (kioski) pyytää päivitystä omalla renderöinnillään,
+mutta kutsu tehdään avainta kohden korkeintaan kerran interval_s-jaksossa koko
+prosessissa:
+  * kesken olevaan päivitykseen yhdistetään: muut pyytäjät eivät odota eivätkä
+    tee omaa kutsua
+  * jakso lasketaan viimeisimmästä yrityksestä, myös epäonnistuneesta, jotta
+    virhetilanne ei moninkertaista kutsuja
+  * jos tuore tilamuutos (last_changed) on jo tullut jakson sisällä, päivitystä
+    ei tarvita
+
+    coordinator = RefreshCoordinator()
+    if coordinator.request("eqe_status", refresh_fn, interval_s=300, last_changed=ts):
+        fetch_cache.clear()
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from typing import Any
+
+
+class RefreshCoordinator:
+    """Päivitykset avaimittain: yksi kutsu kerrallaan, korkeintaan kerran jaksossa."""
+
+    def __init__(self, clock: Callable[[], float] = time.time) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._last_run: dict[str, float] = {}
+        self._in_flight: set[str] = set()
+
+    def request(
+        self,
+        key: str,
+        refresh: Callable[[], Any],
+        interval_s: float,
+        last_changed: datetime | None = None,
+    ) -> bool:
+        """
+        Ajaa refresh()-kutsun, jos avaimen vuoro on. True, jos kutsu tehtiin ja
+        onnistui; False, jos pyyntö yhdistettiin, jakso ei ole täynnä, tila on
+        jo tuore tai kutsu epäonnistui.
+        """
+        now = self._clock()
+        with self._lock:
+            if not self._due(key, interval_s, last_changed, now):
+                return False
+            self._in_flight.add(key)
+            self._last_run[key] = now
+        try:
+            refresh()
+        except Exception:
+            return False
+        finally:
+            with self._lock:
+                self._in_flight.discard(key)
+        return True
+
+    def reset(self, key: str | None = None) -> None:
+        with self._lock:
+            if key is None:
+                self._last_run.clear()
+            else:
+                self._last_run.pop(key, None)
+
+    def _due(
+        self,
+        key: str,
+        interval_s: float,
+        last_changed: datetime | None,
+        now: float,
+    ) -> bool:
+        if key in self._in_flight:
+            return False
+        last_run = self._last_run.get(key)
+        if last_run is not None and now - last_run < interval_s:
+            return False
+        if last_changed is not None:
+            if last_changed.tzinfo is None:
+                last_changed = last_changed.replace(tzinfo=timezone.utc)
+            if now - last_changed.timestamp() < interval_s:
+                return False
+        return True
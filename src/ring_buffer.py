@@ -0,0 +1,61 @@
+"""
+Kiinteän kokoinen rengaspuskuri jatkuvaan jäljitykseen (tracing).
+
+Kirjoitus on yksi järjestysnumeron haku ja yksi listan paikkaan sijoitus,
+molemmat atomisia CPythonissa, joten lukkoa ei tarvita eikä puskuria koskaan
+kopioida tai typistetä. Vanhin tietue ylikirjoitetaan, kun puskuri on täynnä.
+
+Näytteistys (sample_rate) on deterministinen: 0.1 = joka 10. tarjottu tietue.
+Kutsuja tarkistaa should_sample() ennen tietueen rakentamista, jolloin
+näytteistyksen ulkopuolelle jäävä kutsu maksaa vain yhden laskurin askeleen.
+
+    buffer = RingBuffer(capacity=256, sample_rate=0.25)
+    if buffer.should_sample():
+        buffer.append(MyRecord(...))
+    rows = buffer.snapshot()   # vanhin ensin
+"""
+
+from __future__ import annotations
+
+import itertools
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class RingBuffer(Generic[T]):
+    """Lukoton rengaspuskuri: kiinteä kapasiteetti, näytteistys, snapshot vanhin ensin."""
+
+    __slots__ = ("capacity", "sample_rate", "_stride", "_offered", "_written", "_slots")
+
+    def __init__(self, capacity: int = 256, sample_rate: float = 1.0) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if not 0.0 < sample_rate <= 1.0:
+            raise ValueError("sample_rate must be in (0, 1]")
+        self.capacity = capacity
+        self.sample_rate = sample_rate
+        self._stride = max(1, round(1.0 / sample_rate))
+        self._offered = itertools.count()
+        self._written = itertools.count()
+        self._slots: list[tuple[int, T] | None] = [None] * capacity
+
+    def should_sample(self) -> bool:
+        """Kirjataanko seuraava tietue (joka stride:s tarjottu)."""
+        return next(self._offered) % self._stride == 0
+
+    def append(self, record: T) -> None:
+        seq = next(self._written)
+        self._slots[seq % self.capacity] = (seq, record)
+
+    def snapshot(self) -> list[T]:
+        """Puskurin tietueet kirjoitusjärjestyksessä (vanhin ensin)."""
+        entries = [entry for entry in list(self._slots) if entry is not None]
+        entries.sort(key=lambda entry: entry[0])
+        return [record for _, record in entries]
+
+    def clear(self) -> None:
+        self._slots = [None] * self.capacity
+
+    def __len__(self) -> int:
+        return sum(entry is not None for entry in self._slots)
@@ -0,0 +1,396 @@
+"""
+Sovelluksen asetukset yhtenä muuttumattomana, validoituna oliona.
+
+    settings = get_settings()
+    settings.ha.base_url, settings.hue.bridge_host, settings.location.lat, …
+
+Asetukset luetaan Streamlitin secretsista (ylätason avain, sitten osio kuten
+[home_assistant] / [hue] / [heos] / [location]) ja lopuksi ympäristömuuttujista.
+Arvot jäsennetään ja validoidaan kerran (numerot rajoineen, JSON-data, URL);
+virheelliset arvot korvataan oletuksilla ja kirjataan problems-listaan.
+
+Olio rakennetaan uudelleen vain, kun secrets.toml muuttuu (tiedostojen mtime)
+tai st.secrets vaihtuu. Ympäristömuuttujat luetaan latauksen yhteydessä
+(load_dotenv ajetaan ennen ensimmäistä korttia).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import streamlit as st
+
+from src import config
+from src.paths import ROOT_DIR
+
+logger = logging.getLogger("homedashboard")
+
+# Streamlit lukee secretsit näistä (projektin ja käyttäjän .streamlit-kansio)
+SECRETS_PATHS: tuple[Path, ...] = (
+    ROOT_DIR / ".streamlit" / "secrets.toml",
+    Path.home() / ".streamlit" / "secrets.toml",
+)
+
+# HA_*-avain -> [home_assistant]-osion avain
+_HA_SECTION_KEYS: dict[str, str] = {
+    "HA_BASE_URL": "base_url",
+    "HA_TOKEN": "token",
+    "HA_EQE_SOC_ENTITY": "eqe_soc_entity",
+    "HA_EQE_RANGE_ENTITY": "eqe_range_entity",
+    "HA_EQE_CHARGING_ENTITY": "eqe_charging_entity",
+    "HA_EQE_LOCK_ENTITY": "eqe_lock_entity",
+    "HA_EQE_LOCK_STATUS_ENTITY": "eqe_lock_status_entity",
+    "HA_EQE_LOCK_CODE": "eqe_lock_code",
+    "HA_EQE_LOCK_TIMEOUT": "eqe_lock_timeout",
+    "HA_EQE_LOCK_REFRESH_SERVICE": "eqe_lock_refresh_service",
+    "HA_EQE_LOCK_REFRESH_ENTITY": "eqe_lock_refresh_entity",
+    "HA_EQE_LOCK_REFRESH_DATA": "eqe_lock_refresh_data",
+    "HA_EQE_PRECLIMATE_ENTITY": "eqe_preclimate_entity",
+    "HA_EQE_PRECLIMATE_START_ENTITY": "eqe_preclimate_start_entity",
+    "HA_EQE_PRECLIMATE_STOP_ENTITY": "eqe_preclimate_stop_entity",
+    "HA_EQE_CHARGING_POWER_ENTITY": "eqe_charging_power_entity",
+    "HA_EQE_CHARGING_SWITCH_ENTITY": "eqe_charging_switch_entity",
+    "HA_EQE_REFRESH_SERVICE": "eqe_refresh_service",
+    "HA_EQE_REFRESH_ENTITY": "eqe_refresh_entity",
+    "HA_EQE_REFRESH_DATA": "eqe_refresh_data",
+    "HA_EQE_REFRESH_INTERVAL": "eqe_refresh_interval",
+    "HA_CACHE_TTL": "cache_ttl",
+}
+
+Lookup = Callable[[str], "str | None"]
+
+
+# ============================================================
+# LUKU
+# ============================================================
+
+
+def _clean(value: Any) -> str | None:
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+def _section(secrets: Any, name: str) -> Mapping:
+    try:
+        section = secrets.get(name)
+    except Exception:
+        return {}
+    return section if isinstance(section, Mapping) else {}
+
+
+def read_secret(name: str, secrets: Any = None) -> str | None:
+    """HA_*-asetus: ylätaso, sitten [home_assistant]-osio, lopuksi ympäristömuuttuja."""
+    secrets = st.secrets if secrets is None else secrets
+    try:
+        if name in secrets:
+            value = _clean(secrets.get(name))
+            if value:
+                return value
+        mapped = _HA_SECTION_KEYS.get(name)
+        if mapped:
+            value = _clean(_section(secrets, "home_assistant").get(mapped))
+            if value:
+                return value
+    except Exception:
+        pass
+    return _clean(os.getenv(name))
+
+
+def secrets_stamp() -> tuple[int | None, ...]:
+    """secrets.toml-tiedostojen mtime_ns (None = tiedostoa ei ole)."""
+    stamp: list[int | None] = []
+    for path in SECRETS_PATHS:
+        try:
+            stamp.append(path.stat().st_mtime_ns)
+        except OSError:
+            stamp.append(None)
+    return tuple(stamp)
+
+
+# ============================================================
+# VALIDOINTI
+# ============================================================
+
+
+def _unquote(value: str | None) -> str | None:
+    if value is None:
+        return None
+    return value.strip().strip('"').strip("'") or None
+
+
+def _number(
+    raw: str | None,
+    default: float,
+    minimum: float,
+    name: str,
+    problems: list[str],
+) -> float:
+    if raw is None:
+        return default
+    try:
+        return max(minimum, float(raw))
+    except ValueError:
+        problems.append(f"{name}: ei numero ({raw!r}), käytetään oletusta {default}")
+        return default
+
+
+def _json_object(raw: str | None, name: str, problems: list[str]) -> dict[str, Any]:
+    if raw is None:
+        return {}
+    try:
+        parsed = json.loads(raw)
+    except json.JSONDecodeError:
+        problems.append(f"{name}: virheellinen JSON, ohitetaan")
+        return {}
+    if not isinstance(parsed, dict):
+        problems.append(f"{name}: JSON ei ole objekti, ohitetaan")
+        return {}
+    return parsed
+
+
+# ============================================================
+# OSIOT
+# ============================================================
+
+
+@dataclass(frozen=True)
+class HASettings:
+    base_url: str | None = None
+    token: str | None = None
+    soc_entity: str | None = None
+    range_entity: str | None = None
+    charging_entity: str | None = None
+    lock_entity: str | None = None
+    lock_status_entity: str | None = None
+    lock_code: str | None = None
+    lock_timeout_s: float = max(config.HTTP_TIMEOUT_S, 20.0)
+    lock_refresh_service: str | None = None
+    lock_refresh_entity: str | None = None
+    lock_refresh_data: Mapping[str, Any] = field(default_factory=dict)
+    preclimate_entity: str | None = None
+    preclimate_start_entity: str | None = None
+    preclimate_stop_entity: str | None = None
+    charging_power_entity: str | None = None
+    charging_switch_entity: str | None = None
+    refresh_service: str | None = None
+    refresh_entity: str | None = None
+    refresh_data: Mapping[str, Any] = field(default_factory=dict)
+    refresh_interval_s: float = 300.0
+    cache_ttl: int = config.CACHE_TTL_SHORT
+    invalid: tuple[str, ...] = ()
+
+    def missing(self) -> list[str]:
+        """Pakolliset asetukset, jotka puuttuvat (tai ovat virheellisiä)."""
+        return [
+            name
+            for name, value in (
+                ("HA_BASE_URL", self.base_url),
+                ("HA_TOKEN", self.token),
+                ("HA_EQE_SOC_ENTITY", self.soc_entity),
+                ("HA_EQE_RANGE_ENTITY", self.range_entity),
+                ("HA_EQE_CHARGING_ENTITY", self.charging_entity),
+            )
+            if not value
+        ] + list(self.invalid)
+
+    def as_config(self) -> dict[str, Any]:
+        """Entiteetit ja yhteys dictinä (home_assistant._require_config)."""
+        return {
+            "base_url": self.base_url,
+            "token": self.token,
+            "soc_entity": self.soc_entity,
+            "range_entity": self.range_entity,
+            "charging_entity": self.charging_entity,
+            "lock_entity": self.lock_entity,
+            "lock_status_entity": self.lock_status_entity,
+            "preclimate_entity": self.preclimate_entity,
+            "preclimate_start_entity": self.preclimate_start_entity,
+            "preclimate_stop_entity": self.preclimate_stop_entity,
+            "charging_power_entity": self.charging_power_entity,
+            "charging_switch_entity": self.charging_switch_entity,
+        }
+
+
+def load_ha_settings(lookup: Lookup, problems: list[str] | None = None) -> HASettings:
+    problems = [] if problems is None else problems
+    invalid: list[str] = []
+    base_url = lookup("HA_BASE_URL")
+    if base_url:
+        base_url = base_url.rstrip("/")
+        if not base_url.startswith(("http://", "https://")):
+            problems.append(f"HA_BASE_URL: odotettiin http(s)://-osoitetta ({base_url!r})")
+            invalid.append("HA_BASE_URL (http://…)")
+    return HASettings(
+        base_url=base_url,
+        token=_unquote(lookup("HA_TOKEN")),
+        soc_entity=lookup("HA_EQE_SOC_ENTITY"),
+        range_entity=lookup("HA_EQE_RANGE_ENTITY"),
+        charging_entity=lookup("HA_EQE_CHARGING_ENTITY"),
+        lock_entity=lookup("HA_EQE_LOCK_ENTITY"),
+        lock_status_entity=lookup("HA_EQE_LOCK_STATUS_ENTITY"),
+        lock_code=_unquote(lookup("HA_EQE_LOCK_CODE")),
+        lock_timeout_s=_number(
+            lookup("HA_EQE_LOCK_TIMEOUT"),
+            max(config.HTTP_TIMEOUT_S, 20.0),
+            5.0,
+            "HA_EQE_LOCK_TIMEOUT",
+            problems,
+        ),
+        lock_refresh_service=lookup("HA_EQE_LOCK_REFRESH_SERVICE"),
+        lock_refresh_entity=lookup("HA_EQE_LOCK_REFRESH_ENTITY"),
+        lock_refresh_data=_json_object(
+            lookup("HA_EQE_LOCK_REFRESH_DATA"), "HA_EQE_LOCK_REFRESH_DATA", problems
+        ),
+        preclimate_entity=lookup("HA_EQE_PRECLIMATE_ENTITY"),
+        preclimate_start_entity=lookup("HA_EQE_PRECLIMATE_START_ENTITY"),
+        preclimate_stop_entity=lookup("HA_EQE_PRECLIMATE_STOP_ENTITY"),
+        charging_power_entity=lookup("HA_EQE_CHARGING_POWER_ENTITY"),
+        charging_switch_entity=lookup("HA_EQE_CHARGING_SWITCH_ENTITY"),
+        refresh_service=lookup("HA_EQE_REFRESH_SERVICE"),
+        refresh_entity=lookup("HA_EQE_REFRESH_ENTITY"),
+        refresh_data=_json_object(lookup("HA_EQE_REFRESH_DATA"), "HA_EQE_REFRESH_DATA", problems),
+        refresh_interval_s=_number(
+            lookup("HA_EQE_REFRESH_INTERVAL"), 300.0, 30.0, "HA_EQE_REFRESH_INTERVAL", problems
+        ),
+        cache_ttl=int(
+            _number(lookup("HA_CACHE_TTL"), config.CACHE_TTL_SHORT, 5.0, "HA_CACHE_TTL", problems)
+        ),
+        invalid=tuple(invalid),
+    )
+
+
+@dataclass(frozen=True)
+class HueSettings:
+    bridge_host: str | None = None
+    bridge_user: str | None = None
+    v2_app_key: str | None = None
+
+
+def load_hue_settings(secrets: Any) -> HueSettings:
+    hue = _section(secrets, "hue")
+    return HueSettings(
+        bridge_host=_clean(hue.get("bridge_host")),
+        bridge_user=_clean(hue.get("bridge_user")),
+        v2_app_key=_unquote(_clean(hue.get("v2_app_key"))),
+    )
+
+
+@dataclass(frozen=True)
+class HeosSettings:
+    host: str = config.HEOS_HOST
+    username: str = config.HEOS_USERNAME
+    password: str = config.HEOS_PASSWORD
+    player_id: int = config.HEOS_PLAYER_ID
+
+
+def load_heos_settings(secrets: Any, problems: list[str]) -> HeosSettings:
+    """[heos]-osio ohittaa ympäristömuuttujat (src.config)."""
+    heos = _section(secrets, "heos")
+    player_id = config.HEOS_PLAYER_ID
+    raw_player = _clean(heos.get("player_id"))
+    if raw_player is not None:
+        try:
+            player_id = int(raw_player)
+        except ValueError:
+            problems.append(f"heos.player_id: ei kokonaisluku ({raw_player!r})")
+    return HeosSettings(
+        host=_clean(heos.get("host")) or config.HEOS_HOST,
+        username=_clean(heos.get("username")) or config.HEOS_USERNAME,
+        password=_clean(heos.get("password")) or config.HEOS_PASSWORD,
+        player_id=player_id,
+    )
+
+
+@dataclass(frozen=True)
+class LocationSettings:
+    lat: float = config.LAT
+    lon: float = config.LON
+    pollen_station: str = config.POLLEN_STATION
+    pollen_location: str = config.POLLEN_LOCATION
+
+
+def load_location_settings(secrets: Any, problems: list[str]) -> LocationSettings:
+    """[location]-osio ohittaa src.configin koordinaatit ja siitepölyaseman."""
+    location = _section(secrets, "location")
+
+    def coordinate(key: str, default: float, limit: float) -> float:
+        raw = _clean(location.get(key))
+        if raw is None:
+            return default
+        try:
+            value = float(raw)
+        except ValueError:
+            value = None
+        if value is None or not -limit <= value <= limit:
+            problems.append(f"location.{key}: virheellinen koordinaatti ({raw!r})")
+            return default
+        return value
+
+    return LocationSettings(
+        lat=coordinate("lat", config.LAT, 90.0),
+        lon=coordinate("lon", config.LON, 180.0),
+        pollen_station=_clean(location.get("pollen_station")) or config.POLLEN_STATION,
+        pollen_location=_clean(location.get("pollen_location")) or config.POLLEN_LOCATION,
+    )
+
+
+@dataclass(frozen=True)
+class Settings:
+    ha: HASettings
+    hue: HueSettings
+    heos: HeosSettings
+    location: LocationSettings
+    problems: tuple[str, ...] = ()
+
+
+def load_settings(secrets: Any = None) -> Settings:
+    """Rakentaa asetukset secretsista ja ympäristöstä (ei välimuistia)."""
+    secrets = st.secrets if secrets is None else secrets
+    problems: list[str] = []
+    ha = load_ha_settings(lambda name: read_secret(name, secrets), problems)
+    return Settings(
+        ha=ha,
+        hue=load_hue_settings(secrets),
+        heos=load_heos_settings(secrets, problems),
+        location=load_location_settings(secrets, problems),
+        problems=tuple(problems),
+    )
+
+
+# ============================================================
+# VÄLIMUISTI
+# ============================================================
+
+# (st.secrets-olio, secrets.toml-leima, asetukset)
+_SETTINGS_STATE: tuple[Any, tuple[int | None, ...], Settings] | None = None
+_SETTINGS_LOCK = threading.Lock()
+
+
+def get_settings() -> Settings:
+    """Välimuistissa olevat asetukset; uudelleen vain secretsin muuttuessa."""
+    global _SETTINGS_STATE
+    secrets = st.secrets
+    stamp = secrets_stamp()
+    state = _SETTINGS_STATE
+    if state is not None and state[0] is secrets and state[1] == stamp:
+        return state[2]
+    with _SETTINGS_LOCK:
+        settings = load_settings(secrets)
+        _SETTINGS_STATE = (secrets, stamp, settings)
+    for problem in settings.problems:
+        logger.warning("settings: %s", problem)
+    return settings
+
+
+def clear_settings_cache() -> None:
+    global _SETTINGS_STATE
+    _SETTINGS_STATE = None
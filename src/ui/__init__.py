@@ -1,18 +1,41 @@
-"""Expose dashboard card render functions."""
-
-from .card_bitcoin import card_bitcoin
-from .card_bitcoin_ticker import card_bitcoin_ticker
-from .card_eqe import card_eqe
-from .card_ethereum_ticker import card_ethereum_ticker
-from .card_heos import card_heos
-from .card_hue_doors import card_hue_doors
-from .card_hue_motion import card_hue_motion
-from .card_nameday import card_nameday
-from .card_pollen import card_pollen
-from .card_prices import card_prices
-from .card_system import card_system
-from .card_weather import card_weather
-from .card_zen import card_zen
+"""Expose dashboard card render functions.
+
+Kortit ladataan laiskasti: `from src.ui import card_weather` importtaa kortin
+moduulin vasta ensimmäisellä haulla (ks. src.ui.registry).
+"""
+
+from __future__ import annotations
+
+import importlib
+import sys
+import types
+from typing import Any
+
+from .registry import CARD_MODULES
+
+
+class _CardPackage(types.ModuleType):
+    def __setattr__(self, name: str, value: Any) -> None:
+        # Alimoduulin import asettaa paketin attribuutiksi moduulin. Kortin
+        # nimellä paketista löytyy aina render-funktio, kuten ennenkin.
+        if name in CARD_MODULES and isinstance(value, types.ModuleType):
+            value = getattr(value, name)
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _CardPackage
+
+
+def __getattr__(name: str) -> Any:
+    if name in CARD_MODULES:
+        importlib.import_module(CARD_MODULES[name])
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(CARD_MODULES))
+
 
 __all__ = [
     "card_bitcoin",
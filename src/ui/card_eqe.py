@@ -2,14 +2,13 @@ from __future__ import annotations
 
 import base64
 import html
-import threading
-import time
 from dataclasses import dataclass
 
 import requests
 import streamlit as st
 from streamlit.components.v1 import html as st_html
 
+from src.action_jobs import ActionExecutor, JobSnapshot
 from src.api.home_assistant import (
     EqeStatus,
     HAConfigError,
@@ -18,12 +17,12 @@ from src.api.home_assistant import (
     eqe_preclimate_configured,
     fetch_eqe_charging_power,
     fetch_eqe_lock_state,
+    fetch_eqe_preclimate_state,
     fetch_eqe_status,
-    ha_eqe_refresh_interval_s,
     refresh_eqe_charging_power,
-    refresh_eqe_charging_state,
     refresh_eqe_lock_status,
-    refresh_eqe_status_entities,
+    request_eqe_charging_refresh,
+    request_eqe_status_refresh,
     set_eqe_charging_enabled,
     set_eqe_lock,
     set_eqe_preclimate,
@@ -31,137 +30,24 @@ from src.api.home_assistant import (
 from src.paths import asset_path
 from src.ui.common import section_title
 
-_LOCK_JOB_LOCK = threading.Lock()
-_LOCK_POLL_RETRIES = 10
-_LOCK_JOB: dict[str, object] = {
-    "status": "idle",  # idle | pending | polling | error
-    "action": None,  # "lock" | "unlock"
-    "error": None,
-    "poll_remaining": 0,
-}
-
-_PRECLIMATE_JOB_LOCK = threading.Lock()
-_PRECLIMATE_POLL_RETRIES = 10
-_PRECLIMATE_JOB: dict[str, object] = {
-    "status": "idle",  # idle | pending | polling | error
-    "action": None,  # "on" | "off"
-    "error": None,
-    "poll_remaining": 0,
-}
-
-
-def _lock_job_snapshot() -> dict[str, object]:
-    with _LOCK_JOB_LOCK:
-        return dict(_LOCK_JOB)
-
-
-def _reset_lock_job() -> None:
-    with _LOCK_JOB_LOCK:
-        _LOCK_JOB.update(
-            status="idle",
-            action=None,
-            error=None,
-            poll_remaining=0,
-        )
-
-
-def _finish_lock_job(
-    status: str,
-    error: str | None = None,
-    poll_remaining: int | None = None,
-) -> None:
-    with _LOCK_JOB_LOCK:
-        _LOCK_JOB.update(
-            status=status,
-            error=error,
-        )
-        if poll_remaining is not None:
-            _LOCK_JOB["poll_remaining"] = poll_remaining
-
-
-def _run_lock_job(action: str) -> None:
-    try:
-        set_eqe_lock(action == "lock")
-        _finish_lock_job("polling", poll_remaining=_LOCK_POLL_RETRIES)
-    except requests.Timeout:
-        # HA voi jäädä odottamaan pilvipalvelun kuittausta; jatketaan pollingia.
-        _finish_lock_job("polling", poll_remaining=_LOCK_POLL_RETRIES)
-    except Exception as e:
-        _finish_lock_job("error", error=str(e))
-
-
-def _start_lock_job(action: str) -> bool:
-    with _LOCK_JOB_LOCK:
-        if _LOCK_JOB.get("status") in ("pending", "polling"):
-            return False
-        _LOCK_JOB.update(
-            status="pending",
-            action=action,
-            error=None,
-            poll_remaining=0,
-        )
-    threading.Thread(target=_run_lock_job, args=(action,), daemon=True).start()
-    return True
-
-
-def _preclimate_job_snapshot() -> dict[str, object]:
-    with _PRECLIMATE_JOB_LOCK:
-        return dict(_PRECLIMATE_JOB)
-
-
-def _reset_preclimate_job() -> None:
-    with _PRECLIMATE_JOB_LOCK:
-        _PRECLIMATE_JOB.update(
-            status="idle",
-            action=None,
-            error=None,
-            poll_remaining=0,
-        )
-
-
-def _finish_preclimate_job(
-    status: str,
-    error: str | None = None,
-    poll_remaining: int | None = None,
-) -> None:
-    with _PRECLIMATE_JOB_LOCK:
-        _PRECLIMATE_JOB.update(
-            status=status,
-            error=error,
-        )
-        if poll_remaining is not None:
-            _PRECLIMATE_JOB["poll_remaining"] = poll_remaining
-
-
-def _run_preclimate_job(action: str) -> None:
-    try:
-        set_eqe_preclimate(action == "on")
-        _finish_preclimate_job("polling", poll_remaining=_PRECLIMATE_POLL_RETRIES)
-    except requests.Timeout:
-        _finish_preclimate_job("polling", poll_remaining=_PRECLIMATE_POLL_RETRIES)
-    except Exception as e:
-        _finish_preclimate_job("error", error=str(e))
-
-
-def _start_preclimate_job(action: str) -> bool:
-    with _PRECLIMATE_JOB_LOCK:
-        if _PRECLIMATE_JOB.get("status") in ("pending", "polling"):
-            return False
-        _PRECLIMATE_JOB.update(
-            status="pending",
-            action=action,
-            error=None,
-            poll_remaining=0,
-        )
-    threading.Thread(target=_run_preclimate_job, args=(action,), daemon=True).start()
-    return True
-
-
-def _coerce_int(value: object, default: int = 0) -> int:
-    try:
-        return int(value)  # type: ignore[arg-type]
-    except (TypeError, ValueError):
-        return default
+# Ohjauskomennot: rajattu työpooli, komennot kohteittain peräkkäin ja
+# tavoitetilan varmistus taustalla (render ei odota). Pollausten väliset
+# odotukset ajastetaan, joten kuittausta odottavat työt eivät varaa poolia.
+_EXECUTOR = ActionExecutor(max_workers=2)
+# pilvipalvelun kuittaus lukitukselle ja ilmastoinnille voi viipyä minuutin
+_LOCK_JOB = _EXECUTOR.job("eqe_lock", poll_max_s=15.0, confirm_timeout_s=90.0)
+_PRECLIMATE_JOB = _EXECUTOR.job("eqe_preclimate", poll_max_s=15.0, confirm_timeout_s=90.0)
+_CHARGE_JOB = _EXECUTOR.job("eqe_charging", confirm_timeout_s=30.0)
+# valmiin työn tavoitetila ja tulos näytetään, kunnes HA:n välimuisti ehtii perään
+_CHARGE_RESULT_TTL_S = 30.0
+_CONTROL_RESULT_TTL_S = 30.0
+
+# (työ, session_state-avain virheilmoitukselle, ilmoituksen alku)
+_CONTROLS = (
+    (_LOCK_JOB, "eqe_lock_msg", "Lukituksen ohjaus epäonnistui"),
+    (_PRECLIMATE_JOB, "eqe_preclimate_msg", "Ilmastoinnin ohjaus epäonnistui"),
+    (_CHARGE_JOB, "eqe_charge_msg", "Latauksen ohjaus epäonnistui"),
+)
 
 
 def _get_eqe_background() -> str:
@@ -286,64 +172,105 @@ def _charging_state_active(state: str | None, raw_state: str | None) -> bool:
     return "lataa" in state_lower or raw_lower in ("charging", "charge", "on")
 
 
-def _wait_for_power_change(
-    expected_on: bool,
-    timeout_s: float = 5.0,
-    interval_s: float = 1.0,
-) -> tuple[float | None, str | None]:
-    deadline = time.time() + timeout_s
-    last_val: float | None = None
-    last_unit: str | None = None
-    while True:
+def _confirm_charging_power(expected_on: bool):
+    """confirm-funktio ActionJobille: (teho vastaa tavoitetta, (teho, yksikkö))."""
+
+    def confirm() -> tuple[bool, tuple[float, str | None] | None]:
         try:
             refresh_eqe_charging_power()
         except Exception:
             pass
+        val, unit, _updated = fetch_eqe_charging_power()
+        if val is None:
+            return False, None
+        reached = val > 0.1 if expected_on else val <= 0.1
+        return reached, (val, unit)
+
+    return confirm
+
+
+def _start_charge_job(enabled: bool) -> bool:
+    return _CHARGE_JOB.start(
+        "on" if enabled else "off",
+        command=lambda: set_eqe_charging_enabled(enabled),
+        confirm=_confirm_charging_power(enabled),
+        tolerated=(requests.Timeout,),
+    )
+
+
+def _confirm_lock_state(action: str):
+    """confirm-funktio lukitukselle: (tila vastaa tavoitetta, fetch_eqe_lock_state-tuple)."""
+
+    def confirm() -> tuple[bool, tuple | None]:
         try:
-            val, unit, _updated = fetch_eqe_charging_power()
-            if val is not None:
-                last_val = val
-                last_unit = unit
-                if expected_on and val > 0.1:
-                    return last_val, last_unit
-                if (not expected_on) and val <= 0.1:
-                    return last_val, last_unit
+            refresh_eqe_lock_status()
         except Exception:
             pass
-        if time.time() >= deadline:
-            return last_val, last_unit
-        time.sleep(interval_s)
+        lock_state = fetch_eqe_lock_state()
+        state_lower = (lock_state[0] or "").lower()
+        target = "lukossa" if action == "lock" else "auki"
+        return target in state_lower, lock_state
 
+    return confirm
 
-def _maybe_force_charging_refresh(interval_s: float = 15.0) -> None:
-    now = time.time()
-    last_ts = st.session_state.get("eqe_charge_refresh_ts")
-    if isinstance(last_ts, int | float) and now - float(last_ts) < interval_s:
-        return
-    try:
-        refresh_eqe_charging_state()
-    except Exception:
-        pass
-    try:
-        refresh_eqe_charging_power()
-    except Exception:
-        pass
-    st.session_state["eqe_charge_refresh_ts"] = now
-    fetch_eqe_status.clear()
-
-
-def _maybe_force_status_refresh() -> None:
-    now = time.time()
-    interval_s = ha_eqe_refresh_interval_s()
-    last_ts = st.session_state.get("eqe_status_refresh_ts")
-    if isinstance(last_ts, int | float) and now - float(last_ts) < interval_s:
-        return
-    try:
-        refresh_eqe_status_entities()
-    except Exception:
-        pass
-    st.session_state["eqe_status_refresh_ts"] = now
-    fetch_eqe_status.clear()
+
+def _start_lock_job(action: str) -> bool:
+    # HA voi jäädä odottamaan pilvipalvelun kuittausta; pollataan silti
+    return _LOCK_JOB.start(
+        action,
+        command=lambda: set_eqe_lock(action == "lock"),
+        confirm=_confirm_lock_state(action),
+        tolerated=(requests.Timeout,),
+    )
+
+
+def _confirm_preclimate_state(action: str):
+    """confirm-funktio ilmastoinnille: (tila vastaa tavoitetta, normalisoitu tila)."""
+
+    def confirm() -> tuple[bool, str | None]:
+        try:
+            state = fetch_eqe_preclimate_state()
+        except HAConfigError:
+            # vain start/stop-painikkeet: tilaa ei voi varmistaa
+            return True, None
+        return _preclimate_is_on(state) == (action == "on"), state
+
+    return confirm
+
+
+def _start_preclimate_job(action: str) -> bool:
+    return _PRECLIMATE_JOB.start(
+        action,
+        command=lambda: set_eqe_preclimate(action == "on"),
+        confirm=_confirm_preclimate_state(action),
+        tolerated=(requests.Timeout,),
+    )
+
+
+def _job_recent_result(job: JobSnapshot):
+    """Työn tulos, jos työ on kesken tai valmistui äskettäin; muuten None."""
+    if job.active or (
+        job.status in ("done", "timeout") and job.finished_within(_CONTROL_RESULT_TTL_S)
+    ):
+        return job.result
+    return None
+
+
+def _surface_job_errors() -> None:
+    """
+    Siirtää epäonnistuneiden taustatöiden virheet kortin ilmoituksiksi.
+    Virhe pysyy työn tilannekuvassa _CONTROL_RESULT_TTL_S ajan, joten jokainen
+    kioski-istunto näyttää sen kerran (istunto muistaa näyttämänsä virheen).
+    """
+    for job, msg_key, prefix in _CONTROLS:
+        snap = job.snapshot()
+        if snap.status != "error" or not snap.finished_within(_CONTROL_RESULT_TTL_S):
+            continue
+        seen_key = f"{msg_key}_seen"
+        if st.session_state.get(seen_key) == snap.finished_at:
+            continue
+        st.session_state[seen_key] = snap.finished_at
+        st.session_state[msg_key] = ("err", f"{prefix}: {snap.error}")
 
 
 def _lock_chip(state: str | None) -> tuple[str, str]:
@@ -491,22 +418,7 @@ def card_eqe() -> None:
         title_html = "Mercedes EQE"
     section_title(title_html, mt=10, mb=4)
     try:
-        lock_job = _lock_job_snapshot()
-        if lock_job.get("status") == "error":
-            st.session_state["eqe_lock_msg"] = (
-                "err",
-                f"Lukituksen ohjaus epäonnistui: {lock_job.get('error')}",
-            )
-            _reset_lock_job()
-        lock_job = _lock_job_snapshot()
-        preclimate_job = _preclimate_job_snapshot()
-        if preclimate_job.get("status") == "error":
-            st.session_state["eqe_preclimate_msg"] = (
-                "err",
-                f"Ilmastoinnin ohjaus epäonnistui: {preclimate_job.get('error')}",
-            )
-            _reset_preclimate_job()
-        preclimate_job = _preclimate_job_snapshot()
+        _surface_job_errors()
 
         lock_available = eqe_lock_configured()
         preclimate_available = eqe_preclimate_configured()
@@ -569,46 +481,29 @@ def card_eqe() -> None:
                     "Latauksen ohjaus ei ole käytössä (HA_EQE_CHARGING_SWITCH_ENTITY puuttuu).",
                 )
 
-        prev_polling = st.session_state.get("eqe_charging_polling", False)
-        if prev_polling:
-            _maybe_force_charging_refresh(interval_s=30.0)
-        else:
-            _maybe_force_status_refresh()
-
-        lock_job = _lock_job_snapshot()
-        lock_pending_action = (
-            lock_job.get("action") if lock_job.get("status") in ("pending", "polling") else None
-        )
-        is_polling = lock_job.get("status") == "polling"
-        preclimate_job = _preclimate_job_snapshot()
-        preclimate_pending_action = (
-            preclimate_job.get("action")
-            if preclimate_job.get("status") in ("pending", "polling")
-            else None
-        )
-        preclimate_polling = preclimate_job.get("status") == "polling"
-        lock_override = None
-        if lock_pending_action:
-            try:
-                refresh_eqe_lock_status()
-                time.sleep(1.5)
-            except Exception:
-                pass
-            fetch_eqe_status.clear()
-            try:
-                lock_override = fetch_eqe_lock_state()
-            except Exception:
-                lock_override = None
-        if preclimate_pending_action:
+        lock_job = _LOCK_JOB.snapshot()
+        lock_pending_action = lock_job.action if lock_job.active else None
+        preclimate_job = _PRECLIMATE_JOB.snapshot()
+        preclimate_pending_action = preclimate_job.action if preclimate_job.active else None
+        if lock_pending_action or preclimate_pending_action:
             fetch_eqe_status.clear()
         vm = fetch_eqe_status()
-        charge_override = st.session_state.get("eqe_charge_override")
-        charge_override_on = None
-        charge_override_ts = None
-        if isinstance(charge_override, dict):
-            charge_override_on = charge_override.get("value")
-            charge_override_ts = charge_override.get("ts")
+        if st.session_state.get("eqe_charging_polling", False):
+            refreshed = request_eqe_charging_refresh(vm.last_changed)
+        else:
+            refreshed = request_eqe_status_refresh(vm.last_changed)
+        if refreshed:
+            # päivitetty tila näkyy seuraavalla renderöinnillä
+            fetch_eqe_status.clear()
+        charge_job = _CHARGE_JOB.snapshot()
+        charge_override_recent = charge_job.active or (
+            charge_job.status in ("done", "timeout")
+            and charge_job.finished_within(_CHARGE_RESULT_TTL_S)
+        )
+        charge_override_on = (charge_job.action == "on") if charge_override_recent else None
+        lock_override = _job_recent_result(lock_job)
         if lock_override:
+            # taustatyön viimeisin pollattu lukitustila, kunnes HA:n välimuisti ehtii perään
             (
                 vm.lock_state,
                 vm.lock_state_raw,
@@ -616,101 +511,20 @@ def card_eqe() -> None:
                 vm.lock_state_source,
                 vm.lock_state_updated,
             ) = lock_override
-        if lock_pending_action:
-            lock_state_lower = (vm.lock_state or "").lower()
-            target_reached = (lock_pending_action == "lock" and "lukossa" in lock_state_lower) or (
-                lock_pending_action == "unlock" and "auki" in lock_state_lower
-            )
-            if target_reached:
-                _reset_lock_job()
-                lock_pending_action = None
-                is_polling = False
-            elif is_polling:
-                remaining = _coerce_int(lock_job.get("poll_remaining", 0), default=0)
-                remaining = max(remaining - 1, 0)
-                if remaining <= 0:
-                    _reset_lock_job()
-                    lock_pending_action = None
-                    is_polling = False
-                else:
-                    with _LOCK_JOB_LOCK:
-                        _LOCK_JOB["poll_remaining"] = remaining
-        if preclimate_pending_action:
-            preclimate_is_on = _preclimate_is_on(vm.preclimate_state)
-            target_reached = (preclimate_pending_action == "on" and preclimate_is_on) or (
-                preclimate_pending_action == "off" and not preclimate_is_on
-            )
-            if target_reached:
-                _reset_preclimate_job()
-                preclimate_pending_action = None
-                preclimate_polling = False
-            elif preclimate_polling:
-                remaining = _coerce_int(preclimate_job.get("poll_remaining", 0), default=0)
-                remaining = max(remaining - 1, 0)
-                if remaining <= 0:
-                    _reset_preclimate_job()
-                    preclimate_pending_action = None
-                    preclimate_polling = False
-                else:
-                    with _PRECLIMATE_JOB_LOCK:
-                        _PRECLIMATE_JOB["poll_remaining"] = remaining
+        preclimate_override = _job_recent_result(preclimate_job)
+        if preclimate_override:
+            vm.preclimate_state = preclimate_override
         switch_on = vm.charging_switch_on
-        if charge_override_on in (True, False):
-            if (
-                isinstance(charge_override_ts, int | float)
-                and time.time() - float(charge_override_ts) <= 30
-            ):
-                if switch_on == charge_override_on:
-                    st.session_state.pop("eqe_charge_override", None)
-                else:
-                    switch_on = charge_override_on
-            else:
-                st.session_state.pop("eqe_charge_override", None)
-        power_probe = st.session_state.get("eqe_power_probe")
-        if isinstance(power_probe, dict):
-            expected_on = power_probe.get("expected_on")
-            due_at = power_probe.get("due_at")
-            if (
-                isinstance(expected_on, bool)
-                and isinstance(due_at, int | float)
-                and time.time() >= float(due_at)
-            ):
-                power_val, power_unit = _wait_for_power_change(
-                    expected_on=expected_on, timeout_s=10.0, interval_s=1.0
-                )
-                if power_val is not None:
-                    st.session_state["eqe_power_override"] = {
-                        "value": power_val,
-                        "unit": power_unit,
-                        "ts": time.time(),
-                    }
-                st.session_state.pop("eqe_power_probe", None)
-        power_override = st.session_state.get("eqe_power_override")
-        if isinstance(power_override, dict):
-            override_val = power_override.get("value")
-            override_unit = power_override.get("unit")
-            override_ts = power_override.get("ts")
-            if (
-                override_val is None
-                or not isinstance(override_ts, int | float)
-                or time.time() - float(override_ts) > 30
-            ):
-                st.session_state.pop("eqe_power_override", None)
-            else:
-                try:
-                    override_val_f = float(override_val)
-                except (TypeError, ValueError):
-                    st.session_state.pop("eqe_power_override", None)
-                else:
-                    if (
-                        vm.charging_power_kw is not None
-                        and abs(vm.charging_power_kw - override_val_f) <= 0.01
-                    ):
-                        st.session_state.pop("eqe_power_override", None)
-                    else:
-                        vm.charging_power_kw = override_val_f
-                        if override_unit:
-                            vm.charging_power_unit = str(override_unit)
+        if charge_override_on is not None and switch_on != charge_override_on:
+            # HA:n välimuisti ei vielä näe kytkentää; näytetään tavoitetila
+            switch_on = charge_override_on
+        if charge_override_recent and charge_job.result:
+            # taustatyön viimeisin pollattu teho, kunnes HA:n tila ehtii perään
+            override_val, override_unit = charge_job.result
+            if vm.charging_power_kw is None or abs(vm.charging_power_kw - override_val) > 0.01:
+                vm.charging_power_kw = float(override_val)
+                if override_unit:
+                    vm.charging_power_unit = str(override_unit)
         power_refresh = (
             switch_on is True
             or charge_override_on is True
@@ -727,10 +541,6 @@ def card_eqe() -> None:
                     vm.last_changed = power_updated
             except Exception:
                 pass
-        override_recent = (
-            isinstance(charge_override_ts, int | float)
-            and time.time() - float(charge_override_ts) <= 30
-        )
         vm_card = build_eqe_viewmodel(
             vm=vm,
             effective_switch_on=switch_on,
@@ -738,7 +548,7 @@ def card_eqe() -> None:
             preclimate_available=preclimate_available,
             lock_pending_action=lock_pending_action,
             preclimate_pending_action=preclimate_pending_action,
-            charge_override_recent=override_recent,
+            charge_override_recent=charge_override_recent,
         )
         chip_class = vm_card.charge_chip_class
         chip_text = vm_card.charge_chip_text
@@ -773,31 +583,13 @@ def card_eqe() -> None:
                         "Kaapeli ei ole kiinni.",
                     )
                 else:
-                    try:
-                        set_eqe_charging_enabled(desired_on)
-                        try:
-                            refresh_eqe_charging_power()
-                        except Exception:
-                            pass
-                        st.session_state["eqe_power_probe"] = {
-                            "expected_on": desired_on,
-                            "due_at": time.time() + 10.0,
-                        }
-                        st.session_state["eqe_charge_override"] = {
-                            "value": desired_on,
-                            "ts": time.time(),
-                        }
+                    if _start_charge_job(desired_on):
                         st.session_state["eqe_charge_msg"] = (
                             "info",
                             "Lataus kytketty päälle." if desired_on else "Lataus kytketty pois.",
                         )
-                        fetch_eqe_status.clear()
-                        st.rerun()
-                    except Exception as e:
-                        st.session_state["eqe_charge_msg"] = (
-                            "err",
-                            f"Latauksen ohjaus epäonnistui: {e}",
-                        )
+                    fetch_eqe_status.clear()
+                    st.rerun()
         bg = _get_eqe_background()
         overlay = "linear-gradient(90deg, rgba(11,15,20,0.70) 0%, rgba(11,15,20,0.10) 72%)"
         bg_layer = f"{overlay}, url('{bg}')" if bg else overlay
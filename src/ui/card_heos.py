@@ -2,8 +2,8 @@ from __future__ import annotations
 
 import streamlit as st
 
-from src.config import HEOS_HOST, HEOS_PASSWORD, HEOS_PLAYER_ID, HEOS_USERNAME
 from src.heos_client import HeosClient
+from src.settings import get_settings
 from src.ui.common import section_title
 
 
@@ -61,10 +61,11 @@ def card_heos() -> None:
         unsafe_allow_html=True,
     )
 
+    heos = get_settings().heos
     client = HeosClient(
-        HEOS_HOST,
-        username=HEOS_USERNAME,
-        password=HEOS_PASSWORD,
+        heos.host,
+        username=heos.username,
+        password=heos.password,
     )
     try:
         client.sign_in()
@@ -132,27 +133,27 @@ def card_heos() -> None:
     with c_prev:
         if st.button("⏮", key="heos_prev"):
             try:
-                client.play_previous(HEOS_PLAYER_ID)
+                client.play_previous(heos.player_id)
             except Exception:
                 pass
 
     with c_play:
         if st.button("⏯", key="heos_play_pause"):
             try:
-                client.play_pause(HEOS_PLAYER_ID)
+                client.play_pause(heos.player_id)
             except Exception:
                 pass
 
     with c_next:
         if st.button("⏭", key="heos_next"):
             try:
-                client.play_next(HEOS_PLAYER_ID)
+                client.play_next(heos.player_id)
             except Exception:
                 pass
 
     # Now playing (testit lukevat tästä viimeisimmästä markdownista Track/Artist/Album tai tyhjätilan)
     try:
-        resp = client.get_now_playing(HEOS_PLAYER_ID)
+        resp = client.get_now_playing(heos.player_id)
     except Exception:
         resp = {}
 
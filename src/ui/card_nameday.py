@@ -6,7 +6,8 @@ from datetime import datetime
 import streamlit as st
 
 from src.api.calendar_nameday import fetch_holiday_today, fetch_nameday_today
-from src.config import LAT, LON, TZ
+from src.config import TZ
+from src.settings import get_settings
 from src.ui.card_nameday_helpers import get_background_image, get_flag_info
 from src.utils import _sun_icon, fetch_sun_times
 
@@ -30,7 +31,8 @@ def _get_sun_times() -> tuple[str | None, str | None]:
     if callable(fetch_sun_times):  # type: ignore
         try:
             tz_key = TZ.key if hasattr(TZ, "key") else str(TZ)
-            sun_data = fetch_sun_times(LAT, LON, tz_key)  # type: ignore
+            location = get_settings().location
+            sun_data = fetch_sun_times(location.lat, location.lon, tz_key)  # type: ignore
 
             if isinstance(sun_data, tuple) and len(sun_data) == 2:
                 sunrise, sunset = sun_data
@@ -102,22 +104,22 @@ def render_nameday_card(vm: dict) -> None:
     # liputusbalooni, jos on
     if vm["flag_txt"]:
         html.append(
-            "<div style=\"display:inline-flex;align-items:center;gap:6px;"
+            '<div style="display:inline-flex;align-items:center;gap:6px;'
             "background:rgba(255,255,255,.12);padding:4px 10px;"
-            "border-radius:999px;font-size:.75rem;margin-bottom:4px;\">"
+            'border-radius:999px;font-size:.75rem;margin-bottom:4px;">'
             f"{fi_flag_svg}<span>{vm['flag_txt']}</span></div>"
         )
 
     # otsikkorivi
     html.append(
-        "<div style=\"font-size:.8rem; opacity:.9; margin-bottom:2px;\">"
+        '<div style="font-size:.8rem; opacity:.9; margin-bottom:2px;">'
         f"Nimipäivät {vm['weekday_label']} {vm['day_str']}</div>"
     )
     # nimet
     html.append(
-        "<div style=\"font-size:1.3rem; font-weight:700; "
+        '<div style="font-size:1.3rem; font-weight:700; '
         "line-height:1.2; max-height:3.1em; overflow:hidden; "
-        "text-shadow:0 1px 2px rgba(0,0,0,.35);\">"
+        'text-shadow:0 1px 2px rgba(0,0,0,.35);">'
         f"{vm['names']}</div>"
     )
 
@@ -127,20 +129,20 @@ def render_nameday_card(vm: dict) -> None:
         'display:flex; gap:6px; flex-wrap:wrap;">'
     )
     html.append(
-        "<div style=\"display:inline-flex;align-items:center;gap:6px;"
+        '<div style="display:inline-flex;align-items:center;gap:6px;'
         "background:rgba(0,0,0,.35);padding:4px 10px;"
-        "border-radius:999px;font-size:.75rem;color:#fff;line-height:1;\">"
+        'border-radius:999px;font-size:.75rem;color:#fff;line-height:1;">'
         f"{_sun_icon('rise', 16)} "
-        f"<span style=\"display:inline-block;min-width:34px;color:#fff !important;"
-        f"font-weight:700;font-variant-numeric:tabular-nums;\">{vm['sunrise']}</span></div>"
+        f'<span style="display:inline-block;min-width:34px;color:#fff !important;'
+        f'font-weight:700;font-variant-numeric:tabular-nums;">{vm["sunrise"]}</span></div>'
     )
     html.append(
-        "<div style=\"display:inline-flex;align-items:center;gap:6px;"
+        '<div style="display:inline-flex;align-items:center;gap:6px;'
         "background:rgba(0,0,0,.35);padding:4px 10px;"
-        "border-radius:999px;font-size:.75rem;color:#fff;line-height:1;\">"
+        'border-radius:999px;font-size:.75rem;color:#fff;line-height:1;">'
         f"{_sun_icon('set', 16)} "
-        f"<span style=\"display:inline-block;min-width:34px;color:#fff !important;"
-        f"font-weight:700;font-variant-numeric:tabular-nums;\">{vm['sunset']}</span></div>"
+        f'<span style="display:inline-block;min-width:34px;color:#fff !important;'
+        f'font-weight:700;font-variant-numeric:tabular-nums;">{vm["sunset"]}</span></div>'
     )
     html.append("</div>")  # aurinko-div
 
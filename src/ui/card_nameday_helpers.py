@@ -1,10 +1,9 @@
 from __future__ import annotations
 
 import base64
-import json
 from datetime import datetime
-from pathlib import Path
 
+from src.api.calendar_nameday import calendar_index, holiday_source
 from src.paths import asset_path
 
 
@@ -20,33 +19,18 @@ def get_background_image() -> str:
     return ""
 
 
-def find_pyhat_file() -> Path | None:
-    """Etsii data/pyhat_fi.json tiedoston ylöspäin hakemistorakenteesta."""
-    cwd = Path.cwd().resolve()
-    for parent in (cwd, *cwd.parents):
-        cand = parent / "data" / "pyhat_fi.json"
-        if cand.exists():
-            return cand
-    here = Path(__file__).resolve()
-    for parent in (here.parent, *here.parents):
-        cand = parent / "data" / "pyhat_fi.json"
-        if cand.exists():
-            return cand
-    return None
-
-
 def get_flag_info(today: datetime) -> tuple[str | None, str | None]:
-    """Palauttaa (liputuspäivän nimi, debug-viesti)."""
+    """Palauttaa (liputuspäivän nimi, debug-viesti) kalenteri-indeksistä."""
     key = today.strftime("%Y-%m-%d")
-    path = find_pyhat_file()
+    day = today.date() if isinstance(today, datetime) else today
+    index = calendar_index()
+    path, error = holiday_source()
     if path is None:
-        return None, "data/pyhat_fi.json ei löytynyt mistään yläkansiosta"
-    try:
-        data = json.loads(path.read_text(encoding="utf-8"))
-    except Exception as e:
-        return None, f"pyhat_fi.json löytyi ({path}), mutta sitä ei voitu lukea: {e}"
-    info = data.get(key)
-    if info and info.get("flag"):
-        return info.get("name") or "Liputuspäivä", None
-    some_keys = ", ".join(list(data.keys())[:8])
-    return None, f"Avainta {key} ei ollut. Avaimet: {some_keys}"
+        return None, "pyhat_fi.json ei löytynyt mistään HOLIDAY_PATHS-polusta"
+    if error is not None:
+        return None, f"pyhat_fi.json löytyi ({path}), mutta sitä ei voitu lukea: {error}"
+    entry = index.holiday(day)
+    if entry.is_flag_day:
+        return entry.name or "Liputuspäivä", None
+    upcoming = ", ".join(f"{d.isoformat()} {name}" for d, name in index.next_flag_days(day, 2))
+    return None, f"Avainta {key} ei ollut liputuspäivänä. Seuraavat: {upcoming or '—'}"
@@ -5,6 +5,7 @@ import html
 import streamlit as st
 
 from src.api.pollen import fetch_pollen_view
+from src.settings import get_settings
 from src.ui.common import card, section_title
 
 LEVEL_CLASS = {
@@ -15,14 +16,18 @@ LEVEL_CLASS = {
 }
 
 
-def card_pollen() -> None:
-    """Renderöi Riihimäen siitepölytilanteen."""
+def card_pollen(station: str | None = None, location: str | None = None) -> None:
+    """Renderöi valitun paikan siitepölytilanteen (oletus: asetusten [location]-osio)."""
+    settings = get_settings().location
+    station = station or settings.pollen_station
+    location = location or settings.pollen_location
+    title = f"Siitepöly — {location}"
     try:
-        vm = fetch_pollen_view()
-        section_title("🌿 Siitepöly — Riihimäki", mt=10, mb=4)
+        vm = fetch_pollen_view(station, location)
+        section_title(f"🌿 {html.escape(title)}", mt=10, mb=4)
         st.markdown(_render_pollen_html(vm), unsafe_allow_html=True)
     except Exception as e:
-        card("Siitepöly — Riihimäki", f"<span class='hint'>Virhe: {html.escape(str(e))}</span>")
+        card(html.escape(title), f"<span class='hint'>Virhe: {html.escape(str(e))}</span>")
 
 
 def _render_pollen_html(vm: dict) -> str:
@@ -2,13 +2,102 @@
 from __future__ import annotations
 
 from datetime import datetime
+from html import escape
 
 import streamlit as st
 from streamlit.components.v1 import html as st_html
 
 from src.config import TZ
+from src.metrics import REGISTRY, LatencySummary
+from src.process_stats import ProcessStats, process_stats
 from src.ui.common import section_title
-from src.utils import get_ip
+from src.utils import get_ip, report_error
+
+# ------------------- PERFORMANCE PANEL -------------------
+# Valinnainen: näytetään, kun kioskin URL:ssa on ?perf=1.
+
+PERF_QUERY_PARAM = "perf"
+_PERF_ROW_PX = 19
+_PERF_BASE_PX = 86
+
+
+def _perf_panel_enabled() -> bool:
+    return str(st.query_params.get(PERF_QUERY_PARAM, "")).lower() in ("1", "true", "on")
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:.0f} ms" if seconds < 10 else f"{seconds:.1f} s"
+
+
+def _age(seconds: float | None) -> str:
+    if seconds is None:
+        return "–"
+    if seconds < 120:
+        return f"{seconds:.0f} s"
+    if seconds < 7200:
+        return f"{seconds / 60:.0f} min"
+    return f"{seconds / 3600:.1f} h"
+
+
+def _latency_rows(rows: list[LatencySummary], ages: dict[str, float] | None = None) -> str:
+    out = []
+    for row in rows:
+        cells = [escape(row.name), _ms(row.last), _ms(row.avg), _ms(row.p95)]
+        if ages is not None:
+            cells += [str(row.errors), _age(ages.get(row.name))]
+        out.append("<tr>" + "".join(f"<td>{c}</td>" for c in cells) + "</tr>")
+    return "".join(out)
+
+
+def build_perf_panel_html(
+    cards: list[LatencySummary],
+    sources: list[LatencySummary],
+    ages: dict[str, float],
+    proc: ProcessStats,
+) -> str:
+    """Paneelin HTML: korttien ja lähteiden viiveet, datan ikä, prosessin resurssit."""
+    rss = f"{proc.rss_bytes / 1_048_576:.0f} MB" if proc.rss_bytes is not None else "–"
+    cpu = f"{proc.cpu_percent:.0f} %" if proc.cpu_percent is not None else "–"
+    sessions = str(proc.sessions) if proc.sessions is not None else "–"
+    head = "<th>viim.</th><th>ka.</th><th>p95</th>"
+    return f"""
+<!doctype html>
+<html><head><meta charset="utf-8">
+<style>
+  html,body {{ margin:0; padding:0; background:transparent; color:#e7eaee;
+               font-family:ui-sans-serif,system-ui,-apple-system,Segoe UI,Roboto,Ubuntu; }}
+  .card {{ border-radius:14px; background:rgba(255,255,255,0.04);
+           border:1px solid rgba(255,255,255,0.08); padding:8px 12px 10px 12px; font-size:.8rem; }}
+  .proc {{ margin-bottom:6px; }}
+  .hint {{ color:rgba(231,234,238,0.8); }}
+  table {{ border-collapse:collapse; width:100%; margin-top:4px; }}
+  th {{ text-align:right; font-weight:500; opacity:.7; }}
+  th:first-child, td:first-child {{ text-align:left; }}
+  td {{ text-align:right; padding:1px 4px; font-variant-numeric:tabular-nums; }}
+</style>
+</head><body>
+  <section class="card">
+    <div class="proc"><span class="hint">Muisti:</span> {rss} ·
+      <span class="hint">CPU:</span> {cpu} ·
+      <span class="hint">Istunnot:</span> {sessions}</div>
+    <table><tr><th>Kortti</th>{head}</tr>{_latency_rows(cards)}</table>
+    <table><tr><th>Lähde</th>{head}<th>virheet</th><th>datan ikä</th></tr>
+      {_latency_rows(sources, ages)}</table>
+  </section>
+</body></html>
+"""
+
+
+def _render_perf_panel() -> None:
+    try:
+        cards = REGISTRY.summaries("card")
+        sources = REGISTRY.summaries("upstream")
+        html = build_perf_panel_html(cards, sources, REGISTRY.data_ages(), process_stats())
+        height = _PERF_BASE_PX + _PERF_ROW_PX * (len(cards) + len(sources))
+        st_html(html, height=height, scrolling=False)
+    except Exception as e:
+        report_error("perf panel", e)
+
 
 # ------------------- SYSTEM STATUS CARD -------------------
 
@@ -121,6 +210,9 @@ window.addEventListener('DOMContentLoaded', function () {{
 """
         st_html(html, height=200, scrolling=False)
 
+        if _perf_panel_enabled():
+            _render_perf_panel()
+
     except Exception as e:
         section_title("🖥️ Järjestelmätila")
         st.markdown(f"<span class='hint'>Virhe: {e}</span>", unsafe_allow_html=True)
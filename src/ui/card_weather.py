@@ -1,12 +1,126 @@
 # src/ui/card_weather.py
 from __future__ import annotations
 
+import html
+import threading
+
 import streamlit as st
 from streamlit.components.v1 import html as st_html
 
-from src.api.weather_viewmodel import build_weather_view
+from src.api.weather_viewmodel import build_weather_view, point_fingerprint
 from src.ui.common import card, section_title
-from src.weather_icons import render_foreca_icon
+from src.weather_icons import render_foreca_icon, sprite_stylesheet
+
+ICON_SIZE = 48
+# solujen HTML tiivisteen mukaan; yksi ennuste on 5 solua, välit 1/3/6 h
+_CELL_CACHE_MAX = 64
+
+
+def _compact(markup: str) -> str:
+    """Sisennykset pois: iframe-dokumentti lähetetään selaimelle joka rerunilla."""
+    return "".join(line.strip() for line in markup.splitlines())
+
+
+_DOC_HEAD = _compact("""
+            <!doctype html>
+            <html><head><meta charset="utf-8"><!--sprite-->
+            <style>
+              :root { --fg:#e7eaee; --bg2:rgba(255,255,255,0.06); }
+              html,body {margin:0;padding:0;background:transparent;color:var(--fg);
+                         font-family:ui-sans-serif,system-ui,-apple-system,Segoe UI,Roboto,Ubuntu;}
+              .weather-card { padding:8px 12px 6px; }
+              .weather-row {display:grid;grid-template-columns:repeat(5,minmax(88px,1fr));
+                            gap:10px;align-items:stretch;}
+              .weather-cell {display:grid;grid-template-rows:auto auto 1fr auto auto;
+                             align-items:center;justify-items:center;
+                             background:var(--bg2);border-radius:14px;
+                             padding:6px 6px;min-height:110px;}
+              .label{font-size:.9rem;opacity:.9;margin:2px 0 0;}
+              .sub{font-size:.8rem;opacity:.75;margin:0 0 4px;}
+              .icon svg{width:48px;height:48px;display:block;}
+              .temp{font-size:1.1rem;margin-top:6px;}
+              .pop{font-size:.85rem;opacity:.85;margin-top:2px;}
+            </style></head><body>
+              <div class="weather-card"><div class="weather-row">
+            """)
+_DOC_TAIL = "</div></div></body></html>"
+
+# Välimuistit ovat yhteiset kaikille Streamlit-istunnoille (eri säikeet):
+# molempia luetaan ja muutetaan vain _RENDER_LOCKin alla.
+_RENDER_LOCK = threading.Lock()
+_CELL_CACHE: dict[str, str] = {}
+_DOC_CACHE: dict[str, object] = {"key": None, "html": None, "sprite": None}
+
+
+def clear_weather_render_cache() -> None:
+    with _RENDER_LOCK:
+        _CELL_CACHE.clear()
+        _DOC_CACHE.update(key=None, html=None, sprite=None)
+
+
+def _render_cell(point: dict) -> str:
+    icon_html = render_foreca_icon(point["key"], size=ICON_SIZE)
+    temp = "—" if point["temp"] is None else f"{round(point['temp'])}"
+    pop = "—" if point["pop"] is None else f"{point['pop']}%"
+    return _compact(f"""
+                <div class="weather-cell">
+                  <div class="label">{point["label"]}</div>
+                  <div class="sub">{point["hour"]}:00</div>
+                  <div class="icon" style="width:48px; height:48px;">{icon_html}</div>
+                  <div class="temp">{temp}°C</div>
+                  <div class="pop">Sade {pop}</div>
+                </div>
+            """)
+
+
+def _cell(point: dict) -> tuple[str, str]:
+    """
+    (tiiviste, solun HTML); muuttumattoman pisteen HTML tulee välimuistista.
+    Kutsutaan _RENDER_LOCKin alla.
+    """
+    fp = point.get("fp") or point_fingerprint(point)
+    cached = _CELL_CACHE.get(fp)
+    if cached is None:
+        if len(_CELL_CACHE) >= _CELL_CACHE_MAX:
+            _CELL_CACHE.clear()
+        cached = _CELL_CACHE[fp] = _render_cell(point)
+    return fp, cached
+
+
+def _alerts_html(alerts: list[dict]) -> str:
+    """Ensimmäinen varoitus otsikkoon, loput title-vihjeeseen."""
+    if not alerts:
+        return ""
+    first = html.escape(str(alerts[0]["text"]))
+    hint = html.escape("; ".join(f"{a['date']}: {a['text']}" for a in alerts), quote=True)
+    more = f" +{len(alerts) - 1}" if len(alerts) > 1 else ""
+    return f'&nbsp; | &nbsp;<span title="{hint}">⚠️ {first}{more}</span>'
+
+
+def render_weather_html(points: list[dict]) -> str:
+    """
+    Sääkortin iframe-HTML. Solut kootaan tiivisteiden mukaan: muuttumaton
+    ennuste palauttaa edellisen dokumentin sellaisenaan, muuttunut ennuste
+    renderöi vain muuttuneet solut.
+
+    Kun sprite on rakennettu, ikonit ovat <span>-viittauksia ja dokumentti
+    linkittää spriten CSS:n (selain hakee kuvan kerran); muuten ikonit ovat
+    data-URI-kuvia. Spriten vaihtuminen tyhjentää solut.
+    """
+    sprite = sprite_stylesheet()
+    with _RENDER_LOCK:
+        if _DOC_CACHE["sprite"] != sprite:
+            _CELL_CACHE.clear()
+            _DOC_CACHE.update(key=None, html=None, sprite=sprite)
+        cells = [_cell(point) for point in points]
+        key = tuple(fp for fp, _ in cells)
+        if _DOC_CACHE["key"] == key:
+            return str(_DOC_CACHE["html"])
+        link = f'<link rel="stylesheet" href="{sprite}">' if sprite else ""
+        head = _DOC_HEAD.replace("<!--sprite-->", link)
+        document = head + "".join(fragment for _, fragment in cells) + _DOC_TAIL
+        _DOC_CACHE.update(key=key, html=document)
+        return document
 
 
 def card_weather() -> None:
@@ -26,12 +140,18 @@ def card_weather() -> None:
         vm = build_weather_view(interval)
 
         title_left = "🌤️ Sää — Riihimäki"
+        current = vm.get("current") or {}
+        if current.get("temp") is not None:
+            title_left += f"&nbsp; | &nbsp; Nyt {round(current['temp'])}°C"
+            if current.get("feels_like") is not None:
+                title_left += f" (tuntuu {round(current['feels_like'])}°C)"
         if (vm["min_temp"] is not None) and (vm["max_temp"] is not None):
             title_left += (
                 f"&nbsp; | &nbsp; Tänään: {round(vm['min_temp'])}°C — {round(vm['max_temp'])}°C"
             )
+        title_left += _alerts_html(vm.get("alerts") or [])
 
-        # ... (pillerit, cell()-renderointi ja HTML pysyvät ennallaan, vain lähdedata tulee vm["points"])
+        # pillerit ja otsikko renderöidään aina; solut tulevat render_weather_html:stä
 
         def pill(opt: str) -> str:
             is_active = opt == interval
@@ -50,48 +170,7 @@ def card_weather() -> None:
         full_title_html = f"{title_left}&nbsp;&nbsp;{pills_html}"
         section_title(full_title_html, mb=3)
 
-        def cell(point: dict) -> str:
-            icon_html = render_foreca_icon(point["key"], size=48)
-            temp = "—" if point["temp"] is None else f"{round(point['temp'])}"
-            pop = "—" if point["pop"] is None else f"{point['pop']}%"
-            return f"""
-                <div class="weather-cell">
-                  <div class="label">{point["label"]}</div>
-                  <div class="sub">{point["hour"]}:00</div>
-                  <div class="icon" style="width:48px; height:48px;">{icon_html}</div>
-                  <div class="temp">{temp}°C</div>
-                  <div class="pop">Sade {pop}</div>
-                </div>
-            """
-
-        inner_html = (
-            """
-            <!doctype html>
-            <html><head><meta charset="utf-8">
-            <style>
-              :root { --fg:#e7eaee; --bg2:rgba(255,255,255,0.06); }
-              html,body {margin:0;padding:0;background:transparent;color:var(--fg);
-                         font-family:ui-sans-serif,system-ui,-apple-system,Segoe UI,Roboto,Ubuntu;}
-              .weather-card { padding:8px 12px 6px; }
-              .weather-row {display:grid;grid-template-columns:repeat(5,minmax(88px,1fr));
-                            gap:10px;align-items:stretch;}
-              .weather-cell {display:grid;grid-template-rows:auto auto 1fr auto auto;
-                             align-items:center;justify-items:center;
-                             background:var(--bg2);border-radius:14px;
-                             padding:6px 6px;min-height:110px;}
-              .label{font-size:.9rem;opacity:.9;margin:2px 0 0;}
-              .sub{font-size:.8rem;opacity:.75;margin:0 0 4px;}
-              .icon svg{width:48px;height:48px;display:block;}
-              .temp{font-size:1.1rem;margin-top:6px;}
-              .pop{font-size:.85rem;opacity:.85;margin-top:2px;}
-            </style></head><body>
-              <div class="weather-card"><div class="weather-row">
-            """
-            + "".join(cell(p) for p in vm["points"])
-            + "</div></div></body></html>"
-        )
-
-        st_html(inner_html, height=155, scrolling=False)
+        st_html(render_weather_html(vm["points"]), height=155, scrolling=False)
 
     except Exception as e:
         card("Sää — Riihimäki", f"<span class='hint'>Virhe: {e}</span>", height_dvh=15)
@@ -0,0 +1,101 @@
+"""
+Korttien laiska rekisteri.
+
+Kortin moduuli (ja sen raskaat riippuvuudet, esim. plotly ja src.api)
+importataan vasta, kun korttia kutsutaan ensimmäisen kerran. Näin
+Streamlit ehtii piirtää sivun rungon ja ensimmäiset kortit ennen kuin
+kaikki riippuvuudet on ladattu. Jokaisen kutsun renderöintiaika kirjataan
+src.metrics-mittareihin.
+"""
+
+from __future__ import annotations
+
+import importlib
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from src.metrics import REGISTRY
+
+# kortin nimi -> moduuli, jossa samanniminen render-funktio on
+CARD_MODULES: dict[str, str] = {
+    "card_bitcoin": "src.ui.card_bitcoin",
+    "card_bitcoin_ticker": "src.ui.card_bitcoin_ticker",
+    "card_eqe": "src.ui.card_eqe",
+    "card_ethereum_ticker": "src.ui.card_ethereum_ticker",
+    "card_heos": "src.ui.card_heos",
+    "card_hue_doors": "src.ui.card_hue_doors",
+    "card_hue_motion": "src.ui.card_hue_motion",
+    "card_nameday": "src.ui.card_nameday",
+    "card_pollen": "src.ui.card_pollen",
+    "card_prices": "src.ui.card_prices",
+    "card_system": "src.ui.card_system",
+    "card_weather": "src.ui.card_weather",
+    "card_zen": "src.ui.card_zen",
+}
+
+_LOAD_TIMES: dict[str, float] = {}
+_LOAD_LOCK = threading.Lock()
+
+
+def load_card(name: str) -> Callable[..., Any]:
+    """Importtaa kortin moduulin ja palauttaa render-funktion."""
+    try:
+        module_name = CARD_MODULES[name]
+    except KeyError:
+        raise KeyError(f"tuntematon kortti: {name}") from None
+
+    started = time.perf_counter()
+    module = importlib.import_module(module_name)
+    with _LOAD_LOCK:
+        _LOAD_TIMES.setdefault(name, time.perf_counter() - started)
+    return getattr(module, name)
+
+
+def card_load_times() -> dict[str, float]:
+    """Korttien ensimmäisen latauksen (import) kesto sekunteina."""
+    with _LOAD_LOCK:
+        return dict(_LOAD_TIMES)
+
+
+class LazyCard:
+    """Kutsuttava kääre, joka lataa kortin vasta ensimmäisellä kutsulla."""
+
+    __slots__ = ("name", "_fn")
+
+    def __init__(self, name: str) -> None:
+        if name not in CARD_MODULES:
+            raise KeyError(f"tuntematon kortti: {name}")
+        self.name = name
+        self._fn: Callable[..., Any] | None = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._fn is not None
+
+    def load(self) -> Callable[..., Any]:
+        if self._fn is None:
+            self._fn = load_card(self.name)
+        return self._fn
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        fn = self.load()
+        started = time.perf_counter()
+        failed = False
+        try:
+            return fn(*args, **kwargs)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            # renderöintiaika ilman ensimmäisen kutsun importtia (ks. card_load_times)
+            REGISTRY.observe("card", self.name, time.perf_counter() - started, error=failed)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "lazy"
+        return f"<LazyCard {self.name} ({state})>"
+
+
+def lazy_card(name: str) -> LazyCard:
+    return LazyCard(name)
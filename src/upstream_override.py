@@ -0,0 +1,46 @@
+"""
+Ulkoisten lähteiden ohjaus paikalliseen simulaattoriin kuorma- ja viivetestejä varten.
+
+Kun ympäristömuuttuja FAKE_UPSTREAM=host:port on asetettu, kaikki HTTP-haut
+(http_client, Home Assistant, Hue v1/v2, siitepöly) ohjataan osoitteeseen
+http://host:port/<alkuperäinen isäntä>/<polku> ja HEOS-yhteydet porttiin
+port + HEOS_PORT_OFFSET. Simulaattori: python -m benchmarks.fake_upstream.
+Ilman muuttujaa osoitteet palautetaan sellaisinaan.
+"""
+
+from __future__ import annotations
+
+import os
+from urllib.parse import urlsplit
+
+FAKE_UPSTREAM_ENV = "FAKE_UPSTREAM"
+HEOS_PORT_OFFSET = 1
+
+
+def fake_upstream() -> tuple[str, int] | None:
+    """(host, port) simulaattorille; luetaan kutsuhetkellä (.env, testit)."""
+    raw = os.environ.get(FAKE_UPSTREAM_ENV, "").strip()
+    if not raw:
+        return None
+    host, _, port = raw.removeprefix("http://").rstrip("/").rpartition(":")
+    try:
+        return (host or "127.0.0.1"), int(port)
+    except ValueError:
+        return None
+
+
+def upstream_url(url: str) -> str:
+    """https://api.coingecko.com/api/v3/x?y -> http://127.0.0.1:8790/api.coingecko.com/api/v3/x?y"""
+    target = fake_upstream()
+    if target is None:
+        return url
+    parts = urlsplit(url)
+    query = f"?{parts.query}" if parts.query else ""
+    return f"http://{target[0]}:{target[1]}/{parts.netloc}{parts.path}{query}"
+
+
+def heos_address(host: str, port: int) -> tuple[str, int]:
+    target = fake_upstream()
+    if target is None:
+        return host, port
+    return target[0], target[1] + HEOS_PORT_OFFSET
@@ -1,9 +1,6 @@
 """Utility functions for the HomeDashboard application."""
 
-import json as _json
 import socket
-import urllib.parse
-import urllib.request
 
 import streamlit as st
 
@@ -112,44 +109,19 @@ def get_ip() -> str:
         return "localhost"
 
 
-# --- AURINGON NOUSU/LASKU (Open-Meteo, ei uusia riippuvuuksia) ---
+# --- AURINGON NOUSU/LASKU (Open-Meteo, sama kutsu kuin tuntiennusteella) ---
 def fetch_sun_times(lat: float, lon: float, tz_str: str) -> tuple[str | None, str | None]:
-    """Palauttaa (sunrise_HH:MM, sunset_HH:MM) merkkijonot paikallisajassa tai (None, None)."""
-    try:
-        qs = urllib.parse.urlencode(
-            {
-                "latitude": f"{lat:.6f}",
-                "longitude": f"{lon:.6f}",
-                "daily": "sunrise,sunset",
-                "timezone": tz_str,
-                "forecast_days": 1,
-            }
-        )
-
-        url = f"https://api.open-meteo.com/v1/forecast?{qs}"
-
-        parsed = urllib.parse.urlparse(url)
-        if parsed.scheme not in ("http", "https"):
-            raise ValueError(f"Unexpected URL scheme: {parsed.scheme}")
-
-        # Tämä on kovakoodattu ja skeema tarkistettu
-        with urllib.request.urlopen(url, timeout=6) as r:  # nosec B310
-            data = _json.loads(r.read().decode("utf-8"))
-
-        sunrise_iso = (data.get("daily", {}).get("sunrise") or [None])[0]
-        sunset_iso = (data.get("daily", {}).get("sunset") or [None])[0]
-
-        def _fmt(iso: str | None) -> str | None:
-            if not iso:
-                return None
-            try:
-                return iso[11:16]
-            except Exception:
-                from datetime import datetime as _dt
+    """
+    Palauttaa (sunrise_HH:MM, sunset_HH:MM) merkkijonot paikallisajassa tai (None, None).
 
-                return _dt.fromisoformat(iso).strftime("%H:%M")
+    Päivädata tulee sääennusteen välimuistista (src.api.weather_fetch), joten
+    erillistä HTTP-kutsua ei tehdä.
+    """
+    # paikallinen import: src.api -> http_client -> src.utils
+    from src.api.weather_fetch import fetch_sun_times as _fetch_sun_times
 
-        return _fmt(sunrise_iso), _fmt(sunset_iso)
+    try:
+        return _fetch_sun_times(lat, lon, tz_str)
     except Exception:
         return None, None
 
@@ -1,8 +1,28 @@
 # weather_icons.py
+"""
+Forecan sääikonit: sprite-viittauksena tai PNG data-URI:na.
+
+Ikonihakemistot skannataan kerran indeksiksi (avain -> polku + data-URI,
+varakäännökset valmiina). Renderöinti ei tee tiedostojärjestelmäkutsuja;
+indeksi rakennetaan uudelleen, jos hakemiston mtime muuttuu.
+
+Jos sprite on rakennettu (python -m src.weather_sprite), ikoni on pelkkä
+<span class="wx wx-…">, ja sivu linkittää sprite_stylesheet()-tyylitiedoston.
+"""
+
+from __future__ import annotations
+
 import base64
+import os
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass
 from pathlib import Path
+from types import MappingProxyType
+from typing import Any
 
-from src.paths import ASSETS, ROOT_DIR  # ← UUSI
+from src.paths import ASSETS, ROOT_DIR, STATIC  # ← UUSI
+from src.weather_sprite import SPRITE_ICON_PX, SpriteSheet, load_sprite_sheet
 
 SEARCH_DIRS = [
     ASSETS / "foreca",
@@ -27,46 +47,143 @@ def _read_png_as_data_uri(path: Path) -> str:
     return f"data:image/png;base64,{b64}"
 
 
-# Cache: muistetaan löytyneet polut
-_ICON_CACHE: dict[str, Path] = {}
+# Hakemistojen mtime tarkistetaan enintään näin usein; muuten haku ei tee syscalleja
+ICON_INDEX_RECHECK_S = 60.0
+
+DEFAULT_ICON = "d000"
+
+# sprite-build kirjoittaa tänne; selain hakee sen Streamlitin staattisesta jaosta
+SPRITE_DIR = STATIC
+SPRITE_URL = "app/static"
+
+
+@dataclass(frozen=True)
+class IconEntry:
+    path: Path
+    data_uri: str
+
+
+@dataclass(frozen=True)
+class IconIndex:
+    """
+    Kaikki löydetyt ikonit: avain -> (polku, data-URI), varakäännökset valmiina.
+
+    entries sisältää suorien avainten lisäksi yö↔päivä-vastineet niille
+    avaimille, joille ei ole omaa tiedostoa. Tuntemattomat avaimet saavat
+    default-ikonin (d000).
+    """
+
+    dirs: tuple[Path, ...]
+    stamp: tuple[int | None, ...]
+    entries: Mapping[str, IconEntry]
+    default: IconEntry | None
+    sprite_dir: Path | None = None
+    sprite: SpriteSheet | None = None
+
+    def resolve(self, key: str) -> IconEntry | None:
+        return self.entries.get(key, self.default)
+
+
+def _alt_key(key: str) -> str:
+    return ("d" if key.startswith("n") else "n") + key[1:]
+
+
+def _dir_stamp(dirs: tuple[Path, ...]) -> tuple[int | None, ...]:
+    stamp: list[int | None] = []
+    for root in dirs:
+        try:
+            stamp.append(root.stat().st_mtime_ns)
+        except OSError:
+            stamp.append(None)
+    return tuple(stamp)
+
+
+def build_icon_index(dirs: tuple[Path, ...], sprite_dir: Path | None = None) -> IconIndex:
+    """
+    Skannaa hakemistot kerran: ensimmäinen hakemisto voittaa saman avaimen.
+    sprite_dir: spriten manifesti luetaan samalla (sen mtime kuuluu leimaan).
+    """
+    stamp = _dir_stamp(dirs if sprite_dir is None else (*dirs, sprite_dir))
+    found: dict[str, Path] = {}
+    for root in dirs:
+        try:
+            names = sorted(entry.name for entry in os.scandir(root) if entry.is_file())
+        except OSError:
+            continue
+        for name in names:
+            if name.endswith(".png"):
+                found.setdefault(name[: -len(".png")], root / name)
+
+    loaded: dict[str, IconEntry] = {}
+    for key, path in found.items():
+        try:
+            loaded[key] = IconEntry(path=path, data_uri=_read_png_as_data_uri(path))
+        except OSError:
+            continue
+
+    entries = dict(loaded)
+    for key, entry in loaded.items():
+        # yö→päivä tai päivä→yö, jos avaimelle ei ole omaa tiedostoa
+        entries.setdefault(_alt_key(key), entry)
+
+    return IconIndex(
+        dirs=dirs,
+        stamp=stamp,
+        entries=MappingProxyType(entries),
+        default=loaded.get(DEFAULT_ICON),
+        sprite_dir=sprite_dir,
+        sprite=load_sprite_sheet(sprite_dir) if sprite_dir is not None else None,
+    )
+
+
+_INDEX_STATE: dict[str, Any] = {"index": None, "checked_at": 0.0}
+
+
+def icon_index() -> IconIndex:
+    """
+    Välimuistissa oleva ikoni-indeksi. Hakemistojen mtime tarkistetaan enintään
+    ICON_INDEX_RECHECK_S välein; muuttunut hakemisto (tai SEARCH_DIRS /
+    SPRITE_DIR) rakentaa indeksin uudelleen.
+    """
+    dirs = tuple(SEARCH_DIRS)
+    index: IconIndex | None = _INDEX_STATE["index"]
+    now = time.monotonic()
+    if index is not None and index.dirs == dirs and index.sprite_dir == SPRITE_DIR:
+        if now - _INDEX_STATE["checked_at"] < ICON_INDEX_RECHECK_S:
+            return index
+        if _dir_stamp((*dirs, SPRITE_DIR)) == index.stamp:
+            _INDEX_STATE["checked_at"] = now
+            return index
+
+    index = build_icon_index(dirs, SPRITE_DIR)
+    _INDEX_STATE.update(index=index, checked_at=now)
+    return index
+
+
+def reset_icon_index() -> None:
+    _INDEX_STATE.update(index=None, checked_at=0.0)
 
 
 def _find_icon_path(key: str) -> Path | None:
-    # 1) cache
-    p = _ICON_CACHE.get(key)
-    if p and p.exists():
-        return p
-    # 2) etsi useista hakemistoista
-    fname = f"{key}.png"
-    for root in SEARCH_DIRS:
-        p = root / fname
-        if p.exists():
-            _ICON_CACHE[key] = p
-            return p
-    # 3) fallback: yö→päivä tai päivä→yö
-    alt = ("d" if key.startswith("n") else "n") + key[1:]
-    fname_alt = f"{alt}.png"
-    for root in SEARCH_DIRS:
-        p = root / fname_alt
-        if p.exists():
-            _ICON_CACHE[key] = p
-            return p
-    # 4) yleinen d000
-    for root in SEARCH_DIRS:
-        p = root / "d000.png"
-        if p.exists():
-            _ICON_CACHE[key] = p
-            return p
-    return None
-
-
-def render_foreca_icon(key: str, size: int = 48) -> str:
+    entry = icon_index().resolve(key)
+    return entry.path if entry else None
+
+
+def sprite_stylesheet() -> str | None:
+    """Spriten CSS:n URL (versio mukana) tai None, jos spriteä ei ole rakennettu."""
+    sprite = icon_index().sprite
+    return sprite.stylesheet_href(SPRITE_URL) if sprite else None
+
+
+def render_foreca_icon(key: str, size: int = 48, sprite: bool = True) -> str:
     """
-    key = 'dxxx' tai 'nxxx'. Palauttaa <img>-HTML:n.
+    key = 'dxxx' tai 'nxxx'. Palauttaa sprite-<span>:n (vaatii sprite_stylesheet()-
+    linkin sivulle) tai, jos spriteä ei ole tai sprite=False, <img>-HTML:n.
     """
     try:
-        p = _find_icon_path(key)
-        if not p:
+        index = icon_index()
+        entry = index.resolve(key)
+        if not entry:
             # näytä neutraali placeholder
             return (
                 f'<span title="not found: {key}" '
@@ -74,9 +191,12 @@ def render_foreca_icon(key: str, size: int = 48) -> str:
                 f"background:#eee;border-radius:8px;text-align:center;line-height:{size}px;"
                 f'color:#888;">?</span>'
             )
-        uri = _read_png_as_data_uri(p)
+        cell = entry.path.stem
+        if sprite and index.sprite is not None and cell in index.sprite.keys:
+            style = "" if size == SPRITE_ICON_PX else f' style="--wx:{size}px"'
+            return f'<span class="wx wx-{cell}" role="img" aria-label="{key}"{style}></span>'
         return (
-            f'<img src="{uri}" width="{size}" height="{size}" alt="{key}" '
+            f'<img src="{entry.data_uri}" width="{size}" height="{size}" alt="{key}" '
             f'style="vertical-align:middle;" />'
         )
     except Exception:
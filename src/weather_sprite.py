@@ -0,0 +1,136 @@
+"""
+Build-vaihe: Forecan sääikonit yhdeksi sprite-kuvaksi + CSS-offsettikartaksi.
+
+    python -m src.weather_sprite
+
+Kirjoittaa static/-kansioon (Streamlitin staattinen jako, server.enableStaticServing):
+  * foreca_sprite.png  – kaikki ikonit ruudukossa, SPRITE_CELL_PX × SPRITE_CELL_PX
+  * foreca_sprite.css  – .wx-<avain> { background-position: … }
+  * foreca_sprite.json – versio + ikonit; render_foreca_icon lukee tämän
+
+Selain hakee kuvan ja CSS:n kerran ja pitää ne välimuistissa (versio on
+URL:ssa), joten sääkortin solu on pelkkä <span class="wx wx-d410">.
+Taustan sijainnit ovat prosentteja, joten sama sprite skaalautuu mihin tahansa
+kokoon (--wx-muuttuja).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import math
+import os
+from collections.abc import Mapping
+from dataclasses import dataclass
+from pathlib import Path
+
+SPRITE_NAME = "foreca_sprite"
+SPRITE_CELL_PX = 96
+SPRITE_ICON_PX = 48
+
+
+@dataclass(frozen=True)
+class SpriteSheet:
+    """Rakennetun spriten kuvaus: versio (PNG:n tiiviste) ja mukana olevat ikonit."""
+
+    version: str
+    keys: frozenset[str]
+
+    def stylesheet_href(self, base_url: str) -> str:
+        return f"{base_url}/{SPRITE_NAME}.css?v={self.version}"
+
+
+def sprite_css(keys: list[str], cols: int, rows: int, version: str) -> str:
+    """CSS: yhteinen .wx-luokka + prosenttisijainti jokaiselle ikonille."""
+
+    def percent(pos: int, count: int) -> str:
+        return "0%" if count <= 1 else f"{pos * 100 / (count - 1):.4g}%"
+
+    lines = [
+        ".wx{display:inline-block;vertical-align:middle;"
+        f"width:var(--wx,{SPRITE_ICON_PX}px);height:var(--wx,{SPRITE_ICON_PX}px);"
+        f"background:url({SPRITE_NAME}.png?v={version}) no-repeat;"
+        f"background-size:{cols * 100}% {rows * 100}%}}"
+    ]
+    for idx, key in enumerate(keys):
+        col, row = idx % cols, idx // cols
+        lines.append(f".wx-{key}{{background-position:{percent(col, cols)} {percent(row, rows)}}}")
+    return "\n".join(lines) + "\n"
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    # uusi tiedosto + rename: hakemiston mtime muuttuu, joten ikoni-indeksi huomaa spriten
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def build_sprite(
+    icons: Mapping[str, Path],
+    out_dir: Path,
+    cell_px: int = SPRITE_CELL_PX,
+) -> SpriteSheet:
+    """
+    Pakkaa ikonit (avain -> PNG-polku) ruudukkoon ja kirjoittaa PNG:n, CSS:n
+    ja JSON-manifestin out_dir-kansioon. Ikonit skaalataan soluun kuvasuhde
+    säilyttäen ja keskitetään.
+    """
+    from PIL import Image  # build-vaiheen riippuvuus; sovellus ei tarvitse Pillowia
+
+    keys = sorted(icons)
+    if not keys:
+        raise ValueError("no icons to pack")
+    cols = math.ceil(math.sqrt(len(keys)))
+    rows = math.ceil(len(keys) / cols)
+
+    sheet = Image.new("RGBA", (cols * cell_px, rows * cell_px), (0, 0, 0, 0))
+    for idx, key in enumerate(keys):
+        with Image.open(icons[key]) as source:
+            icon = source.convert("RGBA")
+        icon.thumbnail((cell_px, cell_px), Image.Resampling.LANCZOS)
+        x = (idx % cols) * cell_px + (cell_px - icon.width) // 2
+        y = (idx // cols) * cell_px + (cell_px - icon.height) // 2
+        sheet.paste(icon, (x, y), icon)
+
+    buffer = io.BytesIO()
+    sheet.save(buffer, format="PNG", optimize=True)
+    png = buffer.getvalue()
+    version = hashlib.blake2b(png, digest_size=5).hexdigest()
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    _write_atomic(out_dir / f"{SPRITE_NAME}.png", png)
+    _write_atomic(
+        out_dir / f"{SPRITE_NAME}.css",
+        sprite_css(keys, cols, rows, version).encode("utf-8"),
+    )
+    manifest = {"version": version, "cell_px": cell_px, "cols": cols, "rows": rows, "keys": keys}
+    _write_atomic(out_dir / f"{SPRITE_NAME}.json", json.dumps(manifest, indent=2).encode("utf-8"))
+    return SpriteSheet(version=version, keys=frozenset(keys))
+
+
+def load_sprite_sheet(out_dir: Path) -> SpriteSheet | None:
+    """Manifestista SpriteSheet; None, jos spriteä ei ole rakennettu (tai se on rikki)."""
+    try:
+        manifest = json.loads((out_dir / f"{SPRITE_NAME}.json").read_text(encoding="utf-8"))
+        if not (out_dir / f"{SPRITE_NAME}.png").is_file():
+            return None
+        return SpriteSheet(version=str(manifest["version"]), keys=frozenset(manifest["keys"]))
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def main() -> None:
+    from src.weather_icons import SEARCH_DIRS, SPRITE_DIR, build_icon_index
+
+    index = build_icon_index(tuple(SEARCH_DIRS))
+    # vain oikeat tiedostot; yö/päivä-vastineet ja oletus ratkaistaan renderöinnissä
+    icons = {entry.path.stem: entry.path for entry in index.entries.values()}
+    if not icons:
+        raise SystemExit("Foreca-ikoneita ei löytynyt (assets/foreca/*.png)")
+    sheet = build_sprite(icons, SPRITE_DIR)
+    print(f"{SPRITE_DIR / SPRITE_NAME}.png: versio {sheet.version}, {len(sheet.keys)} ikonia")
+
+
+if __name__ == "__main__":
+    main()
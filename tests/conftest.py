@@ -2,6 +2,24 @@
 import sys
 from pathlib import Path
 
+import httpx
+import pytest
+
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
+
+
+@pytest.fixture
+def mock_http():
+    """
+    Korvaa yhteisen async-asiakkaan kuljetuksen:
+    mock_http(handler), jossa handler(httpx.Request) -> httpx.Response.
+    """
+    from src.api import async_http
+
+    def install(handler):
+        async_http.set_transport(httpx.MockTransport(handler))
+
+    yield install
+    async_http.set_transport(None)
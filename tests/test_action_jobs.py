@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from src.action_jobs import ActionExecutor, ActionJob, backoff_delays
+
+
+def _now(_delay_s, fn):
+    fn()
+
+
+def test_backoff_delays_double_until_cap_and_timeout():
+    assert list(backoff_delays(1.0, 2.0, 8.0, 30.0)) == [1.0, 2.0, 4.0, 8.0, 8.0, 7.0]
+    assert list(backoff_delays(1.0, 2.0, 8.0, 0.0)) == []
+
+
+def test_action_job_times_out_with_last_result():
+    job = ActionJob("t", confirm_timeout_s=3.0, schedule=_now)
+    assert job.start("on", command=lambda: None, confirm=lambda: (False, 0.0))
+    job.join(timeout=2)
+
+    snap = job.snapshot()
+    assert snap.status == "timeout"
+    assert snap.result == 0.0
+    assert snap.attempts == 2
+    assert snap.finished_within(60.0)
+
+
+def test_action_job_command_error_and_tolerated_exception():
+    def boom():
+        raise RuntimeError("HA 500")
+
+    job = ActionJob("t", schedule=_now)
+    job.start("off", command=boom)
+    job.join(timeout=2)
+    assert job.snapshot().status == "error"
+    assert job.snapshot().error == "HA 500"
+
+    job.reset()
+    job.start("off", command=boom, confirm=lambda: (True, "ok"), tolerated=(RuntimeError,))
+    job.join(timeout=2)
+    assert job.snapshot().status == "done"
+    assert job.snapshot().result == "ok"
+
+
+def test_action_job_dedupes_and_serializes_commands():
+    release = threading.Event()
+    calls: list[str] = []
+    job = ActionJob("t", schedule=_now)
+
+    assert job.start("on", command=lambda: (release.wait(), calls.append("on"))) is True
+    assert job.snapshot().active
+    # toistuva klikkaus ohitetaan, eri komento jonoon (uusin voittaa)
+    assert job.start("on", command=lambda: calls.append("on")) is False
+    assert job.start("off", command=lambda: calls.append("off-1")) is True
+    assert job.start("off", command=lambda: calls.append("off-2")) is False
+    release.set()
+    job.join(timeout=2)
+
+    assert calls == ["on", "off-1"]
+    assert job.snapshot().status == "done"
+    assert job.snapshot().action == "off"
+    assert job.snapshot().finished_within(30.0)
+    job.reset()
+    assert job.snapshot().finished_within(30.0) is False
+
+
+def test_action_job_reports_stuck_job_as_timeout():
+    release = threading.Event()
+    job = ActionJob("t", confirm_timeout_s=1.0, job_timeout_s=5.0)
+    job.start("on", command=release.wait)
+
+    started = job.snapshot().started_at
+    assert job.snapshot(now=started + 1.0).status == "pending"
+    stale = job.snapshot(now=started + 6.0)
+    assert stale.status == "timeout"
+    assert not stale.active
+    release.set()
+    job.join(timeout=2)
+
+
+def test_action_job_start_replaces_stuck_job_and_drops_queue():
+    release = threading.Event()
+    calls: list[str] = []
+    job = ActionJob("t", job_timeout_s=0.05, schedule=_now)
+    job.start("on", command=lambda: (release.wait(), calls.append("stuck")))
+    assert job.start("off", command=lambda: calls.append("queued")) is True
+    time.sleep(0.1)
+
+    # jumiutunut työ päätetään, jono tyhjennetään ja uusi komento käynnistyy
+    assert job.start("on", command=lambda: calls.append("on")) is True
+    assert job.join(timeout=2)
+    assert calls == ["on"]
+    assert job.snapshot().status == "done"
+
+    release.set()
+    time.sleep(0.05)
+    # ohitettu työ ei kirjoita tilaa eikä käynnistä jonoa
+    assert calls == ["on", "stuck"]
+    assert job.snapshot().action == "on"
+    assert job.snapshot().status == "done"
+
+
+def test_action_executor_polls_without_holding_a_worker():
+    pending = []
+    executor = ActionExecutor(max_workers=1, schedule=lambda _s, fn: pending.append(fn))
+    try:
+        executor.submit("lock", "lock", command=lambda: None, confirm=lambda: (False, None))
+        executor.submit("charge", "on", command=lambda: None)
+        assert executor.job("charge").join(timeout=2)
+        assert executor.snapshot("charge").status == "done"
+        # lukitus odottaa ajastettua tarkistusta, ei työpoolin säiettä
+        assert executor.snapshot("lock").status == "polling"
+        assert len(pending) == 1
+    finally:
+        executor.shutdown()
+
+
+def test_action_executor_runs_keys_on_bounded_pool():
+    release = threading.Event()
+    running: list[str] = []
+    executor = ActionExecutor(max_workers=1, schedule=_now)
+    try:
+        executor.submit("a", "on", command=lambda: (running.append("a"), release.wait()))
+        executor.submit("b", "on", command=lambda: running.append("b"))
+        assert executor.snapshot("b").status == "pending"
+        assert executor.snapshot("missing").status == "idle"
+        release.set()
+        assert executor.job("a").join(timeout=2)
+        assert executor.job("b").join(timeout=2)
+        assert running == ["a", "b"]
+        assert executor.job("a") is executor.job("a", poll_max_s=1.0)
+    finally:
+        executor.shutdown()
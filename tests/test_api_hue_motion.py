@@ -1,7 +1,8 @@
 from datetime import datetime
 
+import httpx
 import pytest
-from requests import Session
+import requests
 
 from src.api.hue_motion import (
     _parse_lastupdated,
@@ -25,91 +26,58 @@ def test_parse_lastupdated_invalid():
     assert _parse_lastupdated("not-a-time") is None
 
 
-class DummyResp:
-    """Simulates requests.Response for JSON return."""
+RAW_SENSORS = {
+    "1": {
+        "name": "Etuovi",
+        "type": "ZLLContact",
+        "state": {"open": True, "lastupdated": "2024-01-01T10:00:00"},
+    },
+    "2": {
+        "name": "Motion1",
+        "type": "ZLLMotion",
+        "state": {"presence": True, "lastupdated": "2024-01-01T11:00:00"},
+    },
+    # ignored type
+    "3": {"name": "Temp", "type": "ZLLTemperature", "state": {}},
+}
 
-    def __init__(self, payload, status=200):
-        self._payload = payload
-        self._status = status
 
-    def raise_for_status(self):
-        if self._status != 200:
-            raise RuntimeError("HTTP error")
+def test_fetch_hue_sensors_basic(monkeypatch, mock_http):
+    called_urls: list[str] = []
 
-    def json(self):
-        return self._payload
-
-
-class DummySession(Session):
-    """Simulates requests.Session with get()."""
-
-    def __init__(self, payload):
-        super().__init__()
-        self.payload = payload
-        self.called_urls: list[tuple[str, float | None]] = []
-
-    def get(self, url, timeout=None, **kwargs):  # type: ignore[override]
-        self.called_urls.append((url, timeout))
-        return DummyResp(self.payload)
-
-
-def test_fetch_hue_sensors_basic(monkeypatch):
-    raw = {
-        "1": {
-            "name": "Etuovi",
-            "type": "ZLLContact",
-            "state": {"open": True, "lastupdated": "2024-01-01T10:00:00"},
-        },
-        "2": {
-            "name": "Motion1",
-            "type": "ZLLMotion",
-            "state": {"presence": True, "lastupdated": "2024-01-01T11:00:00"},
-        },
-        # ignored type
-        "3": {"name": "Temp", "type": "ZLLTemperature", "state": {}},
-    }
-
-    sess = DummySession(raw)
+    def handler(request: httpx.Request) -> httpx.Response:
+        called_urls.append(str(request.url))
+        return httpx.Response(200, json=RAW_SENSORS)
 
+    mock_http(handler)
     monkeypatch.setattr(
-        "src.api.hue_motion.st.secrets",
+        "src.settings.st.secrets",
         {"hue": {"bridge_host": "host", "bridge_user": "user"}},
         raising=False,
     )
 
-    sensors = fetch_hue_door_sensors(session=sess)
+    sensors = fetch_hue_door_sensors()
 
     assert len(sensors) == 2
     names = {s.name for s in sensors}
     assert {"Etuovi", "Motion1"} <= names
+    assert called_urls == ["http://host/api/user/sensors"]
 
 
 def test_fetch_hue_sensors_missing_env(monkeypatch):
-    monkeypatch.setattr("src.api.hue_motion.st.secrets", {}, raising=False)
+    monkeypatch.setattr("src.settings.st.secrets", {}, raising=False)
 
     with pytest.raises(RuntimeError):
-        fetch_hue_door_sensors(session=DummySession({}))
-
-
-def test_fetch_hue_sensors_http_error(monkeypatch):
-    class BadResp:
-        def raise_for_status(self):
-            raise RuntimeError("fail")
+        fetch_hue_door_sensors()
 
-        def json(self):
-            return {}
-
-    class BadSession(Session):
-        """Session, joka simuloi HTTP-virheen."""
-
-        def get(self, *args, **kwargs):  # type: ignore[override]
-            return BadResp()
 
+def test_fetch_hue_sensors_http_error(monkeypatch, mock_http):
+    mock_http(lambda request: httpx.Response(500))
     monkeypatch.setattr(
-        "src.api.hue_motion.st.secrets",
+        "src.settings.st.secrets",
         {"hue": {"bridge_host": "host", "bridge_user": "user"}},
         raising=False,
     )
 
-    with pytest.raises(RuntimeError):
-        fetch_hue_door_sensors(session=BadSession())
+    with pytest.raises(requests.HTTPError):
+        fetch_hue_door_sensors()
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import httpx
+import pytest
+import requests
+
+from src.api import async_http
+
+
+def test_run_sync_returns_result_and_propagates_errors():
+    async def ok() -> int:
+        return 42
+
+    async def boom() -> None:
+        raise ValueError("boom")
+
+    assert async_http.run_sync(ok()) == 42
+    with pytest.raises(ValueError, match="boom"):
+        async_http.run_sync(boom())
+
+
+def test_run_sync_from_loop_thread_is_rejected():
+    async def nested() -> None:
+        async def inner() -> None:
+            return None
+
+        async_http.run_sync(inner())
+
+    with pytest.raises(RuntimeError, match="awaitia"):
+        async_http.run_sync(nested())
+
+
+def test_requests_run_concurrently_on_one_loop(mock_http):
+    arrived: list[str] = []
+    threads: set[str] = set()
+    all_in = asyncio.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        arrived.append(request.url.path)
+        threads.add(threading.current_thread().name)
+        if len(arrived) == 3:
+            all_in.set()
+        # kaikki kolme pyyntöä ovat kesken yhtä aikaa
+        await asyncio.wait_for(all_in.wait(), timeout=5)
+        return httpx.Response(200, json={"path": request.url.path})
+
+    mock_http(handler)
+
+    async def fan_out() -> list[dict]:
+        responses = await asyncio.gather(
+            *(async_http.request("GET", f"https://example.com/{n}") for n in (1, 2, 3))
+        )
+        return [resp.json() for resp in responses]
+
+    assert async_http.run_sync(fan_out(), timeout=10) == [
+        {"path": "/1"},
+        {"path": "/2"},
+        {"path": "/3"},
+    ]
+    assert threads == {async_http.LOOP_THREAD_NAME}
+
+
+def test_errors_are_mapped_to_requests_exceptions(mock_http):
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/slow":
+            raise httpx.ReadTimeout("slow", request=request)
+        if request.url.path == "/down":
+            raise httpx.ConnectError("down", request=request)
+        return httpx.Response(404, text="Entity not found")
+
+    mock_http(handler)
+
+    with pytest.raises(requests.Timeout):
+        async_http.run_sync(async_http.request("GET", "https://example.com/slow"))
+    with pytest.raises(requests.ConnectionError):
+        async_http.run_sync(async_http.request("GET", "https://example.com/down"))
+
+    resp = async_http.run_sync(async_http.request("GET", "https://example.com/missing"))
+    with pytest.raises(requests.HTTPError) as excinfo:
+        async_http.raise_for_status(resp)
+    assert excinfo.value.response.status_code == 404
+    assert excinfo.value.response.text == "Entity not found"
+
+
+def test_clients_are_shared_and_pooled(mock_http):
+    mock_http(lambda request: httpx.Response(204))
+
+    async def clients() -> tuple[httpx.AsyncClient, httpx.AsyncClient, httpx.AsyncClient]:
+        await async_http.request("GET", "https://example.com/")
+        return async_http._client(True), async_http._client(True), async_http._client(False)
+
+    first, again, insecure = async_http.run_sync(clients())
+
+    assert first is again
+    assert insecure is not first
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+
+from benchmarks import suite
+from benchmarks.offline import load_fixture, offline_dashboard, rebase_prices
+
+
+def test_rebase_prices_moves_recorded_day_to_today():
+    items = rebase_prices(load_fixture("porssisahko_latest.json"), today=date(2026, 10, 19))
+    starts = sorted(item["startDate"] for item in items["prices"])
+    # tallenne alkaa paikallisesta keskiyöstä (UTC+3 kesäaikaa)
+    assert starts[0] == "2026-10-18T21:00:00.000Z"
+    assert len(starts) == 192
+
+
+def test_page_renders_offline_from_recordings():
+    import main
+
+    with offline_dashboard() as env:
+        main.main()
+
+    assert env.transport.unmatched == []
+    assert env.transport.requests["ha.bench.invalid"] > 0
+    assert env.st.calls["plotly_chart"] == 2  # bitcoin + sähkö
+    assert env.st.calls["html"] >= 2  # sää, EQE, järjestelmä
+
+
+def test_suite_runs_every_case_once(tmp_path):
+    results = suite.run_suite(number=1, repeat=1, echo=None)
+
+    assert set(results) == set(suite.CASES)
+    assert all(result.best_ms >= 0 for result in results.values())
+
+    path = suite.save_results(results, "base", folder=tmp_path)
+    assert suite.load_results(str(path)) == results
+
+
+def test_compare_marks_regressions():
+    base = {"page.cold": suite.CaseResult(100.0, 110.0, 10, 5)}
+    head = {
+        "page.cold": suite.CaseResult(125.0, 130.0, 10, 5),
+        "weather.parse": suite.CaseResult(0.5, 0.6, 200, 5),
+    }
+
+    rows = suite.compare(base, head)
+    assert rows[0] == ("page.cold", 100.0, 125.0, pytest.approx(1.25))
+    assert rows[1] == ("weather.parse", None, 0.5, None)
+    assert "hitaampi" in suite.format_comparison(rows)
+
+
+@pytest.fixture
+def fake_upstream(monkeypatch):
+    from benchmarks.fake_upstream import FakeUpstream, FaultProfile
+    from src.upstream_override import FAKE_UPSTREAM_ENV
+
+    fake = FakeUpstream(profiles={"api.coingecko.com": FaultProfile(rate_limit_rate=1.0)})
+    with fake.start():
+        monkeypatch.setenv(FAKE_UPSTREAM_ENV, fake.address)
+        yield fake
+
+
+def test_simulator_serves_http_heos_and_rate_limits(fake_upstream):
+    import requests
+
+    from src.api.http_client import http_get_json
+    from src.heos_client import HeosClient
+
+    assert http_get_json("https://zenquotes.io/api/today")[0]["a"]
+    assert HeosClient("192.0.2.1").get_volume(1) == 24
+
+    resp = requests.get(
+        f"http://{fake_upstream.address}/api.coingecko.com/api/v3/simple/price", timeout=5
+    )
+    assert resp.status_code == 429
+    assert resp.headers["Retry-After"] == "1"
+
+    stats = fake_upstream.stats()
+    assert stats["zenquotes.io"]["requests"] == 1
+    assert stats["heos"]["requests"] == 1
+    assert stats["api.coingecko.com"]["rate_limited"] == 1
+
+
+def test_load_driver_renders_sessions_against_simulator():
+    from benchmarks.load_driver import run_load
+
+    report = run_load(sessions=2, duration_s=0.1, interval_s=0.05)
+
+    assert report.renders >= 2
+    assert report.failures == 0
+    assert report.upstream["ha.bench.invalid:8123"]["requests"] > 0
+    assert report.upstream["heos"]["requests"] > 0
@@ -9,15 +9,8 @@ import src.api.calendar_nameday as caln
 
 
 def _clear_calendar_caches():
-    """Tyhjentää cachetut Streamlit-funktiot, jotta testit saavat uudet arvot."""
-    try:
-        caln.fetch_nameday_today.clear()
-    except Exception:
-        pass
-    try:
-        caln.fetch_holiday_today.clear()
-    except Exception:
-        pass
+    """Tyhjentää kalenteri-indeksin, jotta testit saavat uudet arvot."""
+    caln.clear_calendar_cache()
 
 
 def _set_fixed_today(monkeypatch):
@@ -156,3 +149,46 @@ def test_fetch_holiday_today_missing_file(monkeypatch, tmp_path):
 
     out = caln.fetch_holiday_today(_cache_buster=13)
     assert out == {"holiday": None, "is_flag_day": False, "is_holiday": False}
+
+
+# --- indeksi ---------------------------------------------------------
+
+
+def test_calendar_index_serves_today_tomorrow_and_flag_days(monkeypatch, tmp_path):
+    """Molemmat tiedostot luetaan kerran; haut eivät lue tiedostoja uudelleen."""
+    _set_fixed_today(monkeypatch)
+
+    names = tmp_path / "nimipaivat.json"
+    names.write_text(
+        json.dumps({"nimipäivät": {"marraskuu": {"11": "Panu", "12": "Kirsti"}}}),
+        encoding="utf-8",
+    )
+    holidays = tmp_path / "pyhat.json"
+    holidays.write_text(
+        json.dumps(
+            {
+                "2025-11-09": {"name": "Isänpäivä", "flag": True},
+                "2025-12-06": {"name": "Itsenäisyyspäivä", "flag": True, "holiday": True},
+                "12-24": {"name": "Jouluaatto", "is_holiday": True},
+                "01-01": {"name": "Uudenvuodenpäivä", "flag": True},
+            }
+        ),
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(caln, "_resolve_nameday_file", lambda: names)
+    monkeypatch.setattr(caln, "HOLIDAY_PATHS", [holidays])
+    _clear_calendar_caches()
+
+    loads = []
+    real_load = caln._load_nameday_data
+    monkeypatch.setattr(caln, "_load_nameday_data", lambda p: loads.append(p) or real_load(p))
+
+    assert caln.calendar_today().names == "Panu"
+    assert caln.calendar_tomorrow().names == "Kirsti"
+    assert caln.fetch_holiday_today()["holiday"] is None
+    assert caln.next_flag_days(2) == [
+        (dt.date(2025, 12, 6), "Itsenäisyyspäivä"),
+        (dt.date(2026, 1, 1), "Uudenvuodenpäivä"),
+    ]
+    assert caln.calendar_index().day(dt.date(2030, 12, 24)).holiday.is_holiday is True
+    assert loads == [names, holidays]
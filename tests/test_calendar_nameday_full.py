@@ -32,8 +32,7 @@ def test_fetch_nameday_today_happy(tmp_path, monkeypatch):
     fake_today = dt.datetime(2024, 11, 11, 12, 0, tzinfo=api.TZ)
     _freeze_today(monkeypatch, fake_today)
 
-    # käytetään dekoroinnin alla olevaa alkuperäistä funktiota
-    out = api.fetch_nameday_today.__wrapped__(_cache_buster=1)  # type: ignore[attr-defined]
+    out = api.fetch_nameday_today(_cache_buster=1)
     assert out == "Panu"
 
 
@@ -44,7 +43,7 @@ def test_fetch_nameday_today_missing_file(tmp_path, monkeypatch):
     fake_today = dt.datetime(2024, 11, 11, 12, 0, tzinfo=api.TZ)
     _freeze_today(monkeypatch, fake_today)
 
-    out = api.fetch_nameday_today.__wrapped__(_cache_buster=2)  # type: ignore[attr-defined]
+    out = api.fetch_nameday_today(_cache_buster=2)
     assert out == "—"
 
 
@@ -60,7 +59,7 @@ def test_fetch_holiday_today_happy(tmp_path, monkeypatch):
     fake_today = dt.datetime(2024, 11, 11, 12, 0, tzinfo=api.TZ)
     _freeze_today(monkeypatch, fake_today)
 
-    out = api.fetch_holiday_today.__wrapped__(_cache_buster=3)  # type: ignore[attr-defined]
+    out = api.fetch_holiday_today(_cache_buster=3)
     assert out["holiday"] == "X"
     assert out["is_flag_day"] is True
     assert "is_holiday" in out
@@ -72,7 +71,7 @@ def test_fetch_holiday_today_missing_file(tmp_path, monkeypatch):
     fake_today = dt.datetime(2024, 11, 11, 12, 0, tzinfo=api.TZ)
     _freeze_today(monkeypatch, fake_today)
 
-    out = api.fetch_holiday_today.__wrapped__(_cache_buster=4)  # type: ignore[attr-defined]
+    out = api.fetch_holiday_today(_cache_buster=4)
     assert out == {
         "holiday": None,
         "is_flag_day": False,
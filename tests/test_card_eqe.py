@@ -3,6 +3,7 @@ from __future__ import annotations
 import importlib
 from datetime import datetime, timezone
 
+from src.action_jobs import ActionJob
 from src.api.home_assistant import EqeStatus, HAConfigError
 
 
@@ -59,12 +60,13 @@ def _make_status(now: datetime, **overrides) -> EqeStatus:
 class FakeFetch:
     def __init__(self, value):
         self.value = value
+        self.cleared = 0
 
     def __call__(self):
         return self.value
 
     def clear(self):
-        pass
+        self.cleared += 1
 
 
 def test_card_eqe_renders_basic(monkeypatch):
@@ -250,11 +252,11 @@ def test_card_eqe_charge_query_param_success(monkeypatch):
 
     called = {}
 
-    def fake_set_enabled(enabled: bool):
+    def fake_start(enabled: bool):
         called["enabled"] = enabled
+        return True
 
-    monkeypatch.setattr(card_mod, "set_eqe_charging_enabled", fake_set_enabled)
-    monkeypatch.setattr(card_mod, "refresh_eqe_charging_power", lambda: None)
+    monkeypatch.setattr(card_mod, "_start_charge_job", fake_start)
 
     card_mod.card_eqe()
 
@@ -308,15 +310,17 @@ def test_card_eqe_lock_job_error_surface(monkeypatch):
     monkeypatch.setattr(card_mod, "eqe_preclimate_configured", lambda: False)
     monkeypatch.setattr(card_mod, "eqe_charging_switch_configured", lambda: False)
 
-    snapshots = iter(
-        [
-            {"status": "error", "error": "boom"},
-            {"status": "idle"},
-            {"status": "idle"},
-        ]
+    def boom(_locked):
+        raise RuntimeError("boom")
+
+    job = ActionJob("test_lock", schedule=lambda _s, fn: fn())
+    monkeypatch.setattr(card_mod, "_LOCK_JOB", job)
+    monkeypatch.setattr(
+        card_mod, "_CONTROLS", ((job, "eqe_lock_msg", "Lukituksen ohjaus epäonnistui"),)
     )
-    monkeypatch.setattr(card_mod, "_lock_job_snapshot", lambda: next(snapshots))
-    monkeypatch.setattr(card_mod, "_reset_lock_job", lambda: None)
+    monkeypatch.setattr(card_mod, "set_eqe_lock", boom)
+    assert card_mod._start_lock_job("lock") is True
+    job.join(timeout=2)
 
     now = datetime(2024, 1, 1, tzinfo=timezone.utc)
     monkeypatch.setattr(card_mod, "fetch_eqe_status", FakeFetch(_make_status(now)))
@@ -324,7 +328,17 @@ def test_card_eqe_lock_job_error_surface(monkeypatch):
 
     card_mod.card_eqe()
 
-    assert any("Lukituksen ohjaus" in msg for msg in dummy.error_calls)
+    assert any("Lukituksen ohjaus epäonnistui: boom" in msg for msg in dummy.error_calls)
+    # virhe jää tilannekuvaan muille kioskeille; sama istunto näyttää sen kerran
+    assert job.snapshot().status == "error"
+    dummy.error_calls.clear()
+    card_mod.card_eqe()
+    assert dummy.error_calls == []
+
+    other = DummySt()
+    monkeypatch.setattr(card_mod, "st", other)
+    card_mod.card_eqe()
+    assert any("Lukituksen ohjaus epäonnistui: boom" in msg for msg in other.error_calls)
 
 
 def test_card_eqe_helper_functions():
@@ -362,3 +376,62 @@ def test_card_eqe_helper_functions():
 
     assert card_mod._soc_color(85.0) is not None
     assert card_mod._range_color(250.0) is not None
+
+
+def test_charge_job_confirms_power_in_background(monkeypatch):
+    card_mod = _get_card_module()
+    sleeps: list[float] = []
+    job = ActionJob(
+        "test_charging",
+        confirm_timeout_s=30.0,
+        schedule=lambda delay, fn: (sleeps.append(delay), fn()),
+    )
+    monkeypatch.setattr(card_mod, "_CHARGE_JOB", job)
+
+    commands = []
+    readings = iter([(0.0, "kW", None), (None, None, None), (7.2, "kW", None)])
+    monkeypatch.setattr(card_mod, "set_eqe_charging_enabled", commands.append)
+    monkeypatch.setattr(card_mod, "refresh_eqe_charging_power", lambda: None)
+    monkeypatch.setattr(card_mod, "fetch_eqe_charging_power", lambda: next(readings))
+
+    assert card_mod._start_charge_job(True) is True
+    job.join(timeout=2)
+
+    snap = job.snapshot()
+    assert commands == [True]
+    assert snap.status == "done"
+    assert snap.action == "on"
+    assert snap.result == (7.2, "kW")
+    # eksponentiaalinen backoff: 1 s, 2 s, 4 s
+    assert sleeps == [1.0, 2.0, 4.0]
+
+
+def test_card_eqe_refresh_goes_through_coordinator(monkeypatch):
+    card_mod = _get_card_module()
+    monkeypatch.setattr(card_mod, "section_title", lambda *a, **k: None)
+    monkeypatch.setattr(card_mod, "st_html", lambda *a, **k: None)
+    monkeypatch.setattr(card_mod, "_get_eqe_background", lambda: "")
+    monkeypatch.setattr(card_mod, "_get_mercedes_logo_svg_data", lambda: "")
+    monkeypatch.setattr(card_mod, "eqe_lock_configured", lambda: False)
+    monkeypatch.setattr(card_mod, "eqe_preclimate_configured", lambda: False)
+    monkeypatch.setattr(card_mod, "eqe_charging_switch_configured", lambda: False)
+    monkeypatch.setattr(card_mod, "fetch_eqe_charging_power", lambda: (None, None, None))
+
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    fetch = FakeFetch(_make_status(now, charging_state="idle", charging_switch_on=False))
+    monkeypatch.setattr(card_mod, "fetch_eqe_status", fetch)
+    requests_seen = []
+
+    def fake_request(last_changed=None):
+        requests_seen.append(last_changed)
+        return len(requests_seen) == 1
+
+    monkeypatch.setattr(card_mod, "request_eqe_status_refresh", fake_request)
+
+    # kaksi kioskia: kumpikin pyytää, vain ensimmäinen päivitys tehdään
+    for _ in range(2):
+        monkeypatch.setattr(card_mod, "st", DummySt())
+        card_mod.card_eqe()
+
+    assert requests_seen == [now, now]
+    assert fetch.cleared == 1
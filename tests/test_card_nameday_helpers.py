@@ -2,6 +2,7 @@
 import datetime as dt
 import json
 
+import src.api.calendar_nameday as caln
 from src.ui import card_nameday_helpers as h
 
 
@@ -13,8 +14,8 @@ def test_get_flag_info_ok(tmp_path, monkeypatch):
         encoding="utf-8",
     )
 
-    # ohitetaan tiedostonhaku → käytetään tätä väliaikaista polkua
-    monkeypatch.setattr("src.ui.card_nameday_helpers.find_pyhat_file", lambda: p)
+    # ohjataan pyhätiedosto tähän väliaikaiseen polkuun
+    monkeypatch.setattr(caln, "HOLIDAY_PATHS", [p])
 
     txt, dbg = h.get_flag_info(dt.datetime(2024, 11, 11))
 
@@ -27,7 +28,7 @@ def test_get_flag_info_missing(tmp_path, monkeypatch):
     p.parent.mkdir(parents=True)
     p.write_text(json.dumps({}), encoding="utf-8")
 
-    monkeypatch.setattr("src.ui.card_nameday_helpers.find_pyhat_file", lambda: p)
+    monkeypatch.setattr(caln, "HOLIDAY_PATHS", [p])
 
     txt, dbg = h.get_flag_info(dt.datetime(2024, 11, 11))
 
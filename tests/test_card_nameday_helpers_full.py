@@ -1,8 +1,10 @@
 import base64
 import json
+import os
 from datetime import datetime
 from pathlib import Path
 
+import src.api.calendar_nameday as caln
 import src.ui.card_nameday_helpers as h
 
 # ----------------------------
@@ -33,34 +35,6 @@ def test_background_image_missing(monkeypatch):
     assert out == ""
 
 
-# ----------------------------
-# find_pyhat_file()
-# ----------------------------
-
-
-def test_find_pyhat_file_cwd(tmp_path, monkeypatch):
-    # Luo data/pyhat_fi.json nykyiseen hakemistoon
-    data_dir = tmp_path / "data"
-    data_dir.mkdir()
-    target = data_dir / "pyhat_fi.json"
-    target.write_text("{}", encoding="utf-8")
-
-    # patchaa CWD
-    monkeypatch.chdir(tmp_path)
-
-    found = h.find_pyhat_file()
-    assert found == target
-
-
-def test_find_pyhat_file_none(monkeypatch):
-    # Estä sekä cwd että __file__ polut
-    monkeypatch.setattr(Path, "cwd", lambda: Path("/nope/nope"))
-    monkeypatch.setattr(h, "__file__", "/nope/nope/helpers.py")
-
-    out = h.find_pyhat_file()
-    assert out is None
-
-
 # ----------------------------
 # get_flag_info()
 # ----------------------------
@@ -71,8 +45,8 @@ def test_flag_info_flag_true(tmp_path, monkeypatch):
     p.parent.mkdir(parents=True)
     p.write_text(json.dumps({"2024-11-11": {"flag": True, "name": "Itsenäisyyspäivä"}}))
 
-    # patchaa find_pyhat_file palauttamaan tämän
-    monkeypatch.setattr(h, "find_pyhat_file", lambda: p)
+    # ohjataan pyhätiedosto tähän väliaikaiseen tiedostoon
+    monkeypatch.setattr(caln, "HOLIDAY_PATHS", [p])
 
     txt, dbg = h.get_flag_info(datetime(2024, 11, 11))
     assert txt == "Itsenäisyyspäivä"
@@ -85,15 +59,15 @@ def test_flag_info_json_read_fails(tmp_path, monkeypatch):
     p.parent.mkdir(parents=True)
     p.write_text("{NOT JSON")
 
-    monkeypatch.setattr(h, "find_pyhat_file", lambda: p)
+    monkeypatch.setattr(caln, "HOLIDAY_PATHS", [p])
 
     txt, dbg = h.get_flag_info(datetime(2024, 11, 11))
     assert txt is None
     assert "ei voitu lukea" in dbg.lower()
 
 
-def test_flag_info_missing_file(monkeypatch):
-    monkeypatch.setattr(h, "find_pyhat_file", lambda: None)
+def test_flag_info_missing_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(caln, "HOLIDAY_PATHS", [tmp_path / "missing.json"])
 
     txt, dbg = h.get_flag_info(datetime(2024, 11, 11))
     assert txt is None
@@ -105,8 +79,20 @@ def test_flag_info_missing_key(tmp_path, monkeypatch):
     p.parent.mkdir(parents=True)
     p.write_text(json.dumps({"2024-01-01": {"flag": False, "name": "Uudenvuodenpäivä"}}))
 
-    monkeypatch.setattr(h, "find_pyhat_file", lambda: p)
+    monkeypatch.setattr(caln, "HOLIDAY_PATHS", [p])
 
     txt, dbg = h.get_flag_info(datetime(2024, 11, 11))
     assert txt is None
     assert "avainta" in dbg.lower() or "avaimet" in dbg.lower()
+
+
+def test_flag_info_sees_file_change(tmp_path, monkeypatch):
+    p = tmp_path / "pyhat_fi.json"
+    p.write_text(json.dumps({}), encoding="utf-8")
+    monkeypatch.setattr(caln, "HOLIDAY_PATHS", [p])
+    assert h.get_flag_info(datetime(2024, 11, 11))[0] is None
+
+    p.write_text(json.dumps({"2024-11-11": {"flag": True, "name": "Isänpäivä"}}), encoding="utf-8")
+    stat = p.stat()
+    os.utime(p, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert h.get_flag_info(datetime(2024, 11, 11)) == ("Isänpäivä", None)
@@ -17,35 +17,40 @@ def test_card_pollen_renders_view(monkeypatch):
     dummy = DummySt()
     monkeypatch.setattr(card_pollen_module, "st", dummy)
     monkeypatch.setattr(card_pollen_module, "section_title", lambda *a, **k: None)
+    requested: list[tuple] = []
     monkeypatch.setattr(
         card_pollen_module,
         "fetch_pollen_view",
-        lambda: {
-            "location": "Riihimäki",
-            "source": "Turun yliopiston siitepölytiedotus",
-            "updated": "3.5.2026",
-            "summary": "Ilmassa: Koivu",
-            "plants": [
-                {
-                    "key": "koivu",
-                    "name": "Koivu",
-                    "level": "runsaasti",
-                    "forecast_level": "runsaasti",
-                    "forecast": "Koivun määrä pysyy runsaana.",
-                },
-                {
-                    "key": "heinät",
-                    "name": "Heinät",
-                    "level": "ei havaittu",
-                    "forecast_level": "ei havaittu",
-                    "forecast": "Ei erillistä ennustetta.",
-                },
-            ],
-        },
+        lambda *args: (
+            requested.append(args)
+            or {
+                "location": "Riihimäki",
+                "source": "Turun yliopiston siitepölytiedotus",
+                "updated": "3.5.2026",
+                "summary": "Ilmassa: Koivu",
+                "plants": [
+                    {
+                        "key": "koivu",
+                        "name": "Koivu",
+                        "level": "runsaasti",
+                        "forecast_level": "runsaasti",
+                        "forecast": "Koivun määrä pysyy runsaana.",
+                    },
+                    {
+                        "key": "heinät",
+                        "name": "Heinät",
+                        "level": "ei havaittu",
+                        "forecast_level": "ei havaittu",
+                        "forecast": "Ei erillistä ennustetta.",
+                    },
+                ],
+            }
+        ),
     )
 
-    card_pollen_module.card_pollen()
+    card_pollen_module.card_pollen(station="Lahti", location="Lahti")
 
+    assert requested == [("Lahti", "Lahti")]
     html = dummy.markdowns[0]
     assert "Koivu" in html
     assert "runsaasti" in html
@@ -59,7 +64,7 @@ def test_card_pollen_renders_view(monkeypatch):
 
 
 def test_card_pollen_shows_error_card(monkeypatch):
-    def boom():
+    def boom(*args):
         raise RuntimeError("pollen unavailable")
 
     called: list[tuple[str, str]] = []
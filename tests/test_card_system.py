@@ -66,3 +66,35 @@ def test_card_system_handles_exception(monkeypatch):
     card_mod.card_system()
 
     assert "Virhe" in captured["text"]
+
+
+def test_card_system_perf_panel_is_optional(monkeypatch):
+    from src.metrics import MetricsRegistry
+    from src.process_stats import ProcessStats
+
+    reg = MetricsRegistry()
+    reg.observe("card", "card_weather", 0.120)
+    reg.observe("upstream", "ha_state", 0.350)
+    monkeypatch.setattr(card_mod, "REGISTRY", reg)
+    monkeypatch.setattr(
+        card_mod,
+        "process_stats",
+        lambda: ProcessStats(rss_bytes=150 * 1_048_576, cpu_percent=12.4, sessions=2),
+    )
+    monkeypatch.setattr(card_mod, "section_title", lambda *a, **k: None)
+    monkeypatch.setattr(card_mod, "get_ip", lambda: "1.2.3.4")
+    rendered = []
+    monkeypatch.setattr(card_mod, "st_html", lambda html, **kw: rendered.append((html, kw)))
+
+    monkeypatch.setattr(card_mod, "_perf_panel_enabled", lambda: False)
+    card_mod.card_system()
+    assert len(rendered) == 1
+
+    monkeypatch.setattr(card_mod, "_perf_panel_enabled", lambda: True)
+    card_mod.card_system()
+    panel, kw = rendered[-1]
+    assert len(rendered) == 3
+    assert "card_weather" in panel and "120 ms" in panel
+    assert "ha_state" in panel and "350 ms" in panel
+    assert "150 MB" in panel and "12 %" in panel and "Istunnot:</span> 2" in panel
+    assert kw["height"] > 0
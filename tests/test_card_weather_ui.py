@@ -9,6 +9,13 @@ from src.ui.card_weather import card_weather
 card_weather_module = importlib.import_module("src.ui.card_weather")
 
 
+@pytest.fixture(autouse=True)
+def _clear_render_cache():
+    card_weather_module.clear_weather_render_cache()
+    yield
+    card_weather_module.clear_weather_render_cache()
+
+
 class DummySt:
     """Kevyt stub streamlitille card_weather-testejä varten."""
 
@@ -24,6 +31,11 @@ def test_card_weather_happy_path(monkeypatch):
     vm = {
         "min_temp": 1.2,
         "max_temp": 3.4,
+        "current": {"temp": 2.4, "feels_like": -0.6},
+        "alerts": [
+            {"date": "2025-11-11", "kind": "wind", "text": "Tuulenpuuskia 17 m/s"},
+            {"date": "2025-11-12", "kind": "rain", "text": "Runsasta sadetta 25 mm"},
+        ],
         "points": [
             {"label": "Nyt", "hour": 12, "key": "d000", "temp": 2.0, "pop": 42},
             {"label": "14", "hour": 14, "key": "d000", "temp": 3.0, "pop": 10},
@@ -72,6 +84,8 @@ def test_card_weather_happy_path(monkeypatch):
     title = titles[0]
     assert "Sää — Riihimäki" in title
     assert "Tänään:" in title
+    assert "Nyt 2°C (tuntuu -1°C)" in title
+    assert "⚠️ Tuulenpuuskia 17 m/s +1" in title
 
     html = rendered["html"]
     assert "Nyt" in html
@@ -145,3 +159,79 @@ def test_card_weather_shows_error_card_on_exception(monkeypatch):
     title, body = called_cards[0]
     assert "Sää — Riihimäki" in title
     assert "Virhe: oops" in body
+
+
+def test_render_weather_html_reuses_unchanged_cells(monkeypatch):
+    rendered_icons: list[str] = []
+
+    def fake_icon(key, size=48):
+        rendered_icons.append(key)
+        return f"<icon {key}>"
+
+    monkeypatch.setattr(card_weather_module, "render_foreca_icon", fake_icon)
+    points = [
+        {"label": "Nyt", "hour": 12, "key": "d000", "temp": 2.0, "pop": 42},
+        {"label": "+3 h", "hour": 15, "key": "d100", "temp": 3.0, "pop": 10},
+    ]
+
+    first = card_weather_module.render_weather_html(points)
+    # sama ennuste uudelleen (myös pyöristyksen sisällä muuttunut lämpötila)
+    again = card_weather_module.render_weather_html([{**points[0], "temp": 2.2}, points[1]])
+    assert again is first
+    assert rendered_icons == ["d000", "d100"]
+
+    changed = card_weather_module.render_weather_html([points[0], {**points[1], "key": "d410"}])
+    assert rendered_icons == ["d000", "d100", "d410"]
+    assert "<icon d410>" in changed
+    assert changed.count("weather-cell") == first.count("weather-cell")
+
+
+def test_render_weather_html_links_sprite_stylesheet(monkeypatch):
+    rendered_icons: list[str] = []
+
+    def fake_icon(key, size=48):
+        rendered_icons.append(key)
+        return f"<icon {key}>"
+
+    href = {"value": None}
+    monkeypatch.setattr(card_weather_module, "render_foreca_icon", fake_icon)
+    monkeypatch.setattr(card_weather_module, "sprite_stylesheet", lambda: href["value"])
+    points = [{"label": "Nyt", "hour": 12, "key": "d000", "temp": 2.0, "pop": 42}]
+
+    plain = card_weather_module.render_weather_html(points)
+    assert "<link" not in plain
+
+    # sprite rakennettiin: solut renderöidään uudelleen ja CSS linkitetään
+    href["value"] = "app/static/foreca_sprite.css?v=abc"
+    linked = card_weather_module.render_weather_html(points)
+    assert '<link rel="stylesheet" href="app/static/foreca_sprite.css?v=abc">' in linked
+    assert rendered_icons == ["d000", "d000"]
+    assert card_weather_module.render_weather_html(points) is linked
+
+
+def test_render_weather_html_concurrent_sessions_get_their_own_document(monkeypatch):
+    import threading
+
+    monkeypatch.setattr(card_weather_module, "render_foreca_icon", lambda key, size=48: key)
+    monkeypatch.setattr(card_weather_module, "_CELL_CACHE_MAX", 2)
+    # kaksi istuntoa eri väleillä (1 h / 3 h) renderöi vuorotellen samaan välimuistiin
+    sessions = {
+        "1h": [{"label": "Nyt", "hour": h, "key": "d000", "temp": 1.0, "pop": 0} for h in (1, 2)],
+        "3h": [{"label": "Nyt", "hour": h, "key": "d100", "temp": 5.0, "pop": 0} for h in (3, 6)],
+    }
+    wrong: list[str] = []
+
+    def render(name: str) -> None:
+        marker = "d000" if name == "1h" else "d100"
+        for _ in range(200):
+            document = card_weather_module.render_weather_html(sessions[name])
+            if marker not in document:
+                wrong.append(name)
+
+    threads = [threading.Thread(target=render, args=(name,)) for name in sessions]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert wrong == []
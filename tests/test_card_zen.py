@@ -8,6 +8,13 @@ import src.api.quotes as quotes
 # ------------------------
 
 
+def _returns(value):
+    async def fake():
+        return value
+
+    return fake
+
+
 def _clear_quote_cache():
     # streamlitin @st.cache_data antaa .clear()
     if hasattr(quotes.fetch_daily_quote, "clear"):
@@ -20,14 +27,14 @@ def test_fetch_daily_quote_prefers_zenquotes(monkeypatch):
     # 1. lähde palauttaa
     monkeypatch.setattr(
         quotes,
-        "_from_zenquotes",
-        lambda: {"text": "A", "author": "B", "source": "zenquotes"},
+        "_from_zenquotes_async",
+        _returns({"text": "A", "author": "B", "source": "zenquotes"}),
     )
     # tämä ei saisi edes tulla käytetyksi
     monkeypatch.setattr(
         quotes,
-        "_from_quotable",
-        lambda: {"text": "C", "author": "D", "source": "quotable"},
+        "_from_quotable_async",
+        _returns({"text": "C", "author": "D", "source": "quotable"}),
     )
 
     result = quotes.fetch_daily_quote("2025-11-11")
@@ -39,11 +46,11 @@ def test_fetch_daily_quote_prefers_zenquotes(monkeypatch):
 def test_fetch_daily_quote_uses_quotable_if_zenquotes_fails(monkeypatch):
     _clear_quote_cache()
 
-    monkeypatch.setattr(quotes, "_from_zenquotes", lambda: None)
+    monkeypatch.setattr(quotes, "_from_zenquotes_async", _returns(None))
     monkeypatch.setattr(
         quotes,
-        "_from_quotable",
-        lambda: {"text": "Q", "author": "W", "source": "quotable"},
+        "_from_quotable_async",
+        _returns({"text": "Q", "author": "W", "source": "quotable"}),
     )
 
     result = quotes.fetch_daily_quote("2025-11-11")
@@ -55,8 +62,8 @@ def test_fetch_daily_quote_uses_quotable_if_zenquotes_fails(monkeypatch):
 def test_fetch_daily_quote_fallback_to_local(monkeypatch):
     _clear_quote_cache()
 
-    monkeypatch.setattr(quotes, "_from_zenquotes", lambda: None)
-    monkeypatch.setattr(quotes, "_from_quotable", lambda: None)
+    monkeypatch.setattr(quotes, "_from_zenquotes_async", _returns(None))
+    monkeypatch.setattr(quotes, "_from_quotable_async", _returns(None))
 
     result = quotes.fetch_daily_quote("2025-11-11")
 
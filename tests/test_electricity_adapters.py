@@ -42,16 +42,17 @@ def test_electricity_adapters_handle_weird_data(monkeypatch, func_name, scenario
     if func_name == "get_hourly_from_porssisahko":
         # tämä funktio tekee:
         # latest = fetch_from_porssisahko_latest()
-        # per_hour = filter_latest_to_day(latest, date)
+        # out = hourly_prices_from_latest(latest, date)
         if scenario == "empty_latest":
             monkeypatch.setattr(adapters, "fetch_from_porssisahko_latest", lambda: None)
         elif scenario == "no_data_for_day":
             monkeypatch.setattr(adapters, "fetch_from_porssisahko_latest", lambda: {"some": "data"})
-            monkeypatch.setattr(adapters, "filter_latest_to_day", lambda *_: {})
+            monkeypatch.setattr(adapters, "hourly_prices_from_latest", lambda *_: [])
         elif scenario == "one_hour_ok":
-            # palautetaan päivän data siten, että filter_latest_to_day saa tunnin 0 kaksi arvoa
             monkeypatch.setattr(adapters, "fetch_from_porssisahko_latest", lambda: {"raw": "ok"})
-            monkeypatch.setattr(adapters, "filter_latest_to_day", lambda *_: {0: [5.0, 7.0]})
+            monkeypatch.setattr(
+                adapters, "hourly_prices_from_latest", lambda *_: [{"hour": 0, "cents": 6.0}]
+            )
         result = func(TODAY)
 
     elif func_name == "get_15min_from_porssisahko":
@@ -0,0 +1,103 @@
+import datetime as dt
+
+import numpy as np
+
+from src.api.electricity_batch import (
+    PayloadSchema,
+    detect_schema,
+    expand_hours_to_quarters,
+    hourly_means,
+    normalize_payload_15min,
+    parse_payload,
+)
+from src.config import TZ
+
+DAY = dt.date(2025, 11, 11)
+
+
+def _v2(start: str, price: float) -> dict:
+    return {"startDate": start, "endDate": start, "price": price}
+
+
+def test_detect_schema_reads_first_item_once():
+    schema = detect_schema([_v2("2025-11-11T00:00:00.000Z", 5.0), {"time": "x", "cents": 1}])
+    assert schema == PayloadSchema(ts_key="startDate", cents_key="price", is_v2=True)
+    assert detect_schema([]) is None
+    assert detect_schema(["not a dict"]) is None
+
+
+def test_parse_payload_returns_typed_arrays_and_drops_broken_rows():
+    items = [
+        _v2("2025-11-11T00:00:00.000Z", 5.0),
+        _v2("not-a-datetime", 6.0),
+        {"startDate": "2025-11-11T00:30:00.000Z", "price": None},
+        _v2("2025-11-11T00:45:00.000Z", 0.0),
+    ]
+    arrays = parse_payload(items)
+
+    assert arrays.ts.dtype == np.int64
+    assert arrays.cents.dtype == np.float64
+    assert len(arrays) == 2
+    # nollahinta on kelvollinen hinta
+    assert arrays.cents.tolist() == [5.0, 0.0]
+
+
+def test_parse_payload_handles_naive_local_and_offset_timestamps():
+    naive = parse_payload([{"time": "2025-11-11T02:00:00", "cents": 7.0}])
+    offset = parse_payload([{"time": "2025-11-11T02:00:00+02:00", "cents": 7.0}])
+    expected = dt.datetime(2025, 11, 11, 2, 0, tzinfo=TZ).timestamp()
+
+    assert naive.ts.tolist() == [expected]
+    assert offset.ts.tolist() == [expected]
+
+
+def test_parse_payload_converts_old_euro_values_to_cents():
+    arrays = parse_payload([{"time": "2025-11-11T02:00:00", "value": 0.05}])
+    assert arrays.cents.tolist() == [5.0]
+
+
+def test_normalize_payload_15min_filters_sorts_and_dedupes():
+    items = [
+        _v2("2025-11-11T00:15:00.000Z", 5.5),
+        _v2("2025-11-11T00:00:00.000Z", 5.0),
+        _v2("2025-11-11T00:07:00.000Z", 9.9),  # pyöristyy 00:00, ensimmäinen voittaa
+        _v2("2025-11-11T22:00:00.000Z", 1.0),  # Helsingissä jo 12.11.
+    ]
+    rows = normalize_payload_15min(items, DAY).to_price15()
+
+    assert [row["cents"] for row in rows] == [5.0, 5.5]
+    assert rows[0]["ts"] == dt.datetime(2025, 11, 11, 2, 0, tzinfo=TZ)
+    assert all(row["ts"].date() == DAY for row in rows)
+
+
+def test_hourly_means_averages_quarters_per_local_hour():
+    items = [
+        _v2("2025-11-11T07:00:00.000Z", 4.0),
+        _v2("2025-11-11T07:15:00.000Z", 6.0),
+        _v2("2025-11-11T08:00:00.000Z", 3.0),
+    ]
+    hours, means = hourly_means(parse_payload(items), DAY)
+
+    # UTC 07 -> Helsinki 09
+    assert hours.tolist() == [9, 10]
+    assert means.tolist() == [5.0, 3.0]
+
+
+def test_expand_hours_to_quarters_repeats_each_hour_four_times():
+    arrays = expand_hours_to_quarters(np.array([0, 1]), np.array([5.0, 6.0]), DAY)
+    rows = arrays.to_price15()
+
+    assert len(rows) == 8
+    assert rows[0]["ts"] == dt.datetime(2025, 11, 11, 0, 0, tzinfo=TZ)
+    assert rows[3]["ts"] == dt.datetime(2025, 11, 11, 0, 45, tzinfo=TZ)
+    assert [row["cents"] for row in rows] == [5.0] * 4 + [6.0] * 4
+
+
+def test_dst_fall_back_day_keeps_both_repeated_hours():
+    start = dt.datetime(2025, 10, 25, 21, 0, tzinfo=dt.timezone.utc)
+    items = [
+        _v2((start + dt.timedelta(minutes=15 * q)).strftime("%Y-%m-%dT%H:%M:%S.000Z"), 1.0)
+        for q in range(25 * 4)
+    ]
+    arrays = normalize_payload_15min(items, dt.date(2025, 10, 26))
+    assert len(arrays) == 100
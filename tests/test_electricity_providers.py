@@ -0,0 +1,109 @@
+# tests/test_electricity_providers.py
+import datetime as dt
+import threading
+
+import pytest
+
+import src.api.electricity_providers as ep
+
+DAY = dt.date(2025, 11, 11)
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(ep, "_REGISTRY", {})
+    monkeypatch.setattr(ep, "_HEALTH", {})
+    return ep
+
+
+def _provider(name, fetch, **kwargs):
+    return ep.PriceProvider(name=name, fetch=fetch, **kwargs)
+
+
+def test_supports_respects_date_window():
+    p = _provider("a", lambda d: None, days_back=1, days_ahead=1)
+    assert p.supports(DAY, DAY)
+    assert p.supports(DAY - dt.timedelta(days=1), DAY)
+    assert not p.supports(DAY - dt.timedelta(days=2), DAY)
+    assert not p.supports(DAY + dt.timedelta(days=2), DAY)
+
+
+def test_providers_for_orders_by_window_health_and_priority(registry):
+    registry.register_provider(_provider("primary", lambda d: None, priority=0))
+    registry.register_provider(_provider("backup", lambda d: None, priority=10))
+    registry.register_provider(_provider("recent", lambda d: None, priority=-5, days_back=0))
+
+    names = [p.name for p in registry.providers_for(DAY, today=DAY + dt.timedelta(days=3))]
+    # ikkunan ulkopuolinen viimeiseksi, tasapisteillä priority ratkaisee
+    assert names == ["primary", "backup", "recent"]
+
+    for _ in range(3):
+        registry.provider_health("primary").record(False, 0.1, "boom")
+    names = [p.name for p in registry.providers_for(DAY, today=DAY)]
+    assert names[0] == "recent"
+    assert names[-1] == "primary"
+
+    registry.reset_provider_health()
+    names = [p.name for p in registry.providers_for(DAY, today=DAY)]
+    assert names == ["recent", "primary", "backup"]
+
+
+def test_providers_for_filters_by_resolution(registry):
+    registry.register_provider(_provider("hourly", lambda d: None, resolution_min=60))
+    registry.register_provider(_provider("quarter", lambda d: None, resolution_min=15))
+
+    names = [p.name for p in registry.providers_for(DAY, today=DAY, resolution_min=15)]
+    assert names == ["quarter"]
+
+
+def test_hedged_fetch_hedges_slow_primary(registry):
+    release = threading.Event()
+
+    def slow(d):
+        release.wait(2.0)
+        return [{"hour": 0, "cents": 1.0}]
+
+    primary = _provider("slow", slow, latency_slo_s=0.05)
+    backup = _provider("fast", lambda d: [{"hour": 0, "cents": 2.0}])
+    try:
+        out = registry.hedged_fetch([primary, backup], DAY)
+    finally:
+        release.set()
+    assert out == [{"hour": 0, "cents": 2.0}]
+
+
+def test_hedged_fetch_falls_back_on_error_and_records_health(registry):
+    calls = []
+
+    def broken(d):
+        calls.append("broken")
+        raise RuntimeError("down")
+
+    def ok(d):
+        calls.append("ok")
+        return [{"hour": 3, "cents": 4.0}]
+
+    providers = [_provider("broken", broken), _provider("ok", ok)]
+    assert registry.hedged_fetch(providers, DAY) == [{"hour": 3, "cents": 4.0}]
+    assert calls == ["broken", "ok"]
+
+    assert registry.provider_health("broken").snapshot()["last_error"] == "down"
+    assert registry.provider_health("ok").snapshot()["successes"] == 1
+
+
+def test_hedged_fetch_returns_none_when_all_empty(registry):
+    providers = [_provider("a", lambda d: []), _provider("b", lambda d: None)]
+    assert registry.hedged_fetch(providers, DAY) is None
+    assert registry.hedged_fetch([], DAY) is None
+
+
+def test_empty_result_is_neutral_for_health(registry):
+    # huomisen hintoja ei ole vielä julkaistu: tyhjä vastaus ei ole virhe
+    registry.register_provider(_provider("a", lambda d: []))
+    assert registry.hedged_fetch([registry._REGISTRY["a"]], DAY) is None
+
+    snap = registry.provider_health("a").snapshot()
+    assert snap["successes"] == 0
+    assert snap["failures"] == 0
+    assert snap["last_error"] is None
+    assert snap["ewma_latency_s"] is not None
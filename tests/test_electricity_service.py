@@ -1,37 +1,52 @@
 # tests/test_electricity_service.py
 import datetime as dt
 
+import requests
+
+import src.api.electricity_adapters as adapters
 import src.api.electricity_service as es
 import src.api.electricity_service as svc
+import src.api.electricity_sources as sources
+from src.api.electricity_providers import provider_health, reset_provider_health
+from src.config import TZ
 
 
 def test_fetch_prices_for_uses_primary_first(monkeypatch):
-    day = dt.date(2025, 11, 11)
+    # tämä päivä on pörssisähkön ikkunassa (days_back=1), joten se on ensisijainen
+    day = dt.datetime.now(TZ).date()
+    reset_provider_health()
+    fallback_calls: list[dt.date] = []
 
     # ensisijainen lähde palauttaa
     monkeypatch.setattr(
-        "src.api.electricity_service.get_hourly_from_porssisahko",
+        "src.api.electricity_service.fetch_hourly_porssisahko",
         lambda d: [{"hour": 0, "cents": 5.0}],
     )
-    # varalähde ei saisi edes tulla kutsutuksi, mutta annetaan tyhjä
+
+    # varalähde ei saa edes tulla kutsutuksi
+    def fallback(d):
+        fallback_calls.append(d)
+        raise AssertionError("varalähdettä ei pitänyt kutsua")
+
     monkeypatch.setattr(
-        "src.api.electricity_service.get_hourly_from_sahkonhintatanaan",
-        lambda d: [],
+        "src.api.electricity_service.fetch_hourly_sahkonhintatanaan",
+        fallback,
     )
 
     out = svc.fetch_prices_for(day)
     assert out == [{"hour": 0, "cents": 5.0}]
+    assert fallback_calls == []
 
 
 def test_fetch_prices_for_falls_back_to_sahkonhintatanaan(monkeypatch):
     day = dt.date(2025, 11, 11)
 
     monkeypatch.setattr(
-        "src.api.electricity_service.get_hourly_from_porssisahko",
+        "src.api.electricity_service.fetch_hourly_porssisahko",
         lambda d: [],
     )
     monkeypatch.setattr(
-        "src.api.electricity_service.get_hourly_from_sahkonhintatanaan",
+        "src.api.electricity_service.fetch_hourly_sahkonhintatanaan",
         lambda d: [{"hour": 1, "cents": 10.0}],
     )
 
@@ -39,6 +54,29 @@ def test_fetch_prices_for_falls_back_to_sahkonhintatanaan(monkeypatch):
     assert out == [{"hour": 1, "cents": 10.0}]
 
 
+def test_fetch_prices_for_records_adapter_http_failure_in_health(monkeypatch):
+    day = dt.datetime.now(TZ).date()
+    reset_provider_health()
+
+    async def fake_http_get_json(url):
+        if "porssisahko" in url:
+            raise requests.ConnectionError("porssisahko down")
+        return {"prices": [{"hour": 1, "cents": 10.0}]}
+
+    monkeypatch.setattr(sources, "http_get_json_async", fake_http_get_json)
+    monkeypatch.setattr(adapters, "log_raw_prices", lambda *a, **k: None)
+    monkeypatch.setattr(adapters, "normalize_prices_list", lambda raw, d: raw)
+    monkeypatch.setattr(svc, "report_error", lambda *a, **k: None)
+
+    assert svc.fetch_prices_for(day) == [{"hour": 1, "cents": 10.0}]
+
+    failed = provider_health("porssisahko").snapshot()
+    assert failed["failures"] == 1
+    assert failed["last_error"] == "porssisahko down"
+    assert provider_health("sahkonhintatanaan").snapshot()["successes"] == 1
+    reset_provider_health()
+
+
 def test_try_fetch_prices_15min_prefers_direct_15min(monkeypatch):
     day = dt.date(2025, 11, 11)
 
@@ -27,11 +27,11 @@ def test_filter_latest_to_day_groups_by_hour_and_day():
 def test_fetch_from_sahkonhintatanaan_dict_with_prices(monkeypatch):
     date = dt.date(2023, 1, 1)
 
-    def fake_http_get_json(url: str):
+    async def fake_http_get_json(url: str):
         assert "sahkonhintatanaan" in url
         return {"prices": [{"hour": 0, "cents": 5.0}]}
 
-    monkeypatch.setattr(es, "http_get_json", fake_http_get_json)
+    monkeypatch.setattr(es, "http_get_json_async", fake_http_get_json)
 
     out = es.fetch_from_sahkonhintatanaan(date)
     assert out == [{"hour": 0, "cents": 5.0}]
@@ -40,10 +40,10 @@ def test_fetch_from_sahkonhintatanaan_dict_with_prices(monkeypatch):
 def test_fetch_from_sahkonhintatanaan_dict_without_prices_returns_empty(monkeypatch):
     date = dt.date(2023, 1, 1)
 
-    def fake_http_get_json(_url: str):
+    async def fake_http_get_json(_url: str):
         return {"foo": "bar"}
 
-    monkeypatch.setattr(es, "http_get_json", fake_http_get_json)
+    monkeypatch.setattr(es, "http_get_json_async", fake_http_get_json)
 
     out = es.fetch_from_sahkonhintatanaan(date)
     assert out == []
@@ -53,14 +53,14 @@ def test_fetch_from_sahkonhintatanaan_list_and_none(monkeypatch):
     date = dt.date(2023, 1, 1)
     calls: list[int] = []
 
-    def fake_http_get_json(_url: str):
+    async def fake_http_get_json(_url: str):
         # ensimmäinen kutsu: lista, toinen: None
         if not calls:
             calls.append(1)
             return [{"hour": 0, "cents": 3.0}]
         return None
 
-    monkeypatch.setattr(es, "http_get_json", fake_http_get_json)
+    monkeypatch.setattr(es, "http_get_json_async", fake_http_get_json)
 
     out1 = es.fetch_from_sahkonhintatanaan(date)
     out2 = es.fetch_from_sahkonhintatanaan(date)
@@ -106,3 +106,20 @@ def test_filter_latest_to_day_collects_prices_for_matching_day():
     # tunti 2: kaksi varttia, tunti 3: yksi
     assert out[2] == [1.0, 2.0]
     assert out[3] == [3.0]
+
+
+def test_hourly_prices_from_latest_averages_quarters():
+    date = dt.date(2023, 1, 1)
+
+    items = [
+        {"startDate": "2023-01-01T00:00:00Z", "price": 1.0},
+        {"startDate": "2023-01-01T00:15:00Z", "price": 2.0},
+        {"startDate": "2023-01-01T01:00:00Z", "price": 3.0},
+        {"startDate": "2023-01-02T01:00:00Z", "price": 99.0},
+    ]
+
+    assert es.hourly_prices_from_latest(items, date) == [
+        {"hour": 2, "cents": 1.5},
+        {"hour": 3, "cents": 3.0},
+    ]
+    assert es.hourly_prices_from_latest([], date) == []
@@ -5,6 +5,7 @@ from datetime import datetime
 import pytest
 
 import src.api.home_assistant as ha
+from src.settings import HASettings, load_ha_settings
 
 
 def test_get_secret_prefers_top_level(monkeypatch):
@@ -34,7 +35,7 @@ def test_get_secret_env_fallback(monkeypatch):
 
 
 def test_require_config_missing_token(monkeypatch):
-    monkeypatch.setattr(ha, "_get_secret", lambda name: None)
+    monkeypatch.setattr(ha, "ha_settings", lambda: load_ha_settings(lambda name: None))
     with pytest.raises(RuntimeError):
         ha._require_config()
 
@@ -47,7 +48,7 @@ def test_require_config_missing_base_url(monkeypatch):
         "HA_EQE_RANGE_ENTITY": "sensor.range",
         "HA_EQE_CHARGING_ENTITY": "sensor.charge",
     }
-    monkeypatch.setattr(ha, "_get_secret", lambda name: vals.get(name))
+    monkeypatch.setattr(ha, "ha_settings", lambda: load_ha_settings(vals.get))
     with pytest.raises(ha.HAConfigError):
         ha._require_config()
 
@@ -61,7 +62,7 @@ def test_require_config_ok(monkeypatch):
         "HA_EQE_CHARGING_ENTITY": "sensor.charge",
         "HA_EQE_LOCK_ENTITY": "lock.eqe",
     }
-    monkeypatch.setattr(ha, "_get_secret", lambda name: vals.get(name))
+    monkeypatch.setattr(ha, "ha_settings", lambda: load_ha_settings(vals.get))
     cfg = ha._require_config()
     assert cfg["base_url"] == "http://ha"
     assert cfg["charging_entity"] == "sensor.charge"
@@ -127,14 +128,10 @@ def test_set_eqe_lock_uses_lock_domain_and_code(monkeypatch):
         "charging_switch_entity": None,
     }
     monkeypatch.setattr(ha, "_require_config", lambda: cfg)
-    monkeypatch.setattr(
-        ha,
-        "_get_secret",
-        lambda name: "1234" if name == "HA_EQE_LOCK_CODE" else None,
-    )
+    monkeypatch.setattr(ha, "ha_settings", lambda: HASettings(lock_code="1234"))
     called = {}
 
-    def fake_call_service(base_url, token, domain, service, data, session=None, timeout_s=None):
+    def fake_call_service(base_url, token, domain, service, data, timeout_s=None):
         called["domain"] = domain
         called["service"] = service
         called["data"] = data
@@ -165,10 +162,10 @@ def test_set_eqe_lock_switch_domain(monkeypatch):
         "charging_switch_entity": None,
     }
     monkeypatch.setattr(ha, "_require_config", lambda: cfg)
-    monkeypatch.setattr(ha, "_get_secret", lambda name: None)
+    monkeypatch.setattr(ha, "ha_settings", HASettings)
     called = {}
 
-    def fake_call_service(base_url, token, domain, service, data, session=None, timeout_s=None):
+    def fake_call_service(base_url, token, domain, service, data, timeout_s=None):
         called["domain"] = domain
         called["service"] = service
         called["data"] = data
@@ -199,17 +196,14 @@ def test_refresh_eqe_lock_status_with_service(monkeypatch):
     }
     monkeypatch.setattr(ha, "_require_config", lambda: cfg)
 
-    def fake_get_secret(name):
-        data = {
-            "HA_EQE_LOCK_REFRESH_SERVICE": "homeassistant.update_entity",
-            "HA_EQE_LOCK_REFRESH_ENTITY": "lock.refresh",
-        }
-        return data.get(name)
-
-    monkeypatch.setattr(ha, "_get_secret", fake_get_secret)
+    settings = HASettings(
+        lock_refresh_service="homeassistant.update_entity",
+        lock_refresh_entity="lock.refresh",
+    )
+    monkeypatch.setattr(ha, "ha_settings", lambda: settings)
     called = {}
 
-    def fake_call_service(base_url, token, domain, service, data, session=None, timeout_s=None):
+    def fake_call_service(base_url, token, domain, service, data, timeout_s=None):
         called["domain"] = domain
         called["service"] = service
         called["data"] = data
@@ -240,10 +234,10 @@ def test_refresh_eqe_status_entities_default_update(monkeypatch):
         "charging_switch_entity": "switch.charge",
     }
     monkeypatch.setattr(ha, "_require_config", lambda: cfg)
-    monkeypatch.setattr(ha, "_get_secret", lambda name: None)
+    monkeypatch.setattr(ha, "ha_settings", HASettings)
     called = {}
 
-    def fake_call_service(base_url, token, domain, service, data, session=None, timeout_s=None):
+    def fake_call_service(base_url, token, domain, service, data, timeout_s=None):
         called["domain"] = domain
         called["service"] = service
         called["data"] = data
@@ -283,18 +277,17 @@ def test_refresh_eqe_status_entities_custom_service(monkeypatch):
     }
     monkeypatch.setattr(ha, "_require_config", lambda: cfg)
 
-    def fake_get_secret(name):
-        data = {
+    settings = load_ha_settings(
+        {
             "HA_EQE_REFRESH_SERVICE": "button.press",
             "HA_EQE_REFRESH_ENTITY": "button.eqe_refresh",
             "HA_EQE_REFRESH_DATA": '{"mode":"force"}',
-        }
-        return data.get(name)
-
-    monkeypatch.setattr(ha, "_get_secret", fake_get_secret)
+        }.get
+    )
+    monkeypatch.setattr(ha, "ha_settings", lambda: settings)
     called = {}
 
-    def fake_call_service(base_url, token, domain, service, data, session=None, timeout_s=None):
+    def fake_call_service(base_url, token, domain, service, data, timeout_s=None):
         called["domain"] = domain
         called["service"] = service
         called["data"] = data
@@ -317,7 +310,7 @@ def test_fetch_eqe_charging_power(monkeypatch):
     }
     monkeypatch.setattr(ha, "_require_config", lambda: cfg)
 
-    def fake_fetch_state(base_url, token, entity_id, session=None):
+    def fake_fetch_state(base_url, token, entity_id):
         return {
             "state": "1.5",
             "attributes": {"unit_of_measurement": "kW"},
@@ -342,7 +335,7 @@ def test_fetch_eqe_lock_state(monkeypatch):
     }
     monkeypatch.setattr(ha, "_require_config", lambda: cfg)
 
-    def fake_fetch_state(base_url, token, entity_id, session=None):
+    def fake_fetch_state(base_url, token, entity_id):
         return {
             "state": "unlocked",
             "attributes": {"doorlockstatusvehicle": "2"},
@@ -377,7 +370,7 @@ def test_fetch_eqe_status_basic(monkeypatch):
     }
     monkeypatch.setattr(ha, "_require_config", lambda: cfg)
 
-    def fake_fetch_state(base_url, token, entity_id, session=None):
+    async def fake_fetch_state(base_url, token, entity_id):
         if entity_id == cfg["soc_entity"]:
             return {
                 "state": "85",
@@ -419,7 +412,7 @@ def test_fetch_eqe_status_basic(monkeypatch):
             }
         return {}
 
-    monkeypatch.setattr(ha, "_fetch_state", fake_fetch_state)
+    monkeypatch.setattr(ha, "_fetch_state_async", fake_fetch_state)
     if hasattr(ha.fetch_eqe_status, "clear"):
         ha.fetch_eqe_status.clear()
 
@@ -431,3 +424,84 @@ def test_fetch_eqe_status_basic(monkeypatch):
     assert status.charging_switch_on is True
     assert status.lock_state_source == "doorlockstatusvehicle"
     assert status.last_changed is not None
+
+
+def test_request_eqe_status_refresh_is_process_wide(monkeypatch):
+    calls: list[str] = []
+    monkeypatch.setattr(ha, "_REFRESH", ha.RefreshCoordinator())
+    monkeypatch.setattr(ha, "ha_eqe_refresh_interval_s", lambda: 300.0)
+    monkeypatch.setattr(ha, "refresh_eqe_status_entities", lambda: calls.append("status"))
+
+    async def refresh_state() -> None:
+        calls.append("state")
+
+    async def power_fails() -> None:
+        raise RuntimeError("sensor unavailable")
+
+    monkeypatch.setattr(ha, "refresh_eqe_charging_state_async", refresh_state)
+    monkeypatch.setattr(ha, "refresh_eqe_charging_power_async", power_fails)
+
+    assert ha.request_eqe_status_refresh() is True
+    assert ha.request_eqe_status_refresh() is False
+    # toinen avain: lataustila päivittyy, vaikka teho epäonnistuu
+    assert ha.request_eqe_charging_refresh() is True
+    assert ha.request_eqe_charging_refresh() is False
+    assert calls == ["status", "state"]
+
+
+def test_fetch_eqe_states_fetches_entities_concurrently(monkeypatch):
+    import asyncio
+
+    cfg = {
+        "base_url": "http://ha",
+        "token": "token",
+        "soc_entity": "sensor.soc",
+        "range_entity": "sensor.range",
+        "charging_entity": "sensor.charge",
+        "lock_entity": "lock.eqe",
+        "lock_status_entity": None,
+        "preclimate_entity": None,
+        "charging_power_entity": None,
+        "charging_switch_entity": None,
+    }
+    monkeypatch.setattr(ha, "_require_config", lambda: cfg)
+    # neljä pakollista/määritettyä entiteettiä odottavat toisiaan -> haut rinnakkain
+    all_in = asyncio.Event()
+    fetched: list[str] = []
+
+    async def fake_fetch_state(base_url, token, entity_id):
+        fetched.append(entity_id)
+        if len(fetched) == 4:
+            all_in.set()
+        await asyncio.wait_for(all_in.wait(), timeout=5)
+        return {"state": "85" if entity_id == "sensor.soc" else "unknown"}
+
+    monkeypatch.setattr(ha, "_fetch_state_async", fake_fetch_state)
+
+    ha.fetch_eqe_status.clear()
+    status = ha.fetch_eqe_status()
+    ha.fetch_eqe_status.clear()
+
+    assert status.soc_pct == 85.0
+    assert sorted(fetched) == ["lock.eqe", "sensor.charge", "sensor.range", "sensor.soc"]
+
+
+def test_fetch_state_and_call_service_use_shared_client(monkeypatch, mock_http):
+    import httpx
+
+    seen: list[tuple[str, str, str]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append((request.method, request.url.path, request.headers["Authorization"]))
+        if request.method == "POST":
+            return httpx.Response(200, json=[])
+        return httpx.Response(200, json={"state": "on"})
+
+    mock_http(handler)
+
+    assert ha._fetch_state("http://ha", "tok", "switch.x") == {"state": "on"}
+    assert ha._call_service("http://ha", "tok", "switch", "turn_off", {"entity_id": "x"}) == []
+    assert seen == [
+        ("GET", "/api/states/switch.x", "Bearer tok"),
+        ("POST", "/api/services/switch/turn_off", "Bearer tok"),
+    ]
@@ -1,42 +1,29 @@
 from __future__ import annotations
 
+import httpx
 import pytest
+import requests
 
 import src.api.http_client as http_client
 
 
-class DummyResp:
-    def __init__(self, status: int, payload: dict | None = None, headers: dict | None = None):
-        self.status_code = status
-        self._payload = payload or {}
-        self.headers = headers or {}
-
-    def raise_for_status(self) -> None:
-        if self.status_code >= 400 and self.status_code not in (403, 429):
-            raise RuntimeError("http error")
-
-    def json(self) -> dict:
-        return self._payload
+def test_http_get_json_coingecko_backoff_active(monkeypatch, mock_http):
+    monkeypatch.setattr(http_client, "_coingecko_backoff_active", lambda: True)
 
+    def fail(request: httpx.Request) -> httpx.Response:
+        raise AssertionError("should not call")
 
-def test_http_get_json_coingecko_backoff_active(monkeypatch):
-    monkeypatch.setattr(http_client, "_coingecko_backoff_active", lambda: True)
-    monkeypatch.setattr(
-        http_client.requests,
-        "get",
-        lambda *a, **k: (_ for _ in ()).throw(AssertionError("should not call")),
-    )
+    mock_http(fail)
 
     with pytest.raises(http_client.RateLimitBackoff):
         http_client.http_get_json("https://api.coingecko.com/api/v3/ping")
 
 
-def test_http_get_json_coingecko_429_sets_backoff(monkeypatch):
+def test_http_get_json_coingecko_429_sets_backoff(monkeypatch, mock_http):
     monkeypatch.setattr(http_client.time, "time", lambda: 1000.0)
     http_client._COINGECKO_BACKOFF_UNTIL = 0.0
 
-    resp = DummyResp(429, headers={"Retry-After": "2"})
-    monkeypatch.setattr(http_client.requests, "get", lambda *a, **k: resp)
+    mock_http(lambda request: httpx.Response(429, headers={"Retry-After": "2"}))
 
     with pytest.raises(http_client.RateLimitBackoff):
         http_client.http_get_json("https://api.coingecko.com/api/v3/ping")
@@ -44,17 +31,17 @@ def test_http_get_json_coingecko_429_sets_backoff(monkeypatch):
     assert http_client._COINGECKO_BACKOFF_UNTIL == 1002.0
 
 
-def test_http_get_json_non_coingecko_retries(monkeypatch):
+def test_http_get_json_non_coingecko_retries(monkeypatch, mock_http):
     calls = {"n": 0}
 
-    def fake_get(url, *a, **k):
+    def handler(request: httpx.Request) -> httpx.Response:
         calls["n"] += 1
         if calls["n"] == 1:
-            return DummyResp(429)
-        return DummyResp(200, payload={"ok": True})
+            return httpx.Response(429)
+        return httpx.Response(200, json={"ok": True})
 
-    monkeypatch.setattr(http_client.requests, "get", fake_get)
-    monkeypatch.setattr(http_client.time, "sleep", lambda *_: None)
+    mock_http(handler)
+    monkeypatch.setattr(http_client, "RETRY_DELAY_S", 0.0)
 
     out = http_client.http_get_json("https://example.com/api")
 
@@ -62,22 +49,51 @@ def test_http_get_json_non_coingecko_retries(monkeypatch):
     assert calls["n"] == 2
 
 
-def test_http_get_json_reports_error(monkeypatch):
+def test_http_get_json_reports_error(monkeypatch, mock_http):
     captured: dict[str, str] = {}
 
     def fake_report_error(ctx: str, err: Exception) -> None:
         captured["ctx"] = ctx
         captured["err"] = str(err)
 
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("boom", request=request)
+
     monkeypatch.setattr(http_client, "report_error", fake_report_error)
-    monkeypatch.setattr(
-        http_client.requests,
-        "get",
-        lambda *a, **k: (_ for _ in ()).throw(RuntimeError("boom")),
-    )
+    mock_http(handler)
 
-    with pytest.raises(RuntimeError):
+    with pytest.raises(requests.ConnectionError):
         http_client.http_get_json("https://example.com/api")
 
     assert "http_get_json" in captured["ctx"]
     assert "boom" in captured["err"]
+
+
+def test_http_get_json_raises_requests_http_error_with_response(mock_http):
+    mock_http(lambda request: httpx.Response(404, json={"message": "not found"}))
+
+    with pytest.raises(requests.HTTPError) as excinfo:
+        http_client.http_get_json("https://example.com/api")
+
+    assert excinfo.value.response.status_code == 404
+
+
+def test_api_request_with_retry_posts_json_and_gives_up(monkeypatch, mock_http):
+    seen: list[tuple[str, bytes]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append((request.method, request.content))
+        return httpx.Response(503)
+
+    mock_http(handler)
+    monkeypatch.setattr(http_client.asyncio, "sleep", _no_sleep)
+
+    assert (
+        http_client.api_request_with_retry("https://example.com/x", "POST", 2, json={"a": 1})
+        is None
+    )
+    assert seen == [("POST", b'{"a":1}'), ("POST", b'{"a":1}')]
+
+
+async def _no_sleep(_delay: float) -> None:
+    return None
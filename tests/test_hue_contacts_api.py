@@ -2,8 +2,10 @@
 
 from datetime import datetime, timezone
 
+import httpx
 import pytest
 
+from src.api import async_http
 from src.api.hue_contacts_v2 import (
     HueContactSensor,
     HueV2ConfigError,
@@ -13,43 +15,29 @@ from src.api.hue_contacts_v2 import (
 )
 
 
-class DummyResp:
-    def __init__(self, payload, status=200):
-        self._payload = payload
-        self._status = status
-
-    def raise_for_status(self):
-        if self._status != 200:
-            raise RuntimeError("http error")
-
-    def json(self):
-        return self._payload
-
-
 def test_require_v2_config_missing(monkeypatch):
     # patchataan moduulin globaalit, ei ympäristömuuttujia
-    monkeypatch.setattr("src.api.hue_contacts_v2.st.secrets", {}, raising=False)
+    monkeypatch.setattr("src.settings.st.secrets", {}, raising=False)
 
     with pytest.raises(HueV2ConfigError):
         _hue_v2_get("/clip/v2/resource/device")
 
 
-def test_hue_v2_get_builds_url_and_headers(monkeypatch):
+def test_hue_v2_get_builds_url_and_headers(monkeypatch, mock_http):
     called = {}
 
-    def fake_get(url, headers, timeout, verify):
-        called["url"] = url
-        called["headers"] = headers
-        called["timeout"] = timeout
-        called["verify"] = verify
-        return DummyResp({"data": []})
+    def handler(request: httpx.Request) -> httpx.Response:
+        called["url"] = str(request.url)
+        called["headers"] = request.headers
+        called["timeout"] = request.extensions["timeout"]["read"]
+        return httpx.Response(200, json={"data": []})
 
     monkeypatch.setattr(
-        "src.api.hue_contacts_v2.st.secrets",
+        "src.settings.st.secrets",
         {"hue": {"bridge_host": "bridge", "v2_app_key": "app-key"}},
         raising=False,
     )
-    monkeypatch.setattr("src.api.hue_contacts_v2.requests.get", fake_get)
+    mock_http(handler)
 
     data = _hue_v2_get("/clip/v2/resource/device")
 
@@ -57,7 +45,8 @@ def test_hue_v2_get_builds_url_and_headers(monkeypatch):
     assert called["url"] == "https://bridge/clip/v2/resource/device"
     assert called["headers"]["hue-application-key"] == "app-key"
     assert called["timeout"] == 5
-    assert called["verify"] is False
+    # sillan itse allekirjoitettu varmenne: oma verify=False-asiakas
+    assert False in async_http._CLIENTS
 
 
 def test_parse_iso8601_none_and_invalid():
@@ -76,7 +65,7 @@ def test_parse_iso8601_valid_z_suffix():
 
 def test_fetch_hue_contact_sensors_basic(monkeypatch):
     # Patchataan v2-get niin, että se palauttaa eri payloadit polusta riippuen
-    def fake_v2_get(path: str):
+    async def fake_v2_get(path: str):
         if path == "/clip/v2/resource/device":
             return {
                 "data": [
@@ -117,10 +106,10 @@ def test_fetch_hue_contact_sensors_basic(monkeypatch):
             }
         raise AssertionError(f"unexpected path {path}")
 
-    monkeypatch.setattr("src.api.hue_contacts_v2._hue_v2_get", fake_v2_get)
+    monkeypatch.setattr("src.api.hue_contacts_v2._hue_v2_get_async", fake_v2_get)
     # varmista, että konfiguraatio näyttää olevan kunnossa
     monkeypatch.setattr(
-        "src.api.hue_contacts_v2.st.secrets",
+        "src.settings.st.secrets",
         {"hue": {"bridge_host": "bridge", "v2_app_key": "key"}},
         raising=False,
     )
@@ -138,7 +127,7 @@ def test_fetch_hue_contact_sensors_basic(monkeypatch):
 
 
 def test_fetch_hue_contact_sensors_unknown_state(monkeypatch):
-    def fake_v2_get(path: str):
+    async def fake_v2_get(path: str):
         if path == "/clip/v2/resource/device":
             return {
                 "data": [
@@ -163,9 +152,9 @@ def test_fetch_hue_contact_sensors_unknown_state(monkeypatch):
             }
         raise AssertionError
 
-    monkeypatch.setattr("src.api.hue_contacts_v2._hue_v2_get", fake_v2_get)
+    monkeypatch.setattr("src.api.hue_contacts_v2._hue_v2_get_async", fake_v2_get)
     monkeypatch.setattr(
-        "src.api.hue_contacts_v2.st.secrets",
+        "src.settings.st.secrets",
         {"hue": {"bridge_host": "bridge", "v2_app_key": "key"}},
         raising=False,
     )
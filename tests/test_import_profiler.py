@@ -0,0 +1,35 @@
+# tests/test_import_profiler.py
+import src.import_profiler as ip
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       300 |        800 |   encodings
+import time:      1000 |       5000 | streamlit
+import time:        50 |         50 |     streamlit.version
+something else on stderr
+"""
+
+
+def test_parse_importtime_reads_records_and_depth():
+    records = ip.parse_importtime(SAMPLE)
+    assert [r.module for r in records] == ["_io", "encodings", "streamlit", "streamlit.version"]
+    assert records[2].self_us == 1000
+    assert records[2].cumulative_us == 5000
+    assert records[2].depth == 0
+    assert records[3].depth == 2
+
+
+def test_format_report_orders_by_cumulative_or_self():
+    records = ip.parse_importtime(SAMPLE)
+
+    report = ip.format_report(records, top=2)
+    lines = report.splitlines()
+    assert lines[0].startswith("Importit yhteensä: 5.0 ms")
+    assert lines[2].endswith("streamlit")
+    assert len(lines) == 4
+
+    by_self = ip.format_report(records, top=1, by_self=True).splitlines()
+    assert by_self[2].endswith("streamlit")
+
+    assert ip.format_report([]) == "Ei import-tietoja."
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import pytest
+
+import src.metrics as metrics
+import src.ui.registry as registry
+from src.metrics import MetricsRegistry, upstream
+
+
+@pytest.fixture
+def fresh_registry(monkeypatch):
+    reg = MetricsRegistry()
+    monkeypatch.setattr(metrics, "REGISTRY", reg)
+    monkeypatch.setattr(registry, "REGISTRY", reg)
+    return reg
+
+
+def test_upstream_records_latency_errors_and_payload(fresh_registry):
+    with upstream("ha_state") as span:
+        span.payload_bytes = 2048
+    with pytest.raises(RuntimeError), upstream("ha_state"):
+        raise RuntimeError("HA 500")
+
+    hist = fresh_registry.latency("upstream", "ha_state")
+    assert hist is not None and hist.count == 2
+    assert fresh_registry.errors("upstream", "ha_state") == 1
+
+    text = fresh_registry.render_prometheus()
+    assert "# TYPE kotidashboard_upstream_latency_seconds histogram" in text
+    assert 'kotidashboard_upstream_latency_seconds_bucket{source="ha_state",le="+Inf"} 2' in text
+    assert 'kotidashboard_upstream_errors_total{source="ha_state"} 1' in text
+    assert 'kotidashboard_upstream_payload_bytes_bucket{source="ha_state",le="4096"} 1' in text
+
+
+def test_cache_ratio_and_counters(fresh_registry):
+    assert fresh_registry.cache_ratio("weather_forecast") is None
+    for hit in (True, True, True, False):
+        metrics.count_cache("weather_forecast", hit=hit)
+
+    assert fresh_registry.cache_ratio("weather_forecast") == 0.75
+    text = fresh_registry.render_prometheus()
+    assert 'kotidashboard_cache_requests_total{source="weather_forecast",result="hit"} 3' in text
+
+
+def test_lazy_card_records_render_time(fresh_registry, monkeypatch):
+    def boom():
+        raise ValueError("render failed")
+
+    cards = {"card_zen": lambda: "ok", "card_system": boom}
+    monkeypatch.setattr(registry, "load_card", cards.__getitem__)
+
+    assert registry.lazy_card("card_zen")() == "ok"
+    with pytest.raises(ValueError):
+        registry.lazy_card("card_system")()
+
+    assert fresh_registry.latency("card", "card_zen").count == 1
+    assert fresh_registry.errors("card", "card_system") == 1
+    assert 'kotidashboard_card_render_seconds_count{card="card_zen"} 1' in (
+        fresh_registry.render_prometheus()
+    )
+
+
+def test_write_metrics_file_is_throttled(fresh_registry, monkeypatch, tmp_path):
+    monkeypatch.setattr(metrics, "_LAST_WRITE", [0.0])
+    target = tmp_path / "metrics.prom"
+    metrics.count_cache("pollen_bulletin", hit=False)
+
+    assert metrics.write_metrics_file(target) is True
+    assert "pollen_bulletin" in target.read_text(encoding="utf-8")
+    assert metrics.write_metrics_file(target) is False
+
+
+def test_summaries_report_last_avg_p95_and_data_age(fresh_registry, monkeypatch):
+    for ms in range(1, 101):
+        fresh_registry.observe("card", "card_weather", ms / 1000)
+    fresh_registry.observe("card", "card_weather", 0.010)
+    monkeypatch.setattr(metrics.time, "time", lambda: 1000.0)
+    fresh_registry.observe("upstream", "ha_state", 0.2)
+    fresh_registry.observe("upstream", "pollen", 0.5, error=True)
+
+    (card,) = fresh_registry.summaries("card")
+    assert card.name == "card_weather" and card.count == 101
+    assert card.last == pytest.approx(0.010)
+    assert card.p95 == pytest.approx(0.095)
+    assert card.avg == pytest.approx((5050 + 10) / 101 / 1000)
+
+    assert [s.name for s in fresh_registry.summaries("upstream")] == ["ha_state", "pollen"]
+    # epäonnistunut haku ei tuoreuta dataa
+    assert fresh_registry.data_ages(now=1030.0) == {"ha_state": 30.0}
+
+
+def test_summaries_p95_uses_recent_window(fresh_registry):
+    for _ in range(metrics.RECENT_SAMPLES):
+        fresh_registry.observe("card", "card_eqe", 5.0)
+    for _ in range(metrics.RECENT_SAMPLES):
+        fresh_registry.observe("card", "card_eqe", 0.1)
+
+    (card,) = fresh_registry.summaries("card")
+    assert card.p95 == pytest.approx(0.1)
+    assert card.avg == pytest.approx(2.55)
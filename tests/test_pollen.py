@@ -1,7 +1,17 @@
 from __future__ import annotations
 
+import json
+from pathlib import Path
+
+import httpx
+
+import src.api.pollen as pollen
 from src.api.pollen import parse_pollen_text
 
+BULLETIN = """Siitepölytiedote 3.5.2026.
+Uudellamaalla ja Hämeessä koivun siitepölyä on ilmassa runsaasti.
+"""
+
 
 def test_parse_pollen_text_extracts_riihimaki_relevant_levels():
     text = """
@@ -72,3 +82,129 @@ def test_parse_pollen_text_uses_no_pollen_when_plant_is_missing():
     assert plants["heinät"].level == "ei havaittu"
     assert plants["pujo"].level == "ei havaittu"
     assert "Ei koivun" in vm.summary
+
+
+def _response(status_code: int, text: str = "", headers: dict | None = None) -> httpx.Response:
+    return httpx.Response(status_code, content=text.encode("utf-8"), headers=headers)
+
+
+def _use_cache_file(monkeypatch, tmp_path):
+    monkeypatch.setattr(pollen, "POLLEN_CACHE_FILE", tmp_path / "pollen_cache.json")
+    monkeypatch.setattr(pollen, "_FILE_MEMO", {"key": None, "payload": None})
+    monkeypatch.setattr(pollen, "_INDEX_MEMO", {"key": None, "index": None, "views": {}})
+
+
+def _count_parses(monkeypatch) -> list[str]:
+    parsed: list[str] = []
+    real_index = pollen.index_bulletin
+
+    def counting_index(text: str):
+        parsed.append(text)
+        return real_index(text)
+
+    monkeypatch.setattr(pollen, "index_bulletin", counting_index)
+    return parsed
+
+
+def test_fetch_pollen_view_reuses_parsed_view_within_ttl(monkeypatch, tmp_path, mock_http):
+    _use_cache_file(monkeypatch, tmp_path)
+    parsed = _count_parses(monkeypatch)
+    calls: list[dict] = []
+
+    def fake_get(request: httpx.Request) -> httpx.Response:
+        calls.append(request.headers)
+        return _response(200, BULLETIN, {"ETag": '"v1"'})
+
+    mock_http(fake_get)
+
+    first = pollen.fetch_pollen_view()
+    second = pollen.fetch_pollen_view()
+
+    assert first == second
+    assert len(calls) == 1
+    assert len(parsed) == 1
+
+    stored = json.loads((tmp_path / "pollen_cache.json").read_text(encoding="utf-8"))
+    assert stored["sha256"] == pollen._text_hash(BULLETIN)
+    assert stored["index_key"] == pollen._index_key(stored["sha256"])
+    assert stored["index"]["updated"] == "3.5.2026"
+
+
+def test_fetch_pollen_views_parses_all_stations_once(monkeypatch, tmp_path, mock_http):
+    _use_cache_file(monkeypatch, tmp_path)
+    parsed = _count_parses(monkeypatch)
+    bulletin = (Path(__file__).parent / "fixtures" / "pollen" / "2026-04-30_koivu.txt").read_text(
+        encoding="utf-8"
+    )
+    calls: list[str] = []
+
+    def fake_get(request: httpx.Request) -> httpx.Response:
+        calls.append(str(request.url))
+        return _response(200, bulletin)
+
+    mock_http(fake_get)
+
+    helsinki, lahti = pollen.fetch_pollen_views([("Helsinki", "Riihimäki"), ("Lahti", "Lahti")])
+    assert pollen.fetch_pollen_view("Lahti", "Lahti") == lahti
+    # toinen prosessi: indeksi luetaan tiedostosta, ei jäsennetä uudelleen
+    monkeypatch.setattr(pollen, "_INDEX_MEMO", {"key": None, "index": None, "views": {}})
+    assert "Lahti" in pollen.pollen_stations()
+
+    assert len(calls) == 1
+    assert len(parsed) == 1
+    assert {p["key"]: p["level"] for p in helsinki["plants"]}["koivu"] == "kohtalaisesti"
+    assert {p["key"]: p["level"] for p in lahti["plants"]}["koivu"] == "vähän"
+    assert lahti["location"] == "Lahti"
+
+
+def test_fetch_pollen_view_revalidates_with_etag_after_ttl(monkeypatch, tmp_path, mock_http):
+    _use_cache_file(monkeypatch, tmp_path)
+    parsed = _count_parses(monkeypatch)
+    clock = {"now": 1_000_000.0}
+    monkeypatch.setattr(pollen.time, "time", lambda: clock["now"])
+    responses = [
+        _response(200, BULLETIN, {"ETag": '"v1"', "Last-Modified": "Sun, 03 May 2026"}),
+        _response(304),
+        _response(200, BULLETIN.replace("runsaasti", "vähän"), {"ETag": '"v2"'}),
+    ]
+    calls: list[dict] = []
+
+    def fake_get(request: httpx.Request) -> httpx.Response:
+        calls.append(request.headers)
+        return responses.pop(0)
+
+    mock_http(fake_get)
+
+    first = pollen.fetch_pollen_view()
+    clock["now"] += pollen.POLLEN_CACHE_TTL_S + 1
+    unchanged = pollen.fetch_pollen_view()
+
+    assert calls[1]["If-None-Match"] == '"v1"'
+    assert calls[1]["If-Modified-Since"] == "Sun, 03 May 2026"
+    assert unchanged == first
+    assert len(parsed) == 1
+
+    clock["now"] += pollen.POLLEN_CACHE_TTL_S + 1
+    changed = pollen.fetch_pollen_view()
+
+    assert len(parsed) == 2
+    koivu = {p["key"]: p for p in changed["plants"]}["koivu"]
+    assert koivu["level"] == "vähän"
+
+
+def test_fetch_pollen_view_serves_stale_bulletin_when_download_fails(
+    monkeypatch, tmp_path, mock_http
+):
+    _use_cache_file(monkeypatch, tmp_path)
+    clock = {"now": 1_000_000.0}
+    monkeypatch.setattr(pollen.time, "time", lambda: clock["now"])
+    mock_http(lambda request: _response(200, BULLETIN))
+    first = pollen.fetch_pollen_view()
+
+    def failing_get(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("down", request=request)
+
+    mock_http(failing_get)
+    clock["now"] += pollen.POLLEN_CACHE_TTL_S + 1
+
+    assert pollen.fetch_pollen_view() == first
@@ -0,0 +1,105 @@
+# tests/test_pollen_parser.py
+from __future__ import annotations
+
+from pathlib import Path
+
+from src.api.pollen import parse_pollen_text, view_from_index
+from src.api.pollen_parser import PLANT_AUTOMATON, AliasAutomaton, index_bulletin
+
+FIXTURES = Path(__file__).parent / "fixtures" / "pollen"
+
+
+def _fixture(name: str) -> str:
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+def test_alias_automaton_finds_all_plants_in_one_scan():
+    found = PLANT_AUTOMATON.find("KOIVUN ja heinien siitepölyä, pujoa vähän.")
+    assert found == {"koivu", "heinät", "pujo"}
+    assert PLANT_AUTOMATON.find("Lepän siitepölyä on vähän.") == frozenset()
+
+
+def test_alias_automaton_reports_overlapping_and_prefix_aliases():
+    automaton = AliasAutomaton({"abc": "x", "abcd": "y", "bcd": "z"})
+    # pisin osuma "abcd" sisältää myös aliaksen "abc"; "bcd" alkaa sen sisältä
+    assert automaton.find("..ABCD..") == {"x", "y", "z"}
+    assert [start for start, _ in automaton.scan("abcd abc")] == [0, 1, 5]
+
+
+def test_index_bulletin_reads_all_stations_in_one_pass():
+    index = index_bulletin(_fixture("2026-08-07_pujo.txt"))
+
+    assert index.updated == "07.08.2026"
+    assert index.station_names()[:3] == ["Turku", "Helsinki", "Lahti"]
+    assert index.stations["TILANNE"]["Helsinki"] == {"heinät": "vähän", "pujo": "runsaasti"}
+    assert index.stations["ENNUSTE"]["Joensuu"] == {"heinät": "vähän", "pujo": "vähän"}
+    assert index.station_levels("TILANNE", "helsinki") == index.stations["TILANNE"]["Helsinki"]
+
+
+def test_views_for_several_stations_share_one_index():
+    text = _fixture("2026-04-30_koivu.txt")
+    index = index_bulletin(text)
+
+    # asema ilman koodeja ei ole taulussa
+    assert "Joensuu" not in index.stations["TILANNE"]
+    assert index.stations["ENNUSTE"]["Joensuu"] == {"koivu": "vähän"}
+
+    helsinki = {p.key: p for p in view_from_index(index).plants}
+    lahti = {p.key: p for p in view_from_index(index, station="Lahti", location="Lahti").plants}
+
+    assert helsinki["koivu"].level == "kohtalaisesti"
+    assert helsinki["koivu"].forecast_level == "runsaasti"
+    assert lahti["koivu"].level == "vähän"
+    assert lahti["koivu"].forecast_level == "kohtalaisesti"
+    # tekstiosan lauseet ovat yhteiset
+    assert lahti["koivu"].forecast == helsinki["koivu"].forecast
+    assert "Kanta-Hämeessä" in helsinki["koivu"].forecast
+    assert view_from_index(index) == parse_pollen_text(text)
+
+
+def test_text_section_prefers_regional_non_forecast_sentence():
+    index = index_bulletin(_fixture("2026-06-26_heinat.txt"))
+
+    assert index.current["heinät"].startswith("Maan eteläosissa heinien")
+    # alueeton lause ei kelpaa, kun alueellisia lauseita on
+    assert "koivu" not in index.current
+    assert "pujo" not in index.forecast
+    assert index.forecast["heinät"].startswith("Heinien siitepölymäärät voimistuvat")
+
+
+def test_southern_sentences_do_not_apply_to_northern_station_without_codes():
+    index = index_bulletin(_fixture("2026-04-30_koivu.txt"))
+
+    assert index.current_regional and index.forecast_regional
+    joensuu = {
+        p.key: p for p in view_from_index(index, station="Joensuu", location="Joensuu").plants
+    }
+
+    # TILANNE-kartalla ei koodia, eikä Uusimaan/Hämeen lause koske Joensuuta
+    assert joensuu["koivu"].level == "ei havaittu"
+    assert joensuu["koivu"].forecast_level == "vähän"
+    assert joensuu["koivu"].forecast == "Ei erillistä ennustetta lähialueelle."
+    assert index.text_covers("TILANNE", "Helsinki")
+    assert not index.text_covers("ENNUSTE", "Joensuu")
+
+
+def test_regional_flag_is_per_section():
+    text = (
+        "Siitepölytiedote 01.05.2026\n"
+        "TILANNE\n"
+        "Koivun siitepölyä on ilmassa runsaasti.\n"
+        "ENNUSTE\n"
+        "Uudellamaalla koivun siitepölymäärät pysyvät kohtalaisina.\n"
+    )
+    index = index_bulletin(text)
+
+    assert not index.current_regional
+    assert index.forecast_regional
+    oulu = {p.key: p for p in view_from_index(index, station="Oulu", location="Oulu").plants}
+
+    # alueeton TILANNE-lause koskee kaikkia, Uudenmaan ennuste ei
+    assert oulu["koivu"].level == "runsaasti"
+    assert oulu["koivu"].forecast_level == "ei havaittu"
+    assert oulu["koivu"].forecast == "Ei erillistä ennustetta lähialueelle."
+    helsinki = {p.key: p for p in view_from_index(index).plants}
+    assert helsinki["koivu"].forecast.startswith("Uudellamaalla")
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import src.process_stats as ps
+
+
+def test_process_stats_outside_streamlit_server():
+    stats = ps.process_stats()
+    assert stats.rss_bytes is None or stats.rss_bytes > 0
+    assert stats.sessions is None
+
+
+def test_cpu_sampler_measures_process_time_between_samples(monkeypatch):
+    clock = {"wall": 10.0, "cpu": 1.0}
+    monkeypatch.setattr(ps.time, "monotonic", lambda: clock["wall"])
+    monkeypatch.setattr(ps.time, "process_time", lambda: clock["cpu"])
+    sampler = ps.CpuSampler()
+
+    clock.update(wall=12.0, cpu=1.5)
+    assert sampler.sample() == 25.0
+    assert sampler.sample() is None  # ei kulunutta aikaa
@@ -24,11 +24,11 @@ def _force_no_streamlit_cache(monkeypatch):
 def test_fetch_daily_quote_uses_zenquotes_first(monkeypatch):
     _force_no_streamlit_cache(monkeypatch)
 
-    def fake_http_get_json(url, timeout=None):
+    async def fake_http_get_json(url, timeout=None):
         assert "zenquotes" in url
         return [{"q": "Hello Zen", "a": "Zen Master"}]
 
-    monkeypatch.setattr(q, "http_get_json", fake_http_get_json)
+    monkeypatch.setattr(q, "http_get_json_async", fake_http_get_json)
 
     # varmistetaan ettei quotablea tai lokal fallbackia käytetä
     def fake_report_error(msg, exc):  # pragma: no cover
@@ -65,13 +65,13 @@ def test_fetch_daily_quote_falls_back_to_quotable(monkeypatch):
     def fake_report_error(msg, exc):
         report_calls.append(msg)
 
-    def fake_http_get_json(url, timeout=None):
+    async def fake_http_get_json(url, timeout=None):
         if "zenquotes" in url:
             return fake_zen(url, timeout)
         else:
             return fake_quotable(url, timeout)
 
-    monkeypatch.setattr(q, "http_get_json", fake_http_get_json)
+    monkeypatch.setattr(q, "http_get_json_async", fake_http_get_json)
     monkeypatch.setattr(q, "report_error", fake_report_error)
 
     out = q.fetch_daily_quote("2025-01-02")
@@ -92,7 +92,7 @@ def test_fetch_daily_quote_falls_back_to_quotable(monkeypatch):
 def test_fetch_daily_quote_falls_back_to_local(monkeypatch):
     _force_no_streamlit_cache(monkeypatch)
 
-    def fake_http_get_json(url, timeout=None):
+    async def fake_http_get_json(url, timeout=None):
         raise RuntimeError("API down")
 
     report_calls = []
@@ -100,7 +100,7 @@ def test_fetch_daily_quote_falls_back_to_local(monkeypatch):
     def fake_report_error(msg, exc):
         report_calls.append(msg)
 
-    monkeypatch.setattr(q, "http_get_json", fake_http_get_json)
+    monkeypatch.setattr(q, "http_get_json_async", fake_http_get_json)
     monkeypatch.setattr(q, "report_error", fake_report_error)
 
     out = q.fetch_daily_quote("2025-01-03")
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import threading
+from datetime import datetime, timezone
+
+from src.refresh_coordinator import RefreshCoordinator
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_refresh_runs_once_per_interval_across_callers():
+    clock = FakeClock()
+    coordinator = RefreshCoordinator(clock=clock)
+    calls: list[int] = []
+
+    # kolme istuntoa renderöi saman jakson aikana
+    results = [coordinator.request("eqe", lambda: calls.append(1), 300.0) for _ in range(3)]
+    assert results == [True, False, False]
+
+    clock.now += 299.0
+    assert coordinator.request("eqe", lambda: calls.append(1), 300.0) is False
+    clock.now += 1.0
+    assert coordinator.request("eqe", lambda: calls.append(1), 300.0) is True
+    # toinen avain on oma jaksonsa
+    assert coordinator.request("other", lambda: calls.append(1), 300.0) is True
+    assert len(calls) == 3
+
+
+def test_refresh_failure_counts_against_budget():
+    clock = FakeClock()
+    coordinator = RefreshCoordinator(clock=clock)
+
+    def boom() -> None:
+        raise RuntimeError("HA 500")
+
+    assert coordinator.request("eqe", boom, 60.0) is False
+    assert coordinator.request("eqe", lambda: None, 60.0) is False
+    coordinator.reset("eqe")
+    assert coordinator.request("eqe", lambda: None, 60.0) is True
+
+
+def test_refresh_skipped_when_state_changed_recently():
+    clock = FakeClock()
+    coordinator = RefreshCoordinator(clock=clock)
+    fresh = datetime.fromtimestamp(clock.now - 10.0, tz=timezone.utc)
+    stale = datetime.fromtimestamp(clock.now - 600.0, tz=timezone.utc)
+
+    assert coordinator.request("eqe", lambda: None, 300.0, last_changed=fresh) is False
+    assert coordinator.request("eqe", lambda: None, 300.0, last_changed=stale) is True
+
+
+def test_concurrent_requests_coalesce_into_one_call():
+    coordinator = RefreshCoordinator()
+    entered = threading.Event()
+    release = threading.Event()
+    calls: list[int] = []
+
+    def slow_refresh() -> None:
+        calls.append(1)
+        entered.set()
+        release.wait(2)
+
+    worker = threading.Thread(target=coordinator.request, args=("eqe", slow_refresh, 0.0))
+    worker.start()
+    assert entered.wait(2)
+    # kesken olevaan päivitykseen yhdistetään, vaikka jakso olisi jo täynnä
+    assert coordinator.request("eqe", slow_refresh, 0.0) is False
+    release.set()
+    worker.join(2)
+    assert calls == [1]
@@ -0,0 +1,53 @@
+# tests/test_ring_buffer.py
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from src.ring_buffer import RingBuffer
+
+
+def test_ring_buffer_overwrites_oldest_and_keeps_order():
+    buffer: RingBuffer[int] = RingBuffer(capacity=3)
+    for i in range(5):
+        buffer.append(i)
+
+    assert buffer.snapshot() == [2, 3, 4]
+    assert len(buffer) == 3
+
+    buffer.clear()
+    assert buffer.snapshot() == []
+    buffer.append(9)
+    assert buffer.snapshot() == [9]
+
+
+def test_ring_buffer_sampling_is_deterministic():
+    buffer: RingBuffer[int] = RingBuffer(capacity=10, sample_rate=0.5)
+    sampled = [i for i in range(6) if buffer.should_sample()]
+    assert sampled == [0, 2, 4]
+
+    with pytest.raises(ValueError):
+        RingBuffer(capacity=0)
+    with pytest.raises(ValueError):
+        RingBuffer(capacity=1, sample_rate=0.0)
+
+
+def test_ring_buffer_concurrent_writers_lose_nothing_within_capacity():
+    buffer: RingBuffer[tuple[int, int]] = RingBuffer(capacity=4000)
+
+    def writer(n: int) -> None:
+        for i in range(1000):
+            buffer.append((n, i))
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    records = buffer.snapshot()
+    assert len(records) == 4000
+    for n in range(4):
+        # jokaisen kirjoittajan tietueet säilyvät omassa järjestyksessään
+        assert [i for w, i in records if w == n] == list(range(1000))
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import os
+
+import src.settings as settings_mod
+from src import config
+from src.settings import load_ha_settings, load_settings
+
+
+def test_load_settings_parses_sections_and_validates():
+    secrets = {
+        "HA_TOKEN": '"tok"',
+        "home_assistant": {
+            "base_url": "http://ha:8123/",
+            "eqe_refresh_interval": "5",
+            "cache_ttl": "abc",
+            "eqe_refresh_data": "[1, 2]",
+        },
+        "hue": {"bridge_host": " bridge ", "bridge_user": "user", "v2_app_key": "'key'"},
+        "heos": {"host": "10.0.0.5", "player_id": "42"},
+        "location": {"lat": "61.5", "lon": "999"},
+    }
+    settings = load_settings(secrets)
+
+    assert settings.ha.base_url == "http://ha:8123"
+    assert settings.ha.token == "tok"
+    # alaraja 30 s, virheellinen TTL -> oletus, ei-objekti-JSON ohitetaan
+    assert settings.ha.refresh_interval_s == 30.0
+    assert settings.ha.cache_ttl == config.CACHE_TTL_SHORT
+    assert settings.ha.refresh_data == {}
+    assert settings.hue.bridge_host == "bridge"
+    assert settings.hue.v2_app_key == "key"
+    assert settings.heos.host == "10.0.0.5"
+    assert settings.heos.player_id == 42
+    assert settings.location.lat == 61.5
+    assert settings.location.lon == config.LON
+    assert len(settings.problems) == 3
+
+
+def test_ha_settings_missing_and_invalid_url():
+    ha = load_ha_settings({"HA_BASE_URL": "ha.local", "HA_TOKEN": "t"}.get)
+    assert ha.missing() == [
+        "HA_EQE_SOC_ENTITY",
+        "HA_EQE_RANGE_ENTITY",
+        "HA_EQE_CHARGING_ENTITY",
+        "HA_BASE_URL (http://…)",
+    ]
+
+
+def test_get_settings_reloads_only_when_secrets_change(monkeypatch, tmp_path):
+    secrets_file = tmp_path / "secrets.toml"
+    secrets_file.write_text("x = 1\n", encoding="utf-8")
+    monkeypatch.setattr(settings_mod, "SECRETS_PATHS", (secrets_file,))
+    secrets = {"hue": {"bridge_host": "one"}}
+    monkeypatch.setattr(settings_mod.st, "secrets", secrets, raising=False)
+    settings_mod.clear_settings_cache()
+
+    loads = []
+    real_load = settings_mod.load_settings
+    monkeypatch.setattr(
+        settings_mod, "load_settings", lambda s=None: loads.append(1) or real_load(s)
+    )
+
+    first = settings_mod.get_settings()
+    assert settings_mod.get_settings() is first
+    assert first.hue.bridge_host == "one"
+    assert len(loads) == 1
+
+    secrets["hue"]["bridge_host"] = "two"
+    stat = secrets_file.stat()
+    os.utime(secrets_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert settings_mod.get_settings().hue.bridge_host == "two"
+    assert len(loads) == 2
+    settings_mod.clear_settings_cache()
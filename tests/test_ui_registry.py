@@ -0,0 +1,41 @@
+# tests/test_ui_registry.py
+import pytest
+
+import src.ui as ui
+import src.ui.registry as registry
+
+
+def test_lazy_card_loads_on_first_call(monkeypatch):
+    calls = []
+
+    def fake_load(name):
+        calls.append(name)
+        return lambda *a, **k: ("rendered", a, k)
+
+    monkeypatch.setattr(registry, "load_card", fake_load)
+
+    card = registry.lazy_card("card_zen")
+    assert not card.loaded
+    assert calls == []
+
+    assert card(1, x=2) == ("rendered", (1,), {"x": 2})
+    card()
+    assert calls == ["card_zen"]
+    assert card.loaded
+
+
+def test_lazy_card_rejects_unknown_name():
+    with pytest.raises(KeyError):
+        registry.lazy_card("card_missing")
+
+
+def test_package_exposes_render_functions_not_modules():
+    import src.ui.card_zen  # noqa: F401  alimoduulin import ei saa peittää funktiota
+
+    assert callable(ui.card_zen)
+    assert ui.card_zen.__module__ == "src.ui.card_zen"
+    assert registry.load_card("card_zen") is ui.card_zen
+    assert "card_zen" in registry.card_load_times()
+
+    with pytest.raises(AttributeError):
+        _ = ui.card_missing
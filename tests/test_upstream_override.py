@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from src.upstream_override import FAKE_UPSTREAM_ENV, fake_upstream, heos_address, upstream_url
+
+
+def test_urls_unchanged_without_env(monkeypatch):
+    monkeypatch.delenv(FAKE_UPSTREAM_ENV, raising=False)
+
+    url = "https://api.coingecko.com/api/v3/simple/price?ids=bitcoin"
+    assert fake_upstream() is None
+    assert upstream_url(url) == url
+    assert heos_address("192.168.1.231", 1255) == ("192.168.1.231", 1255)
+
+
+def test_env_rewrites_http_and_heos(monkeypatch):
+    monkeypatch.setenv(FAKE_UPSTREAM_ENV, "127.0.0.1:8790")
+
+    assert upstream_url("https://api.coingecko.com/api/v3/simple/price?ids=bitcoin") == (
+        "http://127.0.0.1:8790/api.coingecko.com/api/v3/simple/price?ids=bitcoin"
+    )
+    # portti säilyy isäntäosassa (Home Assistant)
+    assert upstream_url("http://ha.local:8123/api/states/lock.eqe") == (
+        "http://127.0.0.1:8790/ha.local:8123/api/states/lock.eqe"
+    )
+    assert heos_address("192.168.1.231", 1255) == ("127.0.0.1", 8791)
+
+
+def test_invalid_env_is_ignored(monkeypatch):
+    monkeypatch.setenv(FAKE_UPSTREAM_ENV, "localhost")
+
+    assert fake_upstream() is None
+    assert upstream_url("https://zenquotes.io/api/today") == "https://zenquotes.io/api/today"
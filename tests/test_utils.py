@@ -1,10 +1,11 @@
 # tests/test_utils.py
 
 import builtins
-import json
+from datetime import datetime
 from types import SimpleNamespace
 
 import src.utils as utils
+from src.config import TZ
 
 
 def test_color_by_thresholds_basic():
@@ -61,43 +62,39 @@ def test_get_ip_failure_falls_back(monkeypatch):
 
 
 def test_fetch_sun_times_success(monkeypatch):
-    # korvataan urlopen ettei oikeaa HTTP:tä tehdä
-    class FakeResponse:
-        def __init__(self, payload: dict):
-            self._payload = json.dumps(payload).encode("utf-8")
-
-        def read(self):
-            return self._payload
-
-        def __enter__(self):
-            return self
-
-        def __exit__(self, *exc):
-            return False
+    # korvataan Open-Meteo-haku ettei oikeaa HTTP:tä tehdä
+    import src.api.weather_fetch as wf
 
+    today = datetime.now(TZ).date().isoformat()
     payload = {
         "daily": {
-            "sunrise": ["2025-11-11T07:54"],
-            "sunset": ["2025-11-11T16:05"],
+            "time": [today],
+            "sunrise": [f"{today}T07:54"],
+            "sunset": [f"{today}T16:05"],
         }
     }
 
-    def fake_urlopen(url, timeout=6):
-        return FakeResponse(payload)
+    async def fake_get(url):
+        return payload
 
-    monkeypatch.setattr(utils.urllib.request, "urlopen", fake_urlopen)
+    wf.clear_forecast_cache()
+    monkeypatch.setattr(wf, "http_get_json_async", fake_get)
 
     sunrise, sunset = utils.fetch_sun_times(60.0, 25.0, "Europe/Helsinki")
     assert sunrise == "07:54"
     assert sunset == "16:05"
+    wf.clear_forecast_cache()
 
 
 def test_fetch_sun_times_error_returns_none(monkeypatch):
+    import src.api.weather_fetch as wf
+
     # pakotetaan poikkeus
-    def fake_urlopen(*a, **k):
+    async def fake_get(*a, **k):
         raise TimeoutError("boom")
 
-    monkeypatch.setattr(utils.urllib.request, "urlopen", fake_urlopen)
+    wf.clear_forecast_cache()
+    monkeypatch.setattr(wf, "http_get_json_async", fake_get)
 
     sunrise, sunset = utils.fetch_sun_times(0.0, 0.0, "UTC")
     assert sunrise is None
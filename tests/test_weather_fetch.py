@@ -3,7 +3,18 @@ from __future__ import annotations
 
 from datetime import datetime
 
+import numpy as np
+import pytest
+
 import src.api.weather_fetch as wf
+import src.api.weather_hourly as wh
+
+
+@pytest.fixture(autouse=True)
+def _clear_forecast_cache():
+    wf.clear_forecast_cache()
+    yield
+    wf.clear_forecast_cache()
 
 
 class DummyDT(datetime):
@@ -13,6 +24,18 @@ class DummyDT(datetime):
         return datetime(2025, 11, 11, 10, 0, tzinfo=tz)
 
 
+def _stub_icon_keys(monkeypatch):
+    # ei haluta oikeaa ikonimappia
+    monkeypatch.setattr(wh, "wmo_to_foreca_codes", lambda codes, *a: np.full(codes.shape, "d000"))
+
+
+def _returns(payload):
+    async def fake_get(url):
+        return payload
+
+    return fake_get
+
+
 def _fake_hourly_payload():
     # tehdään tunnit: 10, 13, 16, 19, 22
     base = "2025-11-11T"
@@ -33,9 +56,9 @@ def test_fetch_weather_points_happy_path(monkeypatch):
     # 1) pakotetaan aika
     monkeypatch.setattr(wf, "datetime", DummyDT)
     # 2) pakotetaan HTTP-paluuarvo
-    monkeypatch.setattr(wf, "http_get_json", lambda url: _fake_hourly_payload())
+    monkeypatch.setattr(wf, "http_get_json_async", _returns(_fake_hourly_payload()))
     # 3) ei haluta oikeaa ikonimappia
-    monkeypatch.setattr(wf, "wmo_to_foreca_code", lambda *a, **k: "d000")
+    _stub_icon_keys(monkeypatch)
 
     out = wf.fetch_weather_points(
         lat=60.733,
@@ -74,10 +97,136 @@ def test_fetch_weather_points_skips_missing_hours(monkeypatch):
     ):
         payload["hourly"][key].pop()
 
-    monkeypatch.setattr(wf, "http_get_json", lambda url: payload)
-    monkeypatch.setattr(wf, "wmo_to_foreca_code", lambda *a, **k: "d000")
+    monkeypatch.setattr(wf, "http_get_json_async", _returns(payload))
+    _stub_icon_keys(monkeypatch)
 
     out = wf.fetch_weather_points(60.7, 24.7, "Europe/Helsinki")
 
     # nyt 5 → 4
     assert len(out["points"]) == 4
+
+
+def test_interval_views_are_derived_from_one_request(monkeypatch):
+    monkeypatch.setattr(wf, "datetime", DummyDT)
+    _stub_icon_keys(monkeypatch)
+
+    urls = []
+
+    async def fake_get(url):
+        urls.append(url)
+        payload = _fake_hourly_payload()
+        payload["daily"] = {
+            "time": ["2025-11-11"],
+            "sunrise": ["2025-11-11T07:54"],
+            "sunset": ["2025-11-11T16:05"],
+            "temperature_2m_min": [1.5],
+            "temperature_2m_max": [8.5],
+        }
+        return payload
+
+    monkeypatch.setattr(wf, "http_get_json_async", fake_get)
+
+    three_h = wf.fetch_weather_points(60.7, 24.7, "Europe/Helsinki", offsets=(0, 3, 6))
+    six_h = wf.fetch_weather_points(60.7, 24.7, "Europe/Helsinki", offsets=(0, 6, 12))
+
+    assert [p["hour"] for p in three_h["points"]] == [10, 13, 16]
+    assert [p["hour"] for p in six_h["points"]] == [10, 16, 22]
+    # päivän min/max tulevat daily-datasta
+    assert (six_h["min_temp"], six_h["max_temp"]) == (1.5, 8.5)
+    assert wf.fetch_sun_times(60.7, 24.7, "Europe/Helsinki") == ("07:54", "16:05")
+
+    assert len(urls) == 1
+    assert "&daily=sunrise,sunset" in urls[0]
+
+
+def test_registered_locations_are_fetched_in_one_call(monkeypatch):
+    urls = []
+
+    async def fake_get(url):
+        urls.append(url)
+        return [
+            {"hourly": {"time": ["2025-11-11T10:00"]}, "latitude": 60.7},
+            {"hourly": {"time": ["2025-11-11T11:00"]}, "latitude": 60.2},
+        ]
+
+    monkeypatch.setattr(wf, "http_get_json_async", fake_get)
+
+    wf.register_forecast_location(60.7, 24.7, "Europe/Helsinki")
+    wf.register_forecast_location(60.2, 24.9, "Europe/Helsinki")
+
+    first = wf.get_forecast_entry(60.7, 24.7, "Europe/Helsinki")
+    second = wf.get_forecast_entry(60.2, 24.9, "Europe/Helsinki")
+
+    assert first.payload["latitude"] == 60.7
+    assert second.payload["latitude"] == 60.2
+    assert len(urls) == 1
+    assert "latitude=60.7,60.2&longitude=24.7,24.9" in urls[0]
+
+
+def test_current_conditions_share_the_forecast_request(monkeypatch):
+    monkeypatch.setattr(wf, "datetime", DummyDT)
+    _stub_icon_keys(monkeypatch)
+    urls = []
+
+    async def fake_get(url):
+        urls.append(url)
+        payload = _fake_hourly_payload()
+        payload["current"] = {
+            "time": "2025-11-11T10:15",
+            "temperature_2m": 5.4,
+            "apparent_temperature": 2.1,
+            "precipitation": 0.0,
+            "weathercode": 0,
+            "cloudcover": 5,
+            "is_day": 1,
+            "wind_speed_10m": 4.2,
+        }
+        return payload
+
+    monkeypatch.setattr(wf, "http_get_json_async", fake_get)
+
+    wf.fetch_weather_points(60.7, 24.7, "Europe/Helsinki")
+    current = wf.fetch_current(60.7, 24.7, "Europe/Helsinki")
+
+    assert len(urls) == 1
+    assert "&current=temperature_2m,apparent_temperature" in urls[0]
+    assert current["temp"] == 5.4
+    assert current["feels_like"] == 2.1
+    assert current["key"] == "d000"
+
+
+def test_alerts_are_derived_and_cached_on_slower_schedule(monkeypatch):
+    clock = {"now": 1000.0}
+    monkeypatch.setattr("src.api.weather_repository.time.monotonic", lambda: clock["now"])
+    urls = []
+
+    async def fake_get(url):
+        urls.append(url)
+        return {
+            "daily": {
+                "time": ["2025-11-11", "2025-11-12"],
+                "weathercode": [95, 3],
+                "precipitation_sum": [4.0, 25.0],
+                "snowfall_sum": [0.0, 0.0],
+                "wind_gusts_10m_max": [9.0, 17.4],
+            }
+        }
+
+    monkeypatch.setattr(wf, "http_get_json_async", fake_get)
+
+    alerts = wf.fetch_alerts(60.7, 24.7, "Europe/Helsinki")["alerts"]
+    assert [(a["date"], a["kind"]) for a in alerts] == [
+        ("2025-11-11", "thunder"),
+        ("2025-11-12", "wind"),
+        ("2025-11-12", "rain"),
+    ]
+    assert alerts[1]["text"] == "Tuulenpuuskia 17 m/s"
+    assert "&daily=weathercode,precipitation_sum" in urls[0]
+
+    # ennusteen TTL ylittyy, varoitusten ei -> ei uutta varoitushakua
+    clock["now"] += wf.CACHE_TTL_LONG - 1
+    wf.fetch_alerts(60.7, 24.7, "Europe/Helsinki")
+    assert len(urls) == 1
+    clock["now"] += 2
+    wf.fetch_alerts(60.7, 24.7, "Europe/Helsinki")
+    assert len(urls) == 2
@@ -0,0 +1,47 @@
+# tests/test_weather_hourly.py
+from __future__ import annotations
+
+from datetime import date, datetime
+
+import src.api.weather_hourly as wh
+from src.config import TZ
+
+
+def test_parse_hourly_builds_typed_columns_and_keys_once(monkeypatch):
+    calls: list[int] = []
+    real_codes = wh.wmo_to_foreca_codes
+
+    def counting_codes(codes, *args):
+        calls.append(codes.size)
+        return real_codes(codes, *args)
+
+    monkeypatch.setattr(wh, "wmo_to_foreca_codes", counting_codes)
+
+    columns = wh.parse_hourly(
+        {
+            "time": ["2025-11-11T10:00", "rikki", "2025-11-11T11:00", "2025-11-12T00:00"],
+            "temperature_2m": [5.0, 99.0, "6,5", None],
+            "precipitation_probability": [10.7, 0, None],
+            "weathercode": [0, 0, 3, 45],
+            "cloudcover": [5, 0, 90, 100],
+            "is_day": [1, 1, None, 0],
+        }
+    )
+
+    assert calls == [3]
+    assert columns.ts.tolist() == [
+        wh.wall_seconds(datetime(2025, 11, 11, 10)),
+        wh.wall_seconds(datetime(2025, 11, 11, 11)),
+        wh.wall_seconds(datetime(2025, 11, 12, 0)),
+    ]
+    assert columns.is_day.tolist() == [True, True, False]
+    assert columns.keys.tolist() == ["d000", "d400", "n600"]
+
+    points = columns.points(datetime(2025, 11, 11, 10, tzinfo=TZ), (0, 1, 2, 14))
+    assert points == [
+        {"label": "Nyt", "hour": 10, "temp": 5.0, "pop": 10, "key": "d000"},
+        {"label": "+1 h", "hour": 11, "temp": 6.5, "pop": None, "key": "d400"},
+        {"label": "+14 h", "hour": 0, "temp": None, "pop": None, "key": "n600"},
+    ]
+    assert columns.day_minmax(date(2025, 11, 11)) == (5.0, 6.5)
+    assert columns.day_minmax(date(2025, 11, 12)) == (None, None)
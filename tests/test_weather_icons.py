@@ -1,4 +1,5 @@
 # tests/test_weather_icons.py
+import os
 from pathlib import Path
 
 import src.weather_icons as wi
@@ -18,7 +19,7 @@ def _write_dummy_png(path: Path):
 
 def test_find_icon_path_uses_direct_and_cache(monkeypatch, tmp_path):
     # clean cache
-    wi._ICON_CACHE.clear()
+    wi.reset_icon_index()
 
     key = "d100"
     icon_path = tmp_path / "d100.png"
@@ -31,13 +32,20 @@ def test_find_icon_path_uses_direct_and_cache(monkeypatch, tmp_path):
     p1 = wi._find_icon_path(key)
     assert p1 == icon_path
 
-    # cached hit
+    # cached hit: ei tiedostojärjestelmäkutsuja
+    def no_syscalls(*a, **k):
+        raise AssertionError("filesystem access on cached lookup")
+
+    monkeypatch.setattr(wi.os, "scandir", no_syscalls)
+    monkeypatch.setattr(Path, "stat", no_syscalls)
+    monkeypatch.setattr(Path, "exists", no_syscalls)
     p2 = wi._find_icon_path(key)
     assert p2 == icon_path  # same path, from cache
+    assert wi.render_foreca_icon(key).startswith("<img ")
 
 
 def test_find_icon_path_uses_alt_key(monkeypatch, tmp_path):
-    wi._ICON_CACHE.clear()
+    wi.reset_icon_index()
 
     key = "n200"
     alt_key = "d200"  # swapped by logic
@@ -52,7 +60,7 @@ def test_find_icon_path_uses_alt_key(monkeypatch, tmp_path):
 
 
 def test_find_icon_path_falls_back_to_d000(monkeypatch, tmp_path):
-    wi._ICON_CACHE.clear()
+    wi.reset_icon_index()
 
     fallback = tmp_path / "d000.png"
     _write_dummy_png(fallback)
@@ -64,7 +72,7 @@ def test_find_icon_path_falls_back_to_d000(monkeypatch, tmp_path):
 
 
 def test_find_icon_path_returns_none_if_no_files(monkeypatch, tmp_path):
-    wi._ICON_CACHE.clear()
+    wi.reset_icon_index()
     monkeypatch.setattr(wi, "SEARCH_DIRS", [tmp_path])
 
     p = wi._find_icon_path("d999")
@@ -77,7 +85,7 @@ def test_render_foreca_icon_success(monkeypatch, tmp_path):
     _write_dummy_png(icon_path)
 
     monkeypatch.setattr(wi, "SEARCH_DIRS", [tmp_path])
-    wi._ICON_CACHE.clear()
+    wi.reset_icon_index()
 
     html = wi.render_foreca_icon(key)
     assert html.startswith("<img ")
@@ -86,8 +94,64 @@ def test_render_foreca_icon_success(monkeypatch, tmp_path):
 
 def test_render_foreca_icon_fallback_placeholder(monkeypatch, tmp_path):
     monkeypatch.setattr(wi, "SEARCH_DIRS", [tmp_path])
-    wi._ICON_CACHE.clear()
+    wi.reset_icon_index()
 
     html = wi.render_foreca_icon("d999")
     assert html.startswith("<span")
     assert "not found" in html or "?" in html
+
+
+def test_icon_index_rebuilds_when_directory_mtime_changes(monkeypatch, tmp_path):
+    monkeypatch.setattr(wi, "SEARCH_DIRS", [tmp_path])
+    monkeypatch.setattr(wi, "ICON_INDEX_RECHECK_S", 0.0)
+    wi.reset_icon_index()
+    _write_dummy_png(tmp_path / "d000.png")
+
+    first = wi.icon_index()
+    assert first.resolve("d410").path == tmp_path / "d000.png"
+    assert wi.icon_index() is first
+
+    _write_dummy_png(tmp_path / "d410.png")
+    stat = tmp_path.stat()
+    os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    rebuilt = wi.icon_index()
+    assert rebuilt is not first
+    assert rebuilt.resolve("d410").path == tmp_path / "d410.png"
+    # yöikoni puuttuu -> päiväikoni
+    assert rebuilt.resolve("n410").path == tmp_path / "d410.png"
+
+
+def test_render_foreca_icon_uses_sprite_when_built(monkeypatch, tmp_path):
+    from PIL import Image
+
+    from src.weather_sprite import SPRITE_NAME, build_sprite
+
+    icon_dir, static_dir = tmp_path / "foreca", tmp_path / "static"
+    icon_dir.mkdir()
+    for key, color in (("d000", "yellow"), ("d410", "blue"), ("n000", "navy")):
+        Image.new("RGBA", (64, 64), color).save(icon_dir / f"{key}.png")
+
+    monkeypatch.setattr(wi, "SEARCH_DIRS", [icon_dir])
+    monkeypatch.setattr(wi, "SPRITE_DIR", static_dir)
+    wi.reset_icon_index()
+    assert wi.sprite_stylesheet() is None
+    assert wi.render_foreca_icon("d410").startswith("<img ")
+
+    sheet = build_sprite({p.stem: p for p in icon_dir.glob("*.png")}, static_dir)
+    wi.reset_icon_index()
+
+    css = (static_dir / f"{SPRITE_NAME}.css").read_text(encoding="utf-8")
+    assert f"{SPRITE_NAME}.png?v={sheet.version}" in css
+    assert ".wx-d410{background-position:" in css
+    with Image.open(static_dir / f"{SPRITE_NAME}.png") as sprite:
+        assert sprite.size == (2 * 96, 2 * 96)
+
+    assert wi.sprite_stylesheet() == f"app/static/{SPRITE_NAME}.css?v={sheet.version}"
+    assert wi.render_foreca_icon("d410") == (
+        '<span class="wx wx-d410" role="img" aria-label="d410"></span>'
+    )
+    # yöikoni puuttuu -> päiväikonin solu; muu koko CSS-muuttujalla
+    assert 'class="wx wx-d410"' in wi.render_foreca_icon("n410", size=40)
+    assert "--wx:40px" in wi.render_foreca_icon("n410", size=40)
+    assert wi.render_foreca_icon("d410", sprite=False).startswith("<img ")
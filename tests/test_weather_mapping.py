@@ -1,6 +1,8 @@
 # tests/test_weather_mapping.py
 from __future__ import annotations
 
+import numpy as np
+
 import src.api.weather_utils as wu
 import src.api.wmo_foreca_code as wf
 
@@ -61,3 +63,53 @@ def test_wmo_to_foreca_code_falls_back_to_cloud_cover(monkeypatch):
 
     key = wf.wmo_to_foreca_code(999, True, pop=0, temp_c=10, cloudcover=5)
     assert key == "d000"
+
+
+def test_wmo_to_foreca_codes_matches_scalar_mapping(monkeypatch):
+    def fake_load():
+        return {"day": {999: "d999"}, "night": {}}
+
+    monkeypatch.setattr(wf, "load_wmo_foreca_map", fake_load)
+    monkeypatch.setattr("src.api.wmo_foreca_code.trace_map", lambda *a, **k: None)
+
+    codes = [None, 0, 1, 2, 3, 45, 48, 51, 61, 63, 65, 66, 71, 73, 75, 80, 82, 95, 999, 7]
+    rows = [
+        (code, is_day, pop, temp, cover)
+        for code in codes
+        for is_day in (True, False)
+        for pop in (None, 0, 65, 90)
+        for temp in (None, -5.0, 0.5, 8.0)
+        for cover in (None, 5, 50, 80, 95)
+    ]
+
+    def column(values):
+        return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+    code_col, day_col, pop_col, temp_col, cover_col = zip(*rows, strict=True)
+    keys = wf.wmo_to_foreca_codes(
+        column(code_col),
+        np.array(day_col),
+        column(pop_col),
+        column(temp_col),
+        column(cover_col),
+    )
+
+    expected = [
+        wf.wmo_to_foreca_code(code, is_day, pop=pop, temp_c=temp, cloudcover=cover)
+        for code, is_day, pop, temp, cover in rows
+    ]
+    assert keys.tolist() == expected
+
+
+def test_decision_table_matches_branching_logic():
+    table = wf.build_decision_table()
+    assert wf.verify_decision_table(table) == []
+
+    # rikottu taulu jää kiinni
+    flat = table.index(table.codes[61], True, 1, 3, 1)
+    broken = list(table.keys)
+    broken[flat] = "d999"
+    tampered = wf.DecisionTable(table.codes, table.cloud_bounds, tuple(broken), np.array(broken))
+    mismatches = wf.verify_decision_table(tampered)
+    assert mismatches
+    assert {m["wmo"] for m in mismatches} == {61}
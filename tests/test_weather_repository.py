@@ -0,0 +1,185 @@
+# tests/test_weather_repository.py
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+import src.api.weather_repository as wr
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(wr.time, "monotonic", fake.monotonic)
+    return fake
+
+
+def test_repository_caches_until_ttl(clock):
+    calls = []
+
+    def fetcher(locations, tz_name):
+        calls.append(locations)
+        return [{"n": len(calls)} for _ in locations]
+
+    repo = wr.ForecastRepository(fetcher, ttl_s=60)
+
+    assert repo.get(60.7, 24.7, "Europe/Helsinki").payload == {"n": 1}
+    clock.now += 30
+    assert repo.get(60.7, 24.7, "Europe/Helsinki").payload == {"n": 1}
+    clock.now += 31
+    assert repo.get(60.7, 24.7, "Europe/Helsinki").payload == {"n": 2}
+    assert calls == [((60.7, 24.7),), ((60.7, 24.7),)]
+
+
+def test_repository_refreshes_only_stale_locations_in_one_batch(clock):
+    calls = []
+
+    def fetcher(locations, tz_name):
+        calls.append(locations)
+        return [{"loc": loc} for loc in locations]
+
+    repo = wr.ForecastRepository(fetcher, ttl_s=60)
+    repo.register(60.7, 24.7, "Europe/Helsinki")
+    repo.register(60.2, 24.9, "Europe/Helsinki")
+
+    repo.get(60.7, 24.7, "Europe/Helsinki")
+    assert repo.get(60.2, 24.9, "Europe/Helsinki").payload == {"loc": (60.2, 24.9)}
+    assert len(calls) == 1
+
+    clock.now += 61
+    repo.get(60.2, 24.9, "Europe/Helsinki")
+    assert calls[-1] == ((60.7, 24.7), (60.2, 24.9))
+
+
+def test_repository_serves_stale_entry_on_error(clock):
+    state = {"fail": False}
+
+    def fetcher(locations, tz_name):
+        if state["fail"]:
+            raise RuntimeError("down")
+        return [{"ok": True}]
+
+    repo = wr.ForecastRepository(fetcher, ttl_s=60)
+    entry = repo.get(60.7, 24.7, "UTC")
+
+    state["fail"] = True
+    clock.now += 120
+    assert repo.get(60.7, 24.7, "UTC") is entry
+
+    repo.clear()
+    with pytest.raises(RuntimeError):
+        repo.get(60.7, 24.7, "UTC")
+
+
+def test_repository_backs_off_after_failure(clock):
+    calls = []
+    state = {"fail": False}
+
+    def fetcher(locations, tz_name):
+        calls.append(locations)
+        if state["fail"]:
+            raise RuntimeError("down")
+        return [{"ok": True}]
+
+    repo = wr.ForecastRepository(fetcher, ttl_s=60, failure_backoff_s=30)
+    entry = repo.get(60.7, 24.7, "UTC")
+
+    state["fail"] = True
+    clock.now += 61
+    assert repo.get(60.7, 24.7, "UTC") is entry
+    # lähde alhaalla: vanha data ilman uutta hakua backoffin ajan
+    clock.now += 10
+    assert repo.get(60.7, 24.7, "UTC") is entry
+    assert len(calls) == 2
+
+    state["fail"] = False
+    clock.now += 21
+    assert repo.get(60.7, 24.7, "UTC").fetched_at == clock.now
+    assert len(calls) == 3
+
+
+def test_repository_backs_off_after_cold_start_failure(clock):
+    calls = []
+
+    def fetcher(locations, tz_name):
+        calls.append(locations)
+        raise RuntimeError("down")
+
+    repo = wr.ForecastRepository(fetcher, ttl_s=60, failure_backoff_s=30)
+    with pytest.raises(RuntimeError, match="down"):
+        repo.get(60.7, 24.7, "UTC")
+
+    # ei välimuistia: edellinen virhe ilman uutta hakua backoffin ajan
+    clock.now += 10
+    with pytest.raises(RuntimeError, match="down"):
+        repo.get(60.7, 24.7, "UTC")
+    assert len(calls) == 1
+
+    clock.now += 21
+    with pytest.raises(RuntimeError):
+        repo.get(60.7, 24.7, "UTC")
+    assert len(calls) == 2
+
+
+def test_repository_fetches_outside_lock_once_per_location():
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fetcher(locations, tz_name):
+        calls.append(locations)
+        if len(calls) == 2:
+            started.set()
+            release.wait(5)
+        return [{"n": len(calls)} for _ in locations]
+
+    repo = wr.ForecastRepository(fetcher, ttl_s=60)
+    repo.get(60.2, 24.9, "UTC")  # tuore paikka
+    repo.register(60.7, 24.7, "UTC")
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(repo.get(60.7, 24.7, "UTC")))
+        for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    assert started.wait(5)
+
+    # haku on käynnissä: tuoreen paikan lukija ei jää odottamaan
+    assert repo.get(60.2, 24.9, "UTC").payload == {"n": 1}
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 2  # kolme istuntoa, yksi haku
+    assert [r.payload for r in results] == [{"n": 2}] * 3
+
+
+def test_repository_rejects_payload_count_mismatch(clock):
+    repo = wr.ForecastRepository(lambda locations, tz_name: [], ttl_s=60)
+
+    with pytest.raises(ValueError, match="ennusteita 0, paikkoja 1"):
+        repo.get(60.7, 24.7, "UTC")
+
+
+def test_entry_memo_computes_once():
+    entry = wr.ForecastEntry(payload={}, fetched_at=0.0)
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return "axis"
+
+    assert entry.memo("time_axis", factory) == "axis"
+    assert entry.memo("time_axis", factory) == "axis"
+    assert calls == [1]
@@ -50,3 +50,13 @@ def test_safe_cast_basic():
     assert wu.safe_cast("12,5", float) == 12.5
     assert wu.safe_cast("12,0", int) == 12
     assert wu.safe_cast("maybe", bool) is None
+
+
+def test_safe_cast_treats_missing_values_as_none():
+    import pandas as pd
+
+    assert wu.safe_cast(float("nan"), float) is None
+    assert wu.safe_cast(pd.NA, int) is None
+    assert wu.safe_cast(pd.NaT, str) is None
+    assert wu.safe_cast(pd.Series([], dtype=float), float) is None
+    assert wu.safe_cast(pd.Series([3.0]), int) == 3
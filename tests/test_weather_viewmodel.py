@@ -13,14 +13,37 @@ def test_build_weather_view_delegates_and_formats(monkeypatch):
         return fake_weather
 
     monkeypatch.setattr("src.api.weather_viewmodel.fetch_weather_points", fake_fetch)
+    monkeypatch.setattr(
+        "src.api.weather_viewmodel.fetch_current", lambda *a: {"temp": 4.6, "feels_like": 1.0}
+    )
+
+    def failing_alerts(*a):
+        raise RuntimeError("alerts down")
+
+    monkeypatch.setattr("src.api.weather_viewmodel.fetch_alerts", failing_alerts)
 
     out = vm.build_weather_view("3 h")
 
     # palautusarvon rakenne
-    assert set(out.keys()) == {"points", "min_temp", "max_temp", "interval", "offsets"}
+    assert set(out.keys()) == {
+        "points",
+        "min_temp",
+        "max_temp",
+        "interval",
+        "offsets",
+        "current",
+        "alerts",
+    }
+    assert out["current"]["temp"] == 4.6
+    # varoitusten haun virhe ei kaada näkymää
+    assert out["alerts"] == []
     assert out["interval"] == "3 h"
     # viisi offsettia: (0,3,6,9,12)
     assert out["offsets"] == (0, 3, 6, 9, 12)
     # varmista delegointi
     assert called["args"][2] == "Europe/Helsinki"
     assert out["points"][0]["label"] == "Nyt"
+    # sisältötiiviste: sama näkyvä sisältö -> sama tiiviste
+    assert out["points"][0]["fp"] == vm.point_fingerprint(fake_points[0])
+    assert vm.point_fingerprint({**fake_points[0], "temp": 5.2}) == out["points"][0]["fp"]
+    assert vm.point_fingerprint({**fake_points[0], "key": "d400"}) != out["points"][0]["fp"]
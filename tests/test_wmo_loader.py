@@ -87,3 +87,67 @@ def test_load_wmo_foreca_map_uses_provided_df_and_not_file(monkeypatch):
     out = l.load_wmo_foreca_map(df)
     assert out["day"] == {1: "d123"}
     assert out["night"] == {1: "n123"}
+
+
+def _write_csv(path, day="d100"):
+    path.write_text(f"wmo,day,night\n1,{day},n100\n2,,n200\n", encoding="utf-8")
+
+
+def test_compile_wmo_map_roundtrip(tmp_path):
+    source = tmp_path / "map.csv"
+    target = tmp_path / "map.json"
+    _write_csv(source)
+
+    written = l.compile_wmo_map(source, target)
+    compiled = l.read_compiled_wmo_map(target)
+
+    assert compiled["day"] == {1: "d100", 2: "d100"}
+    assert compiled["night"] == {1: "n100", 2: "n200"}
+    assert compiled["version"] == written["version"]
+    # sama sisältö -> sama versio
+    assert l.compile_wmo_map(source, tmp_path / "again.json")["version"] == written["version"]
+
+
+def test_read_compiled_wmo_map_returns_none_for_broken_file(tmp_path):
+    target = tmp_path / "map.json"
+    target.write_text("{not json", encoding="utf-8")
+    assert l.read_compiled_wmo_map(target) is None
+    assert l.read_compiled_wmo_map(tmp_path / "missing.json") is None
+
+
+def _use_files(monkeypatch, source, target):
+    monkeypatch.setattr(l, "COMPILED_MAP_FILE", target)
+    monkeypatch.setattr(l, "find_wmo_source", lambda path=None: source)
+    l._load_default_map.cache_clear()
+
+
+def test_load_wmo_foreca_map_prefers_compiled_table(tmp_path, monkeypatch):
+    source = tmp_path / "map.csv"
+    target = tmp_path / "map.json"
+    _write_csv(source)
+    l.compile_wmo_map(source, target)
+    _use_files(monkeypatch, source, target)
+
+    def fail_read(path=None):
+        raise AssertionError("Excel/CSV should not be read when compiled table is fresh")
+
+    monkeypatch.setattr(l, "read_raw_wmo_mapping", fail_read)
+    assert l.load_wmo_foreca_map()["day"] == {1: "d100", 2: "d100"}
+
+
+def test_load_wmo_foreca_map_falls_back_when_source_changed(tmp_path, monkeypatch):
+    import os
+
+    source = tmp_path / "map.csv"
+    target = tmp_path / "map.json"
+    _write_csv(source)
+    l.compile_wmo_map(source, target)
+
+    _write_csv(source, day="d300")
+    stamp = target.stat().st_mtime + 10
+    os.utime(source, (stamp, stamp))
+    _use_files(monkeypatch, source, target)
+
+    real_read = l.read_raw_wmo_mapping
+    monkeypatch.setattr(l, "read_raw_wmo_mapping", lambda path=None: real_read(str(source)))
+    assert l.load_wmo_foreca_map()["day"] == {1: "d300", 2: "d300"}
@@ -25,9 +25,10 @@ def test_trace_map_enabled_adds_entries(monkeypatch):
     assert rec["reason"] == "ok"
 
 
-def test_trace_map_truncates_when_over_limit(monkeypatch):
-    t.clear_map_trace()
+def test_trace_map_keeps_last_capacity_entries(monkeypatch):
     monkeypatch.setattr(t, "MAP_TRACE_ENABLED", True)
+    monkeypatch.setattr(t, "_MAP_TRACE", t._MAP_TRACE)
+    t.configure_map_trace(capacity=100, sample_rate=1.0)
 
     # push 250 entries
     for i in range(250):
@@ -43,11 +44,19 @@ def test_trace_map_truncates_when_over_limit(monkeypatch):
 
     out = t.get_map_trace()
 
-    # Oikea lopullinen koko
-    assert len(out) == 169
-
-    # viimeinen säilynyt entry
+    # rengaspuskuri: kapasiteetin verran uusimpia, vanhin ensin
+    assert len(out) == 100
+    assert out[0]["wmo"] == 150
     assert out[-1]["wmo"] == 249
+    assert [r.wmo for r in t.map_trace_records()] == list(range(150, 250))
+
+
+def test_trace_map_samples_records(monkeypatch):
+    monkeypatch.setattr(t, "MAP_TRACE_ENABLED", True)
+    monkeypatch.setattr(t, "_MAP_TRACE", t._MAP_TRACE)
+    t.configure_map_trace(capacity=64, sample_rate=0.25)
+
+    for i in range(40):
+        t.trace_map(i, True, None, None, None, "d000", "ok")
 
-    # ensimmäinen säilynyt entry
-    assert out[0]["wmo"] == 81
+    assert [r["wmo"] for r in t.get_map_trace()] == list(range(0, 40, 4))